@@ -0,0 +1,446 @@
+"""
+Seeded benchmark datasets in the shapes the Notion API and Calendar events.list return.
+
+`build_dataset` returns the Notion pages, the events per calendar and the user setting that ties them
+together. The mix covers every sync action: unlinked tasks (create_gcal), linked tasks edited in Notion
+(update_gcal) or in Google (update_notion), and unlinked events (create_notion).
+
+`generate_dataset` builds the same triple at any size (10 to 100k units) with the inputs real accounts
+produce: all-day and timed items, expanded recurring instances with cancelled exceptions, emoji titles,
+descriptions over the Notion limit, tasks filed under another calendar than their event, invited events
+the user does not own, and several tasks pointing at one event. `describe_dataset` counts those features.
+
+  uv run python benchmarks/dataset.py --size 100000 --seed 7 --output runs/dataset.json
+"""
+
+import argparse
+import json
+import random
+import sys
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+
+DATABASE_ID = "benchmark-database"
+CALENDARS = {"Work": "work@benchmark.test", "Home": "home@benchmark.test"}
+FOREIGN_ORGANIZER = "organizer@elsewhere.test"
+PAGE_PROPERTY = {
+    "Task_Notion_Name": "Task Name",
+    "Date_Notion_Name": "Date",
+    "ExtraInfo_Notion_Name": "Extra Info",
+    "Location_Notion_Name": "Location",
+    "GCal_EventId_Notion_Name": "GCal Event Id",
+    "GCal_Name_Notion_Name": "Calendar",
+    "GCal_Sync_Time_Notion_Name": "GCal Sync Time",
+    "GCal_End_Date_Notion_Name": "GCal End Date",
+    "Delete_Notion_Name": "GCal Deleted?",
+    "CompleteIcon_Notion_Name": "Complete Icon",
+}
+START_DATE = date(2026, 5, 1)
+OLDER = "2026-04-01T00:00:00.000Z"
+NEWER = "2026-04-02T00:00:00.000Z"
+
+# Share of generated units per kind; see generate_dataset.
+DEFAULT_MIX = {
+    "linked": 0.35,
+    "task_only": 0.2,
+    "event_only": 0.2,
+    "recurring": 0.1,
+    "moved": 0.05,
+    "foreign": 0.05,
+    "duplicate": 0.05,
+}
+TIMED_SHARE = 0.6
+EMOJI_SHARE = 0.15
+LONG_DESCRIPTION_SHARE = 0.03
+CANCELLED_INSTANCE_SHARE = 0.2
+RECURRING_INSTANCES = (3, 8)
+NOTION_DESCRIPTION_LIMIT = 2000
+EMOJIS = ("🎉", "📅", "✅", "🚀", "☕", "🏃‍♀️", "👨‍👩‍👧")
+TITLE_WORDS = ("Review", "Plan", "Sync", "Call", "Write", "Gym", "Lunch", "Standup", "Ship", "Read")
+LOCATIONS = ("", "", "Room 4.02", "Café Central, Wien", "https://meet.example.test/abc")
+
+
+def build_user_setting() -> dict:
+    return {
+        "database_id": DATABASE_ID,
+        "timecode": "+00:00",
+        "timezone": "UTC",
+        "default_event_length": 60,
+        "after_date": "2026-04-01",
+        "before_date": "2026-08-01",
+        "google_timemin": "2026-04-01T00:00:00Z",
+        "google_timemax": "2026-08-01T00:00:00Z",
+        "gcal_name_dict": dict(CALENDARS),
+        "gcal_id_dict": {calendar_id: name for name, calendar_id in CALENDARS.items()},
+        "gcal_default_name": "Work",
+        "gcal_default_id": CALENDARS["Work"],
+        "page_property": dict(PAGE_PROPERTY),
+    }
+
+
+def _text(content: str) -> list:
+    return [{"type": "text", "text": {"content": content}, "plain_text": content}] if content else []
+
+
+def make_notion_page(
+    page_id,
+    title,
+    day,
+    calendar_name,
+    event_id="",
+    last_edited_time=NEWER,
+    start=None,
+    end=None,
+    description="",
+    location="",
+) -> dict:
+    """Notion page; `start`/`end` are Notion date strings and default to the all-day `day`."""
+    return {
+        "object": "page",
+        "id": page_id,
+        "archived": False,
+        "url": f"https://www.notion.so/{page_id}",
+        "last_edited_time": last_edited_time,
+        "properties": {
+            PAGE_PROPERTY["Task_Notion_Name"]: {"type": "title", "title": _text(title)},
+            PAGE_PROPERTY["Date_Notion_Name"]: {
+                "type": "date",
+                "date": {"start": start or day.isoformat(), "end": end},
+            },
+            PAGE_PROPERTY["ExtraInfo_Notion_Name"]: {"type": "rich_text", "rich_text": _text(description)},
+            PAGE_PROPERTY["Location_Notion_Name"]: {
+                "type": "place",
+                "place": {"lat": 0, "lon": 0, "address": location} if location else None,
+            },
+            PAGE_PROPERTY["GCal_EventId_Notion_Name"]: {"type": "rich_text", "rich_text": _text(event_id)},
+            PAGE_PROPERTY["GCal_Name_Notion_Name"]: {"type": "select", "select": {"name": calendar_name}},
+            PAGE_PROPERTY["GCal_Sync_Time_Notion_Name"]: {"type": "rich_text", "rich_text": []},
+            PAGE_PROPERTY["Delete_Notion_Name"]: {"type": "checkbox", "checkbox": False},
+            PAGE_PROPERTY["CompleteIcon_Notion_Name"]: {"type": "formula", "formula": {"string": "⏳"}},
+        },
+    }
+
+
+def make_gcal_event(
+    event_id, summary, day, calendar_id, updated=OLDER, start=None, end=None, description="", location=""
+) -> dict:
+    """Calendar event; `start`/`end` are datetimes for a timed event and default to the all-day `day`."""
+    event = {
+        "kind": "calendar#event",
+        "id": event_id,
+        "status": "confirmed",
+        "summary": summary,
+        "updated": updated,
+        "organizer": {"email": calendar_id},
+    }
+    if start is not None:
+        event["start"] = {"dateTime": start.isoformat(), "timeZone": "UTC"}
+        event["end"] = {"dateTime": end.isoformat(), "timeZone": "UTC"}
+    else:
+        event["start"] = {"date": day.isoformat()}
+        event["end"] = {"date": (day + timedelta(days=1)).isoformat()}
+    if description:
+        event["description"] = description
+    if location:
+        event["location"] = location
+    return event
+
+
+def build_dataset(task_count: int = 50, event_count: int = 50, seed: int = 0):
+    """Return (notion_pages, events_by_calendar, user_setting) for a reproducible mixed workload."""
+    rng = random.Random(seed)
+    calendar_names = sorted(CALENDARS)
+    pages = []
+    events_by_calendar = {calendar_id: [] for calendar_id in CALENDARS.values()}
+    linked = min(task_count // 2, event_count)
+
+    for index in range(task_count):
+        calendar_name = rng.choice(calendar_names)
+        day = START_DATE + timedelta(days=rng.randrange(90))
+        page_id = f"page-{index:06d}"
+        if index < linked:
+            event_id = f"evt{index:06d}"
+            notion_newer = index % 2 == 0
+            pages.append(
+                make_notion_page(
+                    page_id, f"Task {index}", day, calendar_name, event_id, NEWER if notion_newer else OLDER
+                )
+            )
+            events_by_calendar[CALENDARS[calendar_name]].append(
+                make_gcal_event(
+                    event_id, f"Task {index}", day, CALENDARS[calendar_name], OLDER if notion_newer else NEWER
+                )
+            )
+        else:
+            pages.append(make_notion_page(page_id, f"Task {index}", day, calendar_name))
+
+    for index in range(linked, event_count):
+        calendar_id = CALENDARS[rng.choice(calendar_names)]
+        day = START_DATE + timedelta(days=rng.randrange(90))
+        events_by_calendar[calendar_id].append(make_gcal_event(f"evt{index:06d}", f"Event {index}", day, calendar_id))
+
+    return pages, events_by_calendar, build_user_setting()
+
+
+def _unit_kinds(size: int, mix: dict, rng: random.Random) -> list[str]:
+    """Split `size` units over the mix by largest remainder, then shuffle the order."""
+    total = sum(mix.values())
+    shares = {kind: size * weight / total for kind, weight in sorted(mix.items())}
+    counts = {kind: int(share) for kind, share in shares.items()}
+    remainders = sorted(shares, key=lambda kind: (counts[kind] - shares[kind], kind))
+    for kind in remainders[: size - sum(counts.values())]:
+        counts[kind] += 1
+    kinds = [kind for kind, count in counts.items() for _ in range(count)]
+    rng.shuffle(kinds)
+    return kinds
+
+
+class _ItemFactory:
+    """Draws the per-item variety (title, schedule, description, location) from one seeded generator."""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+    def title(self, index: int) -> str:
+        title = f"{self.rng.choice(TITLE_WORDS)} {self.rng.choice(TITLE_WORDS).lower()} #{index}"
+        if self.rng.random() < EMOJI_SHARE:
+            title = f"{self.rng.choice(EMOJIS)} {title}"
+        return title
+
+    def description(self) -> str:
+        if self.rng.random() < LONG_DESCRIPTION_SHARE:
+            return "Notes. " * (NOTION_DESCRIPTION_LIMIT // 7 + 1 + self.rng.randrange(300))
+        return self.rng.choice(("", "", "Agenda: see doc.", "Bring laptop 💻"))
+
+    def schedule(self):
+        """Return (day, start, end): `start`/`end` are None for an all-day item."""
+        day = START_DATE + timedelta(days=self.rng.randrange(90))
+        if self.rng.random() >= TIMED_SHARE:
+            return day, None, None
+        start = datetime.combine(day, time(self.rng.randrange(7, 20), self.rng.choice((0, 15, 30, 45))), timezone.utc)
+        return day, start, start + timedelta(minutes=self.rng.choice((15, 30, 60, 90)))
+
+    def location(self) -> str:
+        return self.rng.choice(LOCATIONS)
+
+
+def _notion_dates(start, end):
+    if start is None:
+        return None, None
+    return start.isoformat(timespec="milliseconds"), end.isoformat(timespec="milliseconds")
+
+
+def _pair(factory, index, page_calendar, event_calendar, notion_newer, duplicates=0):
+    """One event plus the Notion page(s) linked to it; returns (pages, event)."""
+    title = factory.title(index)
+    day, start, end = factory.schedule()
+    description = factory.description()
+    location = factory.location()
+    event_id = f"evt{index:06d}"
+    event = make_gcal_event(
+        event_id,
+        title,
+        day,
+        CALENDARS[event_calendar],
+        OLDER if notion_newer else NEWER,
+        start,
+        end,
+        description,
+        location,
+    )
+    page_start, page_end = _notion_dates(start, end)
+    pages = [
+        make_notion_page(
+            f"page-{index:06d}" + (f"-dup{copy}" if copy else ""),
+            title,
+            day,
+            page_calendar,
+            event_id,
+            NEWER if notion_newer else OLDER,
+            page_start,
+            page_end,
+            description,
+            location,
+        )
+        for copy in range(duplicates + 1)
+    ]
+    return pages, event
+
+
+def _recurring_instances(factory, index, calendar_id) -> list[dict]:
+    """singleEvents=true expansion of one weekly series, with some instances cancelled."""
+    rng = factory.rng
+    series_id = f"rec{index:06d}"
+    title = factory.title(index)
+    day, start, end = factory.schedule()
+    instances = []
+    for week in range(rng.randint(*RECURRING_INSTANCES)):
+        shift = timedelta(weeks=week)
+        if start is None:
+            instance_id = f"{series_id}_{(day + shift):%Y%m%d}"
+            original_start = {"date": (day + shift).isoformat()}
+        else:
+            instance_id = f"{series_id}_{(start + shift):%Y%m%dT%H%M%SZ}"
+            original_start = {"dateTime": (start + shift).isoformat(), "timeZone": "UTC"}
+        if rng.random() < CANCELLED_INSTANCE_SHARE:
+            # Cancelled exceptions come back without summary or start, only the original slot.
+            instances.append(
+                {
+                    "kind": "calendar#event",
+                    "id": instance_id,
+                    "status": "cancelled",
+                    "recurringEventId": series_id,
+                    "originalStartTime": original_start,
+                }
+            )
+            continue
+        event = make_gcal_event(
+            instance_id,
+            title,
+            day + shift,
+            calendar_id,
+            OLDER,
+            None if start is None else start + shift,
+            None if end is None else end + shift,
+        )
+        event.update(recurringEventId=series_id, originalStartTime=original_start)
+        instances.append(event)
+    return instances
+
+
+def generate_dataset(size: int = 1000, seed: int = 0, mix: dict | None = None):
+    """
+    Return (notion_pages, events_by_calendar, user_setting) with `size` units drawn from `mix`.
+
+    Unit kinds: linked (page + event on one calendar), task_only, event_only, recurring (one weekly series,
+    3-8 instances), moved (page filed under the other calendar), foreign (invited event, not owned) and
+    duplicate (two pages linked to one event). The same seed always yields the same payloads.
+    """
+    rng = random.Random(seed)
+    factory = _ItemFactory(rng)
+    calendar_names = sorted(CALENDARS)
+    pages = []
+    events_by_calendar = {calendar_id: [] for calendar_id in CALENDARS.values()}
+
+    for index, kind in enumerate(_unit_kinds(max(int(size), 0), mix or DEFAULT_MIX, rng)):
+        calendar_name = rng.choice(calendar_names)
+        calendar_id = CALENDARS[calendar_name]
+        if kind in ("linked", "moved", "duplicate"):
+            page_calendar = calendar_name
+            if kind == "moved":
+                page_calendar = next(name for name in calendar_names if name != calendar_name)
+            unit_pages, event = _pair(
+                factory, index, page_calendar, calendar_name, rng.random() < 0.5, duplicates=int(kind == "duplicate")
+            )
+            pages.extend(unit_pages)
+            events_by_calendar[calendar_id].append(event)
+        elif kind == "task_only":
+            day, start, end = factory.schedule()
+            page_start, page_end = _notion_dates(start, end)
+            pages.append(
+                make_notion_page(
+                    f"page-{index:06d}",
+                    factory.title(index),
+                    day,
+                    calendar_name,
+                    start=page_start,
+                    end=page_end,
+                    description=factory.description(),
+                    location=factory.location(),
+                )
+            )
+        elif kind == "recurring":
+            events_by_calendar[calendar_id].extend(_recurring_instances(factory, index, calendar_id))
+        else:
+            day, start, end = factory.schedule()
+            event = make_gcal_event(
+                f"evt{index:06d}",
+                factory.title(index),
+                day,
+                calendar_id,
+                OLDER,
+                start,
+                end,
+                factory.description(),
+                factory.location(),
+            )
+            if kind == "foreign":
+                event["organizer"] = {"email": FOREIGN_ORGANIZER}
+            events_by_calendar[calendar_id].append(event)
+
+    return pages, events_by_calendar, build_user_setting()
+
+
+def _plain_text(page: dict, column: str, key: str = "rich_text") -> str:
+    items = page["properties"].get(column, {}).get(key) or []
+    return items[0].get("plain_text", "") if items else ""
+
+
+def describe_dataset(pages: list[dict], events_by_calendar: dict[str, list[dict]]) -> dict:
+    """Count the features a generated dataset exercises."""
+    events = [event for calendar_events in events_by_calendar.values() for event in calendar_events]
+    live = [event for event in events if event.get("status") != "cancelled"]
+    event_calendar = {event["id"]: calendar_id for calendar_id, items in events_by_calendar.items() for event in items}
+    owned = set(CALENDARS.values())
+
+    linked_ids = []
+    mismatched = 0
+    for page in pages:
+        event_id = _plain_text(page, PAGE_PROPERTY["GCal_EventId_Notion_Name"])
+        if not event_id:
+            continue
+        linked_ids.append(event_id)
+        page_calendar = (page["properties"][PAGE_PROPERTY["GCal_Name_Notion_Name"]].get("select") or {}).get("name")
+        if event_id in event_calendar and CALENDARS.get(page_calendar) != event_calendar[event_id]:
+            mismatched += 1
+
+    titles = [_plain_text(page, PAGE_PROPERTY["Task_Notion_Name"], "title") for page in pages]
+    titles += [event.get("summary", "") for event in live]
+    return {
+        "pages": len(pages),
+        "events": len(events),
+        "all_day": sum("date" in event["start"] for event in live),
+        "timed": sum("dateTime" in event["start"] for event in live),
+        "recurring_instances": sum("recurringEventId" in event for event in events),
+        "cancelled": len(events) - len(live),
+        "emoji_titles": sum(any(mark in title for mark in EMOJIS) for title in titles),
+        "long_descriptions": sum(len(event.get("description") or "") > NOTION_DESCRIPTION_LIMIT for event in live),
+        "foreign_events": sum((event.get("organizer") or {}).get("email") not in owned for event in live),
+        "mismatched_calendars": mismatched,
+        "duplicate_links": len(linked_ids) - len(set(linked_ids)),
+    }
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Write a seeded synthetic Notion/GCal dataset as JSON.")
+    parser.add_argument("--size", type=int, default=1000, help="Units to generate (default 1000)")
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed")
+    parser.add_argument("--output", help="JSON file for pages, events_by_calendar and user_setting")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    pages, events_by_calendar, user_setting = generate_dataset(args.size, args.seed)
+    profile = describe_dataset(pages, events_by_calendar)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        payload = {"pages": pages, "events_by_calendar": events_by_calendar, "user_setting": user_setting}
+        Path(args.output).write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    json.dump(profile, sys.stdout, indent=2)
+    print()
+
+
+__all__ = [
+    "DEFAULT_MIX",
+    "build_dataset",
+    "build_user_setting",
+    "describe_dataset",
+    "generate_dataset",
+    "make_gcal_event",
+    "make_notion_page",
+]
+
+
+if __name__ == "__main__":
+    main()
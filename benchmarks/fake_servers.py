@@ -0,0 +1,299 @@
+"""
+Local HTTP stand-ins for the Notion and Google Calendar endpoints the sync uses.
+
+Both servers keep their dataset in memory, answer over real loopback HTTP and count every request per
+endpoint, so the real service classes, connection pools and retry policy are exercised without network
+access. Latency, page size and a seeded error rate are configurable per server.
+
+Notion:   POST /v1/databases/{id}/query, POST /v1/pages, PATCH /v1/pages/{id}
+Calendar: GET/POST /calendar/v3/calendars/{cal}/events, PATCH/DELETE .../events/{id}, POST .../events/{id}/move
+"""
+
+import copy
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+class FakeApiServer:
+    """Threaded loopback HTTP server with latency, error injection and per-endpoint counters."""
+
+    def __init__(self, latency_ms: float = 0.0, error_rate: float = 0.0, error_status: int = 503, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.call_counts: dict[str, int] = {}
+        self.error_counts: dict[str, int] = {}
+        self.bytes_sent = 0
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeApiServer":
+        server_ref = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; avoid Nagle + delayed-ACK stalls on keep-alive.
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw_body = self.rfile.read(length) if length else b""
+                body = json.loads(raw_body) if raw_body else None
+                status, payload = server_ref._dispatch(self.command, self.path, body)
+                content = b"" if payload is None else json.dumps(payload).encode()
+                self.send_response(status)
+                if content:
+                    self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+                with server_ref._lock:
+                    server_ref.bytes_sent += len(content)
+
+            do_GET = do_POST = do_PATCH = do_DELETE = _handle
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.call_counts = {}
+            self.error_counts = {}
+            self.bytes_sent = 0
+
+    def _dispatch(self, method: str, raw_path: str, body):
+        parts = urlsplit(raw_path)
+        path = [unquote(segment) for segment in parts.path.strip("/").split("/")]
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        endpoint = self.endpoint_name(method, path)
+        with self._lock:
+            self.call_counts[endpoint] = self.call_counts.get(endpoint, 0) + 1
+            inject_error = self.error_rate > 0 and self._random.random() < self.error_rate
+            if inject_error:
+                self.error_counts[endpoint] = self.error_counts.get(endpoint, 0) + 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        if inject_error:
+            return self.error_status, {"error": {"code": self.error_status, "message": "injected"}}
+        with self._lock:
+            return self.handle(method, path, query, body)
+
+    def endpoint_name(self, method: str, path: list[str]) -> str:
+        raise NotImplementedError
+
+    def handle(self, method: str, path: list[str], query: dict, body):
+        raise NotImplementedError
+
+
+def _rich_text(content: str) -> list:
+    return [{"type": "text", "text": {"content": content}, "plain_text": content}] if content else []
+
+
+def _apply_notion_properties(page: dict, properties: dict) -> None:
+    """Store written properties in the shape Notion returns on read (plain_text next to text.content)."""
+    for name, value in properties.items():
+        stored = copy.deepcopy(value)
+        for key in ("rich_text", "title"):
+            if key in stored:
+                stored[key] = [
+                    item for part in stored[key] for item in _rich_text((part.get("text") or {}).get("content") or "")
+                ]
+        page["properties"].setdefault(name, {}).update(stored)
+    page["last_edited_time"] = _now_iso()
+
+
+def _matches(page: dict, condition: dict) -> bool:
+    """Evaluate the subset of Notion filters the sync sends; date and formula conditions always match."""
+    if "and" in condition:
+        return all(_matches(page, part) for part in condition["and"])
+    if "or" in condition:
+        return any(_matches(page, part) for part in condition["or"])
+    value = page["properties"].get(condition.get("property"), {})
+    if "checkbox" in condition:
+        return bool(value.get("checkbox")) == condition["checkbox"]["equals"]
+    if "rich_text" in condition:
+        text = "".join(item.get("plain_text", "") for item in value.get("rich_text", []))
+        check = condition["rich_text"]
+        if "equals" in check:
+            return text == check["equals"]
+        if "is_empty" in check:
+            return not text
+        if "is_not_empty" in check:
+            return bool(text)
+    return True
+
+
+class FakeNotionServer(FakeApiServer):
+    """In-memory Notion database: filtered query with pagination, page create, retrieve, update and archive."""
+
+    def __init__(self, pages: list[dict] | None = None, page_size: int = 100, **kwargs):
+        super().__init__(**kwargs)
+        self.page_size = page_size
+        self.pages: dict[str, dict] = {}
+        self.load(pages or [])
+
+    def load(self, pages: list[dict]) -> None:
+        with self._lock:
+            self.pages = {page["id"]: copy.deepcopy(page) for page in pages}
+
+    def endpoint_name(self, method, path):
+        if path[-1:] == ["query"]:
+            return "databases.query"
+        return {"POST": "pages.create", "GET": "pages.retrieve"}.get(method, "pages.update")
+
+    def handle(self, method, path, query, body):
+        body = body or {}
+        if path[-1:] == ["query"]:
+            return 200, self._query(body)
+        if method == "POST" and path[-1:] == ["pages"]:
+            page = {
+                "object": "page",
+                "id": str(uuid.uuid4()),
+                "archived": False,
+                "last_edited_time": _now_iso(),
+                "properties": {},
+            }
+            _apply_notion_properties(page, body.get("properties") or {})
+            self.pages[page["id"]] = page
+            return 200, page
+        if method == "GET" and len(path) >= 3:
+            page = self.pages.get(path[2])
+            if page is None:
+                return 404, {"object": "error", "status": 404, "code": "object_not_found", "message": "missing"}
+            return 200, copy.deepcopy(page)
+        if method == "PATCH" and len(path) >= 3:
+            page = self.pages.get(path[2])
+            if page is None:
+                return 404, {"object": "error", "status": 404, "code": "object_not_found", "message": "missing"}
+            _apply_notion_properties(page, body.get("properties") or {})
+            if "archived" in body:
+                page["archived"] = bool(body["archived"])
+            return 200, page
+        return 404, {"object": "error", "status": 404, "code": "invalid_request_url", "message": "unknown"}
+
+    def _query(self, body: dict) -> dict:
+        condition = body.get("filter") or {}
+        rows = [page for page in self.pages.values() if not page.get("archived") and _matches(page, condition)]
+        for sort in reversed(body.get("sorts") or []):
+            if sort.get("timestamp") == "last_edited_time":
+                rows.sort(key=lambda page: page["last_edited_time"], reverse=sort.get("direction") == "descending")
+        page_size = min(int(body.get("page_size") or 100), self.page_size)
+        start = int(body.get("start_cursor") or 0)
+        end = start + page_size
+        chunk = rows[start:end]
+        has_more = end < len(rows)
+        return {
+            "object": "list",
+            "results": copy.deepcopy(chunk),
+            "has_more": has_more,
+            "next_cursor": str(end) if has_more else None,
+        }
+
+
+class FakeCalendarServer(FakeApiServer):
+    """In-memory Google calendars: events list (paginated, filterable), insert, patch, delete and move."""
+
+    def __init__(self, events_by_calendar: dict[str, list[dict]] | None = None, page_size: int = 2500, **kwargs):
+        super().__init__(**kwargs)
+        self.page_size = page_size
+        self.calendars: dict[str, dict[str, dict]] = {}
+        self.load(events_by_calendar or {})
+
+    def load(self, events_by_calendar: dict[str, list[dict]]) -> None:
+        with self._lock:
+            self.calendars = {
+                calendar_id: {event["id"]: copy.deepcopy(event) for event in events}
+                for calendar_id, events in events_by_calendar.items()
+            }
+
+    def endpoint_name(self, method, path):
+        if path[-1:] == ["move"]:
+            return "events.move"
+        if path[-1:] == ["events"]:
+            return "events.list" if method == "GET" else "events.insert"
+        return {"PATCH": "events.patch", "DELETE": "events.delete", "GET": "events.get"}.get(method, "events.unknown")
+
+    def handle(self, method, path, query, body):
+        # calendar/v3/calendars/{calendar_id}/events[/{event_id}[/move]]
+        calendar_id = path[3] if len(path) > 3 else ""
+        events = self.calendars.setdefault(calendar_id, {})
+        event_id = path[5] if len(path) > 5 else None
+        if event_id is None and method == "GET":
+            return 200, self._list(events, query)
+        if event_id is None and method == "POST":
+            # Client-specified ids are honoured, and a reused one is a conflict, as in the real API.
+            client_event_id = (body or {}).get("id")
+            if client_event_id in events:
+                return 409, {"error": {"code": 409, "message": "The requested identifier already exists."}}
+            event = {**(body or {}), "id": client_event_id or uuid.uuid4().hex, "status": "confirmed"}
+            event.update(updated=_now_iso(), organizer={"email": calendar_id})
+            events[event["id"]] = event
+            return 200, event
+        if event_id not in events:
+            return 404, {"error": {"code": 404, "message": "Not Found"}}
+        if path[-1] == "move":
+            event = events.pop(event_id)
+            event.update(updated=_now_iso(), organizer={"email": query.get("destination")})
+            self.calendars.setdefault(query.get("destination"), {})[event_id] = event
+            return 200, event
+        if method == "PATCH":
+            events[event_id].update(body or {})
+            events[event_id]["updated"] = _now_iso()
+            return 200, events[event_id]
+        if method == "DELETE":
+            del events[event_id]
+            return 204, None
+        return 200, events[event_id]
+
+    def _list(self, events: dict, query: dict) -> dict:
+        items = list(events.values())
+        if query.get("updatedMin"):
+            items = [item for item in items if item.get("updated", "") >= query["updatedMin"]]
+        if query.get("privateExtendedProperty"):
+            name, _, value = query["privateExtendedProperty"].partition("=")
+            items = [item for item in items if item.get("extendedProperties", {}).get("private", {}).get(name) == value]
+        page_size = min(int(query.get("maxResults") or self.page_size), self.page_size)
+        start = int(query.get("pageToken") or 0)
+        end = start + page_size
+        response = {"kind": "calendar#events", "items": copy.deepcopy(items[start:end])}
+        if end < len(items):
+            response["nextPageToken"] = str(end)
+        return response
+
+
+__all__ = ["FakeApiServer", "FakeCalendarServer", "FakeNotionServer"]
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""Offline end-to-end sync benchmark.
+
+Runs `synchronize_notion_and_google_calendar` (or the asyncio engine) with the real service classes
+against local fake Notion and Calendar servers. Nothing leaves the machine. Each iteration starts from the
+same seeded dataset. The report has p50/p95/max sync latency, API calls per endpoint, response bytes and peak
+RSS. Pass a previous report as `--baseline` to fail on a p95 regression.
+
+Examples:
+  uv run python benchmarks/run_benchmark.py --tasks 200 --events 200 --iterations 5 --latency-ms 20
+  uv run python benchmarks/run_benchmark.py --engine async --output runs/bench.json --baseline runs/base.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import resource
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+from google.oauth2.credentials import Credentials
+from requests.adapters import HTTPAdapter
+
+# Make repo root and src importable regardless of cwd.
+_BENCH_DIR = Path(__file__).resolve().parent
+_REPO_ROOT = _BENCH_DIR.parent
+_SRC = _REPO_ROOT / "src"
+for _p in (_REPO_ROOT, _SRC):
+    p_str = str(_p)
+    if p_str not in sys.path:
+        sys.path.insert(0, p_str)
+
+from benchmarks.dataset import build_dataset, describe_dataset, generate_dataset  # noqa: E402
+from benchmarks.fake_servers import FakeCalendarServer, FakeNotionServer  # noqa: E402
+
+GOOGLE_API_ORIGIN = "https://www.googleapis.com"
+
+
+def _percentile(sorted_values: list, fraction: float):
+    if not sorted_values:
+        return None
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _redirect(url: httpx.URL, target: httpx.URL) -> httpx.URL:
+    return url.copy_with(scheme=target.scheme, host=target.host, port=target.port)
+
+
+class _RedirectTransport(httpx.BaseTransport):
+    """Send every request to the fake server, keeping path and query."""
+
+    def __init__(self, target: str):
+        self.target = httpx.URL(target)
+        self.transport = httpx.HTTPTransport()
+
+    def handle_request(self, request):
+        request.url = _redirect(request.url, self.target)
+        request.headers["Host"] = self.target.netloc.decode()
+        return self.transport.handle_request(request)
+
+    def close(self):
+        self.transport.close()
+
+
+class _AsyncRedirectTransport(httpx.AsyncBaseTransport):
+    def __init__(self, target: str):
+        self.target = httpx.URL(target)
+        self.transport = httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request):
+        request.url = _redirect(request.url, self.target)
+        request.headers["Host"] = self.target.netloc.decode()
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class _RedirectAdapter(HTTPAdapter):
+    """requests adapter that rewrites the Google API origin to the fake Calendar server."""
+
+    def __init__(self, target: str, **kwargs):
+        super().__init__(**kwargs)
+        self.target = target.rstrip("/")
+
+    def send(self, request, **kwargs):
+        request.url = self.target + request.url.removeprefix(GOOGLE_API_ORIGIN)
+        return super().send(request, **kwargs)
+
+
+def _google_token():
+    return SimpleNamespace(credentials=Credentials(token="benchmark-token"))
+
+
+def _configure(service, keep_rate_limits: bool):
+    if not keep_rate_limits:
+        service.rate_limiter = None
+
+
+def _build_blocking_services(user_setting, notion_url, calendar_url, keep_rate_limits):
+    from gcal.gcal_service import GoogleService
+    from notion.notion_service import NotionService
+
+    logger = logging.getLogger("benchmark")
+    notion_service = NotionService(
+        "benchmark-token", user_setting, logger, http_client=httpx.Client(transport=_RedirectTransport(notion_url))
+    )
+    google_service = GoogleService(user_setting, _google_token(), logger)
+    adapter = _RedirectAdapter(calendar_url, pool_connections=1, pool_maxsize=google_service.http.pool_maxsize)
+    google_service.http.session.mount(GOOGLE_API_ORIGIN + "/", adapter)
+    _configure(notion_service, keep_rate_limits)
+    _configure(google_service, keep_rate_limits)
+    return notion_service, google_service
+
+
+def _run_blocking_once(user_setting, notion_url, calendar_url, keep_rate_limits):
+    from sync.sync import synchronize_notion_and_google_calendar
+    from sync.sync_checkpoint import SyncCheckpoint
+
+    notion_service, google_service = _build_blocking_services(user_setting, notion_url, calendar_url, keep_rate_limits)
+    try:
+        return synchronize_notion_and_google_calendar(
+            user_setting, notion_service, google_service, checkpoint=SyncCheckpoint()
+        )
+    finally:
+        google_service.close()
+        notion_service.http_client.close()
+
+
+async def _run_async_once(user_setting, notion_url, calendar_url, keep_rate_limits):
+    from gcal.gcal_service_async import AsyncGoogleService
+    from notion.notion_service_async import AsyncNotionService
+    from sync.sync_async import synchronize_notion_and_google_calendar_async
+    from sync.sync_checkpoint import SyncCheckpoint
+
+    logger = logging.getLogger("benchmark")
+    notion_service = AsyncNotionService(
+        "benchmark-token",
+        user_setting,
+        logger,
+        http_client=httpx.AsyncClient(transport=_AsyncRedirectTransport(notion_url)),
+    )
+    google_service = AsyncGoogleService(
+        user_setting,
+        _google_token(),
+        logger,
+        http_client=httpx.AsyncClient(transport=_AsyncRedirectTransport(calendar_url)),
+    )
+    _configure(notion_service, keep_rate_limits)
+    _configure(google_service, keep_rate_limits)
+    try:
+        return await synchronize_notion_and_google_calendar_async(
+            user_setting, notion_service, google_service, checkpoint=SyncCheckpoint()
+        )
+    finally:
+        await notion_service.aclose()
+        await google_service.aclose()
+
+
+def run_benchmark(
+    tasks: int = 50,
+    events: int = 50,
+    iterations: int = 3,
+    warmup: int = 1,
+    seed: int = 0,
+    engine: str = "blocking",
+    latency_ms: float = 0.0,
+    error_rate: float = 0.0,
+    error_status: int = 503,
+    notion_page_size: int = 100,
+    calendar_page_size: int = 250,
+    keep_rate_limits: bool = False,
+    dataset: str = "simple",
+    size: int = 1000,
+) -> dict:
+    """Run the sync `warmup` + `iterations` times against fresh copies of one dataset and report the measured runs."""
+    from utils.retry_utils import reset_circuit_breakers
+
+    if dataset == "synthetic":
+        pages, events_by_calendar, user_setting = generate_dataset(size, seed)
+    else:
+        pages, events_by_calendar, user_setting = build_dataset(tasks, events, seed)
+    notion_server = FakeNotionServer(
+        pages,
+        page_size=notion_page_size,
+        latency_ms=latency_ms,
+        error_rate=error_rate,
+        error_status=error_status,
+        seed=seed,
+    )
+    calendar_server = FakeCalendarServer(
+        events_by_calendar,
+        page_size=calendar_page_size,
+        latency_ms=latency_ms,
+        error_rate=error_rate,
+        error_status=error_status,
+        seed=seed,
+    )
+    durations_ms = []
+    statuses = {}
+    api_calls = {}
+    injected_errors = 0
+    response_bytes = 0
+    last_result = None
+
+    with notion_server, calendar_server:
+        for run in range(max(int(warmup), 0) + max(int(iterations), 1)):
+            notion_server.load(pages)
+            calendar_server.load(events_by_calendar)
+            notion_server.reset_counters()
+            calendar_server.reset_counters()
+            reset_circuit_breakers()
+
+            started = time.perf_counter()
+            if engine == "async":
+                result = asyncio.run(
+                    _run_async_once(dict(user_setting), notion_server.url, calendar_server.url, keep_rate_limits)
+                )
+            else:
+                result = _run_blocking_once(
+                    dict(user_setting), notion_server.url, calendar_server.url, keep_rate_limits
+                )
+            duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            if run < warmup:
+                continue
+            durations_ms.append(duration_ms)
+
+            status = (result.get("body") or {}).get("status")
+            statuses[status] = statuses.get(status, 0) + 1
+            for provider, server in (("notion", notion_server), ("google", calendar_server)):
+                for endpoint, count in server.call_counts.items():
+                    key = f"{provider}.{endpoint}"
+                    api_calls[key] = api_calls.get(key, 0) + count
+                injected_errors += sum(server.error_counts.values())
+                response_bytes += server.bytes_sent
+            last_result = result
+
+    runs = len(durations_ms)
+    ordered = sorted(durations_ms)
+    message = (last_result.get("body") or {}).get("message") if last_result else None
+    summary = message.get("summary") if isinstance(message, dict) else {}
+    return {
+        "engine": engine,
+        "dataset": dataset,
+        "profile": describe_dataset(pages, events_by_calendar),
+        "seed": seed,
+        "iterations": runs,
+        "latency_ms": latency_ms,
+        "error_rate": error_rate,
+        "p50_ms": _percentile(ordered, 0.5),
+        "p95_ms": _percentile(ordered, 0.95),
+        "max_ms": ordered[-1],
+        "durations_ms": durations_ms,
+        "statuses": statuses,
+        "action_counts": (summary or {}).get("action_counts"),
+        "last_run_spans": ((summary or {}).get("timings") or {}).get("spans"),
+        "last_run_api_calls": (summary or {}).get("api_calls"),
+        "api_calls_per_run": {key: round(count / runs, 1) for key, count in sorted(api_calls.items())},
+        "injected_errors_per_run": round(injected_errors / runs, 1),
+        "response_bytes_per_run": int(response_bytes / runs),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def check_regression(report: dict, baseline: dict, max_regression: float) -> str | None:
+    """Return a failure message when p95 grew by more than `max_regression` (a fraction) over the baseline."""
+    base_p95 = baseline.get("p95_ms")
+    if not base_p95:
+        return None
+    limit = base_p95 * (1 + max_regression)
+    if report["p95_ms"] > limit:
+        return f"p95 {report['p95_ms']}ms exceeds baseline {base_p95}ms by more than {max_regression:.0%}"
+    return None
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline Notion-GCal sync benchmark against local fake servers.")
+    parser.add_argument(
+        "--dataset",
+        choices=("simple", "synthetic"),
+        default="simple",
+        help="simple: --tasks/--events with one of each action; synthetic: generate_dataset(--size)",
+    )
+    parser.add_argument("--tasks", type=int, default=50, help="Notion tasks in the simple dataset")
+    parser.add_argument("--events", type=int, default=50, help="Google Calendar events in the simple dataset")
+    parser.add_argument("--size", type=int, default=1000, help="Units in the synthetic dataset")
+    parser.add_argument("--iterations", type=int, default=3, help="Sync runs to measure")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured runs before the measured ones")
+    parser.add_argument("--seed", type=int, default=0, help="Dataset and error-injection seed")
+    parser.add_argument("--engine", choices=("blocking", "async"), default="blocking", help="Sync engine")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added latency per fake API response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an error")
+    parser.add_argument("--error-status", type=int, default=503, help="HTTP status of injected errors (default 503)")
+    parser.add_argument("--notion-page-size", type=int, default=100, help="Max rows per Notion query page")
+    parser.add_argument("--calendar-page-size", type=int, default=250, help="Max events per Calendar list page")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="Keep the provider token buckets enabled")
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--baseline", help="Previous JSON report to compare p95 against")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="Allowed p95 growth (default 0.25)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    report = run_benchmark(
+        tasks=args.tasks,
+        events=args.events,
+        iterations=args.iterations,
+        warmup=args.warmup,
+        seed=args.seed,
+        engine=args.engine,
+        latency_ms=args.latency_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        notion_page_size=args.notion_page_size,
+        calendar_page_size=args.calendar_page_size,
+        keep_rate_limits=args.keep_rate_limits,
+        dataset=args.dataset,
+        size=args.size,
+    )
+    print(json.dumps(report, indent=2))
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.baseline:
+        failure = check_regression(
+            report, json.loads(Path(args.baseline).read_text(encoding="utf-8")), args.max_regression
+        )
+        if failure:
+            print(f"\n[REGRESSION] {failure}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import functools
 import json
 import os
 import sys
@@ -19,6 +20,8 @@ from src.utils.lambda_utils import (  # noqa: E402
     process_eventbridge_event,
     process_sqs_records,
 )
+from src.utils.sync_deadline import SyncDeadline  # noqa: E402
+from src.utils.sync_profiler import profile_sync_run  # noqa: E402
 
 logger_obj = get_logger(__name__)
 
@@ -51,8 +54,22 @@ def _safe_error_payload(
     }
 
 
+def _with_deadline(run_sync, context: Any):
+    """Bind the invocation deadline so the sync stops taking new actions before the Lambda timeout."""
+    deadline = SyncDeadline.from_lambda_context(context)
+    if deadline is None:
+        return run_sync
+    return functools.partial(run_sync, deadline=deadline)
+
+
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """Dispatch Lambda events and preserve trigger-specific failure semantics."""
+    # Opt-in profiling of the whole invocation (SYNC_PROFILE); per-uuid profiles are taken in main() instead
+    with profile_sync_run(f"lambda-{getattr(context, 'aws_request_id', 'unknown')}"):
+        return _handle_event(event, context)
+
+
+def _handle_event(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     lambda_start_time = datetime.now(timezone.utc)
     event_type = "unknown"
 
@@ -72,7 +89,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 logger_obj,
                 event,
                 context,
-                run_sync_notion_and_google,
+                _with_deadline(run_sync_notion_and_google, context),
                 lambda_start_time,
             )
         elif event_type == "eventbridge":
@@ -82,7 +99,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 logger_obj,
                 event,
                 context,
-                run_sync_notion_and_google,
+                _with_deadline(run_sync_notion_and_google, context),
                 lambda_start_time,
             )
 
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""Batch sync runner for backfills and local load tests.
+
+Syncs many users (APP_MODE=cloud, by uuid) or many local Notion setting files (APP_MODE=local, by
+config path) with bounded concurrency. Every target runs isolated: its failure becomes an outcome row and
+never stops the batch. One row per target (timing, status, action counts) is appended to a JSONL or CSV
+file as soon as the target finishes, and the batch throughput is printed at the end.
+
+Examples:
+  uv run python scripts/batch_sync_runner.py --mode cloud --uuids-file uuids.txt --concurrency 8 \
+      --output runs/backfill.jsonl
+  uv run python scripts/batch_sync_runner.py --mode local --config config/a.json --config config/b.json \
+      --engine async --output runs/local.csv
+
+This helper does not print secret environment values.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Make repo root and src importable regardless of cwd.
+_SCRIPT_DIR = Path(__file__).resolve().parent
+_REPO_ROOT = _SCRIPT_DIR.parent
+_SRC = _REPO_ROOT / "src"
+for _p in (_REPO_ROOT, _SRC):
+    p_str = str(_p)
+    if p_str not in sys.path:
+        sys.path.insert(0, p_str)
+
+from scripts.local_invoke_sync_lambda import _set_and_validate_mode  # noqa: E402
+
+ROW_FIELDS = (
+    "target",
+    "kind",
+    "started_at",
+    "duration_ms",
+    "outcome",
+    "status_code",
+    "status",
+    "error_count",
+    "deferred_count",
+    "action_counts",
+    "error",
+)
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sync many Notion-GCal users or configs with bounded concurrency.")
+    parser.add_argument("--mode", required=True, choices=("cloud", "local"), help="Invocation mode")
+    parser.add_argument("--uuid", action="append", default=[], help="User UUID to sync (cloud; repeatable)")
+    parser.add_argument("--uuids-file", help="File with one user UUID per line (cloud; '#' comments allowed)")
+    parser.add_argument(
+        "--config", action="append", default=[], help="Local Notion setting JSON to sync (local; repeatable)"
+    )
+    parser.add_argument("--concurrency", type=int, default=4, help="Targets synced at the same time (default 4)")
+    parser.add_argument(
+        "--engine",
+        choices=("threads", "async"),
+        default="threads",
+        help="threads: main() on a thread pool; async: main_async() in one event loop",
+    )
+    parser.add_argument("--output", required=True, help="Result rows file; .csv writes CSV, anything else JSONL")
+    parser.add_argument("--verbose", action="store_true", help="Enable DEBUG-level logging")
+    return parser.parse_args(argv)
+
+
+def _read_uuids_file(path) -> list[str]:
+    uuids = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line:
+            uuids.append(line)
+    return uuids
+
+
+def build_targets(args) -> list[dict]:
+    """Return [{"target", "kind", "uuid", "config"}] for the requested mode."""
+    if args.mode == "cloud":
+        if args.config:
+            raise ValueError("--config is only supported in local mode.")
+        uuids = list(args.uuid)
+        if args.uuids_file:
+            uuids.extend(_read_uuids_file(args.uuids_file))
+        # Keep the first occurrence so a uuid is never synced twice in one batch.
+        uuids = list(dict.fromkeys(uuids))
+        if not uuids:
+            raise ValueError("cloud mode needs --uuid or --uuids-file.")
+        return [{"target": uuid, "kind": "uuid", "uuid": uuid, "config": None} for uuid in uuids]
+
+    if args.uuid or args.uuids_file:
+        raise ValueError("--uuid/--uuids-file are only supported in cloud mode.")
+    if not args.config:
+        raise ValueError("local mode needs at least one --config.")
+    from config.config import generate_config
+
+    targets = []
+    for config_path in dict.fromkeys(args.config):
+        path = Path(config_path).resolve()
+        config = generate_config(None, "local")
+        config["notion_setting_path"] = path
+        # Each config keeps its own checkpoint, watermark and retry ledger so concurrent targets never share a file.
+        config["sync_checkpoint_path"] = path.with_name(f"{path.stem}.sync-checkpoint.json")
+        config["sync_watermark_path"] = path.with_name(f"{path.stem}.sync-watermark.json")
+        config["sync_retry_ledger_path"] = path.with_name(f"{path.stem}.sync-retry-ledger.json")
+        targets.append({"target": str(config_path), "kind": "config", "uuid": None, "config": config})
+    return targets
+
+
+def build_row(target: dict, started_at: float, duration_seconds: float, result=None, exc=None) -> dict:
+    row = {
+        "target": target["target"],
+        "kind": target["kind"],
+        "started_at": datetime.fromtimestamp(started_at, timezone.utc).isoformat(),
+        "duration_ms": int(duration_seconds * 1000),
+        "outcome": "error",
+        "status_code": None,
+        "status": None,
+        "error_count": None,
+        "deferred_count": None,
+        "action_counts": None,
+        "error": None,
+    }
+    if exc is not None:
+        row["error"] = f"{type(exc).__name__}: {exc}"
+        return row
+    if not isinstance(result, dict):
+        row["error"] = "no_result"
+        return row
+    if "error" in result:
+        row["error"] = result["error"]
+        return row
+
+    body = result.get("body") or {}
+    message = body.get("message")
+    row["status_code"] = result.get("statusCode")
+    row["status"] = body.get("status")
+    if isinstance(message, dict):
+        summary = message.get("summary") or {}
+        row["error_count"] = len(message.get("errors") or [])
+        row["deferred_count"] = summary.get("deferred_count")
+        row["action_counts"] = summary.get("action_counts")
+    if row["status"] == "sync_success":
+        row["outcome"] = "ok"
+    elif row["status"] == "sync_partial":
+        row["outcome"] = "partial"
+    return row
+
+
+class RowWriter:
+    """Thread-safe JSONL/CSV writer that flushes each row as it is written."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.is_csv = self.path.suffix.lower() == ".csv"
+        self._file = self.path.open("w", encoding="utf-8", newline="")
+        self._lock = threading.Lock()
+        self._csv = None
+        if self.is_csv:
+            self._csv = csv.DictWriter(self._file, fieldnames=ROW_FIELDS)
+            self._csv.writeheader()
+
+    def write(self, row: dict) -> None:
+        with self._lock:
+            if self._csv is not None:
+                self._csv.writerow(
+                    {**row, "action_counts": json.dumps(row["action_counts"]) if row["action_counts"] else ""}
+                )
+            else:
+                self._file.write(json.dumps(row, default=str) + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _run_with_threads(targets, concurrency, writer) -> list[dict]:
+    from main import main as run_sync
+
+    def run_target(target):
+        started_at = time.time()
+        started = time.perf_counter()
+        try:
+            result = run_sync(uuid=target["uuid"], config=target["config"])
+            row = build_row(target, started_at, time.perf_counter() - started, result=result)
+        except Exception as exc:
+            row = build_row(target, started_at, time.perf_counter() - started, exc=exc)
+        writer.write(row)
+        return row
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch-sync") as executor:
+        return list(executor.map(run_target, targets))
+
+
+async def _run_with_asyncio(targets, concurrency, writer) -> list[dict]:
+    from main import main_async
+    from notion.notion_http import create_notion_async_transport
+
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = create_notion_async_transport()
+
+    async def run_target(target):
+        async with semaphore:
+            started_at = time.time()
+            started = time.perf_counter()
+            try:
+                result = await main_async(uuid=target["uuid"], notion_transport=transport, config=target["config"])
+                row = build_row(target, started_at, time.perf_counter() - started, result=result)
+            except Exception as exc:
+                row = build_row(target, started_at, time.perf_counter() - started, exc=exc)
+            writer.write(row)
+            return row
+
+    try:
+        return await asyncio.gather(*(run_target(target) for target in targets))
+    finally:
+        await transport.aclose()
+
+
+def run_batch(targets, concurrency: int, engine: str, writer) -> dict:
+    """Sync every target and return the batch summary."""
+    concurrency = max(int(concurrency), 1)
+    started = time.perf_counter()
+    if engine == "async":
+        rows = asyncio.run(_run_with_asyncio(targets, concurrency, writer))
+    else:
+        rows = _run_with_threads(targets, concurrency, writer)
+    wall_seconds = time.perf_counter() - started
+
+    outcomes = {}
+    for row in rows:
+        outcomes[row["outcome"]] = outcomes.get(row["outcome"], 0) + 1
+    durations = sorted(row["duration_ms"] for row in rows)
+    return {
+        "targets": len(rows),
+        "outcomes": outcomes,
+        "engine": engine,
+        "concurrency": concurrency,
+        "wall_seconds": round(wall_seconds, 3),
+        "users_per_minute": round(len(rows) / wall_seconds * 60, 2) if wall_seconds > 0 else None,
+        "p50_ms": durations[len(durations) // 2] if durations else None,
+        "max_ms": durations[-1] if durations else None,
+    }
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+
+    log_level = logging.DEBUG if args.verbose else logging.INFO
+    logging.basicConfig(
+        level=log_level,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+        datefmt="%H:%M:%S",
+    )
+
+    _set_and_validate_mode(args.mode)
+    try:
+        targets = build_targets(args)
+    except (OSError, ValueError) as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+    # main() parses sys.argv for its own CLI flags; the batch must not pass ours through.
+    sys.argv = [sys.argv[0] if sys.argv else __file__]
+    writer = RowWriter(args.output)
+    try:
+        summary = run_batch(targets, args.concurrency, args.engine, writer)
+    finally:
+        writer.close()
+
+    print("\n=== Batch Summary ===")
+    print(json.dumps(summary, indent=2))
+    if summary["outcomes"].get("error"):
+        print(f"\n[FAILURE] {summary['outcomes']['error']} target(s) failed. See {args.output}.", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -35,9 +35,15 @@ def generate_config(user_uuid: str = None, app_mode: str = None):
 
     if resolved_mode == "local":
         notion_setting_path = CURRENT_DIR / "config" / "local.notion-setting.json"
+        sync_checkpoint_path = CURRENT_DIR / "config" / "local.sync-checkpoint.json"
+        sync_watermark_path = CURRENT_DIR / "config" / "local.sync-watermark.json"
+        sync_retry_ledger_path = CURRENT_DIR / "config" / "local.sync-retry-ledger.json"
         return {
             "mode": "local",
             "notion_setting_path": notion_setting_path,
+            "sync_checkpoint_path": sync_checkpoint_path,
+            "sync_watermark_path": sync_watermark_path,
+            "sync_retry_ledger_path": sync_retry_ledger_path,
         }
 
     raise ConfigError(f"Unknown APP_MODE '{resolved_mode}'. Expected 'cloud' or 'local'.")
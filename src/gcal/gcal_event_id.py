@@ -0,0 +1,138 @@
+"""
+Client-specified Google Calendar event ids derived from the Notion page id.
+
+With GCAL_DETERMINISTIC_EVENT_IDS enabled, `create_gcal` inserts the event under an id computed from the Notion
+page id instead of a server-assigned one. A retried or resumed insert then gets 409 Conflict instead of creating
+a duplicate, and the id never has to be written back to Notion before the next run: the planner recomputes it for
+tasks whose GCal Event Id property is still empty.
+
+Every event body the sync writes is also stamped with private extended properties: the Notion page id, for
+reverse lookup with the `privateExtendedProperty` filter of events.list, and a hash of the synced content, so an
+update whose content matches what the sync last wrote, and that nobody changed in Google Calendar since, can be
+skipped.
+"""
+
+import base64
+import hashlib
+import json
+import os
+from datetime import timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from dateutil.parser import isoparse
+
+GCAL_DETERMINISTIC_EVENT_IDS_VAR = "GCAL_DETERMINISTIC_EVENT_IDS"
+TRUTHY_FLAG_VALUES = frozenset({"1", "true", "yes", "on"})
+# 20 bytes of SHA-256 encode to 32 base32hex characters, inside the API's 5-1024 character limit.
+_DIGEST_BYTES = 20
+NOTION_PAGE_ID_PROPERTY = "notionPageId"
+NOTION_CONTENT_HASH_PROPERTY = "notionContentHash"
+# Event body fields the sync writes; extendedProperties itself is excluded.
+CONTENT_HASH_FIELDS = ("summary", "location", "description", "start", "end", "source")
+_TEXT_FIELDS = ("summary", "location", "description")
+_TIME_FIELDS = ("start", "end")
+
+
+def deterministic_event_ids_enabled() -> bool:
+    return os.environ.get(GCAL_DETERMINISTIC_EVENT_IDS_VAR, "").strip().lower() in TRUTHY_FLAG_VALUES
+
+
+def deterministic_gcal_event_id(notion_page_id: str) -> str:
+    """
+    Return the Calendar event id for a Notion page: lowercase base32hex (`0-9a-v`), as the API requires.
+
+    Dashed and undashed forms of the same page id map to the same event id.
+    """
+    normalized = str(notion_page_id).replace("-", "").strip().lower()
+    digest = hashlib.sha256(normalized.encode("utf-8")).digest()[:_DIGEST_BYTES]
+    return base64.b32hexencode(digest).decode("ascii").lower().rstrip("=")
+
+
+def event_content_hash(event_body: dict) -> str:
+    """Return a stable hash of the synced fields of an event body (key order does not matter)."""
+    content = {field: event_body.get(field) for field in CONTENT_HASH_FIELDS}
+    encoded = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def stamp_notion_link(event_body: dict, notion_page_id: str | None) -> dict:
+    """Add the Notion page id and content hash to `event_body` as private extended properties; returns it."""
+    if not notion_page_id:
+        return event_body
+    event_body["extendedProperties"] = {
+        "private": {
+            NOTION_PAGE_ID_PROPERTY: str(notion_page_id),
+            NOTION_CONTENT_HASH_PROPERTY: event_content_hash(event_body),
+        }
+    }
+    return event_body
+
+
+def _private_property(gcal_event: dict | None, name: str) -> str | None:
+    return ((gcal_event or {}).get("extendedProperties") or {}).get("private", {}).get(name)
+
+
+def linked_notion_page_id(gcal_event: dict | None) -> str | None:
+    return _private_property(gcal_event, NOTION_PAGE_ID_PROPERTY)
+
+
+def linked_content_hash(gcal_event: dict | None) -> str | None:
+    return _private_property(gcal_event, NOTION_CONTENT_HASH_PROPERTY)
+
+
+def notion_page_id_filter(notion_page_id: str) -> str:
+    """Return the events.list `privateExtendedProperty` value that matches events of a Notion page."""
+    return f"{NOTION_PAGE_ID_PROPERTY}={notion_page_id}"
+
+
+def _event_time(value) -> tuple | None:
+    """Comparable form of an event start/end: the all-day date, or the UTC instant of a timed event."""
+    if not isinstance(value, dict):
+        return None
+    if value.get("date"):
+        return ("date", value["date"])
+    raw = value.get("dateTime")
+    if not raw:
+        return None
+    try:
+        moment = isoparse(raw)
+    except (TypeError, ValueError):
+        return ("dateTime", raw)
+    if moment.tzinfo is None:
+        try:
+            moment = moment.replace(tzinfo=ZoneInfo(value.get("timeZone") or "UTC"))
+        except (ZoneInfoNotFoundError, ValueError):
+            return ("dateTime", raw)
+    return ("dateTime", moment.astimezone(timezone.utc))
+
+
+def is_unchanged_since_last_sync(gcal_event: dict | None, event_body: dict) -> bool:
+    """
+    True when `gcal_event` still holds what the sync last wrote and that equals `event_body`.
+
+    The stored hash says what the sync wrote; the text fields and the start/end are compared against the live event
+    directly, so a title, description, location or time edited by hand in Google Calendar is still overwritten.
+    Times are compared as instants, since Google returns them with its own offset format.
+    """
+    stored_hash = linked_content_hash(gcal_event)
+    if not stored_hash or stored_hash != event_content_hash(event_body):
+        return False
+    if any((gcal_event.get(field) or "") != (event_body.get(field) or "") for field in _TEXT_FIELDS):
+        return False
+    return all(_event_time(gcal_event.get(field)) == _event_time(event_body.get(field)) for field in _TIME_FIELDS)
+
+
+__all__ = [
+    "CONTENT_HASH_FIELDS",
+    "GCAL_DETERMINISTIC_EVENT_IDS_VAR",
+    "NOTION_CONTENT_HASH_PROPERTY",
+    "NOTION_PAGE_ID_PROPERTY",
+    "deterministic_event_ids_enabled",
+    "deterministic_gcal_event_id",
+    "event_content_hash",
+    "is_unchanged_since_last_sync",
+    "linked_content_hash",
+    "linked_notion_page_id",
+    "notion_page_id_filter",
+    "stamp_notion_link",
+]
@@ -0,0 +1,165 @@
+"""
+Pooled, thread-safe HTTP transport for the Google Calendar client.
+
+`googleapiclient` defaults to one `httplib2.Http`, which is not thread-safe and keeps a single connection per
+host. `PooledHttp` adapts a `google.auth` `AuthorizedSession` (requests + urllib3 connection pool) to the
+`httplib2.Http.request` interface that `googleapiclient.discovery.build(http=...)` expects, so one pool of
+keep-alive TLS connections serves a whole sync and can be shared by concurrent fetches.
+
+`AsyncCalendarHttp` is the asyncio counterpart: Calendar v3 REST calls over an `httpx.AsyncClient`, raising
+the same `googleapiclient` `HttpError` so retry classification and 404/410 handling are unchanged.
+"""
+
+import asyncio
+import json
+import os
+from urllib.parse import quote
+
+import httplib2
+import httpx
+import requests
+from google.auth.transport.requests import AuthorizedSession, Request
+from googleapiclient.errors import HttpError
+from requests.adapters import HTTPAdapter
+
+from utils.api_metrics import record_response_bytes
+
+GOOGLE_HTTP_POOL_MAXSIZE_VAR = "GOOGLE_HTTP_POOL_MAXSIZE"
+GOOGLE_HTTP_TIMEOUT_SECONDS_VAR = "GOOGLE_HTTP_TIMEOUT_SECONDS"
+DEFAULT_GOOGLE_HTTP_POOL_MAXSIZE = 10
+DEFAULT_GOOGLE_HTTP_TIMEOUT_SECONDS = 30.0
+CALENDAR_API_BASE_URL = "https://www.googleapis.com/calendar/v3"
+
+# requests already decoded the body, so these no longer describe `content`.
+_DECODED_BODY_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+
+
+def _wire_size(response: requests.Response) -> int:
+    """Size of the body as it came over the wire, before gzip decoding."""
+    try:
+        # urllib3 counts the (still compressed) bytes it read off the socket.
+        return int(response.raw.tell())
+    except (AttributeError, TypeError, ValueError):
+        pass
+    try:
+        return int(response.headers.get("Content-Length") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _env_number(name: str, default, cast=float):
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return default
+    try:
+        value = cast(raw)
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+class PooledHttp:
+    """`httplib2.Http`-compatible adapter over a pooled `AuthorizedSession`."""
+
+    def __init__(self, credentials, pool_maxsize: int | None = None, timeout: float | None = None):
+        self.pool_maxsize = pool_maxsize or _env_number(
+            GOOGLE_HTTP_POOL_MAXSIZE_VAR, DEFAULT_GOOGLE_HTTP_POOL_MAXSIZE, int
+        )
+        self.timeout = timeout or _env_number(GOOGLE_HTTP_TIMEOUT_SECONDS_VAR, DEFAULT_GOOGLE_HTTP_TIMEOUT_SECONDS)
+        self.session = AuthorizedSession(credentials)
+        # Retries are handled by utils.retry_utils; urllib3 must not retry behind its back.
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.headers["Accept-Encoding"] = "gzip"
+        self.session.headers["Connection"] = "keep-alive"
+        # googleapiclient reads these attributes from the http object it is given.
+        self.credentials = credentials
+
+    def request(self, uri, method="GET", body=None, headers=None, redirections=5, connection_type=None):
+        try:
+            response = self.session.request(
+                method,
+                uri,
+                data=body,
+                headers=headers,
+                timeout=self.timeout,
+                allow_redirects=redirections > 0,
+            )
+        except requests.exceptions.Timeout as e:
+            raise TimeoutError(str(e)) from e
+        except requests.exceptions.ConnectionError as e:
+            raise ConnectionError(str(e)) from e
+
+        info = {key: value for key, value in response.headers.items() if key.lower() not in _DECODED_BODY_HEADERS}
+        info["status"] = str(response.status_code)
+        resp = httplib2.Response(info)
+        resp.reason = response.reason
+        content = response.content
+        record_response_bytes(_wire_size(response))
+        return resp, content
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncCalendarHttp:
+    """Minimal asyncio client for the Calendar v3 REST endpoints the sync uses."""
+
+    def __init__(self, credentials, client: httpx.AsyncClient | None = None, timeout: float | None = None):
+        self.credentials = credentials
+        timeout = timeout or _env_number(GOOGLE_HTTP_TIMEOUT_SECONDS_VAR, DEFAULT_GOOGLE_HTTP_TIMEOUT_SECONDS)
+        self.client = client or httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=_env_number(GOOGLE_HTTP_POOL_MAXSIZE_VAR, DEFAULT_GOOGLE_HTTP_POOL_MAXSIZE, int)
+            ),
+        )
+        self._refresh_lock = asyncio.Lock()
+
+    @staticmethod
+    def path(*segments: str) -> str:
+        return "/" + "/".join(quote(str(segment), safe="") for segment in segments)
+
+    async def _auth_headers(self) -> dict:
+        if not self.credentials.valid:
+            async with self._refresh_lock:
+                if not self.credentials.valid:
+                    # google-auth refreshes synchronously; keep it off the event loop.
+                    await asyncio.to_thread(self.credentials.refresh, Request())
+        headers = {"Accept-Encoding": "gzip"}
+        self.credentials.apply(headers)
+        return headers
+
+    async def request(self, method: str, path: str, params: dict | None = None, body: dict | None = None):
+        """Send one Calendar API request and return the decoded JSON body (None for empty responses)."""
+        headers = await self._auth_headers()
+        try:
+            response = await self.client.request(
+                method, CALENDAR_API_BASE_URL + path, params=params, json=body, headers=headers
+            )
+        except httpx.TimeoutException as e:
+            raise TimeoutError(str(e)) from e
+        except httpx.TransportError as e:
+            raise ConnectionError(str(e)) from e
+
+        record_response_bytes(response.num_bytes_downloaded)
+        if response.status_code >= 400:
+            info = {key: value for key, value in response.headers.items() if key.lower() not in _DECODED_BODY_HEADERS}
+            info["status"] = str(response.status_code)
+            resp = httplib2.Response(info)
+            resp.reason = response.reason_phrase
+            raise HttpError(resp, response.content, uri=str(response.request.url))
+        if not response.content:
+            return None
+        return json.loads(response.content)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+__all__ = [
+    "AsyncCalendarHttp",
+    "PooledHttp",
+    "GOOGLE_HTTP_POOL_MAXSIZE_VAR",
+    "GOOGLE_HTTP_TIMEOUT_SECONDS_VAR",
+]
@@ -3,6 +3,12 @@ from dateutil.parser import isoparse
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from google.auth.exceptions import RefreshError
+from gcal.gcal_event_id import is_unchanged_since_last_sync, notion_page_id_filter, stamp_notion_link
+from gcal.gcal_http import PooledHttp
+from utils.api_metrics import ApiCallStats
+from utils.rate_limiter import get_rate_limiter, google_rate_limit_scope
+from utils.retry_utils import RetryPolicy, RetryStats, call_with_retry, get_circuit_breaker
+from utils.sync_timings import SyncTimings
 
 
 class SettingError(Exception):
@@ -19,17 +25,47 @@ MAX_GCAL_EVENTS_PER_CALENDAR = 500
 
 class GoogleService:
 
-    def __init__(self, user_setting, google_token, logger):
+    def __init__(self, user_setting, google_token, logger, timings=None, api_stats=None):
         self.logger = logger
         self.notion_setting = user_setting
         self.notion_page_property = user_setting["page_property"]
+        self.retry_policy = RetryPolicy.from_env()
+        self.retry_stats = RetryStats()
+        self.timings = timings if timings is not None else SyncTimings()
+        self.api_stats = api_stats if api_stats is not None else ApiCallStats()
+        self.circuit_breaker = get_circuit_breaker("google")
+        self.rate_limiter = get_rate_limiter("google", google_rate_limit_scope(google_token.credentials))
         try:
-            self.service = build("calendar", "v3", credentials=google_token.credentials)
+            self._create_transport(google_token.credentials)
             self.logger.debug("Google Calendar service initialized successfully.")
         except Exception as e:
             self.logger.error(f"Error initializing Google service: {e}")
             raise
 
+    def _create_transport(self, credentials):
+        # One pooled keep-alive session serves every request of this sync.
+        self.http = PooledHttp(credentials)
+        self.service = build("calendar", "v3", http=self.http)
+
+    def _execute(self, request, endpoint, idempotent=True):
+        """Execute a Google API request through the shared retry policy and circuit breaker."""
+        return call_with_retry(
+            request.execute,
+            provider="google",
+            endpoint=endpoint,
+            policy=self.retry_policy,
+            stats=self.retry_stats,
+            breaker=self.circuit_breaker,
+            rate_limiter=self.rate_limiter,
+            idempotent=idempotent,
+            logger=self.logger,
+            api_stats=self.api_stats,
+        )
+
+    def close(self):
+        """Release the pooled connections held by this service."""
+        self.http.close()
+
     def test_connection(self):
         """Quick sanity check to confirm credentials are valid and API reachable."""
         try:
@@ -43,78 +79,121 @@ class GoogleService:
             self.logger.error(f"Google Calendar Connection test failed: {e}")
             return False
 
+    def _list_params(self, cal_id, page_count, page_token, seen_page_tokens):
+        """Build the events.list parameters for one page, guarding against runaway pagination."""
+        if page_count > MAX_GCAL_PAGES_PER_CALENDAR:
+            raise RuntimeError(
+                f"Exceeded Google Calendar pagination limit for calendar ID {cal_id}: "
+                f"{MAX_GCAL_PAGES_PER_CALENDAR} pages"
+            )
+
+        if page_token:
+            if page_token in seen_page_tokens:
+                raise RuntimeError(f"Repeated Google Calendar page token detected for calendar ID {cal_id}")
+            seen_page_tokens.add(page_token)
+
+        params = {
+            "calendarId": cal_id,
+            "timeMin": self.notion_setting["google_timemin"],
+            "timeMax": self.notion_setting["google_timemax"],
+            "singleEvents": True,
+            "orderBy": "startTime",
+            "maxResults": GCAL_PAGE_SIZE,
+        }
+
+        if page_token:
+            params["pageToken"] = page_token
+        return params
+
+    def _probe_params(self, cal_id, updated_min):
+        """events.list parameters asking whether any event in the sync window changed since `updated_min`."""
+        return {
+            "calendarId": cal_id,
+            "timeMin": self.notion_setting["google_timemin"],
+            "timeMax": self.notion_setting["google_timemax"],
+            "updatedMin": updated_min,
+            "singleEvents": True,
+            # Deleted events count as changes; with updatedMin Google returns them as cancelled items.
+            "showDeleted": True,
+            "maxResults": 1,
+        }
+
+    def probe_gcal_changes(self, updated_min):
+        """Return (changed, calls): whether any configured calendar has an event updated since `updated_min`."""
+        calls = 0
+        for cal_id in set(self.notion_setting["gcal_name_dict"].values()):
+            calls += 1
+            response = self._execute(
+                self.service.events().list(**self._probe_params(cal_id, updated_min)), "events.list"
+            )
+            # A page may come back empty with a nextPageToken; treat that as a change rather than page on.
+            if response.get("items") or response.get("nextPageToken"):
+                return True, calls
+        return False, calls
+
+    def _calendar_span_name(self, cal_id):
+        # Calendar names, not ids: ids are usually email addresses and the spans are stored in sync logs.
+        return f"gcal_fetch_calendar.{self.notion_setting['gcal_id_dict'].get(cal_id, 'unnamed')}"
+
+    def _collect_page_events(self, cal_id, response, events, cal_fetched):
+        """Append the usable events of one page to `events`; return (fetched, skipped) totals for the page."""
+        fetched = 0
+        skipped = 0
+        for item in response.get("items", []):
+            if item.get("status") == "cancelled":
+                self.logger.debug(
+                    f"Skipping cancelled recurring exception: id={item.get('id')} "
+                    f"originalStartTime={item.get('originalStartTime', {})}"
+                )
+                skipped += 1
+                continue
+
+            if not item.get("start"):
+                self.logger.warning(
+                    "Skipping event with missing start field: id=%s",
+                    item.get("id"),
+                )
+                skipped += 1
+                continue
+            if cal_fetched + fetched >= MAX_GCAL_EVENTS_PER_CALENDAR:
+                raise RuntimeError(
+                    f"Exceeded Google Calendar event limit for calendar ID {cal_id}: "
+                    f"{MAX_GCAL_EVENTS_PER_CALENDAR} events"
+                )
+            events.append(item)
+            fetched += 1
+        return fetched, skipped
+
     def get_gcal_event(self):
         # Calculate the start and end dates for the event range
         try:
             events = []
 
             for cal_id in set(self.notion_setting["gcal_name_dict"].values()):
-                page_token = None
-                seen_page_tokens = set()
-                page_count = 0
-                cal_fetched = 0
-                cal_skipped = 0
-
-                while True:
-                    page_count += 1
-
-                    if page_count > MAX_GCAL_PAGES_PER_CALENDAR:
-                        raise RuntimeError(
-                            f"Exceeded Google Calendar pagination limit for calendar ID {cal_id}: "
-                            f"{MAX_GCAL_PAGES_PER_CALENDAR} pages"
-                        )
-
-                    if page_token:
-                        if page_token in seen_page_tokens:
-                            raise RuntimeError(f"Repeated Google Calendar page token detected for calendar ID {cal_id}")
-                        seen_page_tokens.add(page_token)
-
-                    params = {
-                        "calendarId": cal_id,
-                        "timeMin": self.notion_setting["google_timemin"],
-                        "timeMax": self.notion_setting["google_timemax"],
-                        "singleEvents": True,
-                        "orderBy": "startTime",
-                        "maxResults": GCAL_PAGE_SIZE,
-                    }
-
-                    if page_token:
-                        params["pageToken"] = page_token
-
-                    response = self.service.events().list(**params).execute()
-
-                    for item in response.get("items", []):
-                        if item.get("status") == "cancelled":
-                            self.logger.debug(
-                                f"Skipping cancelled recurring exception: id={item.get('id')} "
-                                f"originalStartTime={item.get('originalStartTime', {})}"
-                            )
-                            cal_skipped += 1
-                            continue
-
-                        if not item.get("start"):
-                            self.logger.warning(
-                                "Skipping event with missing start field: id=%s",
-                                item.get("id"),
-                            )
-                            cal_skipped += 1
-                            continue
-                        if cal_fetched >= MAX_GCAL_EVENTS_PER_CALENDAR:
-                            raise RuntimeError(
-                                f"Exceeded Google Calendar event limit for calendar ID {cal_id}: "
-                                f"{MAX_GCAL_EVENTS_PER_CALENDAR} events"
-                            )
-                        events.append(item)
-                        cal_fetched += 1
-
-                    page_token = response.get("nextPageToken")
-                    if not page_token:
-                        break
-
-                self.logger.debug(
-                    f"Retrieved {cal_fetched} valid events from calendar ID {cal_id} "
-                    f"({cal_skipped} skipped, {page_count} pages)"
-                )
+                with self.timings.span(self._calendar_span_name(cal_id)):
+                    page_token = None
+                    seen_page_tokens = set()
+                    page_count = 0
+                    cal_fetched = 0
+                    cal_skipped = 0
+
+                    while True:
+                        page_count += 1
+                        params = self._list_params(cal_id, page_count, page_token, seen_page_tokens)
+                        response = self._execute(self.service.events().list(**params), "events.list")
+
+                        fetched, skipped = self._collect_page_events(cal_id, response, events, cal_fetched)
+                        cal_fetched += fetched
+                        cal_skipped += skipped
+
+                        page_token = response.get("nextPageToken")
+                        if not page_token:
+                            break
+
+                    self.logger.debug(
+                        f"Retrieved {cal_fetched} valid events from calendar ID {cal_id} "
+                        f"({cal_skipped} skipped, {page_count} pages)"
+                    )
 
             self.logger.debug(f"Total events retrieved: {len(events)}")
             return events
@@ -127,19 +206,110 @@ class GoogleService:
             self.logger.exception("Error retrieving Google Calendar events")
             raise
 
-    def update_gcal_event(self, notion_task, existing_gcal_cal_id, existing_gcal_event_id):
+    def update_gcal_event(self, notion_task, existing_gcal_cal_id, existing_gcal_event_id, existing_event=None):
+        """Patch the event to the task; skipped when `existing_event` already holds this content (see gcal_event_id)."""
         event = self.make_event_body(notion_task)
-        self.service.events().patch(
-            calendarId=existing_gcal_cal_id, eventId=existing_gcal_event_id, body=event
-        ).execute()
+        if self._content_unchanged(existing_event, event, existing_gcal_event_id):
+            return
+        self._execute(
+            self.service.events().patch(calendarId=existing_gcal_cal_id, eventId=existing_gcal_event_id, body=event),
+            "events.patch",
+        )
 
-    def create_gcal_event(self, notion_task, new_gcal_calendar_id):
+    def _content_unchanged(self, existing_event, event, gcal_event_id):
+        if not is_unchanged_since_last_sync(existing_event, event):
+            return False
+        self.logger.debug("Google Calendar event_id=%s already matches the Notion task; skipping patch.", gcal_event_id)
+        return True
+
+    def _page_filter_params(self, cal_id, notion_page_id, page_token):
+        params = {
+            "calendarId": cal_id,
+            "privateExtendedProperty": notion_page_id_filter(notion_page_id),
+            "maxResults": GCAL_PAGE_SIZE,
+        }
+        if page_token:
+            params["pageToken"] = page_token
+        return params
+
+    def _calendar_ids(self, calendar_ids):
+        if calendar_ids is not None:
+            return list(calendar_ids)
+        return list(dict.fromkeys(self.notion_setting["gcal_name_dict"].values()))
+
+    def find_gcal_events_by_notion_page_id(self, notion_page_id, calendar_ids=None):
+        """
+        Return the events stamped with `notion_page_id`, across the configured calendars unless `calendar_ids` is given.
+
+        The filter runs server-side and ignores the sync time window, so it also finds events outside the range
+        get_gcal_event fetches. Each event gets a `calendar_id` key naming the calendar it was found in.
+        """
+        events = []
+        for cal_id in self._calendar_ids(calendar_ids):
+            page_token = None
+            for _ in range(MAX_GCAL_PAGES_PER_CALENDAR):
+                response = self._execute(
+                    self.service.events().list(**self._page_filter_params(cal_id, notion_page_id, page_token)),
+                    "events.list",
+                )
+                events.extend({**item, "calendar_id": cal_id} for item in response.get("items", []))
+                page_token = response.get("nextPageToken")
+                if not page_token:
+                    break
+        return events
+
+    def get_gcal_event_by_id(self, gcal_calendar_id, gcal_event_id):
+        """Return one event (events.get), or None when it is absent or cancelled."""
+        try:
+            event = self._execute(
+                self.service.events().get(calendarId=gcal_calendar_id, eventId=gcal_event_id), "events.get"
+            )
+        except HttpError as e:
+            if self._event_absent(e):
+                return None
+            raise
+        return self._live_event(event)
+
+    @staticmethod
+    def _event_absent(error):
+        return getattr(getattr(error, "resp", None), "status", None) in (404, 410)
+
+    @staticmethod
+    def _live_event(event):
+        return None if not event or event.get("status") == "cancelled" else event
+
+    def create_gcal_event(self, notion_task, new_gcal_calendar_id, event_id=None):
+        """
+        Insert an event and return its id.
+
+        With a client-specified `event_id` the insert is idempotent: when the id already exists (a retried or
+        resumed create) the existing event is patched to the task. An event that was deleted in Google Calendar
+        keeps its cancelled status, so the task is linked to the deleted event instead of restoring it.
+        """
         if new_gcal_calendar_id is None:
             new_gcal_calendar_id = self.notion_setting["gcal_default_id"]
         event = self.make_event_body(notion_task)
-        gcal_event = self.service.events().insert(calendarId=new_gcal_calendar_id, body=event).execute()
-        # get the event id and update the notion task by query page id
-        event_id = gcal_event.get("id")
+        if event_id is None:
+            gcal_event = self._execute(
+                self.service.events().insert(calendarId=new_gcal_calendar_id, body=event),
+                "events.insert",
+                idempotent=False,
+            )
+            # get the event id and update the notion task by query page id
+            return gcal_event.get("id")
+        try:
+            self._execute(
+                self.service.events().insert(calendarId=new_gcal_calendar_id, body={**event, "id": event_id}),
+                "events.insert",
+            )
+        except HttpError as e:
+            if not self._already_exists(e, event_id):
+                raise
+            existing_event = self._execute(
+                self.service.events().patch(calendarId=new_gcal_calendar_id, eventId=event_id, body=event),
+                "events.patch",
+            )
+            self._log_cancelled(existing_event, event_id)
         return event_id
 
     def move_and_update_gcal_event(
@@ -149,26 +319,27 @@ class GoogleService:
         new_gcal_calendar_id,
         existing_gcal_cal_id,
     ):
-        self.service.events().move(
-            calendarId=existing_gcal_cal_id,
-            eventId=existing_gcal_event_id,
-            destination=new_gcal_calendar_id,
-        ).execute()
+        self._execute(
+            self.service.events().move(
+                calendarId=existing_gcal_cal_id,
+                eventId=existing_gcal_event_id,
+                destination=new_gcal_calendar_id,
+            ),
+            "events.move",
+            idempotent=False,
+        )
         self.update_gcal_event(notion_task, new_gcal_calendar_id, existing_gcal_event_id)
 
     def delete_gcal_event(self, gcal_calendar_id, gcal_event_id):
         try:
-            self.service.events().delete(calendarId=gcal_calendar_id, eventId=gcal_event_id).execute()
+            self._execute(
+                self.service.events().delete(calendarId=gcal_calendar_id, eventId=gcal_event_id),
+                "events.delete",
+            )
             self.logger.info(f"Successfully deleted event with ID: {gcal_event_id}")
             return True
         except HttpError as e:
-            status_code = getattr(getattr(e, "resp", None), "status", None)
-            if status_code in (404, 410):
-                self.logger.warning(
-                    "Google Calendar event_id=%s was already absent (status=%s); treating delete as converged.",
-                    gcal_event_id,
-                    status_code,
-                )
+            if self._already_deleted(e, gcal_event_id):
                 return True
             self.logger.error(f"An error occurred while deleting event with ID: {gcal_event_id}: {e}")
             raise
@@ -176,6 +347,28 @@ class GoogleService:
             self.logger.error(f"An error occurred while deleting event with ID: {gcal_event_id}: {e}")
             raise
 
+    def _already_exists(self, error, gcal_event_id):
+        status_code = getattr(getattr(error, "resp", None), "status", None)
+        if status_code == 409:
+            self.logger.info("Google Calendar event_id=%s already exists; updating it instead.", gcal_event_id)
+            return True
+        return False
+
+    def _log_cancelled(self, gcal_event, gcal_event_id):
+        if (gcal_event or {}).get("status") == "cancelled":
+            self.logger.info("Google Calendar event_id=%s was deleted in Google; leaving it deleted.", gcal_event_id)
+
+    def _already_deleted(self, error, gcal_event_id):
+        status_code = getattr(getattr(error, "resp", None), "status", None)
+        if status_code in (404, 410):
+            self.logger.warning(
+                "Google Calendar event_id=%s was already absent (status=%s); treating delete as converged.",
+                gcal_event_id,
+                status_code,
+            )
+            return True
+        return False
+
     def make_event_body(self, notion_task):
         # set icone and task name
         event_icon = (
@@ -276,7 +469,7 @@ class GoogleService:
                     "url": event_source_url,
                 },
             }
-        return event
+        return stamp_notion_link(event, notion_task.get("id"))
 
     def adjust_notion_dates(self, start_date_str, end_date_str=None):
         """
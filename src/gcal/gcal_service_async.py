@@ -0,0 +1,219 @@
+"""
+asyncio variant of `GoogleService` over `AsyncCalendarHttp`.
+
+Pagination guards, event bodies and retry/rate-limit settings are inherited from `GoogleService`; only the
+Calendar API calls are coroutines.
+"""
+
+from google.auth.exceptions import RefreshError
+from googleapiclient.errors import HttpError
+
+from gcal.gcal_http import AsyncCalendarHttp
+from gcal.gcal_service import MAX_GCAL_PAGES_PER_CALENDAR, GoogleService
+from utils.retry_utils import call_with_retry_async
+
+
+class AsyncGoogleService(GoogleService):
+    def __init__(self, user_setting, google_token, logger, http_client=None, timings=None, api_stats=None):
+        self._http_client = http_client
+        super().__init__(user_setting, google_token, logger, timings=timings, api_stats=api_stats)
+
+    def _create_transport(self, credentials):
+        self.http = AsyncCalendarHttp(credentials, client=self._http_client)
+        self.service = None
+
+    async def _request(self, endpoint, method, path, params=None, body=None, idempotent=True):
+        """Send a Calendar API request through the shared retry policy and circuit breaker."""
+        return await call_with_retry_async(
+            lambda: self.http.request(method, path, params=params, body=body),
+            provider="google",
+            endpoint=endpoint,
+            policy=self.retry_policy,
+            stats=self.retry_stats,
+            breaker=self.circuit_breaker,
+            rate_limiter=self.rate_limiter,
+            idempotent=idempotent,
+            logger=self.logger,
+            api_stats=self.api_stats,
+        )
+
+    async def aclose(self):
+        await self.http.aclose()
+
+    async def test_connection(self):
+        try:
+            await self.http.request("GET", "/users/me/calendarList", params={"maxResults": 1})
+            self.logger.debug("Google Calendar connection test passed.")
+            return True
+        except HttpError as e:
+            self.logger.error(f"Google API error: {e}. Please click 'view settings' and re-authorize")
+            return False
+        except Exception as e:
+            self.logger.error(f"Google Calendar Connection test failed: {e}")
+            return False
+
+    async def probe_gcal_changes(self, updated_min):
+        calls = 0
+        for cal_id in set(self.notion_setting["gcal_name_dict"].values()):
+            calls += 1
+            params = self._probe_params(cal_id, updated_min)
+            params.pop("calendarId")
+            params.update(singleEvents="true", showDeleted="true")
+            response = await self._request(
+                "events.list", "GET", self.http.path("calendars", cal_id, "events"), params=params
+            )
+            if response.get("items") or response.get("nextPageToken"):
+                return True, calls
+        return False, calls
+
+    async def get_gcal_event(self):
+        try:
+            events = []
+
+            for cal_id in set(self.notion_setting["gcal_name_dict"].values()):
+                with self.timings.span(self._calendar_span_name(cal_id)):
+                    page_token = None
+                    seen_page_tokens = set()
+                    page_count = 0
+                    cal_fetched = 0
+                    cal_skipped = 0
+
+                    while True:
+                        page_count += 1
+                        params = self._list_params(cal_id, page_count, page_token, seen_page_tokens)
+                        params.pop("calendarId")
+                        params["singleEvents"] = "true"
+                        response = await self._request(
+                            "events.list", "GET", self.http.path("calendars", cal_id, "events"), params=params
+                        )
+
+                        fetched, skipped = self._collect_page_events(cal_id, response, events, cal_fetched)
+                        cal_fetched += fetched
+                        cal_skipped += skipped
+
+                        page_token = response.get("nextPageToken")
+                        if not page_token:
+                            break
+
+                    self.logger.debug(
+                        f"Retrieved {cal_fetched} valid events from calendar ID {cal_id} "
+                        f"({cal_skipped} skipped, {page_count} pages)"
+                    )
+
+            self.logger.debug(f"Total events retrieved: {len(events)}")
+            return events
+
+        except RefreshError as e:
+            self.logger.error(f"RefreshError: {e}")
+            raise
+
+        except Exception:
+            self.logger.exception("Error retrieving Google Calendar events")
+            raise
+
+    async def update_gcal_event(self, notion_task, existing_gcal_cal_id, existing_gcal_event_id, existing_event=None):
+        event = self.make_event_body(notion_task)
+        if self._content_unchanged(existing_event, event, existing_gcal_event_id):
+            return
+        await self._request(
+            "events.patch",
+            "PATCH",
+            self.http.path("calendars", existing_gcal_cal_id, "events", existing_gcal_event_id),
+            body=event,
+        )
+
+    async def find_gcal_events_by_notion_page_id(self, notion_page_id, calendar_ids=None):
+        events = []
+        for cal_id in self._calendar_ids(calendar_ids):
+            page_token = None
+            for _ in range(MAX_GCAL_PAGES_PER_CALENDAR):
+                params = self._page_filter_params(cal_id, notion_page_id, page_token)
+                params.pop("calendarId")
+                response = await self._request(
+                    "events.list", "GET", self.http.path("calendars", cal_id, "events"), params=params
+                )
+                events.extend({**item, "calendar_id": cal_id} for item in response.get("items", []))
+                page_token = response.get("nextPageToken")
+                if not page_token:
+                    break
+        return events
+
+    async def get_gcal_event_by_id(self, gcal_calendar_id, gcal_event_id):
+        try:
+            event = await self._request(
+                "events.get", "GET", self.http.path("calendars", gcal_calendar_id, "events", gcal_event_id)
+            )
+        except HttpError as e:
+            if self._event_absent(e):
+                return None
+            raise
+        return self._live_event(event)
+
+    async def create_gcal_event(self, notion_task, new_gcal_calendar_id, event_id=None):
+        if new_gcal_calendar_id is None:
+            new_gcal_calendar_id = self.notion_setting["gcal_default_id"]
+        event = self.make_event_body(notion_task)
+        if event_id is None:
+            gcal_event = await self._request(
+                "events.insert",
+                "POST",
+                self.http.path("calendars", new_gcal_calendar_id, "events"),
+                body=event,
+                idempotent=False,
+            )
+            return gcal_event.get("id")
+        try:
+            await self._request(
+                "events.insert",
+                "POST",
+                self.http.path("calendars", new_gcal_calendar_id, "events"),
+                body={**event, "id": event_id},
+            )
+        except HttpError as e:
+            if not self._already_exists(e, event_id):
+                raise
+            existing_event = await self._request(
+                "events.patch",
+                "PATCH",
+                self.http.path("calendars", new_gcal_calendar_id, "events", event_id),
+                body=event,
+            )
+            self._log_cancelled(existing_event, event_id)
+        return event_id
+
+    async def move_and_update_gcal_event(
+        self,
+        notion_task,
+        existing_gcal_event_id,
+        new_gcal_calendar_id,
+        existing_gcal_cal_id,
+    ):
+        await self._request(
+            "events.move",
+            "POST",
+            self.http.path("calendars", existing_gcal_cal_id, "events", existing_gcal_event_id, "move"),
+            params={"destination": new_gcal_calendar_id},
+            idempotent=False,
+        )
+        await self.update_gcal_event(notion_task, new_gcal_calendar_id, existing_gcal_event_id)
+
+    async def delete_gcal_event(self, gcal_calendar_id, gcal_event_id):
+        try:
+            await self._request(
+                "events.delete",
+                "DELETE",
+                self.http.path("calendars", gcal_calendar_id, "events", gcal_event_id),
+            )
+            self.logger.info(f"Successfully deleted event with ID: {gcal_event_id}")
+            return True
+        except HttpError as e:
+            if self._already_deleted(e, gcal_event_id):
+                return True
+            self.logger.error(f"An error occurred while deleting event with ID: {gcal_event_id}: {e}")
+            raise
+        except Exception as e:
+            self.logger.error(f"An error occurred while deleting event with ID: {gcal_event_id}: {e}")
+            raise
+
+
+__all__ = ["AsyncGoogleService"]
@@ -11,6 +11,7 @@ from utils.token_crypto import (
     decrypt_token_if_encrypted,
 )
 from utils.dynamodb_utils import GoogleTokenWriteConflictError
+from utils.sync_timings import timing_span
 
 _DEFAULT_TOKEN_URI = "https://oauth2.googleapis.com/token"
 _DEFAULT_SCOPES = [
@@ -30,11 +31,12 @@ class SettingError(Exception):
 
 
 class GoogleToken:
-    def __init__(self, config, logger):
+    def __init__(self, config, logger, timings=None):
         self.credentials = None
         self.config = config
         self.mode = config.get("mode")
         self.logger = logger
+        self.timings = timings
         self._loaded_updated_at = None
         self.activate_token()
 
@@ -42,10 +44,12 @@ class GoogleToken:
         credentials = self._load_credentials()
         if self.mode == "local":
             self.logger.info("Local mode: refreshing Google credentials in memory")
-            credentials = self._refresh_tokens(credentials)
+            with timing_span(self.timings, "token_refresh"):
+                credentials = self._refresh_tokens(credentials)
         elif credentials.expired and credentials.refresh_token:
             self.logger.info("Credentials has expired. Refreshing tokens...")
-            credentials = self._refresh_tokens(credentials)
+            with timing_span(self.timings, "token_refresh"):
+                credentials = self._refresh_tokens(credentials)
         self.credentials = credentials
 
     def _load_credentials(self, consistent_read: bool = False):
@@ -59,8 +63,9 @@ class GoogleToken:
                 data = get_google_token_by_uuid(self.config.get("uuid"), consistent_read=consistent_read)
                 self._loaded_updated_at = data.get("updatedAt")
                 try:
-                    access_token = decrypt_token(data.get("accessToken"))
-                    refresh_token = decrypt_token(data.get("refreshToken"))
+                    with timing_span(self.timings, "token_decrypt"):
+                        access_token = decrypt_token(data.get("accessToken"))
+                        refresh_token = decrypt_token(data.get("refreshToken"))
                 except TokenCryptoError as e:
                     raise SettingError(f"Failed to decrypt encrypted Google OAuth token: {e}") from e
 
@@ -113,7 +118,8 @@ class GoogleToken:
         if missing:
             raise SettingError(f"Required environment variables for local Google auth are missing or empty: {missing}")
         try:
-            refresh_token = decrypt_token_if_encrypted(refresh_token)
+            with timing_span(self.timings, "token_decrypt"):
+                refresh_token = decrypt_token_if_encrypted(refresh_token)
         except TokenCryptoError as e:
             raise SettingError(f"Failed to decrypt encrypted Google OAuth token: {e}") from e
         self._assert_plaintext_runtime_token("refreshToken", refresh_token)
@@ -1,6 +1,9 @@
 import sys
 import argparse
+import asyncio
+import functools
 import json
+import os
 from pathlib import Path
 from google.auth.exceptions import RefreshError
 
@@ -16,7 +19,17 @@ from notion.notion_config import (  # noqa: E402
 from notion.notion_token import NotionToken  # noqa: E402
 from gcal.gcal_token import GoogleToken  # noqa: E402
 from gcal.gcal_service import GoogleService  # noqa: E402
+from sync.sync_checkpoint import SyncCheckpoint  # noqa: E402
+from sync.sync_lease import SyncLease  # noqa: E402
+from sync.sync_probe import SyncWatermark  # noqa: E402
+from sync.sync_retry_ledger import SyncRetryLedger  # noqa: E402
+from utils.api_metrics import ApiCallStats  # noqa: E402
 from utils.logging_utils import get_logger  # noqa: E402
+from utils.sync_profiler import profile_sync_run  # noqa: E402
+from utils.sync_timings import SyncTimings  # noqa: E402
+
+MAIN_ASYNC_USER_CONCURRENCY_VAR = "MAIN_ASYNC_USER_CONCURRENCY"
+DEFAULT_MAIN_ASYNC_USER_CONCURRENCY = 10
 
 
 def _parse_args(argv: list[str] | None = None):
@@ -48,9 +61,35 @@ def _parse_args(argv: list[str] | None = None):
         type=int,
         help="Force: Update Google Calendar from Notion Task [start end]",
     )
+    parser.add_argument(
+        "-a",
+        "--archive-deleted",
+        action="store_true",
+        help="Archive Notion tasks already deleted by the sync so later syncs stop fetching them",
+    )
+    parser.add_argument(
+        "-r",
+        "--retry-failed",
+        action="store_true",
+        help="Retry only the items that failed in earlier syncs (the sync retry ledger)",
+    )
     return parser.parse_args(argv)
 
 
+def _is_explicit_run(retry_failed: bool = False) -> bool:
+    """True for runs a user asked for: CLI operations, forced or date-ranged syncs and ledger replays."""
+    args = _parse_args()
+    return bool(
+        retry_failed
+        or args.retry_failed
+        or args.archive_deleted
+        or args.test_connection
+        or args.timestamp
+        or args.google
+        or args.notion
+    )
+
+
 def _apply_date_range_override(
     user_setting: dict,
     goback_days: int,
@@ -63,30 +102,62 @@ def _apply_date_range_override(
     )
 
 
-def main(uuid: str | None = None) -> dict:
+def main(uuid: str | None = None, deadline=None, config: dict | None = None, retry_failed: bool = False) -> dict:
+    """Run the CLI operation for one user; `retry_failed` (or -r) retries only the sync retry ledger items."""
+    # Per-endpoint API call counters; DynamoDB/SSM helpers record into the active stats of this run
+    api_stats = ApiCallStats()
+    # No-op unless SYNC_PROFILE is set (and, with SYNC_PROFILE_UUIDS, this uuid is listed)
+    with profile_sync_run("main", uuid), api_stats.activate():
+        # One sync per user at a time; triggers during or just after a successful sync are coalesced,
+        # explicitly requested runs only while another sync is running
+        lease = SyncLease(uuid, config, get_logger(__name__), debounce=not _is_explicit_run(retry_failed))
+        if not lease.acquire(deadline):
+            return lease.coalesced_result()
+        result = None
+        try:
+            result = _run_main(uuid, deadline, config, api_stats, retry_failed)
+            return result
+        finally:
+            lease.release(result)
+
+
+def _run_main(
+    uuid: str | None, deadline, config: dict | None, api_stats: ApiCallStats, retry_failed: bool = False
+) -> dict:
     logger = get_logger(__name__)
 
     current_dir = Path(__file__).parent.resolve()
     logger.debug(f"Current directory: {current_dir}")
     logger.debug("Initialization start")
+    # Per-phase spans from config load to the last write, reported in the sync summary's timings
+    timings = SyncTimings()
 
     # Initialize services
     try:
         logger.debug(f"Using UUID: {uuid}")
 
         # Configure paths based on UUID (local vs dynamodb)
-        config = generate_config(uuid)  # APP_MODE determines cloud or local config shape
-        logger.debug(f"Generated config keys: {list(config.keys())}")
-
-        # Notion
-        notion_config = NotionConfig(config, logger).get()
+        with timings.span("config_load"):
+            if config is None:
+                config = generate_config(uuid)  # APP_MODE determines cloud or local config shape
+            logger.debug(f"Generated config keys: {list(config.keys())}")
+            notion_config = NotionConfig(config, logger).get()
         logger.debug(f"Notion config type: {type(notion_config).__name__}")
-        notion_token = NotionToken(config, logger).get()
-        notion_service = NotionService(notion_token, notion_config, logger)
 
-        # Google
-        google_token = GoogleToken(config, logger)
-        google_service = GoogleService(notion_config, google_token, logger)
+        # Tokens record their own token_decrypt / token_refresh spans
+        notion_token = NotionToken(config, logger, timings=timings).get()
+        google_token = GoogleToken(config, logger, timings=timings)
+
+        with timings.span("service_build"):
+            notion_service = NotionService(notion_token, notion_config, logger, timings=timings, api_stats=api_stats)
+            google_service = GoogleService(notion_config, google_token, logger, timings=timings, api_stats=api_stats)
+
+        # Resume actions left half-finished by an interrupted run
+        checkpoint = SyncCheckpoint(config, logger)
+        # Last complete sync, for the change probe that skips runs with nothing to do
+        watermark = SyncWatermark(config, logger)
+        # Items that failed with a retriable error in earlier runs
+        retry_ledger = SyncRetryLedger(config, logger)
     except RefreshError as e:
         logger.error(f"Google RefreshError during initialization: {e}", exc_info=True)
         return {"error": "google_refresh_error", "message": str(e)}
@@ -113,6 +184,22 @@ def main(uuid: str | None = None) -> dict:
                 "notion_connection": isConnectedToNotion,
                 "google_connection": isConnectedToGoogle,
             }
+        if args.archive_deleted:
+            logger.debug("▶ Archiving deleted Notion tasks...")
+            return notion_service.archive_deleted_notion_tasks()
+        if retry_failed or args.retry_failed:
+            logger.debug("▶ Retrying failed items from the sync retry ledger...")
+            from sync import sync
+
+            return sync.replay_retry_ledger(
+                user_setting=notion_config,
+                notion_service=notion_service,
+                google_service=google_service,
+                retry_ledger=retry_ledger,
+                checkpoint=checkpoint,
+                deadline=deadline,
+                timings=timings,
+            )
         if not args.timestamp and not args.google and not args.notion:
             logger.debug("▶ Running sync with no arguments (default range)...")
             from sync import sync
@@ -124,6 +211,11 @@ def main(uuid: str | None = None) -> dict:
                 compare_time=True,
                 should_update_notion_tasks=True,
                 should_update_google_events=True,
+                checkpoint=checkpoint,
+                deadline=deadline,
+                timings=timings,
+                watermark=watermark,
+                retry_ledger=retry_ledger,
             )
 
         if args.timestamp:
@@ -143,6 +235,11 @@ def main(uuid: str | None = None) -> dict:
                 compare_time=True,
                 should_update_notion_tasks=True,
                 should_update_google_events=True,
+                checkpoint=checkpoint,
+                deadline=deadline,
+                timings=timings,
+                watermark=watermark,
+                retry_ledger=retry_ledger,
             )
 
         if args.google:
@@ -159,6 +256,9 @@ def main(uuid: str | None = None) -> dict:
                 user_setting=notion_config,
                 notion_service=notion_service,
                 google_service=google_service,
+                checkpoint=checkpoint,
+                deadline=deadline,
+                timings=timings,
             )
 
         if args.notion:
@@ -175,10 +275,160 @@ def main(uuid: str | None = None) -> dict:
                 user_setting=notion_config,
                 notion_service=notion_service,
                 google_service=google_service,
+                checkpoint=checkpoint,
+                deadline=deadline,
+                timings=timings,
             )
         return res
     except Exception as e:
         logger.error(f"Error during sync operation {e}")
+    finally:
+        google_service.close()
+
+
+def _load_user_inputs(uuid: str | None, logger, config: dict | None = None, timings=None):
+    """Blocking config, token and checkpoint loads for one user (run off the event loop by main_async)."""
+    if timings is None:
+        timings = SyncTimings()
+    with timings.span("config_load"):
+        if config is None:
+            config = generate_config(uuid)
+        notion_config = NotionConfig(config, logger).get()
+    notion_token = NotionToken(config, logger, timings=timings).get()
+    google_token = GoogleToken(config, logger, timings=timings)
+    checkpoint = SyncCheckpoint(config, logger)
+    watermark = SyncWatermark(config, logger)
+    retry_ledger = SyncRetryLedger(config, logger)
+    return notion_config, notion_token, google_token, checkpoint, watermark, retry_ledger
+
+
+async def main_async(
+    uuid: str | None = None,
+    deadline=None,
+    notion_transport=None,
+    config: dict | None = None,
+    retry_failed: bool = False,
+) -> dict:
+    """
+    asyncio counterpart of `main`: same CLI operations (`retry_failed` included) and result shape, on the async
+    services and engine.
+
+    `notion_transport` lets a caller running several users in one event loop share a Notion connection pool.
+    """
+    api_stats = ApiCallStats()
+    with api_stats.activate():
+        lease = SyncLease(uuid, config, get_logger(__name__), debounce=not _is_explicit_run(retry_failed))
+        if not await asyncio.to_thread(lease.acquire, deadline):
+            return lease.coalesced_result()
+        result = None
+        try:
+            result = await _run_main_async(uuid, deadline, notion_transport, config, api_stats, retry_failed)
+            return result
+        finally:
+            await asyncio.to_thread(lease.release, result)
+
+
+async def _run_main_async(
+    uuid: str | None, deadline, notion_transport, config: dict | None, api_stats, retry_failed: bool = False
+) -> dict:
+    from notion.notion_service_async import AsyncNotionService
+    from gcal.gcal_service_async import AsyncGoogleService
+    from sync import sync_async
+
+    logger = get_logger(__name__)
+    logger.debug(f"Using UUID: {uuid}")
+
+    timings = SyncTimings()
+    try:
+        notion_config, notion_token, google_token, checkpoint, watermark, retry_ledger = await asyncio.to_thread(
+            _load_user_inputs, uuid, logger, config, timings
+        )
+        with timings.span("service_build"):
+            notion_service = AsyncNotionService(
+                notion_token, notion_config, logger, transport=notion_transport, timings=timings, api_stats=api_stats
+            )
+            google_service = AsyncGoogleService(
+                notion_config, google_token, logger, timings=timings, api_stats=api_stats
+            )
+    except RefreshError as e:
+        logger.error(f"Google RefreshError during initialization: {e}", exc_info=True)
+        return {"error": "google_refresh_error", "message": str(e)}
+    except Exception as e:
+        logger.error(f"Error initializing services: {e}", exc_info=True)
+        return {"error": "service_initialization_error", "message": str(e)}
+
+    args = _parse_args()
+    try:
+        if args.test_connection:
+            is_connected_to_notion, is_connected_to_google = await asyncio.gather(
+                notion_service.test_connection(), google_service.test_connection()
+            )
+            return {"notion_connection": is_connected_to_notion, "google_connection": is_connected_to_google}
+        if args.archive_deleted:
+            return await notion_service.archive_deleted_notion_tasks()
+        if retry_failed or args.retry_failed:
+            return await sync_async.replay_retry_ledger_async(
+                user_setting=notion_config,
+                notion_service=notion_service,
+                google_service=google_service,
+                retry_ledger=retry_ledger,
+                checkpoint=checkpoint,
+                deadline=deadline,
+                timings=timings,
+            )
+
+        date_range = args.timestamp or args.google or args.notion
+        if date_range:
+            _apply_date_range_override(notion_config, date_range[0], date_range[1], logger)
+        if args.google:
+            run_sync = sync_async.force_update_notion_tasks_by_google_event_and_ignore_time_async
+        elif args.notion:
+            run_sync = sync_async.force_update_google_event_by_notion_task_and_ignore_time_async
+        else:
+            run_sync = functools.partial(
+                sync_async.synchronize_notion_and_google_calendar_async, watermark=watermark, retry_ledger=retry_ledger
+            )
+        return await run_sync(
+            user_setting=notion_config,
+            notion_service=notion_service,
+            google_service=google_service,
+            checkpoint=checkpoint,
+            deadline=deadline,
+            timings=timings,
+        )
+    except Exception as e:
+        logger.error(f"Error during sync operation {e}")
+    finally:
+        await asyncio.gather(notion_service.aclose(), google_service.aclose(), return_exceptions=True)
+
+
+async def main_many_async(uuids: list[str], deadline=None, concurrency: int | None = None) -> dict:
+    """
+    Sync several users concurrently in one event loop and return {uuid: result}.
+
+    At most `concurrency` users (MAIN_ASYNC_USER_CONCURRENCY, default 10) are in flight; their Notion clients
+    share one connection pool. A failure for one user is reported as that user's result.
+    """
+    from notion.notion_http import create_notion_async_transport
+
+    if concurrency is None:
+        raw = os.environ.get(MAIN_ASYNC_USER_CONCURRENCY_VAR, "").strip()
+        concurrency = int(raw) if raw.isdigit() and int(raw) > 0 else DEFAULT_MAIN_ASYNC_USER_CONCURRENCY
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = create_notion_async_transport()
+
+    async def run_user(uuid):
+        async with semaphore:
+            try:
+                return await main_async(uuid, deadline=deadline, notion_transport=transport)
+            except Exception as e:
+                return {"error": "sync_failed", "message": str(e)}
+
+    try:
+        results = await asyncio.gather(*(run_user(uuid) for uuid in uuids))
+    finally:
+        await transport.aclose()
+    return dict(zip(uuids, results))
 
 
 if __name__ == "__main__":
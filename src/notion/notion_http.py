@@ -0,0 +1,142 @@
+"""
+Process-wide connection pool for Notion API calls.
+
+`notion_client.Client` rewrites the headers, base URL and timeout of the `httpx.Client` it is given, so one
+`httpx.Client` cannot be shared between users without leaking the Authorization header. The connection pool
+lives in the httpx transport instead: every user gets a lightweight `httpx.Client` over one shared transport,
+so a warm container reuses TLS connections to api.notion.com across users while only the auth header varies.
+
+Async transports are bound to the event loop that opened their connections, so the asyncio engine shares one
+`create_notion_async_transport()` per batch (one event loop) instead of per process.
+"""
+
+import os
+import threading
+
+import httpx
+
+from utils.api_metrics import record_response_bytes
+
+NOTION_HTTP2_VAR = "NOTION_HTTP2"
+NOTION_HTTP_MAX_CONNECTIONS_VAR = "NOTION_HTTP_MAX_CONNECTIONS"
+NOTION_HTTP_MAX_KEEPALIVE_VAR = "NOTION_HTTP_MAX_KEEPALIVE_CONNECTIONS"
+NOTION_HTTP_KEEPALIVE_EXPIRY_VAR = "NOTION_HTTP_KEEPALIVE_EXPIRY_SECONDS"
+DEFAULT_NOTION_HTTP_MAX_CONNECTIONS = 20
+DEFAULT_NOTION_HTTP_MAX_KEEPALIVE = 10
+DEFAULT_NOTION_HTTP_KEEPALIVE_EXPIRY_SECONDS = 60.0
+
+_shared_transport: httpx.HTTPTransport | None = None
+_transport_lock = threading.Lock()
+
+
+def _env_number(name: str, default, cast=float):
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return default
+    try:
+        value = cast(raw)
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+def http2_enabled() -> bool:
+    """HTTP/2 (`httpx[http2]`) is used unless NOTION_HTTP2=false."""
+    return os.environ.get(NOTION_HTTP2_VAR, "true").strip().lower() not in {"0", "false", "no"}
+
+
+def notion_http_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=_env_number(NOTION_HTTP_MAX_CONNECTIONS_VAR, DEFAULT_NOTION_HTTP_MAX_CONNECTIONS, int),
+        max_keepalive_connections=_env_number(NOTION_HTTP_MAX_KEEPALIVE_VAR, DEFAULT_NOTION_HTTP_MAX_KEEPALIVE, int),
+        keepalive_expiry=_env_number(NOTION_HTTP_KEEPALIVE_EXPIRY_VAR, DEFAULT_NOTION_HTTP_KEEPALIVE_EXPIRY_SECONDS),
+    )
+
+
+def get_shared_transport() -> httpx.HTTPTransport:
+    global _shared_transport
+    with _transport_lock:
+        if _shared_transport is None:
+            _shared_transport = httpx.HTTPTransport(http2=http2_enabled(), limits=notion_http_limits())
+        return _shared_transport
+
+
+class _SharedTransportClient(httpx.Client):
+    """Per-user client whose close() leaves the shared transport open for other users."""
+
+    def close(self) -> None:
+        pass
+
+    def __exit__(self, exc_type=None, exc_value=None, traceback=None) -> None:
+        pass
+
+
+def _record_response_size(response: httpx.Response) -> None:
+    response.read()
+    record_response_bytes(response.num_bytes_downloaded)
+
+
+async def _record_response_size_async(response: httpx.Response) -> None:
+    await response.aread()
+    record_response_bytes(response.num_bytes_downloaded)
+
+
+def track_response_sizes(client):
+    """Report each response's wire (still compressed) body size to `utils.api_metrics`; safe to call again."""
+    if isinstance(client, httpx.AsyncClient):
+        hook = _record_response_size_async
+    elif isinstance(client, httpx.Client):
+        hook = _record_response_size
+    else:
+        return client
+    hooks = client.event_hooks
+    if hook not in hooks["response"]:
+        client.event_hooks = {**hooks, "response": [*hooks["response"], hook]}
+    return client
+
+
+def create_notion_http_client() -> httpx.Client:
+    """Return a per-user `httpx.Client` backed by the process-wide Notion connection pool."""
+    return _SharedTransportClient(transport=get_shared_transport())
+
+
+class _SharedTransportAsyncClient(httpx.AsyncClient):
+    """Per-user async client whose aclose() leaves the batch transport open for other users."""
+
+    async def aclose(self) -> None:
+        pass
+
+    async def __aexit__(self, exc_type=None, exc_value=None, traceback=None) -> None:
+        pass
+
+
+def create_notion_async_transport() -> httpx.AsyncHTTPTransport:
+    """Return a connection pool for the async Notion clients of one event loop."""
+    return httpx.AsyncHTTPTransport(http2=http2_enabled(), limits=notion_http_limits())
+
+
+def create_notion_async_http_client(transport: httpx.AsyncBaseTransport | None = None) -> httpx.AsyncClient:
+    """Return a per-user `httpx.AsyncClient`, over `transport` when one is shared by the caller."""
+    if transport is None:
+        return httpx.AsyncClient(transport=create_notion_async_transport())
+    return _SharedTransportAsyncClient(transport=transport)
+
+
+def reset_shared_transport() -> None:
+    """Close and forget the shared transport (tests and process shutdown)."""
+    global _shared_transport
+    with _transport_lock:
+        if _shared_transport is not None:
+            _shared_transport.close()
+        _shared_transport = None
+
+
+__all__ = [
+    "create_notion_async_http_client",
+    "create_notion_async_transport",
+    "create_notion_http_client",
+    "get_shared_transport",
+    "http2_enabled",
+    "reset_shared_transport",
+    "track_response_sizes",
+]
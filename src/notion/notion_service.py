@@ -1,10 +1,29 @@
 from notion_client import Client
 from notion_client.errors import APIResponseError
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import os
 import emoji
+from gcal.gcal_event_id import deterministic_event_ids_enabled
+from notion.notion_http import create_notion_http_client, track_response_sizes
+from utils.api_metrics import ApiCallStats
+from utils.rate_limiter import get_rate_limiter, notion_rate_limit_scope
+from utils.retry_utils import RetryPolicy, RetryStats, call_with_retry, get_circuit_breaker
+from utils.sync_timings import SyncTimings, timing_span
 
 
 NOTION_API_VERSION_2022 = "2022-06-28"
+NOTION_ARCHIVE_CONCURRENCY_VAR = "NOTION_ARCHIVE_CONCURRENCY"
+DEFAULT_NOTION_ARCHIVE_CONCURRENCY = 3
+
+
+def notion_archive_concurrency() -> int:
+    raw = os.environ.get(NOTION_ARCHIVE_CONCURRENCY_VAR, "").strip()
+    try:
+        value = int(raw) if raw else DEFAULT_NOTION_ARCHIVE_CONCURRENCY
+    except ValueError:
+        return DEFAULT_NOTION_ARCHIVE_CONCURRENCY
+    return value if value > 0 else DEFAULT_NOTION_ARCHIVE_CONCURRENCY
 
 
 class SettingError(Exception):
@@ -15,20 +34,47 @@ class SettingError(Exception):
 
 
 class NotionService:
-    def __init__(self, token, user_setting, logger):
+    def __init__(self, token, user_setting, logger, http_client=None, timings=None, api_stats=None):
         self.logger = logger
         self.token = token
         self.setting = user_setting
         self.page_property = self.setting["page_property"]
         self.notion_api_version = self.setting.get("notion_api_version", NOTION_API_VERSION_2022)
+        self.retry_policy = RetryPolicy.from_env()
+        self.retry_stats = RetryStats()
+        self.timings = timings if timings is not None else SyncTimings()
+        self.api_stats = api_stats if api_stats is not None else ApiCallStats()
+        self.circuit_breaker = get_circuit_breaker("notion")
+        self.rate_limiter = get_rate_limiter("notion", notion_rate_limit_scope())
 
         try:
-            self.client = Client(auth=self.token, notion_version=self.notion_api_version)
+            self.client = self._create_client(http_client)
             self.logger.debug(f"Notion client initialized successfully with API version {self.notion_api_version}.")
         except Exception as e:
             self.logger.error(f"Failed to initialize Notion client: {e}")
             raise SettingError(f"Failed to initialize Notion client: {e}")
 
+    def _create_client(self, http_client):
+        # Per-user client over the process-wide connection pool unless the caller injects one.
+        self.http_client = http_client if http_client is not None else create_notion_http_client()
+        track_response_sizes(self.http_client)
+        return Client(auth=self.token, notion_version=self.notion_api_version, client=self.http_client)
+
+    def _call(self, endpoint, fn, *args, idempotent=True, **kwargs):
+        """Call a Notion client method through the shared retry policy and circuit breaker."""
+        return call_with_retry(
+            lambda: fn(*args, **kwargs),
+            provider="notion",
+            endpoint=endpoint,
+            policy=self.retry_policy,
+            stats=self.retry_stats,
+            breaker=self.circuit_breaker,
+            rate_limiter=self.rate_limiter,
+            idempotent=idempotent,
+            logger=self.logger,
+            api_stats=self.api_stats,
+        )
+
     def test_connection(self):
         try:
             self.client.users.me()
@@ -41,7 +87,14 @@ class NotionService:
             self.logger.error(f"Notion Connection failed: {e}. Please check your network connection.")
             return False
 
-    def _query_database_with_pagination(self, **query_kwargs):
+    def _query_page_body(self, request_body, next_cursor):
+        paginated_query_kwargs = {**request_body, "page_size": 100}
+        if next_cursor:
+            paginated_query_kwargs["start_cursor"] = next_cursor
+        return paginated_query_kwargs
+
+    def _query_database_with_pagination(self, page_span=None, **query_kwargs):
+        """Return every row of a database query; `page_span` names the timing span recorded per page."""
         results = []
         next_cursor = None
         page_number = 0
@@ -50,15 +103,14 @@ class NotionService:
 
         while True:
             page_number += 1
-            paginated_query_kwargs = {**request_body, "page_size": 100}
-            if next_cursor:
-                paginated_query_kwargs["start_cursor"] = next_cursor
-
-            response = self.client.request(
-                path=f"databases/{database_id}/query",
-                method="POST",
-                body=paginated_query_kwargs,
-            )
+            with timing_span(self.timings if page_span else None, page_span):
+                response = self._call(
+                    "databases.query",
+                    self.client.request,
+                    path=f"databases/{database_id}/query",
+                    method="POST",
+                    body=self._query_page_body(request_body, next_cursor),
+                )
             page_results = response.get("results", [])
             results.extend(page_results)
             self.logger.debug(
@@ -75,8 +127,8 @@ class NotionService:
 
         return results
 
-    def get_notion_task(self):
-
+    def _task_query(self):
+        """Return (summary, query kwargs) for the tasks in the configured date range."""
         # TODO: Notion has no filter for start date and end date so add extra column: GCAL_END_DATE_NOTION_NAME
         before_date_with_time_zone = self.setting["before_date"] + "T00:00:00.000" + self.setting["timecode"]
         after_date_with_time_zone = self.setting["after_date"] + "T00:00:00.000" + self.setting["timecode"]
@@ -90,208 +142,341 @@ class NotionService:
 
         self.logger.debug(notion_summary)
 
+        conditions = [
+            {
+                "property": self.page_property["Date_Notion_Name"],
+                "date": {"before": before_date_with_time_zone},
+            },
+            {
+                "property": self.page_property["GCal_End_Date_Notion_Name"],
+                "formula": {"date": {"on_or_after": after_date_with_time_zone}},
+            },
+        ]
+        # With deterministic event ids an unlinked deleted row may still own an event, so it has to be fetched.
+        if not deterministic_event_ids_enabled():
+            conditions.append(self._not_tombstoned_filter())
+        return notion_summary, {
+            "database_id": self.setting["database_id"],
+            "filter": {"and": conditions},
+        }
+
+    def _not_tombstoned_filter(self):
+        """Match rows that are not tombstones: not marked deleted, or still linked to an event to delete."""
+        return {
+            "or": [
+                {"property": self.page_property["Delete_Notion_Name"], "checkbox": {"equals": False}},
+                {"property": self.page_property["GCal_EventId_Notion_Name"], "rich_text": {"is_not_empty": True}},
+            ]
+        }
+
+    def _tombstone_query(self):
+        """Rows left behind by `delete_notion_task`, across the whole database (no date window)."""
+        return {
+            "database_id": self.setting["database_id"],
+            "filter": {
+                "and": [
+                    {"property": self.page_property["Delete_Notion_Name"], "checkbox": {"equals": True}},
+                    {"property": self.page_property["GCal_EventId_Notion_Name"], "rich_text": {"is_empty": True}},
+                ]
+            },
+        }
+
+    def _gcal_event_id_query(self, gcal_event_id):
+        return {
+            "database_id": self.setting["database_id"],
+            "filter": {
+                "property": self.page_property["GCal_EventId_Notion_Name"],
+                "rich_text": {"equals": gcal_event_id},
+            },
+        }
+
+    def get_notion_task(self):
+        notion_summary, query = self._task_query()
         try:
-            return (
-                notion_summary,
-                self._query_database_with_pagination(
-                    database_id=self.setting["database_id"],
-                    filter={
-                        "and": [
-                            {
-                                "property": self.page_property["Date_Notion_Name"],
-                                "date": {"before": before_date_with_time_zone},
-                            },
-                            {
-                                "property": self.page_property["GCal_End_Date_Notion_Name"],
-                                "formula": {"date": {"on_or_after": after_date_with_time_zone}},
-                            },
-                        ]
-                    },
-                ),
-            )
+            return notion_summary, self._query_database_with_pagination(page_span="notion_fetch_page", **query)
         except Exception as e:
             error_message = f"Error reading Notion table: {e}"
             self.logger.error(error_message)
             raise SettingError(error_message)
 
+    def _latest_edit_body(self):
+        _, query = self._task_query()
+        return {
+            "filter": query["filter"],
+            "sorts": [{"timestamp": "last_edited_time", "direction": "descending"}],
+            "page_size": 1,
+        }
+
+    def get_latest_notion_edit_time(self):
+        """Return the last_edited_time of the most recently edited task in the sync window (one query call)."""
+        response = self._call(
+            "databases.query",
+            self.client.request,
+            path=f"databases/{self.setting['database_id']}/query",
+            method="POST",
+            body=self._latest_edit_body(),
+        )
+        results = response.get("results") or []
+        return results[0].get("last_edited_time") if results else None
+
     def get_notion_task_by_gcal_event_id(self, gcal_event_id):
         try:
             self.logger.info(f"Reading Notion database by Google event ID: {gcal_event_id}")
-            return self._query_database_with_pagination(
-                database_id=self.setting["database_id"],
-                filter={
-                    "property": self.page_property["GCal_EventId_Notion_Name"],
-                    "rich_text": {"equals": gcal_event_id},
-                },
-            )
+            return self._query_database_with_pagination(**self._gcal_event_id_query(gcal_event_id))
         except Exception as e:
             self.logger.error(f"Error reading Notion table: {e}")
             return None
 
-    def update_notion_task(self, page_id, gcal_event, gcal_cal_name, new_gcal_sync_time):
-        """
-        Update a Notion task with Google Calendar event details.
+    def _live_task(self, page_id, page):
+        if page.get("archived") or page.get("in_trash"):
+            self.logger.debug(f"Notion task {page_id} is archived or in the trash.")
+            return None
+        return page
 
-        Notes:
-            - The function updates the task's title, date, location, and Google Calendar event ID.
-            - It also updates the current calendar name.
-            - The function handles exceptions and logs errors if any occur.
+    def _missing_task(self, error, page_id):
+        if getattr(error, "status", None) == 404:
+            self.logger.warning(f"Notion task {page_id} no longer exists.")
+            return True
+        return False
 
-        Limits:
-            - The function does not update the task's extra information from Google Calendar.
-        """
-        summary_without_emojis = self.remove_emojis(gcal_event.get("summary", ""))
+    def get_notion_task_by_id(self, page_id):
+        """Return one task page (pages.retrieve), or None when it is gone, archived or in the trash."""
+        try:
+            page = self._call("pages.retrieve", self.client.pages.retrieve, page_id=page_id)
+        except APIResponseError as e:
+            if self._missing_task(e, page_id):
+                return None
+            raise
+        return self._live_task(page_id, page)
+
+    def _event_dates(self, gcal_event):
         gcal_event_start_datetime = self.get_event_time(gcal_event, "start")
         gcal_event_end_datetime = self.get_event_time(gcal_event, "end")
 
         # Adjust end date if it is in the date format. All day event will be the same day
         if "date" in gcal_event["end"]:
             gcal_event_end_datetime = self.adjust_end_date(gcal_event_end_datetime)
+        return gcal_event_start_datetime, gcal_event_end_datetime
 
-        self.client.pages.update(
-            page_id=page_id,
-            properties={
-                self.page_property["Task_Notion_Name"]: {
-                    "type": "title",
-                    "title": [{"type": "text", "text": {"content": summary_without_emojis}}],
-                },
-                self.page_property["Date_Notion_Name"]: {
-                    "type": "date",
-                    "date": {
-                        "start": gcal_event_start_datetime,
-                        "end": gcal_event_end_datetime,
-                    },
+    def _task_update_properties(self, gcal_event, gcal_cal_name, new_gcal_sync_time):
+        summary_without_emojis = self.remove_emojis(gcal_event.get("summary", ""))
+        gcal_event_start_datetime, gcal_event_end_datetime = self._event_dates(gcal_event)
+        return {
+            self.page_property["Task_Notion_Name"]: {
+                "type": "title",
+                "title": [{"type": "text", "text": {"content": summary_without_emojis}}],
+            },
+            self.page_property["Date_Notion_Name"]: {
+                "type": "date",
+                "date": {
+                    "start": gcal_event_start_datetime,
+                    "end": gcal_event_end_datetime,
                 },
-                self.page_property["ExtraInfo_Notion_Name"]: {
-                    "type": "rich_text",
-                    "rich_text": [{"text": {"content": gcal_event.get("description", "")}}],
+            },
+            self.page_property["ExtraInfo_Notion_Name"]: {
+                "type": "rich_text",
+                "rich_text": [{"text": {"content": gcal_event.get("description", "")}}],
+            },
+            self.page_property["Location_Notion_Name"]: {
+                "type": "place",
+                "place": {
+                    "lat": 0,
+                    "lon": 0,
+                    "address": gcal_event.get("location", ""),
                 },
-                self.page_property["Location_Notion_Name"]: {
-                    "type": "place",
-                    "place": {
-                        "lat": 0,
-                        "lon": 0,
-                        "address": gcal_event.get("location", ""),
+            },
+            self.page_property["GCal_Sync_Time_Notion_Name"]: {
+                "type": "rich_text",
+                "rich_text": [{"text": {"content": new_gcal_sync_time}}],
+            },
+            self.page_property["GCal_EventId_Notion_Name"]: {
+                "type": "rich_text",
+                "rich_text": [{"text": {"content": gcal_event.get("id", "")}}],
+            },
+            self.page_property["GCal_Name_Notion_Name"]: {
+                "select": {"name": gcal_cal_name},
+            },
+        }
+
+    def _task_create_properties(self, gcal_event, gcal_cal_name):
+        gcal_event_start_datetime, gcal_event_end_datetime = self._event_dates(gcal_event)
+        return {
+            self.page_property["Task_Notion_Name"]: {
+                "type": "title",
+                "title": [
+                    {
+                        "type": "text",
+                        "text": {
+                            "content": gcal_event.get("summary", ""),
+                        },
                     },
+                ],
+            },
+            self.page_property["Date_Notion_Name"]: {
+                "type": "date",
+                "date": {
+                    "start": gcal_event_start_datetime,
+                    "end": gcal_event_end_datetime,
                 },
-                self.page_property["GCal_Sync_Time_Notion_Name"]: {
-                    "type": "rich_text",
-                    "rich_text": [{"text": {"content": new_gcal_sync_time}}],
-                },
-                self.page_property["GCal_EventId_Notion_Name"]: {
-                    "type": "rich_text",
-                    "rich_text": [{"text": {"content": gcal_event.get("id", "")}}],
-                },
-                self.page_property["GCal_Name_Notion_Name"]: {
-                    "select": {"name": gcal_cal_name},
+            },
+            self.page_property["ExtraInfo_Notion_Name"]: {
+                "type": "rich_text",
+                "rich_text": [{"text": {"content": gcal_event.get("description", "")}}],
+            },
+            self.page_property["Location_Notion_Name"]: {
+                "type": "place",
+                "place": {
+                    "lat": 0,
+                    "lon": 0,
+                    "address": gcal_event.get("location", ""),
                 },
             },
+            self.page_property["GCal_EventId_Notion_Name"]: {
+                "type": "rich_text",
+                "rich_text": [{"text": {"content": gcal_event.get("id")}}],
+            },
+            self.page_property["GCal_Name_Notion_Name"]: {
+                "select": {"name": gcal_cal_name},
+            },
+        }
+
+    def _gcal_event_id_properties(self, new_gcal_event_id):
+        return {
+            self.page_property["GCal_EventId_Notion_Name"]: {
+                "type": "rich_text",
+                "rich_text": [{"text": {"content": new_gcal_event_id}}],
+            },
+        }
+
+    def _gcal_sync_time_properties(self, new_gcal_sync_time):
+        return {
+            self.page_property["GCal_Sync_Time_Notion_Name"]: {
+                "type": "rich_text",
+                "rich_text": [{"text": {"content": new_gcal_sync_time}}],
+            },
+        }
+
+    def _default_calendar_properties(self, default_calendar_name):
+        return {
+            self.page_property["GCal_Name_Notion_Name"]: {
+                "select": {"name": default_calendar_name},
+            },
+        }
+
+    def _deletion_properties(self):
+        return {
+            self.page_property["Delete_Notion_Name"]: {"checkbox": True},
+            self.page_property["GCal_Sync_Time_Notion_Name"]: {
+                "type": "rich_text",
+                "rich_text": [{"text": {"content": ""}}],
+            },
+            self.page_property["GCal_EventId_Notion_Name"]: {
+                "type": "rich_text",
+                "rich_text": [{"text": {"content": ""}}],
+            },
+        }
+
+    def update_notion_task(self, page_id, gcal_event, gcal_cal_name, new_gcal_sync_time):
+        """
+        Update a Notion task with Google Calendar event details.
+
+        Notes:
+            - The function updates the task's title, date, location, and Google Calendar event ID.
+            - It also updates the current calendar name.
+            - The function handles exceptions and logs errors if any occur.
+
+        Limits:
+            - The function does not update the task's extra information from Google Calendar.
+        """
+        self._call(
+            "pages.update",
+            self.client.pages.update,
+            page_id=page_id,
+            properties=self._task_update_properties(gcal_event, gcal_cal_name, new_gcal_sync_time),
         )
 
     def update_notion_task_for_new_gcal_event_id(self, page_id, new_gcal_event_id):
-        self.client.pages.update(
+        self._call(
+            "pages.update",
+            self.client.pages.update,
             page_id=page_id,
-            properties={
-                self.page_property["GCal_EventId_Notion_Name"]: {
-                    "type": "rich_text",
-                    "rich_text": [{"text": {"content": new_gcal_event_id}}],
-                },
-            },
+            properties=self._gcal_event_id_properties(new_gcal_event_id),
         )
 
     def update_notion_task_for_new_gcal_sync_time(self, page_id, new_gcal_sync_time):
-        self.client.pages.update(
+        self._call(
+            "pages.update",
+            self.client.pages.update,
             page_id=page_id,
-            properties={
-                self.page_property["GCal_Sync_Time_Notion_Name"]: {
-                    "type": "rich_text",
-                    "rich_text": [{"text": {"content": new_gcal_sync_time}}],
-                },
-            },
+            properties=self._gcal_sync_time_properties(new_gcal_sync_time),
         )
 
     def update_notion_task_for_default_calendar(self, page_id, default_calendar_name):
         """Update the Notion task for the default calendar."""
-        self.client.pages.update(
+        self._call(
+            "pages.update",
+            self.client.pages.update,
             page_id=page_id,
-            properties={
-                self.page_property["GCal_Name_Notion_Name"]: {
-                    "select": {"name": default_calendar_name},
-                },
-            },
+            properties=self._default_calendar_properties(default_calendar_name),
         )
 
     def create_notion_task(self, gcal_event, gcal_cal_name):
         """Create a Notion task using Google Calendar event details."""
-
-        gcal_event_start_datetime = self.get_event_time(gcal_event, "start")
-        gcal_event_end_datetime = self.get_event_time(gcal_event, "end")
-
-        # Adjust end date if it is in the date format. All day event will be the same day
-        if "date" in gcal_event["end"]:
-            gcal_event_end_datetime = self.adjust_end_date(gcal_event_end_datetime)
-
-        self.client.pages.create(
+        self._call(
+            "pages.create",
+            self.client.pages.create,
+            idempotent=False,
             parent={"database_id": self.setting["database_id"]},
-            properties={
-                self.page_property["Task_Notion_Name"]: {
-                    "type": "title",
-                    "title": [
-                        {
-                            "type": "text",
-                            "text": {
-                                "content": gcal_event.get("summary", ""),
-                            },
-                        },
-                    ],
-                },
-                self.page_property["Date_Notion_Name"]: {
-                    "type": "date",
-                    "date": {
-                        "start": gcal_event_start_datetime,
-                        "end": gcal_event_end_datetime,
-                    },
-                },
-                self.page_property["ExtraInfo_Notion_Name"]: {
-                    "type": "rich_text",
-                    "rich_text": [{"text": {"content": gcal_event.get("description", "")}}],
-                },
-                self.page_property["Location_Notion_Name"]: {
-                    "type": "place",
-                    "place": {
-                        "lat": 0,
-                        "lon": 0,
-                        "address": gcal_event.get("location", ""),
-                    },
-                },
-                self.page_property["GCal_EventId_Notion_Name"]: {
-                    "type": "rich_text",
-                    "rich_text": [{"text": {"content": gcal_event.get("id")}}],
-                },
-                self.page_property["GCal_Name_Notion_Name"]: {
-                    "select": {"name": gcal_cal_name},
-                },
-            },
+            properties=self._task_create_properties(gcal_event, gcal_cal_name),
         )
         self.logger.info("Created Notion task for Google Calendar event_id=%s", gcal_event.get("id"))
 
     def delete_notion_task(self, page_id):
-        self.client.pages.update(
+        self._call(
+            "pages.update",
+            self.client.pages.update,
             page_id=page_id,
-            properties={
-                self.page_property["Delete_Notion_Name"]: {"checkbox": True},
-                self.page_property["GCal_Sync_Time_Notion_Name"]: {
-                    "type": "rich_text",
-                    "rich_text": [{"text": {"content": ""}}],
-                },
-                self.page_property["GCal_EventId_Notion_Name"]: {
-                    "type": "rich_text",
-                    "rich_text": [{"text": {"content": ""}}],
-                },
-            },
+            properties=self._deletion_properties(),
         )
         self.logger.info(f"Event {page_id} marked as deletion in Notion successfully.")
 
+    def archive_notion_task(self, page_id):
+        self._call("pages.update", self.client.pages.update, page_id=page_id, archived=True)
+
+    def _archive_summary(self, page_ids, failed_page_ids):
+        summary = {
+            "action": "archive_deleted_notion_tasks",
+            "database_id": self.setting["database_id"],
+            "tombstones_found": len(page_ids),
+            "archived": len(page_ids) - len(failed_page_ids),
+            "failed_page_ids": failed_page_ids,
+        }
+        self.logger.info(summary)
+        return summary
+
+    def archive_deleted_notion_tasks(self, concurrency=None):
+        """
+        Archive every tombstoned row (Delete ticked, event id cleared) so later task queries stop returning it.
+
+        At most `concurrency` archives (NOTION_ARCHIVE_CONCURRENCY, default 3) are in flight; the shared Notion
+        rate limiter still paces them. A failed archive is reported in the summary and does not stop the rest.
+        """
+        page_ids = [page["id"] for page in self._query_database_with_pagination(**self._tombstone_query())]
+
+        def archive(page_id):
+            try:
+                self.archive_notion_task(page_id)
+                return None
+            except Exception as e:
+                self.logger.error(f"Failed to archive deleted Notion task {page_id}: {e}")
+                return page_id
+
+        with ThreadPoolExecutor(
+            max_workers=concurrency or notion_archive_concurrency(), thread_name_prefix="notion-archive"
+        ) as executor:
+            failed_page_ids = [page_id for page_id in executor.map(archive, page_ids) if page_id is not None]
+        return self._archive_summary(page_ids, failed_page_ids)
+
     def parse_date_in_notion_format(self, date_obj):
         """Helper function to notion format dates."""
         try:
@@ -0,0 +1,190 @@
+"""
+asyncio variant of `NotionService` built on `notion_client.AsyncClient`.
+
+Queries, property payloads and retry/rate-limit settings are inherited from `NotionService`; only the I/O
+methods are coroutines, so many users' Notion calls can share one event loop.
+"""
+
+import asyncio
+
+from notion_client import AsyncClient
+from notion_client.errors import APIResponseError
+
+from notion.notion_http import create_notion_async_http_client, track_response_sizes
+from notion.notion_service import NotionService, SettingError, notion_archive_concurrency
+from utils.retry_utils import call_with_retry_async
+from utils.sync_timings import timing_span
+
+
+class AsyncNotionService(NotionService):
+    def __init__(self, token, user_setting, logger, http_client=None, transport=None, timings=None, api_stats=None):
+        self._transport = transport
+        super().__init__(token, user_setting, logger, http_client=http_client, timings=timings, api_stats=api_stats)
+
+    def _create_client(self, http_client):
+        self.http_client = http_client if http_client is not None else create_notion_async_http_client(self._transport)
+        track_response_sizes(self.http_client)
+        return AsyncClient(auth=self.token, notion_version=self.notion_api_version, client=self.http_client)
+
+    async def _call(self, endpoint, fn, *args, idempotent=True, **kwargs):
+        """Await a Notion client method through the shared retry policy and circuit breaker."""
+        return await call_with_retry_async(
+            lambda: fn(*args, **kwargs),
+            provider="notion",
+            endpoint=endpoint,
+            policy=self.retry_policy,
+            stats=self.retry_stats,
+            breaker=self.circuit_breaker,
+            rate_limiter=self.rate_limiter,
+            idempotent=idempotent,
+            logger=self.logger,
+            api_stats=self.api_stats,
+        )
+
+    async def aclose(self):
+        await self.http_client.aclose()
+
+    async def test_connection(self):
+        try:
+            await self.client.users.me()
+            self.logger.info("Notion connection passed.")
+            return True
+        except APIResponseError as e:
+            self.logger.error(f"Notion API error: {e}. Please click 'view settings' and re-authorize the integration.")
+            return False
+        except Exception as e:
+            self.logger.error(f"Notion Connection failed: {e}. Please check your network connection.")
+            return False
+
+    async def _query_database_with_pagination(self, page_span=None, **query_kwargs):
+        results = []
+        next_cursor = None
+        database_id = query_kwargs["database_id"]
+        request_body = {key: value for key, value in query_kwargs.items() if key != "database_id"}
+
+        while True:
+            with timing_span(self.timings if page_span else None, page_span):
+                response = await self._call(
+                    "databases.query",
+                    self.client.request,
+                    path=f"databases/{database_id}/query",
+                    method="POST",
+                    body=self._query_page_body(request_body, next_cursor),
+                )
+            results.extend(response.get("results", []))
+            if not response.get("has_more"):
+                break
+            next_cursor = response.get("next_cursor")
+
+        self.logger.debug("Notion query fetched %s rows", len(results))
+        return results
+
+    async def get_notion_task(self):
+        notion_summary, query = self._task_query()
+        try:
+            return notion_summary, await self._query_database_with_pagination(page_span="notion_fetch_page", **query)
+        except Exception as e:
+            error_message = f"Error reading Notion table: {e}"
+            self.logger.error(error_message)
+            raise SettingError(error_message)
+
+    async def get_latest_notion_edit_time(self):
+        response = await self._call(
+            "databases.query",
+            self.client.request,
+            path=f"databases/{self.setting['database_id']}/query",
+            method="POST",
+            body=self._latest_edit_body(),
+        )
+        results = response.get("results") or []
+        return results[0].get("last_edited_time") if results else None
+
+    async def get_notion_task_by_gcal_event_id(self, gcal_event_id):
+        try:
+            self.logger.info(f"Reading Notion database by Google event ID: {gcal_event_id}")
+            return await self._query_database_with_pagination(**self._gcal_event_id_query(gcal_event_id))
+        except Exception as e:
+            self.logger.error(f"Error reading Notion table: {e}")
+            return None
+
+    async def get_notion_task_by_id(self, page_id):
+        try:
+            page = await self._call("pages.retrieve", self.client.pages.retrieve, page_id=page_id)
+        except APIResponseError as e:
+            if self._missing_task(e, page_id):
+                return None
+            raise
+        return self._live_task(page_id, page)
+
+    async def update_notion_task(self, page_id, gcal_event, gcal_cal_name, new_gcal_sync_time):
+        await self._call(
+            "pages.update",
+            self.client.pages.update,
+            page_id=page_id,
+            properties=self._task_update_properties(gcal_event, gcal_cal_name, new_gcal_sync_time),
+        )
+
+    async def update_notion_task_for_new_gcal_event_id(self, page_id, new_gcal_event_id):
+        await self._call(
+            "pages.update",
+            self.client.pages.update,
+            page_id=page_id,
+            properties=self._gcal_event_id_properties(new_gcal_event_id),
+        )
+
+    async def update_notion_task_for_new_gcal_sync_time(self, page_id, new_gcal_sync_time):
+        await self._call(
+            "pages.update",
+            self.client.pages.update,
+            page_id=page_id,
+            properties=self._gcal_sync_time_properties(new_gcal_sync_time),
+        )
+
+    async def update_notion_task_for_default_calendar(self, page_id, default_calendar_name):
+        await self._call(
+            "pages.update",
+            self.client.pages.update,
+            page_id=page_id,
+            properties=self._default_calendar_properties(default_calendar_name),
+        )
+
+    async def create_notion_task(self, gcal_event, gcal_cal_name):
+        await self._call(
+            "pages.create",
+            self.client.pages.create,
+            idempotent=False,
+            parent={"database_id": self.setting["database_id"]},
+            properties=self._task_create_properties(gcal_event, gcal_cal_name),
+        )
+        self.logger.info("Created Notion task for Google Calendar event_id=%s", gcal_event.get("id"))
+
+    async def delete_notion_task(self, page_id):
+        await self._call(
+            "pages.update",
+            self.client.pages.update,
+            page_id=page_id,
+            properties=self._deletion_properties(),
+        )
+        self.logger.info(f"Event {page_id} marked as deletion in Notion successfully.")
+
+    async def archive_notion_task(self, page_id):
+        await self._call("pages.update", self.client.pages.update, page_id=page_id, archived=True)
+
+    async def archive_deleted_notion_tasks(self, concurrency=None):
+        page_ids = [page["id"] for page in await self._query_database_with_pagination(**self._tombstone_query())]
+        semaphore = asyncio.Semaphore(concurrency or notion_archive_concurrency())
+
+        async def archive(page_id):
+            async with semaphore:
+                try:
+                    await self.archive_notion_task(page_id)
+                    return None
+                except Exception as e:
+                    self.logger.error(f"Failed to archive deleted Notion task {page_id}: {e}")
+                    return page_id
+
+        results = await asyncio.gather(*(archive(page_id) for page_id in page_ids))
+        return self._archive_summary(page_ids, [page_id for page_id in results if page_id is not None])
+
+
+__all__ = ["AsyncNotionService"]
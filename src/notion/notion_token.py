@@ -1,4 +1,5 @@
 import os
+from utils.sync_timings import timing_span
 from utils.token_crypto import (
     TokenCryptoError,
     decrypt_token,
@@ -16,9 +17,10 @@ class SettingError(Exception):
 class NotionToken:
     """Handles Notion API token"""
 
-    def __init__(self, config, logger):
+    def __init__(self, config, logger, timings=None):
         self.logger = logger
         self.config = config
+        self.timings = timings
         self.mode = config.get("mode")
         self.uuid = config.get("uuid")
         self.token = self.load_settings(self.uuid if self.mode == "cloud" else None)
@@ -32,7 +34,8 @@ class NotionToken:
 
                 response = get_notion_token_by_uuid(uuid)
                 try:
-                    return decrypt_token(response.get("accessToken"))
+                    with timing_span(self.timings, "token_decrypt"):
+                        return decrypt_token(response.get("accessToken"))
                 except TokenCryptoError as e:
                     raise SettingError(f"Failed to decrypt Notion token: {e}") from e
             except SettingError:
@@ -44,7 +47,8 @@ class NotionToken:
             if not token:
                 raise SettingError("NOTION_TOKEN environment variable is required in local mode but is not set.")
             try:
-                return decrypt_token_if_encrypted(token)
+                with timing_span(self.timings, "token_decrypt"):
+                    return decrypt_token_if_encrypted(token)
             except TokenCryptoError as e:
                 raise SettingError(f"Failed to decrypt Notion token: {e}") from e
         raise SettingError(f"Unknown config mode '{self.mode}'. Expected 'cloud' or 'local'.")
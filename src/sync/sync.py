@@ -1,98 +1,291 @@
 import sys
-import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 from pathlib import Path
-from datetime import datetime, timezone
-from dateutil.parser import isoparse
-from utils.logging_utils import build_debug_exception_detail, get_logger  # noqa: E402
-from notion.notion_properties import get_checkbox, get_rich_text, get_select, get_title
+from utils.logging_utils import get_logger  # noqa: E402
+from sync.sync_checkpoint import SyncCheckpoint
+from sync.sync_plan import SyncAbortError, plan_create_notion, plan_notion_task, replay_event_location
+from sync.sync_probe import advance_watermark, finish_probe, notion_changed_since, probe_failed, probe_since
+from sync.sync_result import (
+    api_call_summary,
+    build_create_notion_failure,
+    build_deferred_action,
+    build_task_failure,
+    check_loaded_inputs,
+    count_action,
+    defer_at_retry_deadline,
+    elapsed_ms,
+    failure_calendar_id,
+    finish_retry_ledger,
+    finish_sync,
+    get_current_time_in_iso_format,
+    input_load_failed_response,
+    ledger_entry_failure,
+    partial_before_input_load,
+    probe_enabled_for,
+    replay_summary,
+    retry_summary,
+    span_summary,
+    sync_failed_response,
+    unchanged_sync_summary,
+)
+from sync.sync_retry_ledger import SyncRetryLedger
+from utils.retry_utils import RetryDeadlineError, bind_retry_deadline
+from utils.sync_timings import SyncTimings, timing_span
 
 # Configure logging
 logger = get_logger(__name__)
 
-# Cap sync volume to avoid unbounded processing for large datasets.
-SYNC_TASK_LIMIT = 250
-SAFE_SYNC_FAILURE_MESSAGE = "Sync failed. See Lambda logs with aws_request_id for details."
 
+def _timed_call(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, elapsed_ms(started)
 
-class SyncAbortError(Exception):
-    """Raised when a fatal condition requires the entire sync to stop immediately."""
 
-    pass
-
-
-def compare_timezones(notion_time_str, google_time_str):
-    # Parse the time strings into datetime objects
-    notion_time = isoparse(notion_time_str)
-    google_time = isoparse(google_time_str)
-
-    notion_timezone = notion_time.tzinfo
-    google_timezone = google_time.tzinfo
-    logger.debug(f"Notion Timezone: {notion_timezone}, Google Calendar Timezone: {google_timezone}")
-    if notion_timezone != google_timezone:
-        raise SyncAbortError(f"Timezones are different: Notion {notion_timezone} and Google Calendar {google_timezone}")
-
-
-def get_current_time_in_iso_format():
+def _load_inputs(notion_service, google_service):
     """
-    Returns the current UTC time in ISO 8601 format with milliseconds.
-    Format: YYYY-MM-DDTHH:MM:SS.SSSZ
+    Fetch Google events and Notion tasks concurrently and wait for both.
+
+    Returns (gcal_event_list, notion_config, notion_task_list, timings). Either fetch's exception is re-raised
+    after the other one has finished.
     """
-    current_time = datetime.now(timezone.utc)
-    formatted_current_time = current_time.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
-    # Trim the microseconds to milliseconds (3 decimal places)
-    formatted_current_time = formatted_current_time[:-3] + "Z"
-    return formatted_current_time
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="sync-input") as executor:
+        # Each fetch runs in a copy of this context so the run's active API call stats follow it.
+        gcal_future = executor.submit(copy_context().run, _timed_call, google_service.get_gcal_event)
+        notion_future = executor.submit(copy_context().run, _timed_call, notion_service.get_notion_task)
+        gcal_event_list, gcal_fetch_ms = gcal_future.result()
+        (notion_config, notion_task_list), notion_fetch_ms = notion_future.result()
+    timings = {
+        "gcal_fetch_ms": gcal_fetch_ms,
+        "notion_fetch_ms": notion_fetch_ms,
+        "input_load_ms": elapsed_ms(started),
+    }
+    return gcal_event_list, notion_config, notion_task_list, timings
 
 
-def remove_gcal_event_from_list(gcal_event_list, gcal_event, gcal_event_summary):
-    gcal_event_list.remove(gcal_event)
-    logger.debug(
-        f"Google Calendar: Event '{gcal_event_summary}' removed from the list, {len(gcal_event_list)} events remaining\n"  # noqa: E501
+def _run_change_probe(user_setting, notion_service, google_service, checkpoint, watermark):
+    """Return the change probe summary; result "unchanged" means the full sync can be skipped."""
+    since, probe = probe_since(user_setting, checkpoint, watermark)
+    if since is None:
+        return probe
+    started = time.perf_counter()
+    calls = 1
+    try:
+        changed = notion_changed_since(notion_service.get_latest_notion_edit_time(), since)
+        if not changed:
+            changed, gcal_calls = google_service.probe_gcal_changes(since)
+            calls += gcal_calls
+    except Exception:
+        logger.warning("Change probe failed; running the full sync", exc_info=True)
+        return probe_failed(probe, calls, started)
+    return finish_probe(probe, changed, calls, started)
+
+
+def _execute_task_plan(
+    plan, notion_service, google_service, checkpoint, current_gcal_sync_time, action_counts, timings=None
+):
+    notion_task_page_id = plan["notion_task_id"]
+    action = plan["action"]
+    if plan["default_calendar_name"]:
+        logger.info("Update Notion Task for default calendar id and calendar name")
+        with timing_span(timings, "write.default_calendar"):
+            notion_service.update_notion_task_for_default_calendar(notion_task_page_id, plan["default_calendar_name"])
+    if action is None or plan["deferred"] or plan["error"]:
+        return
+
+    with timing_span(timings, f"write.{action}"):
+        _run_task_action(plan, notion_service, google_service, checkpoint, current_gcal_sync_time)
+    # update_notion writes only to Notion and keeps no checkpoint entry.
+    if action != "update_notion":
+        checkpoint.complete(action, notion_task_page_id)
+    count_action(action_counts, action)
+
+
+def _run_task_action(plan, notion_service, google_service, checkpoint, current_gcal_sync_time):
+    notion_task_page_id = plan["notion_task_id"]
+    action = plan["action"]
+    if action == "create_gcal":
+        if plan["resumed"]:
+            new_gcal_event_id = plan["resumed"]["gcal_event_id"]
+        elif plan["client_gcal_event_id"]:
+            # Idempotent insert: a repeated create finds the existing event instead of duplicating it.
+            logger.debug("Creating a Google Calendar event with a client-specified id for a Notion task.")
+            new_gcal_event_id = google_service.create_gcal_event(
+                plan["notion_task"], plan["calendar_id"], event_id=plan["client_gcal_event_id"]
+            )
+            checkpoint.record(action, notion_task_page_id, gcal_event_id=new_gcal_event_id)
+        else:
+            logger.debug("Creating a new event in Google Calendar for a Notion task.")
+            new_gcal_event_id = google_service.create_gcal_event(plan["notion_task"], plan["calendar_id"])
+            checkpoint.record(action, notion_task_page_id, gcal_event_id=new_gcal_event_id)
+        notion_service.update_notion_task_for_new_gcal_event_id(notion_task_page_id, new_gcal_event_id)
+    elif action == "delete_gcal":
+        if not plan["resumed"]:
+            logger.debug("Deleting a Google Calendar event for a Notion task.")
+            google_service.delete_gcal_event(plan["calendar_id"], plan["gcal_event_id"])
+            checkpoint.record(action, notion_task_page_id, gcal_event_id=plan["gcal_event_id"])
+        notion_service.delete_notion_task(notion_task_page_id)
+        duplicate_notion_task_list = notion_service.get_notion_task_by_gcal_event_id(plan["gcal_event_id"])
+        for duplicate_notion_task in duplicate_notion_task_list or []:
+            logger.debug(f"Duplicate Notion Task Page ID: {duplicate_notion_task['id']}")
+            notion_service.delete_notion_task(duplicate_notion_task["id"])
+    elif action == "update_gcal":
+        if not plan["resumed"]:
+            logger.debug("Updating the Google Calendar event from Notion.")
+            if plan["calendar_id"] == plan["source_calendar_id"]:
+                google_service.update_gcal_event(
+                    plan["notion_task"], plan["calendar_id"], plan["gcal_event_id"], existing_event=plan["gcal_event"]
+                )
+            else:
+                logger.debug("Moving Google Calendar event_id=%s to the configured calendar.", plan["gcal_event_id"])
+                google_service.move_and_update_gcal_event(
+                    plan["notion_task"],
+                    plan["gcal_event_id"],
+                    plan["calendar_id"],
+                    plan["source_calendar_id"],
+                )
+            checkpoint.record(
+                action,
+                notion_task_page_id,
+                gcal_event_id=plan["gcal_event_id"],
+                notion_last_edited_time=plan["notion_last_edited_time"],
+            )
+        notion_service.update_notion_task_for_new_gcal_sync_time(notion_task_page_id, current_gcal_sync_time)
+    elif action == "update_notion":
+        logger.debug("Updating the Notion task from Google Calendar.")
+        notion_service.update_notion_task(
+            notion_task_page_id,
+            plan["gcal_event"],
+            plan["calendar_name"],
+            current_gcal_sync_time,
+        )
+
+
+def _replay_task_inputs(entry, user_setting, notion_service, google_service):
+    """Fetch the task of a ledger entry and its linked event; the task is None when it is gone."""
+    notion_task = notion_service.get_notion_task_by_id(entry["notion_task_id"])
+    if notion_task is None:
+        return None, []
+    gcal_event_id, calendar_ids = replay_event_location(entry, notion_task, user_setting)
+    if not gcal_event_id:
+        # An event created for the task before its id write-back failed still carries the page id.
+        return notion_task, google_service.find_gcal_events_by_notion_page_id(notion_task["id"], calendar_ids)
+    for calendar_id in calendar_ids:
+        gcal_event = google_service.get_gcal_event_by_id(calendar_id, gcal_event_id)
+        if gcal_event is not None:
+            return notion_task, [gcal_event]
+    return notion_task, []
+
+
+def _replay_entry(
+    entry, user_setting, notion_service, google_service, checkpoint, current_gcal_sync_time, action_counts, timings
+):
+    """Re-plan one ledger item from freshly fetched data and run it; returns the plan, or None if nothing is left."""
+    if entry.get("notion_task_id"):
+        notion_task, gcal_event_list = _replay_task_inputs(entry, user_setting, notion_service, google_service)
+        if notion_task is None:
+            return None
+        with timing_span(timings, "planning"):
+            plan = plan_notion_task(notion_task, gcal_event_list, user_setting, checkpoint)
+        _execute_task_plan(
+            plan, notion_service, google_service, checkpoint, current_gcal_sync_time, action_counts, timings
+        )
+        return plan
+
+    gcal_event = google_service.get_gcal_event_by_id(entry.get("calendar_id"), entry["gcal_event_id"])
+    if gcal_event is None:
+        return None
+    existing_tasks = notion_service.get_notion_task_by_gcal_event_id(gcal_event["id"])
+    if existing_tasks is None:
+        raise RuntimeError(f"Could not look up Notion tasks for event_id={gcal_event['id']}")
+    if existing_tasks:
+        # A run in between already created the task.
+        return None
+    with timing_span(timings, "planning"):
+        plan = plan_create_notion(gcal_event, user_setting)
+    if not plan["error"]:
+        with timing_span(timings, "write.create_notion"):
+            notion_service.create_notion_task(gcal_event, plan["calendar_name"])
+        count_action(action_counts, "create_notion")
+    return plan
+
+
+def _replay_ledger(user_setting, notion_service, google_service, retry_ledger, checkpoint, deadline, timings):
+    """Retry only the ledger items; returns (summary, errors, deferred actions)."""
+    current_gcal_sync_time = get_current_time_in_iso_format()
+    sync_errors = []
+    deferred_actions = []
+    action_counts = {}
+    entries = list(retry_ledger.entries.values())
+    for entry in entries:
+        if deadline is not None and deadline.expired():
+            retry_ledger.keep(entry.get("notion_task_id"), entry.get("gcal_event_id"))
+            deferred_actions.append(
+                build_deferred_action(entry.get("action"), entry.get("notion_task_id"), entry.get("gcal_event_id"))
+            )
+            continue
+        try:
+            plan = _replay_entry(
+                entry,
+                user_setting,
+                notion_service,
+                google_service,
+                checkpoint,
+                current_gcal_sync_time,
+                action_counts,
+                timings,
+            )
+            if plan and plan["error"]:
+                sync_errors.append(plan["error"])
+        except SyncAbortError:
+            raise
+        except RetryDeadlineError as e:
+            logger.warning("Deferring ledger item action=%s: %s", entry.get("action"), e)
+            retry_ledger.keep(entry.get("notion_task_id"), entry.get("gcal_event_id"))
+            deferred_actions.append(
+                build_deferred_action(entry.get("action"), entry.get("notion_task_id"), entry.get("gcal_event_id"))
+            )
+        except Exception as e:
+            error = ledger_entry_failure(entry, e)
+            sync_errors.append(error)
+            retry_ledger.record_failure(error, calendar_id=entry.get("calendar_id"))
+            logger.exception("Error retrying ledger item action=%s", entry.get("action"))
+    replay = {"replayed": len(entries) - len(deferred_actions), "failed": len(sync_errors)}
+    summary = replay_summary(
+        replay, action_counts, deferred_actions, checkpoint, timings, notion_service, google_service
     )
+    finish_retry_ledger(retry_ledger, summary, sync_errors)
+    return summary, sync_errors, deferred_actions
 
 
-def get_gcal_event_from_list(gcal_event_list, gcal_event_id):
-    """Return the Google Calendar event with the given ID from the list."""
-    for gcal_event in gcal_event_list:
-        if gcal_event.get("id") == gcal_event_id:
-            return gcal_event
-
-    logger.debug(f"Google Calendar event '{gcal_event_id}' not found in the provided list")
-    return None
-
-
-def _exception_error_code(exc: Exception) -> str:
-    name = type(exc).__name__
-    code = re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
-    return code or "unexpected_sync_error"
-
-
-def _build_sync_error(
-    action: str | None,
-    error_code: str,
-    *,
-    error_message: str | None = None,
-    error: str | None = None,
-    notion_task_id: str | None = None,
-    gcal_event_id: str | None = None,
-    gcal_event_start: str | None = None,
-    retriable: bool | None = None,
-    debug_detail: str | None = None,
+def replay_retry_ledger(
+    user_setting: dict, notion_service, google_service, retry_ledger, checkpoint=None, deadline=None, timings=None
 ):
-    message = error_message if error_message is not None else error
-    payload = {
-        "action": action,
-        "error_code": error_code,
-        "error_message": message,
-        "error": error,
-        "notion_task_id": notion_task_id,
-        "gcal_event_id": gcal_event_id,
-        "gcal_event_start": gcal_event_start,
-        "retriable": retriable,
-    }
-    if debug_detail is not None:
-        payload["debug_detail"] = debug_detail
-    return payload
+    """
+    Retry only the items in `retry_ledger` (sync_retry_ledger.SyncRetryLedger), without fetching both windows.
+
+    Each item is re-planned from its freshly fetched Notion task and Google event, so an item that another run
+    or the user already fixed takes no action.
+    """
+    if checkpoint is None:
+        checkpoint = SyncCheckpoint(logger=logger)
+    if timings is None:
+        timings = SyncTimings()
+    trigger_sync_time = get_current_time_in_iso_format()
+    bind_retry_deadline(deadline, notion_service, google_service)
+    try:
+        summary, sync_errors, deferred_actions = _replay_ledger(
+            user_setting, notion_service, google_service, retry_ledger, checkpoint, deadline, timings
+        )
+    except Exception as e:
+        logger.exception("Error while retrying the sync retry ledger")
+        return sync_failed_response(e)
+    finally:
+        checkpoint.flush()
+    return finish_sync(summary, trigger_sync_time, sync_errors, deferred_actions)
 
 
 def synchronize_notion_and_google_calendar(
@@ -102,279 +295,114 @@ def synchronize_notion_and_google_calendar(
     compare_time=True,
     should_update_notion_tasks=True,
     should_update_google_events=True,
+    checkpoint=None,
+    deadline=None,
+    timings=None,
+    watermark=None,
+    retry_ledger=None,
 ):
-    try:
-        # notion page property
-        notion_page_property = user_setting["page_property"]
-        gcal_id_dict = user_setting["gcal_id_dict"]
-        gcal_name_dict = user_setting["gcal_name_dict"]
+    """
+    Sync one user's Notion tasks and Google Calendar events.
 
+    With a `watermark` (sync_probe.SyncWatermark) a cheap change probe runs first, and the run returns early
+    when neither side changed since the last complete sync; the watermark is advanced after a complete run.
+    Items that fail with a retriable error are recorded in `retry_ledger` (sync_retry_ledger.SyncRetryLedger);
+    when the probe finds no other change, only those items are retried.
+    """
+    if checkpoint is None:
+        checkpoint = SyncCheckpoint(logger=logger)
+    if retry_ledger is None:
+        retry_ledger = SyncRetryLedger(logger=logger)
+    if timings is None:
+        timings = SyncTimings()
+    if not probe_enabled_for(watermark, compare_time, should_update_notion_tasks, should_update_google_events):
+        watermark = None
+    # Provider retries stop backing off at the deadline; the engine defers what they could not finish.
+    bind_retry_deadline(deadline, notion_service, google_service)
+    try:
         # freeze the datetime of the gcal event and notion task status
         current_gcal_sync_time = get_current_time_in_iso_format()
         trigger_sync_time = get_current_time_in_iso_format()
 
+        if deadline is not None and deadline.expired():
+            return partial_before_input_load(trigger_sync_time)
+
+        probe = None
+        if watermark is not None:
+            with timings.span("change_probe"):
+                probe = _run_change_probe(user_setting, notion_service, google_service, checkpoint, watermark)
+            if probe["result"] == "unchanged" and retry_ledger.entries:
+                summary, sync_errors, deferred_actions = _replay_ledger(
+                    user_setting, notion_service, google_service, retry_ledger, checkpoint, deadline, timings
+                )
+                summary["change_probe"] = probe
+                return finish_sync(summary, trigger_sync_time, sync_errors, deferred_actions)
+            if probe["result"] == "unchanged":
+                summary = unchanged_sync_summary(probe, timings, notion_service, google_service)
+                return finish_sync(summary, trigger_sync_time, [], [])
+
         # Get the Google Calendar and Notion events
         try:
-            gcal_event_list = google_service.get_gcal_event()
-            notion_config, notion_task_list = notion_service.get_notion_task()
-            event_count = len(gcal_event_list)
-            task_count = len(notion_task_list)
-
-            # Create a summary of the sync process
-            sync_summary = {
-                "google_event_count": event_count,
-                "notion_task_count": task_count,
-                "notion_config": notion_config,
-            }
-
-            logger.debug(f"Sync Summary: {sync_summary}")
-            # Stop early if either side exceeds the supported sync cap.
-            if task_count > SYNC_TASK_LIMIT or event_count > SYNC_TASK_LIMIT:
-                warning_message = f"Task count exceeds {SYNC_TASK_LIMIT} when triggering sync at {trigger_sync_time}. Sync process stopped to avoid overloading the sync job."  # noqa: E501
-                logger.warning(warning_message)
-                return {
-                    "statusCode": 200,
-                    "body": {
-                        "status": "sync_error",
-                        "message": warning_message,
-                    },
-                }
-            # No Notion tasks found and no Google Calendar events found
-            if task_count == 0 and event_count == 0:
-                logger.debug("No Notion tasks found and no Google Calendar events found.")
-                return {
-                    "statusCode": 200,
-                    "body": {
-                        "status": "sync_success",
-                        "message": "No Notion tasks found and no Google Calendar events found.",
-                    },
-                }
+            gcal_event_list, notion_config, notion_task_list, input_timings = _load_inputs(
+                notion_service, google_service
+            )
+            sync_summary, early_response = check_loaded_inputs(
+                gcal_event_list, notion_config, notion_task_list, trigger_sync_time
+            )
+            if early_response is not None:
+                if early_response["body"]["status"] == "sync_success":
+                    advance_watermark(watermark, user_setting, trigger_sync_time, [], [])
+                return early_response
+            sync_summary["timings"] = input_timings
+            if probe is not None:
+                sync_summary["change_probe"] = probe
+        except RetryDeadlineError:
+            return partial_before_input_load(trigger_sync_time)
         except Exception:
             logger.exception("Failed to load sync inputs")
-            return {
-                "statusCode": 500,
-                "body": {
-                    "status": "sync_error",
-                    "message": {
-                        "error_code": "sync_input_load_failed",
-                        "error_message": SAFE_SYNC_FAILURE_MESSAGE,
-                    },
-                },
-            }
+            return input_load_failed_response()
 
         # Check if Notion Task is in Google Calendar
         sync_errors = []
+        deferred_actions = []
+        action_counts = {}
         for notion_task in notion_task_list:
             notion_task_page_id = notion_task.get("id")
-            notion_gcal_event_id = None
-            action = None
+            plan = None
+            # Once the deadline is reached, tasks are still matched but no new writes are started.
+            out_of_time = deadline is not None and deadline.expired()
             try:
-                notion_gcal_cal_name = get_select(
-                    notion_task["properties"],
-                    notion_page_property["GCal_Name_Notion_Name"],
-                )
-                if not notion_gcal_cal_name:
-                    notion_gcal_cal_name = user_setting["gcal_default_name"]
-                    notion_gcal_cal_id = user_setting["gcal_default_id"]
-                    logger.warning(f"Calendar name not found. Use the default calendar: {notion_gcal_cal_name}")
-                    logger.debug(f"Calendar id not found. Use the default calendar id: {notion_gcal_cal_id}")
-                    logger.info("Update Notion Task for default calendar id and calendar name")
-                    notion_service.update_notion_task_for_default_calendar(notion_task_page_id, notion_gcal_cal_name)
-                else:
-                    notion_gcal_cal_id = gcal_name_dict.get(notion_gcal_cal_name)
-                    if not notion_gcal_cal_id:
-                        logger.warning(
-                            f"Calendar '{notion_gcal_cal_name}' not found in gcal_name_dict, "
-                            f"skipping task '{notion_task_page_id}'"
-                        )
-                        continue
-
-                notion_gcal_event_id = get_rich_text(
-                    notion_task["properties"],
-                    notion_page_property["GCal_EventId_Notion_Name"],
-                )
-                notion_deletion = get_checkbox(
-                    notion_task["properties"],
-                    notion_page_property["Delete_Notion_Name"],
-                )
-                notion_task_name = (
-                    get_title(
-                        notion_task["properties"],
-                        notion_page_property["Task_Notion_Name"],
+                with timings.span("planning"):
+                    plan = plan_notion_task(
+                        notion_task,
+                        gcal_event_list,
+                        user_setting,
+                        checkpoint,
+                        compare_time=compare_time,
+                        should_update_notion_tasks=should_update_notion_tasks,
+                        should_update_google_events=should_update_google_events,
+                        out_of_time=out_of_time,
                     )
-                    or ""
-                )
-                notion_gcal_sync_time = get_rich_text(
-                    notion_task["properties"],
-                    notion_page_property["GCal_Sync_Time_Notion_Name"],
+                if plan["error"]:
+                    sync_errors.append(plan["error"])
+                if plan["deferred"]:
+                    deferred_actions.append(
+                        build_deferred_action(plan["action"], notion_task_page_id, plan["gcal_event_id"] or None)
+                    )
+                    retry_ledger.keep(notion_task_page_id)
+                _execute_task_plan(
+                    plan, notion_service, google_service, checkpoint, current_gcal_sync_time, action_counts, timings
                 )
-                notion_task_last_edited_time = notion_task.get("last_edited_time")
-
-                # Notion Task without Google Calendar Event ID - Create a new event in Google Calendar
-                if not notion_gcal_event_id and should_update_google_events:
-                    if notion_deletion:
-                        logger.debug("Skipping Google Calendar create for task marked deleted.")
-                        continue
-                    action = "create_gcal"
-                    logger.debug("Creating a new event in Google Calendar for a Notion task.")
-                    new_gcal_event_id = google_service.create_gcal_event(notion_task, notion_gcal_cal_id)
-                    notion_service.update_notion_task_for_new_gcal_event_id(notion_task_page_id, new_gcal_event_id)
-                    continue
-
-                # Notion Task with deletion flag - Delete the event in Google Calendar
-                if notion_deletion and notion_gcal_event_id is not None:
-                    action = "delete_gcal"
-                    logger.debug("Deleting a Google Calendar event for a Notion task.")
-                    google_service.delete_gcal_event(notion_gcal_cal_id, notion_gcal_event_id)
-
-                    notion_service.delete_notion_task(notion_task_page_id)
-
-                    duplicate_notion_task_list = notion_service.get_notion_task_by_gcal_event_id(notion_gcal_event_id)
-                    if duplicate_notion_task_list is not None:
-                        for duplicate_notion_task in duplicate_notion_task_list:
-                            duplicate_notion_task_page_id = duplicate_notion_task["id"]
-                            logger.debug(f"Duplicate Notion Task Page ID: {duplicate_notion_task_page_id}")
-                            notion_service.delete_notion_task(duplicate_notion_task_page_id)
-
-                    deleted_gcal_event = get_gcal_event_from_list(gcal_event_list, notion_gcal_event_id)
-                    if deleted_gcal_event is not None:
-                        remove_gcal_event_from_list(gcal_event_list, deleted_gcal_event, notion_gcal_event_id)
-                    continue
-
-                # Notion Task with Google Calendar Event ID - Check if the event is in Google Calendar
-                for gcal_event in gcal_event_list:
-                    gcal_event_summary = gcal_event.get("summary", "")
-                    gcal_event_id = gcal_event.get("id", "")
-                    gcal_event_updated_time = gcal_event.get("updated")
-                    gcal_cal_id = gcal_event.get("organizer", {}).get("email")
-                    gcal_cal_name = gcal_id_dict.get(gcal_cal_id)
-
-                    if notion_gcal_event_id == gcal_event_id:
-                        if compare_time:
-                            if not notion_task_last_edited_time or not gcal_event_updated_time:
-                                logger.warning(
-                                    "Missing last edited or updated time. Skipping sync for task_id=%s event_id=%s",
-                                    notion_task_page_id,
-                                    gcal_event_id,
-                                )
-                                continue
-
-                            compare_timezones(notion_task_last_edited_time, gcal_event_updated_time)
-
-                            if (
-                                notion_gcal_sync_time
-                                and notion_gcal_sync_time > gcal_event_updated_time
-                                and notion_gcal_sync_time > notion_task_last_edited_time
-                            ):
-                                logger.debug(
-                                    "Skipping already-synced task_id=%s event_id=%s",
-                                    notion_task_page_id,
-                                    gcal_event_id,
-                                )
-                                remove_gcal_event_from_list(gcal_event_list, gcal_event, gcal_event_summary)
-                                break
-
-                        # Update Google Calendar if Notion is newer or force update
-                        if should_update_google_events and (
-                            not compare_time or (notion_task_last_edited_time > gcal_event_updated_time)
-                        ):
-                            action = "update_gcal"
-                            logger.debug(
-                                "Notion task is newer than Google event for task_id=%s event_id=%s",
-                                notion_task_page_id,
-                                gcal_event_id,
-                            )
-                            logger.debug("Updating the Google Calendar event from Notion.")
-                            if notion_gcal_cal_id == gcal_cal_id:
-                                google_service.update_gcal_event(
-                                    notion_task,
-                                    notion_gcal_cal_id,
-                                    notion_gcal_event_id,
-                                )
-                            else:
-                                logger.debug(
-                                    "Moving Google Calendar event_id=%s to the configured calendar.",
-                                    gcal_event_id,
-                                )
-                                google_service.move_and_update_gcal_event(
-                                    notion_task,
-                                    notion_gcal_event_id,
-                                    notion_gcal_cal_id,
-                                    gcal_cal_id,
-                                )
-                            notion_service.update_notion_task_for_new_gcal_sync_time(
-                                notion_task_page_id, current_gcal_sync_time
-                            )
-                        # Update Notion if Google Calendar is newer or force update
-                        elif should_update_notion_tasks and (
-                            not compare_time or (notion_task_last_edited_time < gcal_event_updated_time)
-                        ):
-                            action = "update_notion"
-                            description = gcal_event.get("description") or ""
-                            if len(description) > 2000:
-                                sync_errors.append(
-                                    _build_sync_error(
-                                        action,
-                                        "gcal_description_too_long",
-                                        error=(
-                                            f"Skipped: GCal event description exceeds Notion's 2000-character "
-                                            f"rich_text limit ({len(description)} chars). "
-                                            "Syncing this event would corrupt data integrity."
-                                        ),
-                                        notion_task_id=notion_task_page_id,
-                                        gcal_event_id=gcal_event_id,
-                                        gcal_event_start=gcal_event.get("start", {}).get("dateTime")
-                                        or gcal_event.get("start", {}).get("date"),
-                                        retriable=False,
-                                    )
-                                )
-                                logger.warning(
-                                    "Skipped update_notion for event_id=%s because the description exceeds "
-                                    "the Notion limit.",
-                                    gcal_event_id,
-                                )
-                            else:
-                                logger.debug(
-                                    "Google event is newer than the Notion task for task_id=%s event_id=%s",
-                                    notion_task_page_id,
-                                    gcal_event_id,
-                                )
-                                logger.debug("Updating the Notion task from Google Calendar.")
-                                notion_service.update_notion_task(
-                                    notion_task_page_id,
-                                    gcal_event,
-                                    gcal_cal_name,
-                                    current_gcal_sync_time,
-                                )
-                        else:
-                            logger.debug("Notion task and Google event are already in sync.")
-
-                        remove_gcal_event_from_list(gcal_event_list, gcal_event, gcal_event_summary)
-                        break
-
             except SyncAbortError:
                 raise
+            except RetryDeadlineError as e:
+                deferred_actions.append(defer_at_retry_deadline(plan, notion_task_page_id, checkpoint, retry_ledger, e))
             except Exception as e:
-                sync_errors.append(
-                    _build_sync_error(
-                        action,
-                        _exception_error_code(e),
-                        error_message=SAFE_SYNC_FAILURE_MESSAGE,
-                        error=None,
-                        debug_detail=build_debug_exception_detail(e),
-                        notion_task_id=notion_task_page_id,
-                        gcal_event_id=notion_gcal_event_id,
-                        gcal_event_start=(
-                            (gcal_event.get("start", {}).get("dateTime") or gcal_event.get("start", {}).get("date"))
-                            if "gcal_event" in locals()
-                            else None
-                        ),
-                        retriable=True,
-                    )
-                )
+                sync_errors.append(build_task_failure(plan, notion_task_page_id, e))
+                retry_ledger.record_failure(sync_errors[-1], calendar_id=failure_calendar_id(plan))
                 logger.exception(
                     "Error during sync action=%s notion_task_id=%s",
-                    action,
+                    plan["action"] if plan else None,
                     notion_task_page_id,
                 )
 
@@ -387,90 +415,54 @@ def synchronize_notion_and_google_calendar(
                     "Google Calendar: Creating a new task in Notion for event_id=%s",
                     gcal_event_id,
                 )
+                if deadline is not None and deadline.expired():
+                    deferred_actions.append(build_deferred_action("create_notion", gcal_event_id=gcal_event_id))
+                    retry_ledger.keep(gcal_event_id=gcal_event_id)
+                    continue
                 try:
-                    organizer_email = (gcal_event.get("organizer") or {}).get("email")
-                    gcal_cal_name = gcal_id_dict.get(organizer_email)
-                    if not gcal_cal_name:
-                        sync_errors.append(
-                            _build_sync_error(
-                                "create_notion",
-                                "gcal_event_not_owned",
-                                error=(
-                                    "Skipped: You are not the owner of this Google Calendar event, "
-                                    "so it was not synced."
-                                ),
-                                gcal_event_id=gcal_event_id,
-                                gcal_event_start=gcal_event.get("start", {}).get("dateTime")
-                                or gcal_event.get("start", {}).get("date"),
-                                retriable=False,
-                            )
-                        )
-                        logger.warning(
-                            "Skipped create_notion for non-owned/invited Google Calendar event_id=%s",
-                            gcal_event_id,
-                        )
+                    with timings.span("planning"):
+                        plan = plan_create_notion(gcal_event, user_setting)
+                    if plan["error"]:
+                        sync_errors.append(plan["error"])
                         continue
-                    description = gcal_event.get("description") or ""
-                    if len(description) > 2000:
-                        sync_errors.append(
-                            _build_sync_error(
-                                "create_notion",
-                                "gcal_description_too_long",
-                                error=(
-                                    f"Skipped: GCal event description exceeds Notion's 2000-character "
-                                    f"rich_text limit ({len(description)} chars). "
-                                    "Syncing this event would corrupt data integrity."
-                                ),
-                                gcal_event_id=gcal_event_id,
-                                gcal_event_start=gcal_event.get("start", {}).get("dateTime")
-                                or gcal_event.get("start", {}).get("date"),
-                                retriable=False,
-                            )
-                        )
-                        logger.warning(
-                            "Skipped create_notion for event_id=%s because the description exceeds the Notion limit.",
-                            gcal_event_id,
-                        )
-                    else:
-                        notion_service.create_notion_task(gcal_event, gcal_cal_name)
+                    with timings.span("write.create_notion"):
+                        notion_service.create_notion_task(gcal_event, plan["calendar_name"])
+                    count_action(action_counts, "create_notion")
+                except RetryDeadlineError as e:
+                    logger.warning("Deferring create_notion for event_id=%s: %s", gcal_event_id, e)
+                    deferred_actions.append(build_deferred_action("create_notion", gcal_event_id=gcal_event_id))
+                    retry_ledger.keep(gcal_event_id=gcal_event_id)
                 except Exception as e:
-                    sync_errors.append(
-                        _build_sync_error(
-                            "create_notion",
-                            _exception_error_code(e),
-                            error_message=SAFE_SYNC_FAILURE_MESSAGE,
-                            error=None,
-                            debug_detail=build_debug_exception_detail(e),
-                            gcal_event_id=gcal_event_id,
-                            gcal_event_start=gcal_event.get("start", {}).get("dateTime")
-                            or gcal_event.get("start", {}).get("date"),
-                            retriable=True,
-                        )
+                    sync_errors.append(build_create_notion_failure(gcal_event, e))
+                    retry_ledger.record_failure(
+                        sync_errors[-1], calendar_id=failure_calendar_id({"gcal_event": gcal_event})
                     )
                     logger.exception("Error during create_notion for event_id=%s", gcal_event_id)
 
+        # Entries for tasks seen in this run that were not resumed are obsolete.
+        checkpoint.prune(notion_task.get("id") for notion_task in notion_task_list)
+        sync_summary["checkpoint"] = checkpoint.summary()
+        sync_summary["action_counts"] = action_counts
+        sync_summary["deferred_count"] = len(deferred_actions)
+        sync_summary["retries"] = retry_summary(notion_service, google_service)
+        sync_summary["timings"]["spans"] = span_summary(timings, notion_service, google_service)
+        sync_summary["api_calls"] = api_call_summary(notion_service, google_service)
+        # Errors the ledger retries do not hold the watermark back; the next unchanged probe replays them.
+        unscheduled_errors = finish_retry_ledger(retry_ledger, sync_summary, sync_errors)
+        advance_watermark(watermark, user_setting, trigger_sync_time, unscheduled_errors, deferred_actions)
+
     except Exception as e:
         logger.exception("Error during synchronization")
-        return {
-            "statusCode": 500,
-            "body": {
-                "status": "sync_error",
-                "message": {
-                    "error_code": _exception_error_code(e),
-                    "error_message": SAFE_SYNC_FAILURE_MESSAGE,
-                },
-            },
-        }
-
-    message = {
-        "summary": sync_summary,
-        "trigger_time": trigger_sync_time,
-        "errors": sync_errors,
-    }
-    return {"statusCode": 200, "body": {"status": "sync_success", "message": message}}
+        return sync_failed_response(e)
+    finally:
+        checkpoint.flush()
 
+    return finish_sync(sync_summary, trigger_sync_time, sync_errors, deferred_actions)
 
-def force_update_notion_tasks_by_google_event_and_ignore_time(user_setting, notion_service, google_service):
+
+def force_update_notion_tasks_by_google_event_and_ignore_time(
+    user_setting, notion_service, google_service, checkpoint=None, deadline=None, timings=None
+):
     # -ga
     # Only update notion tasks
     # Do not update google events (Keep the google events as it is)
@@ -481,11 +473,16 @@ def force_update_notion_tasks_by_google_event_and_ignore_time(user_setting, noti
         compare_time=False,
         should_update_notion_tasks=True,
         should_update_google_events=False,
+        checkpoint=checkpoint,
+        deadline=deadline,
+        timings=timings,
     )
     return result
 
 
-def force_update_google_event_by_notion_task_and_ignore_time(user_setting, notion_service, google_service):
+def force_update_google_event_by_notion_task_and_ignore_time(
+    user_setting, notion_service, google_service, checkpoint=None, deadline=None, timings=None
+):
     # -na
     # Only update google events
     # Do not update notion tasks (Keep the notion tasks as it is)
@@ -496,6 +493,9 @@ def force_update_google_event_by_notion_task_and_ignore_time(user_setting, notio
         compare_time=False,
         should_update_notion_tasks=False,
         should_update_google_events=True,
+        checkpoint=checkpoint,
+        deadline=deadline,
+        timings=timings,
     )
     return result
 
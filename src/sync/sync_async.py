@@ -0,0 +1,503 @@
+"""
+asyncio engine for the Notion <-> Google Calendar sync.
+
+Uses the same planner (`sync.sync_plan`) and result helpers (`sync.sync_result`) as
+`sync.synchronize_notion_and_google_calendar`, so both engines take identical actions and return the same result
+shape. The two input fetches run concurrently, every task is planned up front, and the planned writes then run
+concurrently under a semaphore (SYNC_ASYNC_CONCURRENCY, default 8). Services are `AsyncNotionService` /
+`AsyncGoogleService`.
+"""
+
+import asyncio
+import os
+import time
+
+from sync.sync_checkpoint import SyncCheckpoint
+from sync.sync_plan import SyncAbortError, plan_create_notion, plan_notion_task, replay_event_location
+from sync.sync_probe import advance_watermark, finish_probe, notion_changed_since, probe_failed, probe_since
+from sync.sync_result import (
+    api_call_summary,
+    build_create_notion_failure,
+    build_deferred_action,
+    build_task_failure,
+    check_loaded_inputs,
+    count_action,
+    defer_at_retry_deadline,
+    elapsed_ms,
+    failure_calendar_id,
+    finish_retry_ledger,
+    finish_sync,
+    get_current_time_in_iso_format,
+    input_load_failed_response,
+    ledger_entry_failure,
+    partial_before_input_load,
+    probe_enabled_for,
+    replay_summary,
+    retry_summary,
+    span_summary,
+    sync_failed_response,
+    unchanged_sync_summary,
+)
+from sync.sync_retry_ledger import SyncRetryLedger
+from utils.logging_utils import get_logger
+from utils.retry_utils import RetryDeadlineError, bind_retry_deadline
+from utils.sync_timings import SyncTimings, timing_span
+
+logger = get_logger(__name__)
+
+SYNC_ASYNC_CONCURRENCY_VAR = "SYNC_ASYNC_CONCURRENCY"
+DEFAULT_SYNC_ASYNC_CONCURRENCY = 8
+
+
+def sync_async_concurrency() -> int:
+    raw = os.environ.get(SYNC_ASYNC_CONCURRENCY_VAR, "").strip()
+    try:
+        value = int(raw) if raw else DEFAULT_SYNC_ASYNC_CONCURRENCY
+    except ValueError:
+        return DEFAULT_SYNC_ASYNC_CONCURRENCY
+    return value if value > 0 else DEFAULT_SYNC_ASYNC_CONCURRENCY
+
+
+async def _timed_await(awaitable):
+    started = time.perf_counter()
+    result = await awaitable
+    return result, elapsed_ms(started)
+
+
+async def _execute_task_plan(
+    plan, notion_service, google_service, checkpoint, current_gcal_sync_time, action_counts, timings=None
+):
+    """Async mirror of `sync._execute_task_plan`."""
+    notion_task_page_id = plan["notion_task_id"]
+    action = plan["action"]
+    if plan["default_calendar_name"]:
+        logger.info("Update Notion Task for default calendar id and calendar name")
+        with timing_span(timings, "write.default_calendar"):
+            await notion_service.update_notion_task_for_default_calendar(
+                notion_task_page_id, plan["default_calendar_name"]
+            )
+    if action is None or plan["deferred"] or plan["error"]:
+        return
+
+    with timing_span(timings, f"write.{action}"):
+        await _run_task_action(plan, notion_service, google_service, checkpoint, current_gcal_sync_time)
+    # update_notion writes only to Notion and keeps no checkpoint entry.
+    if action != "update_notion":
+        checkpoint.complete(action, notion_task_page_id)
+    count_action(action_counts, action)
+
+
+async def _run_task_action(plan, notion_service, google_service, checkpoint, current_gcal_sync_time):
+    """Async mirror of `sync._run_task_action`."""
+    notion_task_page_id = plan["notion_task_id"]
+    action = plan["action"]
+    if action == "create_gcal":
+        if plan["resumed"]:
+            new_gcal_event_id = plan["resumed"]["gcal_event_id"]
+        elif plan["client_gcal_event_id"]:
+            new_gcal_event_id = await google_service.create_gcal_event(
+                plan["notion_task"], plan["calendar_id"], event_id=plan["client_gcal_event_id"]
+            )
+            checkpoint.record(action, notion_task_page_id, gcal_event_id=new_gcal_event_id)
+        else:
+            new_gcal_event_id = await google_service.create_gcal_event(plan["notion_task"], plan["calendar_id"])
+            checkpoint.record(action, notion_task_page_id, gcal_event_id=new_gcal_event_id)
+        await notion_service.update_notion_task_for_new_gcal_event_id(notion_task_page_id, new_gcal_event_id)
+    elif action == "delete_gcal":
+        if not plan["resumed"]:
+            await google_service.delete_gcal_event(plan["calendar_id"], plan["gcal_event_id"])
+            checkpoint.record(action, notion_task_page_id, gcal_event_id=plan["gcal_event_id"])
+        await notion_service.delete_notion_task(notion_task_page_id)
+        duplicate_notion_task_list = await notion_service.get_notion_task_by_gcal_event_id(plan["gcal_event_id"])
+        for duplicate_notion_task in duplicate_notion_task_list or []:
+            await notion_service.delete_notion_task(duplicate_notion_task["id"])
+    elif action == "update_gcal":
+        if not plan["resumed"]:
+            if plan["calendar_id"] == plan["source_calendar_id"]:
+                await google_service.update_gcal_event(
+                    plan["notion_task"], plan["calendar_id"], plan["gcal_event_id"], existing_event=plan["gcal_event"]
+                )
+            else:
+                await google_service.move_and_update_gcal_event(
+                    plan["notion_task"],
+                    plan["gcal_event_id"],
+                    plan["calendar_id"],
+                    plan["source_calendar_id"],
+                )
+            checkpoint.record(
+                action,
+                notion_task_page_id,
+                gcal_event_id=plan["gcal_event_id"],
+                notion_last_edited_time=plan["notion_last_edited_time"],
+            )
+        await notion_service.update_notion_task_for_new_gcal_sync_time(notion_task_page_id, current_gcal_sync_time)
+    elif action == "update_notion":
+        await notion_service.update_notion_task(
+            notion_task_page_id,
+            plan["gcal_event"],
+            plan["calendar_name"],
+            current_gcal_sync_time,
+        )
+
+
+async def _run_change_probe(user_setting, notion_service, google_service, checkpoint, watermark):
+    since, probe = probe_since(user_setting, checkpoint, watermark)
+    if since is None:
+        return probe
+    started = time.perf_counter()
+    calls = 1
+    try:
+        changed = notion_changed_since(await notion_service.get_latest_notion_edit_time(), since)
+        if not changed:
+            changed, gcal_calls = await google_service.probe_gcal_changes(since)
+            calls += gcal_calls
+    except Exception:
+        logger.warning("Change probe failed; running the full sync", exc_info=True)
+        return probe_failed(probe, calls, started)
+    return finish_probe(probe, changed, calls, started)
+
+
+async def _replay_task_inputs(entry, user_setting, notion_service, google_service):
+    notion_task = await notion_service.get_notion_task_by_id(entry["notion_task_id"])
+    if notion_task is None:
+        return None, []
+    gcal_event_id, calendar_ids = replay_event_location(entry, notion_task, user_setting)
+    if not gcal_event_id:
+        return notion_task, await google_service.find_gcal_events_by_notion_page_id(notion_task["id"], calendar_ids)
+    for calendar_id in calendar_ids:
+        gcal_event = await google_service.get_gcal_event_by_id(calendar_id, gcal_event_id)
+        if gcal_event is not None:
+            return notion_task, [gcal_event]
+    return notion_task, []
+
+
+async def _replay_entry(
+    entry, user_setting, notion_service, google_service, checkpoint, current_gcal_sync_time, action_counts, timings
+):
+    """Async mirror of `sync._replay_entry`."""
+    if entry.get("notion_task_id"):
+        notion_task, gcal_event_list = await _replay_task_inputs(entry, user_setting, notion_service, google_service)
+        if notion_task is None:
+            return None
+        with timing_span(timings, "planning"):
+            plan = plan_notion_task(notion_task, gcal_event_list, user_setting, checkpoint)
+        await _execute_task_plan(
+            plan, notion_service, google_service, checkpoint, current_gcal_sync_time, action_counts, timings
+        )
+        return plan
+
+    gcal_event = await google_service.get_gcal_event_by_id(entry.get("calendar_id"), entry["gcal_event_id"])
+    if gcal_event is None:
+        return None
+    existing_tasks = await notion_service.get_notion_task_by_gcal_event_id(gcal_event["id"])
+    if existing_tasks is None:
+        raise RuntimeError(f"Could not look up Notion tasks for event_id={gcal_event['id']}")
+    if existing_tasks:
+        return None
+    with timing_span(timings, "planning"):
+        plan = plan_create_notion(gcal_event, user_setting)
+    if not plan["error"]:
+        with timing_span(timings, "write.create_notion"):
+            await notion_service.create_notion_task(gcal_event, plan["calendar_name"])
+        count_action(action_counts, "create_notion")
+    return plan
+
+
+async def _replay_ledger(
+    user_setting, notion_service, google_service, retry_ledger, checkpoint, deadline, timings, semaphore
+):
+    """Async mirror of `sync._replay_ledger`; ledger items are retried concurrently under `semaphore`."""
+    current_gcal_sync_time = get_current_time_in_iso_format()
+    sync_errors = []
+    deferred_actions = []
+    action_counts = {}
+    entries = list(retry_ledger.entries.values())
+
+    async def replay(entry):
+        async with semaphore:
+            if deadline is not None and deadline.expired():
+                retry_ledger.keep(entry.get("notion_task_id"), entry.get("gcal_event_id"))
+                deferred_actions.append(
+                    build_deferred_action(entry.get("action"), entry.get("notion_task_id"), entry.get("gcal_event_id"))
+                )
+                return
+            try:
+                plan = await _replay_entry(
+                    entry,
+                    user_setting,
+                    notion_service,
+                    google_service,
+                    checkpoint,
+                    current_gcal_sync_time,
+                    action_counts,
+                    timings,
+                )
+                if plan and plan["error"]:
+                    sync_errors.append(plan["error"])
+            except RetryDeadlineError as e:
+                logger.warning("Deferring ledger item action=%s: %s", entry.get("action"), e)
+                retry_ledger.keep(entry.get("notion_task_id"), entry.get("gcal_event_id"))
+                deferred_actions.append(
+                    build_deferred_action(entry.get("action"), entry.get("notion_task_id"), entry.get("gcal_event_id"))
+                )
+            except Exception as e:
+                error = ledger_entry_failure(entry, e)
+                sync_errors.append(error)
+                retry_ledger.record_failure(error, calendar_id=entry.get("calendar_id"))
+                logger.exception("Error retrying ledger item action=%s", entry.get("action"))
+
+    await asyncio.gather(*(replay(entry) for entry in entries))
+    replay_counts = {"replayed": len(entries) - len(deferred_actions), "failed": len(sync_errors)}
+    summary = replay_summary(
+        replay_counts, action_counts, deferred_actions, checkpoint, timings, notion_service, google_service
+    )
+    finish_retry_ledger(retry_ledger, summary, sync_errors)
+    return summary, sync_errors, deferred_actions
+
+
+async def replay_retry_ledger_async(
+    user_setting: dict,
+    notion_service,
+    google_service,
+    retry_ledger,
+    checkpoint=None,
+    deadline=None,
+    concurrency: int | None = None,
+    timings=None,
+):
+    """Async mirror of `sync.replay_retry_ledger`: retry only the ledger items, without fetching both windows."""
+    if checkpoint is None:
+        checkpoint = SyncCheckpoint(logger=logger)
+    if timings is None:
+        timings = SyncTimings()
+    semaphore = asyncio.Semaphore(concurrency or sync_async_concurrency())
+    trigger_sync_time = get_current_time_in_iso_format()
+    bind_retry_deadline(deadline, notion_service, google_service)
+    try:
+        summary, sync_errors, deferred_actions = await _replay_ledger(
+            user_setting, notion_service, google_service, retry_ledger, checkpoint, deadline, timings, semaphore
+        )
+    except Exception as e:
+        logger.exception("Error while retrying the sync retry ledger")
+        return sync_failed_response(e)
+    finally:
+        checkpoint.flush()
+    return finish_sync(summary, trigger_sync_time, sync_errors, deferred_actions)
+
+
+async def synchronize_notion_and_google_calendar_async(
+    user_setting: dict,
+    notion_service,
+    google_service,
+    compare_time=True,
+    should_update_notion_tasks=True,
+    should_update_google_events=True,
+    checkpoint=None,
+    deadline=None,
+    concurrency: int | None = None,
+    timings=None,
+    watermark=None,
+    retry_ledger=None,
+):
+    if checkpoint is None:
+        checkpoint = SyncCheckpoint(logger=logger)
+    if retry_ledger is None:
+        retry_ledger = SyncRetryLedger(logger=logger)
+    if timings is None:
+        timings = SyncTimings()
+    if not probe_enabled_for(watermark, compare_time, should_update_notion_tasks, should_update_google_events):
+        watermark = None
+    semaphore = asyncio.Semaphore(concurrency or sync_async_concurrency())
+    bind_retry_deadline(deadline, notion_service, google_service)
+    try:
+        current_gcal_sync_time = get_current_time_in_iso_format()
+        trigger_sync_time = get_current_time_in_iso_format()
+
+        if deadline is not None and deadline.expired():
+            return partial_before_input_load(trigger_sync_time)
+
+        probe = None
+        if watermark is not None:
+            with timings.span("change_probe"):
+                probe = await _run_change_probe(user_setting, notion_service, google_service, checkpoint, watermark)
+            if probe["result"] == "unchanged" and retry_ledger.entries:
+                summary, sync_errors, deferred_actions = await _replay_ledger(
+                    user_setting, notion_service, google_service, retry_ledger, checkpoint, deadline, timings, semaphore
+                )
+                summary["change_probe"] = probe
+                return finish_sync(summary, trigger_sync_time, sync_errors, deferred_actions)
+            if probe["result"] == "unchanged":
+                summary = unchanged_sync_summary(probe, timings, notion_service, google_service)
+                return finish_sync(summary, trigger_sync_time, [], [])
+
+        try:
+            started = time.perf_counter()
+            (gcal_event_list, gcal_fetch_ms), ((notion_config, notion_task_list), notion_fetch_ms) = (
+                await asyncio.gather(
+                    _timed_await(google_service.get_gcal_event()), _timed_await(notion_service.get_notion_task())
+                )
+            )
+            sync_summary, early_response = check_loaded_inputs(
+                gcal_event_list, notion_config, notion_task_list, trigger_sync_time
+            )
+            if early_response is not None:
+                if early_response["body"]["status"] == "sync_success":
+                    advance_watermark(watermark, user_setting, trigger_sync_time, [], [])
+                return early_response
+            sync_summary["timings"] = {
+                "gcal_fetch_ms": gcal_fetch_ms,
+                "notion_fetch_ms": notion_fetch_ms,
+                "input_load_ms": elapsed_ms(started),
+            }
+            if probe is not None:
+                sync_summary["change_probe"] = probe
+        except RetryDeadlineError:
+            return partial_before_input_load(trigger_sync_time)
+        except Exception:
+            logger.exception("Failed to load sync inputs")
+            return input_load_failed_response()
+
+        sync_errors = []
+        deferred_actions = []
+        action_counts = {}
+
+        # Planning is in-memory and consumes gcal_event_list, so it runs in order before any write starts.
+        plans = []
+        for notion_task in notion_task_list:
+            try:
+                with timings.span("planning"):
+                    plan = plan_notion_task(
+                        notion_task,
+                        gcal_event_list,
+                        user_setting,
+                        checkpoint,
+                        compare_time=compare_time,
+                        should_update_notion_tasks=should_update_notion_tasks,
+                        should_update_google_events=should_update_google_events,
+                        out_of_time=deadline is not None and deadline.expired(),
+                    )
+                plans.append(plan)
+            except SyncAbortError:
+                raise
+            except Exception as e:
+                sync_errors.append(build_task_failure(None, notion_task.get("id"), e))
+                retry_ledger.record_failure(sync_errors[-1])
+                logger.exception("Error planning sync for notion_task_id=%s", notion_task.get("id"))
+
+        async def run_task_plan(plan):
+            async with semaphore:
+                if plan["action"] and not plan["deferred"] and deadline is not None and deadline.expired():
+                    plan["deferred"] = True
+                    checkpoint.keep(plan["action"], plan["notion_task_id"])
+                if plan["error"]:
+                    sync_errors.append(plan["error"])
+                if plan["deferred"]:
+                    deferred_actions.append(
+                        build_deferred_action(plan["action"], plan["notion_task_id"], plan["gcal_event_id"] or None)
+                    )
+                    retry_ledger.keep(plan["notion_task_id"])
+                try:
+                    await _execute_task_plan(
+                        plan, notion_service, google_service, checkpoint, current_gcal_sync_time, action_counts, timings
+                    )
+                except RetryDeadlineError as e:
+                    deferred_actions.append(
+                        defer_at_retry_deadline(plan, plan["notion_task_id"], checkpoint, retry_ledger, e)
+                    )
+                except Exception as e:
+                    sync_errors.append(build_task_failure(plan, plan["notion_task_id"], e))
+                    retry_ledger.record_failure(sync_errors[-1], calendar_id=failure_calendar_id(plan))
+                    logger.exception(
+                        "Error during sync action=%s notion_task_id=%s", plan["action"], plan["notion_task_id"]
+                    )
+
+        async def run_create_notion(gcal_event):
+            async with semaphore:
+                gcal_event_id = gcal_event.get("id")
+                if deadline is not None and deadline.expired():
+                    deferred_actions.append(build_deferred_action("create_notion", gcal_event_id=gcal_event_id))
+                    retry_ledger.keep(gcal_event_id=gcal_event_id)
+                    return
+                try:
+                    with timings.span("planning"):
+                        plan = plan_create_notion(gcal_event, user_setting)
+                    if plan["error"]:
+                        sync_errors.append(plan["error"])
+                        return
+                    with timings.span("write.create_notion"):
+                        await notion_service.create_notion_task(gcal_event, plan["calendar_name"])
+                    count_action(action_counts, "create_notion")
+                except RetryDeadlineError as e:
+                    logger.warning("Deferring create_notion for event_id=%s: %s", gcal_event_id, e)
+                    deferred_actions.append(build_deferred_action("create_notion", gcal_event_id=gcal_event_id))
+                    retry_ledger.keep(gcal_event_id=gcal_event_id)
+                except Exception as e:
+                    sync_errors.append(build_create_notion_failure(gcal_event, e))
+                    retry_ledger.record_failure(
+                        sync_errors[-1], calendar_id=failure_calendar_id({"gcal_event": gcal_event})
+                    )
+                    logger.exception("Error during create_notion for event_id=%s", gcal_event_id)
+
+        coroutines = [run_task_plan(plan) for plan in plans]
+        if should_update_notion_tasks:
+            coroutines.extend(run_create_notion(gcal_event) for gcal_event in gcal_event_list)
+        await asyncio.gather(*coroutines)
+
+        checkpoint.prune(notion_task.get("id") for notion_task in notion_task_list)
+        sync_summary["checkpoint"] = checkpoint.summary()
+        sync_summary["action_counts"] = action_counts
+        sync_summary["deferred_count"] = len(deferred_actions)
+        sync_summary["retries"] = retry_summary(notion_service, google_service)
+        sync_summary["timings"]["spans"] = span_summary(timings, notion_service, google_service)
+        sync_summary["api_calls"] = api_call_summary(notion_service, google_service)
+        unscheduled_errors = finish_retry_ledger(retry_ledger, sync_summary, sync_errors)
+        advance_watermark(watermark, user_setting, trigger_sync_time, unscheduled_errors, deferred_actions)
+
+    except Exception as e:
+        logger.exception("Error during synchronization")
+        return sync_failed_response(e)
+    finally:
+        checkpoint.flush()
+
+    return finish_sync(sync_summary, trigger_sync_time, sync_errors, deferred_actions)
+
+
+async def force_update_notion_tasks_by_google_event_and_ignore_time_async(
+    user_setting, notion_service, google_service, checkpoint=None, deadline=None, timings=None
+):
+    return await synchronize_notion_and_google_calendar_async(
+        user_setting=user_setting,
+        notion_service=notion_service,
+        google_service=google_service,
+        compare_time=False,
+        should_update_notion_tasks=True,
+        should_update_google_events=False,
+        checkpoint=checkpoint,
+        deadline=deadline,
+        timings=timings,
+    )
+
+
+async def force_update_google_event_by_notion_task_and_ignore_time_async(
+    user_setting, notion_service, google_service, checkpoint=None, deadline=None, timings=None
+):
+    return await synchronize_notion_and_google_calendar_async(
+        user_setting=user_setting,
+        notion_service=notion_service,
+        google_service=google_service,
+        compare_time=False,
+        should_update_notion_tasks=False,
+        should_update_google_events=True,
+        checkpoint=checkpoint,
+        deadline=deadline,
+        timings=timings,
+    )
+
+
+__all__ = [
+    "SYNC_ASYNC_CONCURRENCY_VAR",
+    "force_update_google_event_by_notion_task_and_ignore_time_async",
+    "force_update_notion_tasks_by_google_event_and_ignore_time_async",
+    "replay_retry_ledger_async",
+    "synchronize_notion_and_google_calendar_async",
+]
@@ -0,0 +1,159 @@
+"""
+Durable checkpoint of half-finished sync actions.
+
+Some sync actions write to both providers, e.g. create_gcal inserts a Google event and then
+writes the new event id back to Notion. The result of the first write is recorded here so
+that a run interrupted between the two writes (Lambda timeout, crash) can be resumed by the
+next run without repeating the first write.
+
+Stored through `sync_state_store.SyncStateStore`:
+  cloud: `syncCheckpoint` attribute on the Users item (DynamoDB)
+  local: JSON file at config["sync_checkpoint_path"]
+Without a backing store the checkpoint is kept in memory only.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from sync.sync_state_store import SyncStateStore
+
+CHECKPOINT_VERSION = 1
+# Number of checkpoint changes buffered before they are flushed to storage.
+CHECKPOINT_FLUSH_INTERVAL = 10
+# Entries older than this are treated as stale and dropped on load.
+CHECKPOINT_MAX_AGE = timedelta(days=7)
+# Actions whose first write is not idempotent; their entries are flushed immediately.
+_IMMEDIATE_FLUSH_ACTIONS = frozenset({"create_gcal"})
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class SyncCheckpoint:
+    """Tracks executed first-half writes so interrupted actions can be resumed."""
+
+    def __init__(self, config=None, logger=None, flush_interval: int = CHECKPOINT_FLUSH_INTERVAL):
+        self.config = config or {}
+        self.logger = logger
+        self.store = SyncStateStore(self.config, "syncCheckpoint", "sync_checkpoint_path")
+        self.flush_interval = max(int(flush_interval), 1)
+        self.resumed_count = 0
+        self._unflushed_changes = 0
+        self._persisted = False
+        self._visited_keys = set()
+        self.entries = self._load()
+
+    @staticmethod
+    def key(action: str, item_id: str) -> str:
+        return f"{action}:{item_id}"
+
+    def get(self, action: str, item_id: str) -> dict | None:
+        """Return the recorded first-half result for an action, if any."""
+        key = self.key(action, item_id)
+        self._visited_keys.add(key)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.resumed_count += 1
+            self._debug(f"Resuming {action} for item_id={item_id} from checkpoint")
+        return entry
+
+    def keep(self, action: str, item_id: str) -> None:
+        """Keep an entry through `prune` when its action was deferred rather than resumed."""
+        self._visited_keys.add(self.key(action, item_id))
+
+    def record(self, action: str, item_id: str, **result) -> None:
+        """Record that the first write of an action has landed."""
+        key = self.key(action, item_id)
+        self._visited_keys.add(key)
+        self.entries[key] = {
+            "action": action,
+            "item_id": item_id,
+            "recorded_at": _utc_now().isoformat(),
+            **result,
+        }
+        self._changed(force=action in _IMMEDIATE_FLUSH_ACTIONS)
+
+    def complete(self, action: str, item_id: str) -> None:
+        """Drop an action from the checkpoint once all of its writes have landed."""
+        if self.entries.pop(self.key(action, item_id), None) is not None:
+            self._changed()
+
+    def prune(self, item_ids) -> None:
+        """Drop entries for items seen in this run whose actions no longer need resuming."""
+        item_ids = set(item_ids)
+        stale_keys = [
+            key
+            for key, entry in self.entries.items()
+            if entry.get("item_id") in item_ids and key not in self._visited_keys
+        ]
+        for key in stale_keys:
+            del self.entries[key]
+        if stale_keys:
+            self._changed()
+
+    def flush(self) -> None:
+        """Persist pending checkpoint changes. Storage errors are logged and never raised."""
+        if self._unflushed_changes == 0:
+            return
+        try:
+            if self.entries:
+                self.store.save(
+                    {
+                        "version": CHECKPOINT_VERSION,
+                        "updated_at": _utc_now().isoformat(),
+                        "entries": self.entries,
+                    }
+                )
+                self._persisted = True
+            elif self._persisted:
+                self.store.delete()
+                self._persisted = False
+            self._unflushed_changes = 0
+        except Exception:
+            if self.logger:
+                self.logger.exception("Failed to persist sync checkpoint")
+
+    def summary(self) -> dict:
+        return {"resumed_count": self.resumed_count, "pending_count": len(self.entries)}
+
+    def _changed(self, force: bool = False) -> None:
+        self._unflushed_changes += 1
+        if force or self._unflushed_changes >= self.flush_interval:
+            self.flush()
+
+    def _load(self) -> dict:
+        try:
+            data = self.store.read()
+        except Exception:
+            if self.logger:
+                self.logger.exception("Failed to load sync checkpoint; starting without one")
+            return {}
+        if not data:
+            return {}
+        self._persisted = True
+        if data.get("version") != CHECKPOINT_VERSION:
+            self._warning(f"Ignoring sync checkpoint with unsupported version {data.get('version')}")
+            self._unflushed_changes += 1
+            return {}
+
+        cutoff = _utc_now() - CHECKPOINT_MAX_AGE
+        entries = {}
+        for key, entry in (data.get("entries") or {}).items():
+            try:
+                recorded_at = datetime.fromisoformat(entry["recorded_at"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if recorded_at >= cutoff:
+                entries[key] = entry
+        if len(entries) != len(data.get("entries") or {}):
+            self._unflushed_changes += 1
+        self._debug(f"Loaded sync checkpoint with {len(entries)} pending action(s)")
+        return entries
+
+    def _debug(self, message: str) -> None:
+        if self.logger:
+            self.logger.debug(message)
+
+    def _warning(self, message: str) -> None:
+        if self.logger:
+            self.logger.warning(message)
@@ -0,0 +1,220 @@
+"""
+Per-user sync lease: at most one sync runs per uuid, and triggers that arrive too soon are coalesced.
+
+EventBridge schedules, SQS redeliveries and manual runs can all start a sync for the same user. `main()` takes the
+user's lease before syncing. A trigger that finds the lease held by a running sync, or by a sync that finished
+successfully less than SYNC_DEBOUNCE_SECONDS ago (default 60), returns `sync_coalesced` without fetching anything.
+Explicitly requested runs (`debounce=False`: CLI operations, forced or date-ranged syncs, ledger replays) take over
+a `finished` lease, so they are only coalesced while another sync is running. A running lease expires after the
+invocation deadline (or SYNC_LEASE_TTL_SECONDS, default 900, without one), so a
+crashed run never blocks the user for longer than that.
+
+Storage follows APP_MODE:
+  cloud: `syncLease` attribute on the Users item, taken with a conditional update (DynamoDB)
+  local: an in-memory lease store shared by the process, keyed by the uuid or else by the Notion settings file,
+         so distinct local configs never share a lease
+Lease storage errors are logged and never raised; the sync then runs without a lease.
+"""
+
+import os
+import threading
+import time
+import uuid as uuid_lib
+
+SYNC_COALESCED_STATUS = "sync_coalesced"
+SYNC_LEASE_TTL_SECONDS_VAR = "SYNC_LEASE_TTL_SECONDS"
+DEFAULT_SYNC_LEASE_TTL_SECONDS = 900
+SYNC_DEBOUNCE_SECONDS_VAR = "SYNC_DEBOUNCE_SECONDS"
+DEFAULT_SYNC_DEBOUNCE_SECONDS = 60
+LEASE_RUNNING = "running"
+LEASE_FINISHED = "finished"
+_LOCAL_LEASE_KEY = "local"
+
+
+def _seconds_from_env(name: str, default: int) -> int:
+    raw = os.environ.get(name, "").strip()
+    try:
+        value = int(raw) if raw else default
+    except ValueError:
+        return default
+    return value if value >= 0 else default
+
+
+def sync_lease_ttl_seconds() -> int:
+    return (
+        _seconds_from_env(SYNC_LEASE_TTL_SECONDS_VAR, DEFAULT_SYNC_LEASE_TTL_SECONDS) or DEFAULT_SYNC_LEASE_TTL_SECONDS
+    )
+
+
+def sync_debounce_seconds() -> int:
+    """Debounce window after a successful sync; 0 turns debouncing off."""
+    return _seconds_from_env(SYNC_DEBOUNCE_SECONDS_VAR, DEFAULT_SYNC_DEBOUNCE_SECONDS)
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+class InMemoryLeaseStore:
+    """Lease store for local runs: the same conditional semantics as the DynamoDB store, inside one process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._leases = {}
+
+    def acquire(self, key: str, lease: dict, now_ms: int, take_finished: bool = False) -> dict | None:
+        """
+        Store `lease` unless an unexpired lease exists; returns None when taken, else the blocking lease.
+
+        With `take_finished` only a running lease blocks.
+        """
+        with self._lock:
+            current = self._leases.get(key)
+            if current and current["expires_at_ms"] > now_ms:
+                if not (take_finished and current.get("state") == LEASE_FINISHED):
+                    return dict(current)
+            self._leases[key] = dict(lease)
+            return None
+
+    def release(self, key: str, owner: str, lease: dict | None) -> bool:
+        """Replace (or drop, when `lease` is None) the lease still held by `owner`."""
+        with self._lock:
+            current = self._leases.get(key)
+            if not current or current.get("owner") != owner:
+                return False
+            if lease is None:
+                del self._leases[key]
+            else:
+                self._leases[key] = dict(lease)
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._leases.clear()
+
+
+class DynamoDbLeaseStore:
+    """Lease store on the Users item (`syncLease`), so concurrent Lambda invocations see each other."""
+
+    def acquire(self, key: str, lease: dict, now_ms: int, take_finished: bool = False) -> dict | None:
+        """Raises LookupError (SyncUserNotFoundError) when `key` has no Users item."""
+        from utils.dynamodb_utils import acquire_sync_lease_by_uuid
+
+        return acquire_sync_lease_by_uuid(key, lease, now_ms, take_finished=take_finished)
+
+    def release(self, key: str, owner: str, lease: dict | None) -> bool:
+        from utils.dynamodb_utils import release_sync_lease_by_uuid
+
+        return release_sync_lease_by_uuid(key, owner, lease)
+
+
+_local_lease_store = InMemoryLeaseStore()
+
+
+class SyncLease:
+    """The sync lease of one user for one run: `acquire()` before syncing, `release(result)` afterwards."""
+
+    def __init__(self, uuid: str | None = None, config=None, logger=None, store=None, debounce: bool = True):
+        config = config or {}
+        self.logger = logger
+        # False for explicitly requested runs: a recent successful sync does not coalesce them
+        self.debounce = debounce
+        self.mode = config.get("mode") or os.environ.get("APP_MODE")
+        self.store = store or (DynamoDbLeaseStore() if self.mode == "cloud" else _local_lease_store)
+        self.key = config.get("uuid") or uuid
+        # uuid-less local runs are keyed by their settings file; a Users item is never leased without a uuid
+        if not self.key and isinstance(self.store, InMemoryLeaseStore):
+            self.key = str(config.get("notion_setting_path") or _LOCAL_LEASE_KEY)
+        self.owner = uuid_lib.uuid4().hex
+        self.held = False
+        self.blocking_lease = None
+
+    def acquire(self, deadline=None) -> bool:
+        """Take the lease; False means another trigger holds it and this one should be coalesced."""
+        if not self.key:
+            self._warning("No uuid for the sync lease; syncing without one")
+            return True
+        now_ms = _now_ms()
+        ttl_ms = max(deadline.remaining_ms(), 0) if deadline is not None else sync_lease_ttl_seconds() * 1000
+        lease = {
+            "owner": self.owner,
+            "state": LEASE_RUNNING,
+            "acquired_at_ms": now_ms,
+            "expires_at_ms": now_ms + ttl_ms,
+        }
+        try:
+            self.blocking_lease = self.store.acquire(self.key, lease, now_ms, take_finished=not self.debounce)
+        except LookupError:
+            # Unknown user: not a held lease; the sync runs and reports the missing user itself
+            self._warning(f"No user {self.key} for the sync lease; syncing without one")
+            return True
+        except Exception:
+            if self.logger:
+                self.logger.exception("Failed to acquire sync lease; syncing without one")
+            return True
+        self.held = self.blocking_lease is None
+        if not self.held and self.logger:
+            self.logger.info(f"Sync for {self.key} coalesced: lease is {self.blocking_lease.get('state', 'held')}")
+        return self.held
+
+    def release(self, result: dict | None = None) -> None:
+        """Release the lease; after a successful sync it is kept as `finished` for the debounce window."""
+        if not self.held:
+            return
+        self.held = False
+        debounce_ms = sync_debounce_seconds() * 1000
+        lease = None
+        if debounce_ms and _is_sync_success(result):
+            now_ms = _now_ms()
+            lease = {
+                "owner": self.owner,
+                "state": LEASE_FINISHED,
+                "acquired_at_ms": now_ms,
+                "expires_at_ms": now_ms + debounce_ms,
+            }
+        try:
+            if not self.store.release(self.key, self.owner, lease):
+                self._warning(f"Sync lease for {self.key} expired and was taken over before release")
+        except Exception:
+            if self.logger:
+                self.logger.exception("Failed to release sync lease; it expires on its own")
+
+    def _warning(self, message: str) -> None:
+        if self.logger:
+            self.logger.warning(message)
+
+    def coalesced_result(self) -> dict:
+        """Sync result returned instead of running, shaped like the sync engine's results."""
+        blocking = self.blocking_lease or {}
+        return {
+            "statusCode": 200,
+            "body": {
+                "status": SYNC_COALESCED_STATUS,
+                "message": {
+                    "summary": {
+                        "lease": {"state": blocking.get("state"), "expires_at_ms": blocking.get("expires_at_ms")}
+                    },
+                    "errors": [],
+                },
+            },
+        }
+
+
+def _is_sync_success(result) -> bool:
+    return isinstance(result, dict) and (result.get("body") or {}).get("status") == "sync_success"
+
+
+__all__ = [
+    "DEFAULT_SYNC_DEBOUNCE_SECONDS",
+    "DEFAULT_SYNC_LEASE_TTL_SECONDS",
+    "DynamoDbLeaseStore",
+    "InMemoryLeaseStore",
+    "LEASE_FINISHED",
+    "LEASE_RUNNING",
+    "SYNC_COALESCED_STATUS",
+    "SYNC_DEBOUNCE_SECONDS_VAR",
+    "SYNC_LEASE_TTL_SECONDS_VAR",
+    "SyncLease",
+    "sync_debounce_seconds",
+    "sync_lease_ttl_seconds",
+]
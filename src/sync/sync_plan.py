@@ -0,0 +1,304 @@
+"""
+Sync planning shared by the blocking and the asyncio sync engines.
+
+The planners decide the action for one Notion task or one unmatched Google event from already-fetched data and
+never write to either provider; the engines in `sync.sync` and `sync.sync_async` run the actions.
+"""
+
+from dateutil.parser import isoparse
+
+from gcal.gcal_event_id import deterministic_event_ids_enabled, deterministic_gcal_event_id, linked_notion_page_id
+from notion.notion_properties import get_checkbox, get_rich_text, get_select
+from sync.sync_result import build_sync_error, description_too_long_error, event_start
+from utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class SyncAbortError(Exception):
+    """Raised when a fatal condition requires the entire sync to stop immediately."""
+
+    pass
+
+
+def compare_timezones(notion_time_str, google_time_str):
+    # Parse the time strings into datetime objects
+    notion_time = isoparse(notion_time_str)
+    google_time = isoparse(google_time_str)
+
+    notion_timezone = notion_time.tzinfo
+    google_timezone = google_time.tzinfo
+    logger.debug(f"Notion Timezone: {notion_timezone}, Google Calendar Timezone: {google_timezone}")
+    if notion_timezone != google_timezone:
+        raise SyncAbortError(f"Timezones are different: Notion {notion_timezone} and Google Calendar {google_timezone}")
+
+
+def remove_gcal_event_from_list(gcal_event_list, gcal_event, gcal_event_summary):
+    gcal_event_list.remove(gcal_event)
+    logger.debug(
+        f"Google Calendar: Event '{gcal_event_summary}' removed from the list, {len(gcal_event_list)} events remaining\n"  # noqa: E501
+    )
+
+
+def get_gcal_event_from_list(gcal_event_list, gcal_event_id):
+    """Return the Google Calendar event with the given ID from the list."""
+    for gcal_event in gcal_event_list:
+        if gcal_event.get("id") == gcal_event_id:
+            return gcal_event
+
+    logger.debug(f"Google Calendar event '{gcal_event_id}' not found in the provided list")
+    return None
+
+
+def get_linked_gcal_event_from_list(gcal_event_list, notion_page_id):
+    """Return the Google Calendar event stamped with the given Notion page ID from the list."""
+    for gcal_event in gcal_event_list:
+        if linked_notion_page_id(gcal_event) == notion_page_id:
+            return gcal_event
+    return None
+
+
+def plan_notion_task(
+    notion_task: dict,
+    gcal_event_list: list,
+    user_setting: dict,
+    checkpoint,
+    compare_time=True,
+    should_update_notion_tasks=True,
+    should_update_google_events=True,
+    out_of_time=False,
+) -> dict:
+    """
+    Decide the sync action for one Notion task without writing to either provider.
+
+    The matched (or deleted) Google event is removed from `gcal_event_list`, so the events left after every
+    task is planned are the ones to create in Notion. Shared by the blocking and the asyncio engines.
+    """
+    notion_page_property = user_setting["page_property"]
+    gcal_id_dict = user_setting["gcal_id_dict"]
+    gcal_name_dict = user_setting["gcal_name_dict"]
+    notion_task_page_id = notion_task.get("id")
+    plan = {
+        "action": None,
+        "notion_task": notion_task,
+        "notion_task_id": notion_task_page_id,
+        "gcal_event_id": None,
+        "gcal_event": None,
+        "calendar_id": None,
+        "source_calendar_id": None,
+        "calendar_name": None,
+        "default_calendar_name": None,
+        "notion_last_edited_time": notion_task.get("last_edited_time"),
+        "resumed": None,
+        "deferred": False,
+        "error": None,
+        # Client-specified id for create_gcal when GCAL_DETERMINISTIC_EVENT_IDS is enabled.
+        "client_gcal_event_id": None,
+    }
+
+    notion_gcal_cal_name = get_select(
+        notion_task["properties"],
+        notion_page_property["GCal_Name_Notion_Name"],
+    )
+    if not notion_gcal_cal_name:
+        notion_gcal_cal_name = user_setting["gcal_default_name"]
+        notion_gcal_cal_id = user_setting["gcal_default_id"]
+        logger.warning(f"Calendar name not found. Use the default calendar: {notion_gcal_cal_name}")
+        logger.debug(f"Calendar id not found. Use the default calendar id: {notion_gcal_cal_id}")
+        if not out_of_time:
+            plan["default_calendar_name"] = notion_gcal_cal_name
+    else:
+        notion_gcal_cal_id = gcal_name_dict.get(notion_gcal_cal_name)
+        if not notion_gcal_cal_id:
+            logger.warning(
+                f"Calendar '{notion_gcal_cal_name}' not found in gcal_name_dict, "
+                f"skipping task '{notion_task_page_id}'"
+            )
+            return plan
+    plan["calendar_id"] = notion_gcal_cal_id
+
+    notion_gcal_event_id = get_rich_text(
+        notion_task["properties"],
+        notion_page_property["GCal_EventId_Notion_Name"],
+    )
+    if not notion_gcal_event_id:
+        # A create interrupted before its id write-back leaves an empty property with an event stamped with the page.
+        linked_gcal_event = get_linked_gcal_event_from_list(gcal_event_list, notion_task_page_id)
+        if linked_gcal_event is not None:
+            notion_gcal_event_id = linked_gcal_event.get("id")
+    if not notion_gcal_event_id and deterministic_event_ids_enabled():
+        # Without the stamp the deterministic id still finds the event.
+        client_gcal_event_id = deterministic_gcal_event_id(notion_task_page_id)
+        if get_gcal_event_from_list(gcal_event_list, client_gcal_event_id) is not None:
+            notion_gcal_event_id = client_gcal_event_id
+        else:
+            plan["client_gcal_event_id"] = client_gcal_event_id
+    plan["gcal_event_id"] = notion_gcal_event_id
+    notion_deletion = get_checkbox(
+        notion_task["properties"],
+        notion_page_property["Delete_Notion_Name"],
+    )
+    notion_gcal_sync_time = get_rich_text(
+        notion_task["properties"],
+        notion_page_property["GCal_Sync_Time_Notion_Name"],
+    )
+    notion_task_last_edited_time = plan["notion_last_edited_time"]
+
+    # Notion Task without Google Calendar Event ID - Create a new event in Google Calendar
+    if not notion_gcal_event_id and should_update_google_events:
+        if notion_deletion:
+            logger.debug("Skipping Google Calendar create for task marked deleted.")
+            return plan
+        plan["action"] = "create_gcal"
+        if out_of_time:
+            plan["deferred"] = True
+            checkpoint.keep(plan["action"], notion_task_page_id)
+            return plan
+        # A create interrupted after the Google write only needs the id write-back.
+        plan["resumed"] = checkpoint.get(plan["action"], notion_task_page_id)
+        return plan
+
+    # Notion Task with deletion flag - Delete the event in Google Calendar
+    if notion_deletion and notion_gcal_event_id is not None:
+        plan["action"] = "delete_gcal"
+        if out_of_time:
+            plan["deferred"] = True
+            checkpoint.keep(plan["action"], notion_task_page_id)
+        else:
+            plan["resumed"] = checkpoint.get(plan["action"], notion_task_page_id)
+        # Keep the event out of the create_notion pass whether or not the delete runs now.
+        deleted_gcal_event = get_gcal_event_from_list(gcal_event_list, notion_gcal_event_id)
+        if deleted_gcal_event is not None:
+            remove_gcal_event_from_list(gcal_event_list, deleted_gcal_event, notion_gcal_event_id)
+        return plan
+
+    # Notion Task with Google Calendar Event ID - Check if the event is in Google Calendar
+    for gcal_event in gcal_event_list:
+        gcal_event_summary = gcal_event.get("summary", "")
+        gcal_event_id = gcal_event.get("id", "")
+        gcal_event_updated_time = gcal_event.get("updated")
+        gcal_cal_id = gcal_event.get("organizer", {}).get("email")
+
+        if notion_gcal_event_id != gcal_event_id:
+            continue
+
+        resumed = checkpoint.get("update_gcal", notion_task_page_id)
+        if resumed and resumed.get("notion_last_edited_time") == notion_task_last_edited_time:
+            # Google was already patched by an interrupted run; only the sync time is missing.
+            plan.update(action="update_gcal", gcal_event=gcal_event, resumed=resumed, deferred=out_of_time)
+            remove_gcal_event_from_list(gcal_event_list, gcal_event, gcal_event_summary)
+            return plan
+
+        if compare_time:
+            if not notion_task_last_edited_time or not gcal_event_updated_time:
+                logger.warning(
+                    "Missing last edited or updated time. Skipping sync for task_id=%s event_id=%s",
+                    notion_task_page_id,
+                    gcal_event_id,
+                )
+                continue
+
+            compare_timezones(notion_task_last_edited_time, gcal_event_updated_time)
+
+            if (
+                notion_gcal_sync_time
+                and notion_gcal_sync_time > gcal_event_updated_time
+                and notion_gcal_sync_time > notion_task_last_edited_time
+            ):
+                logger.debug(
+                    "Skipping already-synced task_id=%s event_id=%s",
+                    notion_task_page_id,
+                    gcal_event_id,
+                )
+                remove_gcal_event_from_list(gcal_event_list, gcal_event, gcal_event_summary)
+                return plan
+
+        plan["gcal_event"] = gcal_event
+        # Update Google Calendar if Notion is newer or force update
+        if should_update_google_events and (
+            not compare_time or (notion_task_last_edited_time > gcal_event_updated_time)
+        ):
+            logger.debug(
+                "Notion task is newer than Google event for task_id=%s event_id=%s",
+                notion_task_page_id,
+                gcal_event_id,
+            )
+            plan.update(action="update_gcal", source_calendar_id=gcal_cal_id, deferred=out_of_time)
+        # Update Notion if Google Calendar is newer or force update
+        elif should_update_notion_tasks and (
+            not compare_time or (notion_task_last_edited_time < gcal_event_updated_time)
+        ):
+            plan.update(action="update_notion", calendar_name=gcal_id_dict.get(gcal_cal_id))
+            if len(gcal_event.get("description") or "") > 2000:
+                plan["error"] = description_too_long_error(plan["action"], gcal_event, notion_task_page_id)
+                logger.warning(
+                    "Skipped update_notion for event_id=%s because the description exceeds the Notion limit.",
+                    gcal_event_id,
+                )
+            else:
+                plan["deferred"] = out_of_time
+        else:
+            logger.debug("Notion task and Google event are already in sync.")
+
+        remove_gcal_event_from_list(gcal_event_list, gcal_event, gcal_event_summary)
+        return plan
+
+    return plan
+
+
+def plan_create_notion(gcal_event: dict, user_setting: dict) -> dict:
+    """Decide whether a Google event left unmatched after task planning can be created in Notion."""
+    gcal_event_id = gcal_event.get("id")
+    organizer_email = (gcal_event.get("organizer") or {}).get("email")
+    plan = {
+        "action": "create_notion",
+        "gcal_event": gcal_event,
+        "gcal_event_id": gcal_event_id,
+        "calendar_name": user_setting["gcal_id_dict"].get(organizer_email),
+        "error": None,
+    }
+    if not plan["calendar_name"]:
+        plan["error"] = build_sync_error(
+            "create_notion",
+            "gcal_event_not_owned",
+            error="Skipped: You are not the owner of this Google Calendar event, so it was not synced.",
+            gcal_event_id=gcal_event_id,
+            gcal_event_start=event_start(gcal_event),
+            retriable=False,
+        )
+        logger.warning("Skipped create_notion for non-owned/invited Google Calendar event_id=%s", gcal_event_id)
+    elif len(gcal_event.get("description") or "") > 2000:
+        plan["error"] = description_too_long_error("create_notion", gcal_event)
+        logger.warning(
+            "Skipped create_notion for event_id=%s because the description exceeds the Notion limit.",
+            gcal_event_id,
+        )
+    return plan
+
+
+def replay_event_location(entry, notion_task, user_setting):
+    """Return (event id, calendar ids to look in) for the event linked to a ledger task."""
+    page_property = user_setting["page_property"]
+    properties = notion_task["properties"]
+    gcal_event_id = get_rich_text(properties, page_property["GCal_EventId_Notion_Name"]) or entry.get("gcal_event_id")
+    if not gcal_event_id and deterministic_event_ids_enabled():
+        gcal_event_id = deterministic_gcal_event_id(notion_task["id"])
+    calendar_name = get_select(properties, page_property["GCal_Name_Notion_Name"])
+    calendar_ids = [
+        entry.get("calendar_id"),
+        user_setting["gcal_name_dict"].get(calendar_name),
+        user_setting["gcal_default_id"],
+    ]
+    return gcal_event_id, list(dict.fromkeys(filter(None, calendar_ids)))
+
+
+__all__ = [
+    "SyncAbortError",
+    "compare_timezones",
+    "remove_gcal_event_from_list",
+    "get_gcal_event_from_list",
+    "get_linked_gcal_event_from_list",
+    "plan_notion_task",
+    "plan_create_notion",
+    "replay_event_location",
+]
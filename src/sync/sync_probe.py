@@ -0,0 +1,140 @@
+"""
+Cheap pre-flight check for whether a scheduled sync has anything to do.
+
+When a sync finishes without errors or deferred actions, its trigger time is stored as the watermark of the
+fetched windows (the `scope`: Notion database, calendars and date range). The next run first asks Notion for the
+most recently edited task in the window (page_size=1, sorted by last_edited_time) and each Google calendar for
+one event updated since the watermark (events.list updatedMin, maxResults=1). When neither side changed, the full
+fetch and planning are skipped.
+
+The probe is not run without a watermark, after the window or calendars changed, or while the checkpoint holds
+actions to resume. Notion reports last_edited_time to the minute, so edits are compared with PROBE_CLOCK_SKEW of
+slack. Pages moved to the Notion trash do not show up in the probe; they are noticed with the next change on
+either side. SYNC_CHANGE_PROBE=false turns the probe off.
+
+Stored through `sync_state_store.SyncStateStore`:
+  cloud: `syncWatermark` attribute on the Users item (DynamoDB)
+  local: JSON file at config["sync_watermark_path"]
+Without a backing store the watermark is kept in memory only.
+"""
+
+import hashlib
+import json
+import os
+import time
+from datetime import timedelta, timezone
+
+from dateutil.parser import isoparse
+
+from sync.sync_state_store import SyncStateStore
+
+SYNC_CHANGE_PROBE_VAR = "SYNC_CHANGE_PROBE"
+# Slack for Notion's minute-rounded last_edited_time and for clock skew between Lambda and the providers.
+PROBE_CLOCK_SKEW = timedelta(minutes=1)
+_SCOPE_KEYS = ("database_id", "after_date", "before_date", "google_timemin", "google_timemax")
+
+
+def change_probe_enabled() -> bool:
+    return os.environ.get(SYNC_CHANGE_PROBE_VAR, "true").strip().lower() not in {"0", "false", "no"}
+
+
+def sync_scope(user_setting: dict) -> str:
+    """Fingerprint of what a sync fetches; a watermark only applies to runs with the same scope."""
+    scope = {key: user_setting.get(key) for key in _SCOPE_KEYS}
+    scope["calendars"] = sorted(set((user_setting.get("gcal_name_dict") or {}).values()))
+    encoded = json.dumps(scope, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+class SyncWatermark:
+    """Trigger time of the last sync that finished with nothing left to do, per scope."""
+
+    def __init__(self, config=None, logger=None):
+        self.config = config or {}
+        self.logger = logger
+        self.store = SyncStateStore(self.config, "syncWatermark", "sync_watermark_path")
+        self.data = self._load()
+
+    def synced_at(self, scope: str) -> str | None:
+        if self.data.get("scope") != scope:
+            return None
+        return self.data.get("synced_at")
+
+    def advance(self, synced_at: str, scope: str) -> None:
+        """Store a new watermark. Storage errors are logged and never raised."""
+        self.data = {"synced_at": synced_at, "scope": scope}
+        try:
+            self.store.save(self.data)
+        except Exception:
+            if self.logger:
+                self.logger.exception("Failed to persist sync watermark")
+
+    def _load(self) -> dict:
+        try:
+            data = self.store.read()
+        except Exception:
+            if self.logger:
+                self.logger.exception("Failed to load sync watermark; probing is skipped for this run")
+            return {}
+        return data if isinstance(data, dict) else {}
+
+
+def _format_time(value) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def probe_since(user_setting: dict, checkpoint, watermark) -> tuple[str | None, dict]:
+    """
+    Return (since, probe summary): `since` is the time to probe from, or None when the probe cannot run.
+
+    The summary of a probe that cannot run has result "not_run" and the reason.
+    """
+    if not change_probe_enabled():
+        return None, {"result": "not_run", "reason": "disabled"}
+    if checkpoint.entries:
+        return None, {"result": "not_run", "reason": "pending_checkpoint"}
+    synced_at = watermark.synced_at(sync_scope(user_setting))
+    if not synced_at:
+        return None, {"result": "not_run", "reason": "no_watermark"}
+    return _format_time(isoparse(synced_at) - PROBE_CLOCK_SKEW), {"since": synced_at}
+
+
+def notion_changed_since(latest_edit_time: str | None, since: str) -> bool:
+    if not latest_edit_time:
+        return False
+    return isoparse(latest_edit_time) >= isoparse(since)
+
+
+def finish_probe(probe: dict, changed: bool, calls: int, started: float) -> dict:
+    probe.update(
+        result="changed" if changed else "unchanged",
+        calls=calls,
+        duration_ms=int((time.perf_counter() - started) * 1000),
+    )
+    return probe
+
+
+def probe_failed(probe: dict, calls: int, started: float) -> dict:
+    probe.update(result="failed", calls=calls, duration_ms=int((time.perf_counter() - started) * 1000))
+    return probe
+
+
+def advance_watermark(watermark, user_setting: dict, trigger_time: str, sync_errors, deferred_actions) -> None:
+    """Record `trigger_time` after a run that left nothing to do (no errors, nothing deferred)."""
+    if watermark is None or not change_probe_enabled() or sync_errors or deferred_actions:
+        return
+    watermark.advance(trigger_time, sync_scope(user_setting))
+
+
+__all__ = [
+    "PROBE_CLOCK_SKEW",
+    "SYNC_CHANGE_PROBE_VAR",
+    "SyncWatermark",
+    "advance_watermark",
+    "change_probe_enabled",
+    "finish_probe",
+    "notion_changed_since",
+    "probe_failed",
+    "probe_since",
+    "sync_scope",
+]
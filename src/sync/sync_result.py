@@ -0,0 +1,345 @@
+"""
+Results, errors and run summaries shared by the blocking and the asyncio sync engines.
+
+Nothing here talks to Notion or Google; the engines in `sync.sync` and `sync.sync_async` call these helpers to
+build the error and deferred-action entries, the summary and the response of a run.
+"""
+
+import re
+import time
+from datetime import datetime, timezone
+
+from utils.api_metrics import active_api_stats, merge_api_stats
+from utils.logging_utils import build_debug_exception_detail, get_logger
+from utils.retry_utils import RetryStats
+from utils.sync_timings import merge_timings
+
+logger = get_logger(__name__)
+
+# Cap sync volume to avoid unbounded processing for large datasets.
+SYNC_TASK_LIMIT = 250
+SAFE_SYNC_FAILURE_MESSAGE = "Sync failed. See Lambda logs with aws_request_id for details."
+# Returned when the run deadline stopped the sync before every action was taken.
+SYNC_PARTIAL_STATUS = "sync_partial"
+
+
+def get_current_time_in_iso_format():
+    """
+    Returns the current UTC time in ISO 8601 format with milliseconds.
+    Format: YYYY-MM-DDTHH:MM:SS.SSSZ
+    """
+    current_time = datetime.now(timezone.utc)
+    formatted_current_time = current_time.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    # Trim the microseconds to milliseconds (3 decimal places)
+    formatted_current_time = formatted_current_time[:-3] + "Z"
+    return formatted_current_time
+
+
+def exception_error_code(exc: Exception) -> str:
+    name = type(exc).__name__
+    code = re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+    return code or "unexpected_sync_error"
+
+
+def build_sync_error(
+    action: str | None,
+    error_code: str,
+    *,
+    error_message: str | None = None,
+    error: str | None = None,
+    notion_task_id: str | None = None,
+    gcal_event_id: str | None = None,
+    gcal_event_start: str | None = None,
+    retriable: bool | None = None,
+    debug_detail: str | None = None,
+):
+    message = error_message if error_message is not None else error
+    payload = {
+        "action": action,
+        "error_code": error_code,
+        "error_message": message,
+        "error": error,
+        "notion_task_id": notion_task_id,
+        "gcal_event_id": gcal_event_id,
+        "gcal_event_start": gcal_event_start,
+        "retriable": retriable,
+    }
+    if debug_detail is not None:
+        payload["debug_detail"] = debug_detail
+    return payload
+
+
+def build_deferred_action(action: str, notion_task_id: str | None = None, gcal_event_id: str | None = None):
+    return {
+        "action": action,
+        "notion_task_id": notion_task_id,
+        "gcal_event_id": gcal_event_id,
+    }
+
+
+def defer_at_retry_deadline(plan: dict | None, notion_task_page_id, checkpoint, retry_ledger, exc: Exception):
+    """Defer a task action whose provider retry would have waited past the deadline; returns the deferred action."""
+    action = plan["action"] if plan else None
+    logger.warning("Deferring action=%s notion_task_id=%s: %s", action, notion_task_page_id, exc)
+    if action:
+        # A first write that already landed stays checkpointed, so the next run only finishes the action.
+        checkpoint.keep(action, notion_task_page_id)
+    retry_ledger.keep(notion_task_page_id)
+    return build_deferred_action(action, notion_task_page_id, (plan or {}).get("gcal_event_id") or None)
+
+
+def count_action(action_counts: dict, action: str) -> None:
+    action_counts[action] = action_counts.get(action, 0) + 1
+
+
+def retry_summary(notion_service, google_service) -> dict:
+    summary = {}
+    for provider, service in (("notion", notion_service), ("google", google_service)):
+        stats = getattr(service, "retry_stats", None)
+        if isinstance(stats, RetryStats):
+            summary[provider] = stats.to_dict()
+    return summary
+
+
+def span_summary(timings, notion_service, google_service) -> dict:
+    # The services record their own fetch spans; main() usually hands all three the same recorder.
+    return merge_timings(timings, getattr(notion_service, "timings", None), getattr(google_service, "timings", None))
+
+
+def api_call_summary(notion_service, google_service) -> dict:
+    # DynamoDB / SSM calls made so far in this run are recorded into the stats main() activated.
+    return merge_api_stats(
+        getattr(notion_service, "api_stats", None), getattr(google_service, "api_stats", None), active_api_stats()
+    )
+
+
+def event_start(gcal_event):
+    if not gcal_event:
+        return None
+    return gcal_event.get("start", {}).get("dateTime") or gcal_event.get("start", {}).get("date")
+
+
+def description_too_long_error(action, gcal_event, notion_task_id=None):
+    description = gcal_event.get("description") or ""
+    return build_sync_error(
+        action,
+        "gcal_description_too_long",
+        error=(
+            f"Skipped: GCal event description exceeds Notion's 2000-character "
+            f"rich_text limit ({len(description)} chars). "
+            "Syncing this event would corrupt data integrity."
+        ),
+        notion_task_id=notion_task_id,
+        gcal_event_id=gcal_event.get("id"),
+        gcal_event_start=event_start(gcal_event),
+        retriable=False,
+    )
+
+
+def build_task_failure(plan: dict | None, notion_task_page_id, exc: Exception) -> dict:
+    plan = plan or {}
+    return build_sync_error(
+        plan.get("action"),
+        exception_error_code(exc),
+        error_message=SAFE_SYNC_FAILURE_MESSAGE,
+        error=None,
+        debug_detail=build_debug_exception_detail(exc),
+        notion_task_id=notion_task_page_id,
+        gcal_event_id=plan.get("gcal_event_id"),
+        gcal_event_start=event_start(plan.get("gcal_event")),
+        retriable=True,
+    )
+
+
+def build_create_notion_failure(gcal_event: dict, exc: Exception) -> dict:
+    return build_sync_error(
+        "create_notion",
+        exception_error_code(exc),
+        error_message=SAFE_SYNC_FAILURE_MESSAGE,
+        error=None,
+        debug_detail=build_debug_exception_detail(exc),
+        gcal_event_id=gcal_event.get("id"),
+        gcal_event_start=event_start(gcal_event),
+        retriable=True,
+    )
+
+
+def failure_calendar_id(plan: dict | None) -> str | None:
+    """Calendar to fetch the failed item's event from on a retry: where the event is, else the task's calendar."""
+    plan = plan or {}
+    gcal_event = plan.get("gcal_event") or {}
+    return (gcal_event.get("organizer") or {}).get("email") or plan.get("calendar_id")
+
+
+def finish_retry_ledger(retry_ledger, sync_summary: dict, sync_errors: list) -> list:
+    """Persist the ledger, flag the errors it will retry, and return the errors it does not cover."""
+    retry_ledger.finish_run()
+    for error in sync_errors:
+        if retry_ledger.covers(error):
+            # Runtime-only flag read by sync_result_requires_retry; not part of the persisted error shape.
+            error["retry_scheduled"] = True
+    sync_summary["retry_ledger"] = retry_ledger.summary()
+    return [error for error in sync_errors if not error.get("retry_scheduled")]
+
+
+def partial_before_input_load(trigger_sync_time: str) -> dict:
+    logger.warning("Sync deadline reached before loading inputs; deferring the whole sync.")
+    return {
+        "statusCode": 200,
+        "body": {
+            "status": SYNC_PARTIAL_STATUS,
+            "message": {
+                "summary": {"deferred_count": 0, "deferred_before_input_load": True},
+                "trigger_time": trigger_sync_time,
+                "errors": [],
+                "deferred_actions": [],
+            },
+        },
+    }
+
+
+def elapsed_ms(started: float) -> int:
+    return int((time.perf_counter() - started) * 1000)
+
+
+def check_loaded_inputs(gcal_event_list, notion_config, notion_task_list, trigger_sync_time):
+    """Build the input summary, or the early response when there is nothing (or too much) to sync."""
+    event_count = len(gcal_event_list)
+    task_count = len(notion_task_list)
+
+    # Create a summary of the sync process
+    sync_summary = {
+        "google_event_count": event_count,
+        "notion_task_count": task_count,
+        "notion_config": notion_config,
+    }
+
+    logger.debug(f"Sync Summary: {sync_summary}")
+    # Stop early if either side exceeds the supported sync cap.
+    if task_count > SYNC_TASK_LIMIT or event_count > SYNC_TASK_LIMIT:
+        warning_message = f"Task count exceeds {SYNC_TASK_LIMIT} when triggering sync at {trigger_sync_time}. Sync process stopped to avoid overloading the sync job."  # noqa: E501
+        logger.warning(warning_message)
+        return sync_summary, {
+            "statusCode": 200,
+            "body": {
+                "status": "sync_error",
+                "message": warning_message,
+            },
+        }
+    # No Notion tasks found and no Google Calendar events found
+    if task_count == 0 and event_count == 0:
+        logger.debug("No Notion tasks found and no Google Calendar events found.")
+        return sync_summary, {
+            "statusCode": 200,
+            "body": {
+                "status": "sync_success",
+                "message": "No Notion tasks found and no Google Calendar events found.",
+            },
+        }
+    return sync_summary, None
+
+
+def input_load_failed_response() -> dict:
+    return {
+        "statusCode": 500,
+        "body": {
+            "status": "sync_error",
+            "message": {
+                "error_code": "sync_input_load_failed",
+                "error_message": SAFE_SYNC_FAILURE_MESSAGE,
+            },
+        },
+    }
+
+
+def sync_failed_response(exc: Exception) -> dict:
+    return {
+        "statusCode": 500,
+        "body": {
+            "status": "sync_error",
+            "message": {
+                "error_code": exception_error_code(exc),
+                "error_message": SAFE_SYNC_FAILURE_MESSAGE,
+            },
+        },
+    }
+
+
+def finish_sync(sync_summary, trigger_sync_time, sync_errors, deferred_actions) -> dict:
+    message = {
+        "summary": sync_summary,
+        "trigger_time": trigger_sync_time,
+        "errors": sync_errors,
+    }
+    if deferred_actions:
+        logger.warning(f"Sync deadline reached; deferred {len(deferred_actions)} action(s) to the next run.")
+        message["deferred_actions"] = deferred_actions
+        return {"statusCode": 200, "body": {"status": SYNC_PARTIAL_STATUS, "message": message}}
+    return {"statusCode": 200, "body": {"status": "sync_success", "message": message}}
+
+
+def probe_enabled_for(watermark, compare_time, should_update_notion_tasks, should_update_google_events):
+    # Force modes ignore timestamps, so "nothing changed" does not mean "nothing to do" for them.
+    return watermark is not None and compare_time and should_update_notion_tasks and should_update_google_events
+
+
+def unchanged_sync_summary(probe, timings, notion_service, google_service) -> dict:
+    logger.info("No changes on either side since %s; skipping the full sync.", probe["since"])
+    return {
+        "change_probe": probe,
+        "action_counts": {},
+        "deferred_count": 0,
+        "retries": retry_summary(notion_service, google_service),
+        "timings": {"spans": span_summary(timings, notion_service, google_service)},
+        "api_calls": api_call_summary(notion_service, google_service),
+    }
+
+
+def ledger_entry_failure(entry: dict, exc: Exception) -> dict:
+    if entry.get("notion_task_id"):
+        return build_task_failure(entry, entry["notion_task_id"], exc)
+    return build_create_notion_failure({"id": entry.get("gcal_event_id")}, exc)
+
+
+def replay_summary(replay, action_counts, deferred_actions, checkpoint, timings, notion_service, google_service):
+    return {
+        "retry_replay": replay,
+        "action_counts": action_counts,
+        "deferred_count": len(deferred_actions),
+        "checkpoint": checkpoint.summary(),
+        "retries": retry_summary(notion_service, google_service),
+        "timings": {"spans": span_summary(timings, notion_service, google_service)},
+        "api_calls": api_call_summary(notion_service, google_service),
+    }
+
+
+__all__ = [
+    "SYNC_TASK_LIMIT",
+    "SAFE_SYNC_FAILURE_MESSAGE",
+    "SYNC_PARTIAL_STATUS",
+    "get_current_time_in_iso_format",
+    "exception_error_code",
+    "build_sync_error",
+    "build_deferred_action",
+    "defer_at_retry_deadline",
+    "count_action",
+    "retry_summary",
+    "span_summary",
+    "api_call_summary",
+    "event_start",
+    "description_too_long_error",
+    "build_task_failure",
+    "build_create_notion_failure",
+    "failure_calendar_id",
+    "finish_retry_ledger",
+    "partial_before_input_load",
+    "elapsed_ms",
+    "check_loaded_inputs",
+    "input_load_failed_response",
+    "sync_failed_response",
+    "finish_sync",
+    "probe_enabled_for",
+    "unchanged_sync_summary",
+    "ledger_entry_failure",
+    "replay_summary",
+]
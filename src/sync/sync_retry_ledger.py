@@ -0,0 +1,158 @@
+"""
+Durable ledger of sync items whose actions failed with a retriable error.
+
+Each failed item (a Notion task, or a Google event for create_notion) is recorded with its last action, ids,
+calendar, error code and attempt count. The next run retries it: a full sync re-plans every item anyway and
+rebuilds the ledger from that run's failures, and a run whose change probe finds nothing new replays only the
+ledger items (see `sync.replay_retry_ledger`). Items that failed SYNC_RETRY_MAX_ATTEMPTS times (default 5) are
+dropped from the ledger and reported as exhausted.
+
+While the ledger is stored durably, retriable item errors no longer fail the SQS record or EventBridge
+invocation: the ledger, not a redelivery of the whole user sync, retries them.
+
+Stored through `sync_state_store.SyncStateStore`:
+  cloud: `syncRetryLedger` attribute on the Users item (DynamoDB)
+  local: JSON file at config["sync_retry_ledger_path"]
+Without a backing store the ledger is kept in memory only and is never reported as durable.
+"""
+
+import os
+from datetime import datetime, timezone
+
+from sync.sync_state_store import SyncStateStore
+
+LEDGER_VERSION = 1
+SYNC_RETRY_MAX_ATTEMPTS_VAR = "SYNC_RETRY_MAX_ATTEMPTS"
+DEFAULT_SYNC_RETRY_MAX_ATTEMPTS = 5
+
+
+def sync_retry_max_attempts() -> int:
+    raw = os.environ.get(SYNC_RETRY_MAX_ATTEMPTS_VAR, "").strip()
+    try:
+        value = int(raw) if raw else DEFAULT_SYNC_RETRY_MAX_ATTEMPTS
+    except ValueError:
+        return DEFAULT_SYNC_RETRY_MAX_ATTEMPTS
+    return value if value > 0 else DEFAULT_SYNC_RETRY_MAX_ATTEMPTS
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def ledger_key(notion_task_id: str | None = None, gcal_event_id: str | None = None) -> str | None:
+    """Key of the item an action works on: the Notion task, or the Google event for create_notion."""
+    if notion_task_id:
+        return f"notion:{notion_task_id}"
+    if gcal_event_id:
+        return f"gcal:{gcal_event_id}"
+    return None
+
+
+class SyncRetryLedger:
+    """Failed items of the last run, kept until a later run syncs them or they run out of attempts."""
+
+    def __init__(self, config=None, logger=None):
+        self.config = config or {}
+        self.logger = logger
+        self.store = SyncStateStore(self.config, "syncRetryLedger", "sync_retry_ledger_path")
+        self.durable = False
+        self._failed = {}
+        self._kept = set()
+        self._persisted = False
+        self._exhausted = 0
+        self.entries = self._load()
+
+    def record_failure(self, error: dict, calendar_id: str | None = None) -> None:
+        """Record a retriable sync error of this run; non-retriable errors are not retried and are ignored."""
+        if error.get("retriable") is not True:
+            return
+        key = ledger_key(error.get("notion_task_id"), error.get("gcal_event_id"))
+        if key is None:
+            return
+        previous = self.entries.get(key) or {}
+        now = _utc_now()
+        self._failed[key] = {
+            "action": error.get("action"),
+            "notion_task_id": error.get("notion_task_id"),
+            "gcal_event_id": error.get("gcal_event_id"),
+            "calendar_id": calendar_id or previous.get("calendar_id"),
+            "error_code": error.get("error_code"),
+            "attempts": int(previous.get("attempts") or 0) + 1,
+            "first_failed_at": previous.get("first_failed_at") or now,
+            "last_failed_at": now,
+        }
+
+    def keep(self, notion_task_id: str | None = None, gcal_event_id: str | None = None) -> None:
+        """Carry an entry over unchanged when its item was deferred instead of retried."""
+        key = ledger_key(notion_task_id, gcal_event_id)
+        if key in self.entries:
+            self._kept.add(key)
+
+    def covers(self, error: dict) -> bool:
+        """True when `error` is retried through the durable ledger instead of a redelivery."""
+        return self.durable and ledger_key(error.get("notion_task_id"), error.get("gcal_event_id")) in self.entries
+
+    def finish_run(self) -> None:
+        """Replace the entries with this run's failures plus the kept entries, then persist the ledger."""
+        max_attempts = sync_retry_max_attempts()
+        entries = {key: self.entries[key] for key in self._kept if key not in self._failed}
+        for key, entry in self._failed.items():
+            if entry["attempts"] >= max_attempts:
+                self._exhausted += 1
+                self._warning(f"Giving up on {key} after {entry['attempts']} failed attempt(s)")
+                continue
+            entries[key] = entry
+        self.entries = entries
+        self._failed = {}
+        self._kept = set()
+        self.flush()
+
+    def flush(self) -> None:
+        """Persist the entries. Storage errors are logged and never raised; the ledger is then not durable."""
+        if not self.store.durable:
+            self.durable = False
+            return
+        try:
+            if self.entries:
+                self.store.save({"version": LEDGER_VERSION, "updated_at": _utc_now(), "entries": self.entries})
+                self._persisted = True
+            elif self._persisted:
+                self.store.delete()
+                self._persisted = False
+            self.durable = True
+        except Exception:
+            self.durable = False
+            if self.logger:
+                self.logger.exception("Failed to persist sync retry ledger")
+
+    def summary(self) -> dict:
+        return {"pending_count": len(self.entries), "exhausted_count": self._exhausted, "durable": self.durable}
+
+    def _load(self) -> dict:
+        try:
+            data = self.store.read()
+        except Exception:
+            if self.logger:
+                self.logger.exception("Failed to load sync retry ledger; starting without one")
+            return {}
+        if not data:
+            return {}
+        self._persisted = True
+        if data.get("version") != LEDGER_VERSION:
+            self._warning(f"Ignoring sync retry ledger with unsupported version {data.get('version')}")
+            return {}
+        return dict(data.get("entries") or {})
+
+    def _warning(self, message: str) -> None:
+        if self.logger:
+            self.logger.warning(message)
+
+
+__all__ = [
+    "DEFAULT_SYNC_RETRY_MAX_ATTEMPTS",
+    "LEDGER_VERSION",
+    "SYNC_RETRY_MAX_ATTEMPTS_VAR",
+    "SyncRetryLedger",
+    "ledger_key",
+    "sync_retry_max_attempts",
+]
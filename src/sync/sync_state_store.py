@@ -0,0 +1,72 @@
+"""
+Storage of one per-user sync state document: the checkpoint, the change-probe watermark or the retry ledger.
+
+Storage follows APP_MODE:
+  cloud: one attribute of the Users item (DynamoDB), e.g. `syncCheckpoint`
+  local: a JSON file at config[<path key>], e.g. config["sync_checkpoint_path"]
+Without either the store is not durable and reads nothing; callers keep their state in memory only.
+Errors are raised to the caller, which logs them.
+"""
+
+import json
+from pathlib import Path
+
+
+class SyncStateStore:
+    """Read, save and delete one sync state document of the user described by `config`."""
+
+    def __init__(self, config: dict | None, attribute: str, path_key: str):
+        self.config = config or {}
+        self.mode = self.config.get("mode")
+        self.attribute = attribute
+        self.path_key = path_key
+
+    @property
+    def durable(self) -> bool:
+        return self.mode == "cloud" or self.local_path() is not None
+
+    def read(self) -> dict | None:
+        if self.mode == "cloud":
+            from utils.dynamodb_utils import get_sync_state_by_uuid
+
+            return get_sync_state_by_uuid(self.config.get("uuid"), self.attribute)
+        path = self.local_path()
+        if path is None or not path.exists():
+            return None
+        with path.open(encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self, data: dict) -> None:
+        if self.mode == "cloud":
+            from utils.dynamodb_utils import save_sync_state_by_uuid
+
+            save_sync_state_by_uuid(self.config.get("uuid"), self.attribute, data)
+            return
+        path = self.local_path()
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write and rename, so an interrupted save never leaves a truncated file.
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        tmp_path.replace(path)
+
+    def delete(self) -> None:
+        if self.mode == "cloud":
+            from utils.dynamodb_utils import delete_sync_state_by_uuid
+
+            delete_sync_state_by_uuid(self.config.get("uuid"), self.attribute)
+            return
+        path = self.local_path()
+        if path is not None and path.exists():
+            path.unlink()
+
+    def local_path(self) -> Path | None:
+        if self.mode != "local":
+            return None
+        path = self.config.get(self.path_key)
+        return Path(path) if path else None
+
+
+__all__ = ["SyncStateStore"]
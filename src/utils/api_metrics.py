@@ -0,0 +1,151 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Upper bounds (ms) of the latency histogram buckets; slower attempts land in the overflow bucket.
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000)
+
+_active_stats: ContextVar["ApiCallStats | None"] = ContextVar("active_api_call_stats", default=None)
+_current_attempt: ContextVar[tuple | None] = ContextVar("current_api_attempt", default=None)
+
+
+def _latency_bucket(latency_ms: float) -> str:
+    for bound in LATENCY_BUCKETS_MS:
+        if latency_ms <= bound:
+            return f"le_{bound}"
+    return f"gt_{LATENCY_BUCKETS_MS[-1]}"
+
+
+def _new_entry() -> dict:
+    return {
+        "calls": 0,
+        "attempts": 0,
+        "retries": 0,
+        "errors": 0,
+        "response_bytes": 0,
+        "latency_ms_total": 0.0,
+        "latency_histogram": {},
+    }
+
+
+class ApiCallStats:
+    """Per-endpoint API call counters reported in the sync summary's `api_calls`.
+
+    Keys are `<provider>.<endpoint>` such as `notion.databases.query`, `google.events.list` or
+    `dynamodb.users.update_item`. Each entry counts logical calls, HTTP attempts, retries, errors and response
+    bytes, plus a latency histogram of the attempts. Notion/Google services record through `call_with_retry`;
+    the module-level AWS helpers record into the stats made current with `activate()`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: dict[str, dict] = {}
+
+    def record_call(self, key: str) -> None:
+        with self._lock:
+            self._endpoints.setdefault(key, _new_entry())["calls"] += 1
+
+    def record_attempt(self, key: str, latency_ms: float, error: bool = False, retry: bool = False) -> None:
+        bucket = _latency_bucket(latency_ms)
+        with self._lock:
+            entry = self._endpoints.setdefault(key, _new_entry())
+            entry["attempts"] += 1
+            entry["retries"] += int(retry)
+            entry["errors"] += int(error)
+            entry["latency_ms_total"] += latency_ms
+            entry["latency_histogram"][bucket] = entry["latency_histogram"].get(bucket, 0) + 1
+
+    def add_response_bytes(self, key: str, size: int) -> None:
+        with self._lock:
+            self._endpoints.setdefault(key, _new_entry())["response_bytes"] += size
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                key: {
+                    **entry,
+                    "latency_ms_total": round(entry["latency_ms_total"], 1),
+                    "latency_histogram": dict(entry["latency_histogram"]),
+                }
+                for key, entry in sorted(self._endpoints.items())
+            }
+
+    @contextmanager
+    def activate(self):
+        """Make these the stats that `track_api_call` records into for the current context."""
+        token = _active_stats.set(self)
+        try:
+            yield self
+        finally:
+            _active_stats.reset(token)
+
+
+def active_api_stats() -> ApiCallStats | None:
+    return _active_stats.get()
+
+
+@contextmanager
+def track_attempt(stats: ApiCallStats | None, key: str, retry: bool = False):
+    """Time one request attempt; response bytes reported inside it are attributed to `key`."""
+    started = time.perf_counter()
+    token = _current_attempt.set((stats, key))
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        _current_attempt.reset(token)
+        if stats is not None:
+            stats.record_attempt(key, (time.perf_counter() - started) * 1000, error=error, retry=retry)
+
+
+def record_response_bytes(size: int) -> None:
+    """Add `size` response bytes to the attempt in progress (no-op outside `track_attempt`)."""
+    current = _current_attempt.get()
+    if current is not None and current[0] is not None and size:
+        current[0].add_response_bytes(current[1], int(size))
+
+
+@contextmanager
+def track_api_call(key: str):
+    """Count one single-attempt call (DynamoDB, SSM) into the stats active for this run, if any."""
+    stats = _active_stats.get()
+    if stats is not None:
+        stats.record_call(key)
+    with track_attempt(stats, key):
+        yield
+
+
+def merge_api_stats(*recorders) -> dict:
+    """Combine several recorders' endpoints; the same recorder passed twice is only counted once."""
+    merged: dict[str, dict] = {}
+    seen = set()
+    for recorder in recorders:
+        if not isinstance(recorder, ApiCallStats) or id(recorder) in seen:
+            continue
+        seen.add(id(recorder))
+        for key, entry in recorder.to_dict().items():
+            if key not in merged:
+                merged[key] = entry
+                continue
+            total = merged[key]
+            for name in ("calls", "attempts", "retries", "errors", "response_bytes"):
+                total[name] += entry[name]
+            total["latency_ms_total"] = round(total["latency_ms_total"] + entry["latency_ms_total"], 1)
+            for bucket, count in entry["latency_histogram"].items():
+                total["latency_histogram"][bucket] = total["latency_histogram"].get(bucket, 0) + count
+    return dict(sorted(merged.items()))
+
+
+__all__ = [
+    "ApiCallStats",
+    "LATENCY_BUCKETS_MS",
+    "active_api_stats",
+    "merge_api_stats",
+    "record_response_bytes",
+    "track_api_call",
+    "track_attempt",
+]
@@ -2,13 +2,47 @@ import os
 import time
 from datetime import datetime, timezone
 import boto3
+from utils.api_metrics import record_response_bytes, track_api_call
+from utils.sync_log_codec import decode_sync_log, encode_sync_log
 from utils.token_crypto import encrypt_token_if_plaintext
 
 
+# Attributes each read needs; reads project only these so large attributes (lastSyncLog) are never fetched.
+NOTION_TOKEN_ATTRIBUTES = ("accessToken",)
+GOOGLE_TOKEN_ATTRIBUTES = ("accessToken", "refreshToken", "expiryDate", "updatedAt")
+NOTION_CONFIG_ATTRIBUTES = ("notionConfig",)
+
+
+def _projection(attributes) -> str:
+    return ", ".join(attributes)
+
+
 class GoogleTokenWriteConflictError(RuntimeError):
     """Raised when a Google token update loses a conditional-write race."""
 
 
+class SyncUserNotFoundError(LookupError):
+    """Raised when a sync lease is requested for a uuid that has no Users item."""
+
+
+def _table_call(table: str, operation: str, method, **kwargs):
+    """Run one table operation, counted as `dynamodb.<table>.<operation>` in the run's API call stats."""
+    with track_api_call(f"dynamodb.{table}.{operation}"):
+        response = method(**kwargs)
+        record_response_bytes(_response_content_length(response))
+    return response
+
+
+def _response_content_length(response) -> int:
+    if not isinstance(response, dict):
+        return 0
+    headers = (response.get("ResponseMetadata") or {}).get("HTTPHeaders") or {}
+    try:
+        return int(headers.get("content-length") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
 def _get_dynamodb():
     return boto3.resource("dynamodb", region_name=os.getenv("APP_REGION"))
 
@@ -53,7 +87,7 @@ def _get_notion_tables():
 def save_sync_logs(uuid: str, response: dict, ttl_days: int = 7):
     now_iso = datetime.now(timezone.utc).isoformat()
     trigger_by = response.get("trigger_by", "unknown")
-    log_map = response  # use dict to store map data
+    log_map = encode_sync_log(response)  # header fields + size-bounded compressed payload
     now = datetime.now(timezone.utc)
     epoch_ms = int(now.timestamp() * 1000)
     ttl_sec = int(time.time()) + ttl_days * 24 * 60 * 60
@@ -64,17 +98,27 @@ def save_sync_logs(uuid: str, response: dict, ttl_days: int = 7):
     now = datetime.now(timezone.utc)
     now_iso = now.strftime("%Y-%m-%d")  # e.g. '2025-11-06'
     now_ms = int(now.timestamp() * 1000)  # epoch milliseconds
-    users.update_item(
+    _table_call(
+        "users",
+        "update_item",
+        users.update_item,
         Key={"uuid": uuid},
-        UpdateExpression="SET lastSyncLog = :ls, updatedAt = :ua, updatedAtMs = :uams",
+        UpdateExpression=(
+            "SET lastSyncLog = :ls, updatedAt = :ua, updatedAtMs = :uams, "
+            "lastSyncSeenAtMs = :uams, noopSyncCount = :zero"
+        ),
         ExpressionAttributeValues={
             ":ls": log_map,
             ":ua": now_iso,
             ":uams": now_ms,
+            ":zero": 0,
         },
     )
 
-    logs.put_item(
+    _table_call(
+        "sync_logs",
+        "put_item",
+        logs.put_item,
         Item={
             "uuid": uuid,  # partition key
             "date": now_iso,
@@ -82,14 +126,62 @@ def save_sync_logs(uuid: str, response: dict, ttl_days: int = 7):
             "trigger_by": trigger_by,
             "log": log_map,
             "ttl": ttl_sec,
-        }
+        },
+    )
+
+
+# count a no-op sync on the user row instead of writing a full sync log
+def record_noop_sync_by_uuid(uuid: str, status: str) -> bool:
+    """
+    Bump `noopSyncCount` and `lastSyncSeenAtMs` in one conditional update.
+
+    Returns False without writing when the last logged status differs from `status`, so the caller logs the change.
+    """
+    users_tbl = _get_users_table()
+    try:
+        _table_call(
+            "users",
+            "update_item",
+            users_tbl.update_item,
+            Key={"uuid": uuid},
+            UpdateExpression="SET noopSyncCount = if_not_exists(noopSyncCount, :zero) + :one, lastSyncSeenAtMs = :seen",
+            ConditionExpression="lastSyncLog.#status = :status",
+            ExpressionAttributeNames={"#status": "status"},
+            ExpressionAttributeValues={
+                ":zero": 0,
+                ":one": 1,
+                ":seen": int(datetime.now(timezone.utc).timestamp() * 1000),
+                ":status": status,
+            },
+        )
+    except Exception as exc:
+        error_code = getattr(exc, "response", {}).get("Error", {}).get("Code")
+        if error_code == "ConditionalCheckFailedException":
+            return False
+        raise
+    return True
+
+
+# get the decoded last sync log in user table by uuid
+def get_last_sync_log_by_uuid(uuid: str) -> dict | None:
+    users_tbl = _get_users_table()
+    response = _table_call(
+        "users", "get_item", users_tbl.get_item, Key={"uuid": uuid}, ProjectionExpression="lastSyncLog"
     )
+    item = response.get("Item") or {}
+    return decode_sync_log(item.get("lastSyncLog"))
 
 
 # get data from notion oauth token tables by uuid
 def get_notion_token_by_uuid(uuid: str) -> str:
     notion_tbl = _get_notion_tables()
-    response = notion_tbl.get_item(Key={"uuid": uuid})
+    response = _table_call(
+        "notion_tokens",
+        "get_item",
+        notion_tbl.get_item,
+        Key={"uuid": uuid},
+        ProjectionExpression=_projection(NOTION_TOKEN_ATTRIBUTES),
+    )
     item = response.get("Item")
     if not item:
         raise ValueError(f"No Notion token found for uuid: {uuid}")
@@ -99,7 +191,14 @@ def get_notion_token_by_uuid(uuid: str) -> str:
 # get data from google oauth token tables by uuid
 def get_google_token_by_uuid(uuid: str, consistent_read: bool = False) -> str:
     google_tbl = _get_google_tables()
-    response = google_tbl.get_item(Key={"uuid": uuid}, ConsistentRead=consistent_read)
+    response = _table_call(
+        "google_tokens",
+        "get_item",
+        google_tbl.get_item,
+        Key={"uuid": uuid},
+        ConsistentRead=consistent_read,
+        ProjectionExpression=_projection(GOOGLE_TOKEN_ATTRIBUTES),
+    )
     item = response.get("Item")
     if not item:
         raise ValueError(f"No Google token found for uuid: {uuid}")
@@ -130,7 +229,10 @@ def update_google_token_by_uuid(
         condition_expression = "attribute_not_exists(updatedAt) OR updatedAt = :expected_updated"
         expression_attribute_values[":expected_updated"] = expected_updated_at
     try:
-        google_tbl.update_item(
+        _table_call(
+            "google_tokens",
+            "update_item",
+            google_tbl.update_item,
             Key={"uuid": uuid},
             UpdateExpression="""
                 SET accessToken = :at,
@@ -153,7 +255,13 @@ def update_google_token_by_uuid(
 # get notion config in user table by uuid
 def get_notion_config_by_uuid(uuid: str) -> dict:
     users_tbl = _get_users_table()
-    response = users_tbl.get_item(Key={"uuid": uuid})
+    response = _table_call(
+        "users",
+        "get_item",
+        users_tbl.get_item,
+        Key={"uuid": uuid},
+        ProjectionExpression=_projection(NOTION_CONFIG_ATTRIBUTES),
+    )
     item = response.get("Item")
     if not item or "notionConfig" not in item:
         raise ValueError(f"No Notion config found for uuid: {uuid}")
@@ -163,7 +271,10 @@ def get_notion_config_by_uuid(uuid: str) -> dict:
 # update notion config in user table by uuid
 def update_notion_config_by_uuid(uuid: str, notion_config: dict):
     users_tbl = _get_users_table()
-    users_tbl.update_item(
+    _table_call(
+        "users",
+        "update_item",
+        users_tbl.update_item,
         Key={"uuid": uuid},
         UpdateExpression="SET notionConfig = :nc",
         ExpressionAttributeValues={
@@ -172,12 +283,143 @@ def update_notion_config_by_uuid(uuid: str, notion_config: dict):
     )
 
 
+# get one sync state attribute (syncCheckpoint, syncWatermark, syncRetryLedger) in user table by uuid
+def get_sync_state_by_uuid(uuid: str, attribute: str) -> dict | None:
+    users_tbl = _get_users_table()
+    response = _table_call(
+        "users",
+        "get_item",
+        users_tbl.get_item,
+        Key={"uuid": uuid},
+        ProjectionExpression="#state",
+        ExpressionAttributeNames={"#state": attribute},
+    )
+    item = response.get("Item") or {}
+    return item.get(attribute)
+
+
+# save one sync state attribute in user table by uuid
+def save_sync_state_by_uuid(uuid: str, attribute: str, state: dict):
+    users_tbl = _get_users_table()
+    _table_call(
+        "users",
+        "update_item",
+        users_tbl.update_item,
+        Key={"uuid": uuid},
+        UpdateExpression="SET #state = :state",
+        ExpressionAttributeNames={"#state": attribute},
+        ExpressionAttributeValues={
+            ":state": state,
+        },
+    )
+
+
+# remove one sync state attribute from user table by uuid
+def delete_sync_state_by_uuid(uuid: str, attribute: str):
+    users_tbl = _get_users_table()
+    _table_call(
+        "users",
+        "update_item",
+        users_tbl.update_item,
+        Key={"uuid": uuid},
+        UpdateExpression="REMOVE #state",
+        ExpressionAttributeNames={"#state": attribute},
+    )
+
+
+# take the sync lease in user table by uuid unless an unexpired lease exists
+def acquire_sync_lease_by_uuid(uuid: str, lease: dict, now_ms: int, take_finished: bool = False) -> dict | None:
+    """
+    Store `lease` as `syncLease` in one conditional update on an existing Users item.
+
+    Returns None when the lease was taken, else the unexpired lease that blocked it; with `take_finished` only a
+    running lease blocks. Raises SyncUserNotFoundError when there is no Users item for `uuid`, so an unknown uuid
+    never creates a row.
+    """
+    users_tbl = _get_users_table()
+    available = "attribute_not_exists(syncLease) OR syncLease.expires_at_ms <= :now"
+    names = {"#uuid": "uuid"}
+    values = {":lease": lease, ":now": now_ms}
+    if take_finished:
+        available += " OR syncLease.#state = :finished"
+        names["#state"] = "state"
+        values[":finished"] = "finished"
+    try:
+        _table_call(
+            "users",
+            "update_item",
+            users_tbl.update_item,
+            Key={"uuid": uuid},
+            UpdateExpression="SET syncLease = :lease",
+            ConditionExpression=f"attribute_exists(#uuid) AND ({available})",
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values,
+        )
+    except Exception as exc:
+        error_code = getattr(exc, "response", {}).get("Error", {}).get("Code")
+        if error_code != "ConditionalCheckFailedException":
+            raise
+    else:
+        return None
+    # Only read on contention, to tell a missing user from a held lease and report its state.
+    response = _table_call(
+        "users",
+        "get_item",
+        users_tbl.get_item,
+        Key={"uuid": uuid},
+        ProjectionExpression="#uuid, syncLease",
+        ExpressionAttributeNames={"#uuid": "uuid"},
+        ConsistentRead=True,
+    )
+    item = response.get("Item")
+    if not item:
+        raise SyncUserNotFoundError(f"No Users item for uuid {uuid}")
+    # A lease released between the update and the read still counts as held for this trigger.
+    return item.get("syncLease") or {}
+
+
+# replace (or remove, when lease is None) the sync lease still held by owner
+def release_sync_lease_by_uuid(uuid: str, owner: str, lease: dict | None) -> bool:
+    """Returns False without writing when the lease expired and another run took it over."""
+    users_tbl = _get_users_table()
+    update = {"UpdateExpression": "REMOVE syncLease", "ExpressionAttributeValues": {":owner": owner}}
+    if lease is not None:
+        update = {
+            "UpdateExpression": "SET syncLease = :lease",
+            "ExpressionAttributeValues": {":owner": owner, ":lease": lease},
+        }
+    try:
+        _table_call(
+            "users",
+            "update_item",
+            users_tbl.update_item,
+            Key={"uuid": uuid},
+            ConditionExpression="syncLease.#owner = :owner",
+            ExpressionAttributeNames={"#owner": "owner"},
+            **update,
+        )
+    except Exception as exc:
+        error_code = getattr(exc, "response", {}).get("Error", {}).get("Code")
+        if error_code == "ConditionalCheckFailedException":
+            return False
+        raise
+    return True
+
+
 __all__ = [
     "save_sync_logs",
+    "get_last_sync_log_by_uuid",
+    "record_noop_sync_by_uuid",
     "get_notion_token_by_uuid",
     "get_google_token_by_uuid",
     "GoogleTokenWriteConflictError",
     "update_google_token_by_uuid",
     "get_notion_config_by_uuid",
     "update_notion_config_by_uuid",
+    "get_sync_state_by_uuid",
+    "save_sync_state_by_uuid",
+    "delete_sync_state_by_uuid",
+    "acquire_sync_lease_by_uuid",
+    "SyncUserNotFoundError",
+    "release_sync_lease_by_uuid",
 ]
@@ -0,0 +1,149 @@
+"""
+CloudWatch Embedded Metric Format (EMF) lines for sync results.
+
+Lambda forwards stdout to CloudWatch Logs, which extracts the metrics of every EMF JSON line, so dashboards and
+alarms on sync throughput need no log-scanning queries. Each line carries the `trigger` and `status` dimensions.
+Set SYNC_EMF_ENABLED=false to turn the lines off; SYNC_METRICS_NAMESPACE overrides the namespace.
+"""
+
+import json
+import os
+import sys
+import time
+from typing import Any, Dict
+
+SYNC_EMF_ENABLED_VAR = "SYNC_EMF_ENABLED"
+SYNC_METRICS_NAMESPACE_VAR = "SYNC_METRICS_NAMESPACE"
+DEFAULT_SYNC_METRICS_NAMESPACE = "NotionSyncGCal"
+
+
+def emf_enabled() -> bool:
+    return os.environ.get(SYNC_EMF_ENABLED_VAR, "true").strip().lower() not in {"0", "false", "no"}
+
+
+def _metrics_namespace() -> str:
+    return os.environ.get(SYNC_METRICS_NAMESPACE_VAR, "").strip() or DEFAULT_SYNC_METRICS_NAMESPACE
+
+
+def build_emf_record(metrics: Dict[str, tuple], dimensions: Dict[str, str], properties: Dict[str, Any]) -> dict:
+    """Return one EMF document; `metrics` maps a metric name to (value, CloudWatch unit)."""
+    record = {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [
+                {
+                    "Namespace": _metrics_namespace(),
+                    "Dimensions": [list(dimensions)],
+                    "Metrics": [{"Name": name, "Unit": unit} for name, (_, unit) in metrics.items()],
+                }
+            ],
+        },
+        **properties,
+        **{name: str(value) for name, value in dimensions.items()},
+    }
+    record.update({name: value for name, (value, _) in metrics.items()})
+    return record
+
+
+def emit_emf(metrics: Dict[str, tuple], dimensions: Dict[str, str], properties: Dict[str, Any] | None = None) -> None:
+    """Write one EMF line to stdout (looked up per call so tests can capture it)."""
+    if not emf_enabled() or not metrics:
+        return
+    record = build_emf_record(metrics, dimensions, properties or {})
+    sys.stdout.write(json.dumps(record, default=str) + "\n")
+    sys.stdout.flush()
+
+
+def _sync_summary(payload: Dict[str, Any]) -> Dict[str, Any]:
+    message = payload.get("message")
+    summary = message.get("summary") if isinstance(message, dict) else None
+    return summary if isinstance(summary, dict) else {}
+
+
+def _sync_error_count(payload: Dict[str, Any]) -> int:
+    message = payload.get("message")
+    if not isinstance(message, dict):
+        return 0
+    if isinstance(message.get("error_count"), int):
+        return message["error_count"]
+    errors = message.get("errors")
+    return len(errors) if isinstance(errors, list) else 0
+
+
+def sync_metrics(payload: Dict[str, Any]) -> Dict[str, tuple]:
+    """Metrics for one user's processed sync result (the payload built by `process_and_log_sync_result`)."""
+    summary = _sync_summary(payload)
+    metrics = {
+        "Syncs": (1, "Count"),
+        "DurationMs": (payload.get("duration_ms") or 0, "Milliseconds"),
+        "Errors": (_sync_error_count(payload), "Count"),
+    }
+    if "notion_task_count" in summary:
+        metrics["TasksSeen"] = (summary["notion_task_count"], "Count")
+    if "google_event_count" in summary:
+        metrics["EventsSeen"] = (summary["google_event_count"], "Count")
+    action_counts = summary.get("action_counts")
+    if isinstance(action_counts, dict):
+        metrics["Writes"] = (sum(action_counts.values()), "Count")
+        for action, count in sorted(action_counts.items()):
+            metrics[f"Writes.{action}"] = (count, "Count")
+    retries = summary.get("retries")
+    if isinstance(retries, dict):
+        metrics["Retries"] = (
+            sum(stats.get("retries", 0) for stats in retries.values() if isinstance(stats, dict)),
+            "Count",
+        )
+    if "deferred_count" in summary:
+        metrics["DeferredActions"] = (summary["deferred_count"], "Count")
+    probe = summary.get("change_probe")
+    if isinstance(probe, dict) and probe.get("result") in ("changed", "unchanged"):
+        # Hit rate = ChangeProbeHits / ChangeProbes: the share of probed runs that skipped the full sync.
+        metrics["ChangeProbes"] = (1, "Count")
+        metrics["ChangeProbeHits"] = (int(probe["result"] == "unchanged"), "Count")
+        metrics["ChangeProbeCalls"] = (probe.get("calls", 0), "Count")
+    return metrics
+
+
+def emit_sync_metrics(payload: Dict[str, Any]) -> None:
+    emit_emf(
+        sync_metrics(payload),
+        {"trigger": payload.get("trigger_by", "unknown"), "status": payload.get("status", "unknown")},
+        {
+            "aws_request_id": payload.get("aws_request_id"),
+            "lambda_name": payload.get("lambda_name"),
+            "statusCode": payload.get("statusCode"),
+        },
+    )
+
+
+def emit_batch_metrics(batch_summary: Dict[str, Any]) -> None:
+    """Metrics for one SQS batch: record, success, failure and deduplicated counts plus the batch duration."""
+    emit_emf(
+        {
+            "Records": (batch_summary.get("record_count", 0), "Count"),
+            "RecordsDeduplicated": (batch_summary.get("deduplicated_count", 0), "Count"),
+            "RecordSuccesses": (batch_summary.get("success_count", 0), "Count"),
+            "RecordFailures": (batch_summary.get("failure_count", 0), "Count"),
+            "DurationMs": (batch_summary.get("duration_ms") or 0, "Milliseconds"),
+        },
+        {
+            "trigger": batch_summary.get("trigger_by", "sqs_batch"),
+            "status": batch_summary.get("status", "unknown"),
+        },
+        {
+            "aws_request_id": batch_summary.get("aws_request_id"),
+            "lambda_name": batch_summary.get("lambda_name"),
+        },
+    )
+
+
+__all__ = [
+    "SYNC_EMF_ENABLED_VAR",
+    "SYNC_METRICS_NAMESPACE_VAR",
+    "build_emf_record",
+    "emf_enabled",
+    "emit_batch_metrics",
+    "emit_emf",
+    "emit_sync_metrics",
+    "sync_metrics",
+]
@@ -1,10 +1,18 @@
 import json
+import os
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional, TypedDict
 
+from .emf_metrics import emit_batch_metrics, emit_sync_metrics
+
 MAX_SYNC_LOG_ERRORS = 3
-SYNC_LOG_CONTRACT_VERSION = "2026-05-31.sync-log.v2"
+SYNC_LOG_CONTRACT_VERSION = "2026-10-19.sync-log.v3"
 SAFE_SYNC_FAILURE_MESSAGE = "Sync failed. See Lambda logs with aws_request_id for details."
+SYNC_PARTIAL_STATUS = "sync_partial"
+# Returned by main() when another trigger holds the user's sync lease (see sync.sync_lease).
+SYNC_COALESCED_STATUS = "sync_coalesced"
+# "changes" (default): no-op runs only bump a counter on the user row; "always": every run writes a full log.
+SYNC_LOG_WRITE_POLICY_VAR = "SYNC_LOG_WRITE_POLICY"
 
 # Sentinel used as the uuid field on SQS batch-aggregate summaries.
 # It is never a real user UUID and must never be written to DynamoDB.
@@ -107,10 +115,42 @@ def sync_result_requires_retry(payload: Dict[str, Any]) -> bool:
     if isinstance(status_code, int) and status_code >= 500:
         return True
 
-    return any(error.get("retriable") is True for error in _iter_sync_errors(payload))
+    # Deadline-deferred work is finished by a redelivery instead of waiting for the next schedule.
+    if payload.get("status") == SYNC_PARTIAL_STATUS:
+        return True
+
+    # Errors the sync recorded in its durable retry ledger are retried by the next run, not by a redelivery.
+    return any(
+        error.get("retriable") is True and not error.get("retry_scheduled") for error in _iter_sync_errors(payload)
+    )
+
+
+def sync_log_write_policy() -> str:
+    policy = os.environ.get(SYNC_LOG_WRITE_POLICY_VAR, "changes").strip().lower()
+    return policy if policy in {"changes", "always"} else "changes"
+
+
+def is_noop_sync_log(payload: Dict[str, Any]) -> bool:
+    """True for a successful run that took no actions, had no errors and deferred nothing."""
+    if payload.get("status") != "sync_success" or payload.get("statusCode") != 200:
+        return False
+    message = payload.get("message")
+    if not isinstance(message, dict) or message.get("errors") or message.get("deferred_actions"):
+        return False
+    summary = message.get("summary")
+    if not isinstance(summary, dict):
+        return False
+    action_counts = summary.get("action_counts") or {}
+    return isinstance(action_counts, dict) and not any(action_counts.values())
 
 
 def _save_sync_logs(uuid: str, payload: Dict[str, Any]) -> None:
+    # A no-op run only counts itself, unless the last logged status differs (then the status change is logged).
+    if sync_log_write_policy() == "changes" and is_noop_sync_log(payload):
+        from .dynamodb_utils import record_noop_sync_by_uuid
+
+        if record_noop_sync_by_uuid(uuid, payload["status"]):
+            return
     from .dynamodb_utils import save_sync_logs
 
     save_sync_logs(uuid, payload)
@@ -156,17 +196,52 @@ def process_and_log_sync_result(
             "log_level": logger_obj.level,
             "duration_ms": int((datetime.now(timezone.utc) - lambda_start_time).total_seconds() * 1000),
         }
+    # Per-sync CloudWatch EMF metrics; the batch aggregate emits its own batch metrics instead
+    if uuid != _BATCH_SUMMARY_UUID:
+        try:
+            emit_sync_metrics(payload)
+        except Exception:
+            logger_obj.exception("Failed to emit sync metrics")
     # Persist summary to DynamoDB; don't fail the handler on logging errors
     try:
         # _BATCH_SUMMARY_UUID is a sentinel for SQS aggregate results — never a real user UUID.
         # Batch summaries must never be written to DynamoDB as user sync logs.
-        if uuid and uuid != _BATCH_SUMMARY_UUID:
+        # Coalesced triggers did not sync, so they keep the last real sync log.
+        if uuid and uuid != _BATCH_SUMMARY_UUID and payload.get("status") != SYNC_COALESCED_STATUS:
             _save_sync_logs(uuid, sanitize_sync_log_payload(payload))
     except Exception:
         logger_obj.exception("Failed to persist sync summary to DynamoDB")
     return payload
 
 
+def _group_sqs_records(logger_obj, records: list) -> tuple[Dict[Any, Dict[str, Any]], list]:
+    """
+    Group SQS records by uuid, in first-seen order: {uuid: {"indexes": [...], "retry_failed": bool}}.
+
+    Also returns one result slot per record; records with an unreadable body or a non-string uuid get their failed
+    result there directly.
+    A group only replays the retry ledger when every record in it asked for that, since a full sync retries the
+    ledger items too.
+    """
+    groups: Dict[Any, Dict[str, Any]] = {}
+    record_results: list = [None] * len(records)
+    for index, record in enumerate(records):
+        logger_obj.debug(f"Processing SQS record: {record}")
+        try:
+            body = json.loads(record.get("body", "{}"))
+            provided_uuid = body.get("uuid")
+            if not isinstance(provided_uuid, str):
+                raise TypeError(f"SQS record uuid must be a string, got {type(provided_uuid).__name__}")
+        except Exception:
+            logger_obj.exception("Error processing SQS record")
+            record_results[index] = {"uuid": None, "statusCode": 500, "error": "record processing failed"}
+            continue
+        group = groups.setdefault(provided_uuid, {"indexes": [], "retry_failed": True})
+        group["indexes"].append(index)
+        group["retry_failed"] = group["retry_failed"] and bool(body.get("retry_failed"))
+    return groups, record_results
+
+
 def process_sqs_records(
     logger_obj,
     event: Dict[str, Any],
@@ -175,21 +250,29 @@ def process_sqs_records(
     lambda_start_time: datetime,
 ) -> Dict[str, Any]:
     """
-    SQS batch processing: handle each record, summarize, and log
+    SQS batch processing: sync each user in the batch once, summarize, and log.
+
+    Records are grouped by uuid, so retries and bursts of manual triggers for one user cost a single sync. The
+    group's outcome applies to every message id in it, for `batchItemFailures` and the per-record summaries.
     """
     sqs_batch_results = []
     batch_item_failures = []
     logger_obj.debug(f"Processing SQS event with {len(event.get('Records', []))} records")
 
-    # Process each SQS record
-    for record in event["Records"]:
-        logger_obj.debug(f"Processing SQS record: {record}")
-        job_id = record.get("messageId", "unknown")
-        provided_uuid = None
+    records = event["Records"]
+    job_ids = [record.get("messageId", "unknown") for record in records]
+    groups, record_results = _group_sqs_records(logger_obj, records)
+    for provided_uuid, group in groups.items():
+        group_job_ids = [job_ids[index] for index in group["indexes"]]
+        extra = {"job_id": group_job_ids[0]}
+        if len(group_job_ids) > 1:
+            extra["job_ids"] = group_job_ids
+            logger_obj.info(f"Syncing {provided_uuid} once for {len(group_job_ids)} SQS records")
         try:
-            body = json.loads(record.get("body", "{}"))
-            provided_uuid = body.get("uuid")
-            sync_result = run_sync(provided_uuid)
+            # {"uuid": ..., "retry_failed": true} retries only the user's sync retry ledger items
+            sync_result = (
+                run_sync(provided_uuid, retry_failed=True) if group["retry_failed"] else run_sync(provided_uuid)
+            )
             processed_result = process_and_log_sync_result(
                 logger_obj=logger_obj,
                 sync_result=sync_result,
@@ -197,21 +280,18 @@ def process_sqs_records(
                 uuid=provided_uuid,
                 lambda_start_time=lambda_start_time,
                 trigger_name="sqs",
-                extra={"job_id": job_id},
+                extra=extra,
             )
-            sqs_batch_results.append(processed_result)
-            if sync_result_requires_retry(processed_result):
-                batch_item_failures.append({"itemIdentifier": job_id})
         except Exception:
             logger_obj.exception("Error processing SQS record")
-            sqs_batch_results.append(
-                {
-                    "uuid": provided_uuid,
-                    "job_id": job_id,
-                    "statusCode": 500,
-                    "error": "record processing failed",
-                }
-            )
+            processed_result = {"uuid": provided_uuid, "statusCode": 500, "error": "record processing failed"}
+        for index in group["indexes"]:
+            record_results[index] = processed_result
+
+    # The group's outcome applies to each of its records, in record order
+    for job_id, processed_result in zip(job_ids, record_results):
+        sqs_batch_results.append({**processed_result, "job_id": job_id})
+        if sync_result_requires_retry(processed_result):
             batch_item_failures.append({"itemIdentifier": job_id})
 
     # Summarize results for batch logging
@@ -241,6 +321,8 @@ def process_sqs_records(
         trigger_name="sqs_batch",
         extra={
             "record_count": len(sqs_batch_results),
+            "sync_count": len(groups),
+            "deduplicated_count": sum(len(group["indexes"]) - 1 for group in groups.values()),
             "success_count": success_count,
             "failure_count": failure_count,
             "record_summaries": sqs_batch_results,  # concise per-record summary list
@@ -250,6 +332,10 @@ def process_sqs_records(
         },
     )
     batch_summary["batchItemFailures"] = batch_item_failures
+    try:
+        emit_batch_metrics(batch_summary)
+    except Exception:
+        logger_obj.exception("Failed to emit batch metrics")
     return batch_summary
 
 
@@ -332,5 +418,7 @@ __all__ = [
     "process_eventbridge_event",
     "detect_event_source",
     "sync_result_requires_retry",
+    "is_noop_sync_log",
+    "sync_log_write_policy",
     "RetryableSyncFailure",
 ]
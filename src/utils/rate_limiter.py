@@ -0,0 +1,144 @@
+"""
+Process-wide token-bucket rate limiters for provider calls.
+
+Provider quotas are enforced per integration / OAuth client, not per user, so every service instance in a
+warm container acquires from one bucket per (provider, credential scope). Default rates sit just under the
+documented quotas; set `*_RATE_LIMIT_PER_SECOND=0` to disable a limiter.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Callable
+
+NOTION_RATE_LIMIT_PER_SECOND_VAR = "NOTION_RATE_LIMIT_PER_SECOND"
+NOTION_RATE_LIMIT_BURST_VAR = "NOTION_RATE_LIMIT_BURST"
+GOOGLE_RATE_LIMIT_PER_SECOND_VAR = "GOOGLE_RATE_LIMIT_PER_SECOND"
+GOOGLE_RATE_LIMIT_BURST_VAR = "GOOGLE_RATE_LIMIT_BURST"
+NOTION_OAUTH_CLIENT_ID_VAR = "NOTION_OAUTH_CLIENT_ID"
+
+# Notion allows an average of 3 requests/second per integration.
+DEFAULT_NOTION_RATE_PER_SECOND = 2.7
+DEFAULT_NOTION_BURST = 3
+# Google Calendar's default per-project quota is 10 queries/second.
+DEFAULT_GOOGLE_RATE_PER_SECOND = 9.0
+DEFAULT_GOOGLE_BURST = 10
+
+_PROVIDER_LIMITS = {
+    "notion": (
+        NOTION_RATE_LIMIT_PER_SECOND_VAR,
+        DEFAULT_NOTION_RATE_PER_SECOND,
+        NOTION_RATE_LIMIT_BURST_VAR,
+        DEFAULT_NOTION_BURST,
+    ),
+    "google": (
+        GOOGLE_RATE_LIMIT_PER_SECOND_VAR,
+        DEFAULT_GOOGLE_RATE_PER_SECOND,
+        GOOGLE_RATE_LIMIT_BURST_VAR,
+        DEFAULT_GOOGLE_BURST,
+    ),
+}
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        return default
+    return value if value >= 0 else default
+
+
+class TokenBucket:
+    """Thread-safe token bucket; `acquire()` blocks until a token is available."""
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate_per_second = rate_per_second
+        self.capacity = max(capacity, 1.0)
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = self.capacity
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float) -> float:
+        """Take `tokens` now (possibly going negative) and return how long the caller must wait."""
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate_per_second)
+            self._updated_at = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate_per_second
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until `tokens` are available and return the seconds spent waiting."""
+        if self.rate_per_second <= 0:
+            return 0.0
+        # Reserving up front keeps callers in FIFO order without holding the lock while sleeping.
+        wait = self._reserve(tokens)
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        """Like `acquire`, but waits with `asyncio.sleep` so other coroutines keep running."""
+        if self.rate_per_second <= 0:
+            return 0.0
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+_rate_limiters: dict[tuple[str, str], TokenBucket] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, scope: str | None = None) -> TokenBucket:
+    """Return the shared bucket for a provider and credential scope, creating it from env on first use."""
+    key = (provider, scope or "default")
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(key)
+        if limiter is None:
+            rate_var, default_rate, burst_var, default_burst = _PROVIDER_LIMITS[provider]
+            limiter = TokenBucket(_env_float(rate_var, default_rate), _env_float(burst_var, default_burst))
+            _rate_limiters[key] = limiter
+        return limiter
+
+
+def reset_rate_limiters() -> None:
+    with _rate_limiters_lock:
+        _rate_limiters.clear()
+
+
+def notion_rate_limit_scope() -> str:
+    """All users share the public integration's quota; local runs fall back to one default scope."""
+    return os.environ.get(NOTION_OAUTH_CLIENT_ID_VAR, "").strip() or "default"
+
+
+def google_rate_limit_scope(credentials) -> str:
+    """Google quotas are per OAuth client (project)."""
+    client_id = getattr(credentials, "client_id", None)
+    return client_id if isinstance(client_id, str) and client_id else "default"
+
+
+__all__ = [
+    "TokenBucket",
+    "get_rate_limiter",
+    "reset_rate_limiters",
+    "notion_rate_limit_scope",
+    "google_rate_limit_scope",
+    "NOTION_RATE_LIMIT_PER_SECOND_VAR",
+    "GOOGLE_RATE_LIMIT_PER_SECOND_VAR",
+]
@@ -0,0 +1,487 @@
+"""
+Shared retry policy for provider (Google Calendar / Notion) calls.
+
+Transient failures (HTTP 429, 5xx, Google `rateLimitExceeded`, connection errors) are retried with capped
+exponential backoff and full jitter, honouring `Retry-After` when the provider sends one. Each provider has a
+process-wide circuit breaker so a provider outage fails fast instead of burning the invocation on sleeps. Only
+outage errors (5xx, connection errors) trip it: rate limits are scoped to one user's credentials, and counting
+them would fail every other user's calls too.
+A policy bound to the run deadline (`bind_retry_deadline`) raises RetryDeadlineError instead of sleeping past it,
+so the sync engine defers the action to the next run.
+"""
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable
+
+from utils.api_metrics import ApiCallStats, track_attempt
+
+PROVIDER_RETRY_MAX_ATTEMPTS_VAR = "PROVIDER_RETRY_MAX_ATTEMPTS"
+PROVIDER_RETRY_BASE_DELAY_VAR = "PROVIDER_RETRY_BASE_DELAY_SECONDS"
+PROVIDER_RETRY_MAX_DELAY_VAR = "PROVIDER_RETRY_MAX_DELAY_SECONDS"
+CIRCUIT_FAILURE_THRESHOLD_VAR = "PROVIDER_CIRCUIT_FAILURE_THRESHOLD"
+CIRCUIT_RESET_SECONDS_VAR = "PROVIDER_CIRCUIT_RESET_SECONDS"
+
+DEFAULT_MAX_ATTEMPTS = 4
+DEFAULT_BASE_DELAY_SECONDS = 0.5
+DEFAULT_MAX_DELAY_SECONDS = 8.0
+# Retry-After values above this are not worth waiting for inside one invocation.
+MAX_RETRY_AFTER_SECONDS = 30.0
+DEFAULT_CIRCUIT_FAILURE_THRESHOLD = 5
+DEFAULT_CIRCUIT_RESET_SECONDS = 30.0
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# Statuses that mean the request was rejected before it was processed, so even non-idempotent calls can retry.
+REJECTED_STATUS_CODES = frozenset({429})
+GOOGLE_RATE_LIMIT_REASONS = frozenset({"rateLimitExceeded", "userRateLimitExceeded"})
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the provider while its circuit breaker is open."""
+
+    def __init__(self, provider: str, retry_in_seconds: float):
+        super().__init__(f"{provider} circuit breaker is open; retry in {retry_in_seconds:.1f}s")
+        self.provider = provider
+        self.retry_in_seconds = retry_in_seconds
+
+
+class RetryDeadlineError(RuntimeError):
+    """Raised instead of a retry whose wait would run past the sync deadline; the engine defers the action."""
+
+    def __init__(self, provider: str, endpoint: str, delay: float):
+        super().__init__(f"{provider} {endpoint} retry in {delay:.1f}s would pass the sync deadline")
+        self.provider = provider
+        self.endpoint = endpoint
+        self.delay = delay
+
+
+def _env_number(name: str, default, cast=float):
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return default
+    try:
+        value = cast(raw)
+    except ValueError:
+        return default
+    return value if value >= 0 else default
+
+
+def _status_code(exc: Exception) -> int | None:
+    # googleapiclient.errors.HttpError
+    status = getattr(getattr(exc, "resp", None), "status", None)
+    if status is None:
+        # notion_client.errors.HTTPResponseError / APIResponseError
+        status = getattr(exc, "status", None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _google_error_reasons(exc: Exception) -> set[str]:
+    content = getattr(exc, "content", None)
+    if not content:
+        return set()
+    try:
+        if isinstance(content, bytes):
+            content = content.decode("utf-8")
+        errors = (json.loads(content).get("error") or {}).get("errors") or []
+    except (ValueError, AttributeError):
+        return set()
+    return {error.get("reason") for error in errors if isinstance(error, dict)}
+
+
+def _is_transport_error(exc: Exception) -> bool:
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    try:
+        import httpx
+    except ImportError:  # pragma: no cover - httpx ships with notion-client
+        httpx = None
+    if httpx is not None and isinstance(exc, httpx.TransportError):
+        return True
+    try:
+        from notion_client.errors import RequestTimeoutError
+    except ImportError:  # pragma: no cover
+        return False
+    return isinstance(exc, RequestTimeoutError)
+
+
+def classify_error(exc: Exception) -> tuple[bool, bool]:
+    """Return (retryable, rejected_before_processing) for a provider exception."""
+    if isinstance(exc, CircuitOpenError):
+        return False, False
+    status = _status_code(exc)
+    if status in REJECTED_STATUS_CODES:
+        return True, True
+    if status == 403 and _google_error_reasons(exc) & GOOGLE_RATE_LIMIT_REASONS:
+        return True, True
+    if status in RETRYABLE_STATUS_CODES:
+        return True, False
+    if status is None and _is_transport_error(exc):
+        return True, False
+    return False, False
+
+
+def retry_after_seconds(exc: Exception) -> float | None:
+    """Parse a Retry-After header (delta-seconds or HTTP date) from a provider exception."""
+    value = None
+    headers = getattr(exc, "headers", None)
+    if headers is not None:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+    if value is None:
+        resp = getattr(exc, "resp", None)
+        getter = getattr(resp, "get", None)
+        if callable(getter):
+            value = getter("retry-after")
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class RetryPolicy:
+    """Capped exponential backoff with full jitter."""
+
+    def __init__(
+        self,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        base_delay: float = DEFAULT_BASE_DELAY_SECONDS,
+        max_delay: float = DEFAULT_MAX_DELAY_SECONDS,
+        sleep: Callable[[float], None] = time.sleep,
+        jitter: Callable[[], float] = random.random,
+        async_sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.max_attempts = max(int(max_attempts), 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+        self.jitter = jitter
+        self.async_sleep = async_sleep
+        # Run deadline (sync_deadline.SyncDeadline) that waits must not cross; set by bind_retry_deadline.
+        self.deadline = None
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        return cls(
+            max_attempts=_env_number(PROVIDER_RETRY_MAX_ATTEMPTS_VAR, DEFAULT_MAX_ATTEMPTS, int),
+            base_delay=_env_number(PROVIDER_RETRY_BASE_DELAY_VAR, DEFAULT_BASE_DELAY_SECONDS),
+            max_delay=_env_number(PROVIDER_RETRY_MAX_DELAY_VAR, DEFAULT_MAX_DELAY_SECONDS),
+        )
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """Seconds to wait after failed attempt number `attempt` (1-based)."""
+        backoff = self.jitter() * min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        if retry_after is not None:
+            return max(min(retry_after, MAX_RETRY_AFTER_SECONDS), backoff)
+        return backoff
+
+    def fits_deadline(self, delay: float) -> bool:
+        """True when waiting `delay` seconds still leaves the deadline's safety margin."""
+        if self.deadline is None:
+            return True
+        margin_ms = getattr(self.deadline, "safety_margin_ms", 0)
+        return delay * 1000 <= self.deadline.remaining_ms() - margin_ms
+
+
+def bind_retry_deadline(deadline, *services) -> None:
+    """Give the retry policy of each service the run deadline (None unbinds it)."""
+    for service in services:
+        policy = getattr(service, "retry_policy", None)
+        if isinstance(policy, RetryPolicy):
+            policy.deadline = deadline
+
+
+class CircuitBreaker:
+    """Consecutive-outage-failure circuit breaker shared by every caller of one provider in this process."""
+
+    def __init__(
+        self,
+        provider: str,
+        failure_threshold: int = DEFAULT_CIRCUIT_FAILURE_THRESHOLD,
+        reset_seconds: float = DEFAULT_CIRCUIT_RESET_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.provider = provider
+        self.failure_threshold = max(int(failure_threshold), 1)
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._opened_at: float | None = None
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None and self.clock() - self._opened_at < self.reset_seconds
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError while open; after `reset_seconds` one trial call is let through."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            elapsed = self.clock() - self._opened_at
+            if elapsed < self.reset_seconds:
+                raise CircuitOpenError(self.provider, self.reset_seconds - elapsed)
+            # Half-open: re-arm the timer so concurrent callers keep failing fast until the trial returns.
+            self._opened_at = self.clock()
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._consecutive_failures = 0
+            self._opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._consecutive_failures >= self.failure_threshold:
+                self._opened_at = self.clock()
+
+
+_circuit_breakers: dict[str, CircuitBreaker] = {}
+_circuit_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(provider: str) -> CircuitBreaker:
+    with _circuit_breakers_lock:
+        breaker = _circuit_breakers.get(provider)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                provider,
+                failure_threshold=_env_number(CIRCUIT_FAILURE_THRESHOLD_VAR, DEFAULT_CIRCUIT_FAILURE_THRESHOLD, int),
+                reset_seconds=_env_number(CIRCUIT_RESET_SECONDS_VAR, DEFAULT_CIRCUIT_RESET_SECONDS),
+            )
+            _circuit_breakers[provider] = breaker
+        return breaker
+
+
+def reset_circuit_breakers() -> None:
+    with _circuit_breakers_lock:
+        _circuit_breakers.clear()
+
+
+class RetryStats:
+    """Per-service retry counters reported in the sync summary."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.sleep_seconds = 0.0
+        self.gave_up = 0
+        self.circuit_rejections = 0
+        self.throttle_seconds = 0.0
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "retries": self.retries,
+                "sleep_ms": int(self.sleep_seconds * 1000),
+                "gave_up": self.gave_up,
+                "circuit_rejections": self.circuit_rejections,
+                "throttle_ms": int(self.throttle_seconds * 1000),
+            }
+
+    def _add(self, **counts) -> None:
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+
+def _start_attempt(stats: RetryStats | None, breaker: CircuitBreaker | None) -> None:
+    if breaker is not None:
+        try:
+            breaker.before_call()
+        except CircuitOpenError:
+            if stats is not None:
+                stats._add(circuit_rejections=1)
+            raise
+
+
+def _retry_delay(
+    exc: Exception,
+    attempt: int,
+    *,
+    provider: str,
+    endpoint: str,
+    policy: RetryPolicy,
+    stats: RetryStats | None,
+    breaker: CircuitBreaker | None,
+    idempotent: bool,
+    logger,
+) -> float | None:
+    """
+    Return the seconds to wait before retrying `exc`, or None when it must be re-raised.
+
+    Raises RetryDeadlineError when the wait would cross the policy's deadline.
+    """
+    retryable, rejected = classify_error(exc)
+    if not retryable:
+        return None
+    # A rate-limited request was rejected for this credential only; the provider itself is up.
+    if breaker is not None and not rejected:
+        breaker.record_failure()
+    if attempt >= policy.max_attempts or not (idempotent or rejected):
+        if stats is not None:
+            stats._add(gave_up=1)
+        return None
+    delay = policy.delay(attempt, retry_after_seconds(exc))
+    if not policy.fits_deadline(delay):
+        if stats is not None:
+            stats._add(gave_up=1)
+        raise RetryDeadlineError(provider, endpoint, delay) from exc
+    if logger:
+        logger.warning(
+            "%s %s failed with %s (attempt %s/%s); retrying in %.2fs",
+            provider,
+            endpoint,
+            type(exc).__name__,
+            attempt,
+            policy.max_attempts,
+            delay,
+        )
+    if stats is not None:
+        stats._add(retries=1, sleep_seconds=delay)
+    return delay
+
+
+def call_with_retry(
+    fn: Callable[[], Any],
+    *,
+    provider: str,
+    endpoint: str,
+    policy: RetryPolicy,
+    stats: RetryStats | None = None,
+    breaker: CircuitBreaker | None = None,
+    rate_limiter=None,
+    idempotent: bool = True,
+    logger=None,
+    api_stats: ApiCallStats | None = None,
+) -> Any:
+    """
+    Call `fn` and retry transient provider failures.
+
+    Non-idempotent calls (e.g. creating an event) are only retried when the provider rejected the request
+    before processing it (429 / rate limit), so a retry can never create a duplicate.
+    Every attempt, including retries, first acquires a token from `rate_limiter` when one is given.
+    With `api_stats`, the call and each attempt's latency are counted under `<provider>.<endpoint>`.
+    """
+    key = f"{provider}.{endpoint}"
+    if api_stats is not None:
+        api_stats.record_call(key)
+    attempt = 0
+    while True:
+        attempt += 1
+        _start_attempt(stats, breaker)
+        if rate_limiter is not None:
+            waited = rate_limiter.acquire()
+            if waited and stats is not None:
+                stats._add(throttle_seconds=waited)
+        if stats is not None:
+            stats._add(calls=1)
+        try:
+            with track_attempt(api_stats, key, retry=attempt > 1):
+                result = fn()
+        except Exception as exc:
+            delay = _retry_delay(
+                exc,
+                attempt,
+                provider=provider,
+                endpoint=endpoint,
+                policy=policy,
+                stats=stats,
+                breaker=breaker,
+                idempotent=idempotent,
+                logger=logger,
+            )
+            if delay is None:
+                raise
+            policy.sleep(delay)
+            continue
+        if breaker is not None:
+            breaker.record_success()
+        return result
+
+
+async def call_with_retry_async(
+    fn: Callable[[], Awaitable[Any]],
+    *,
+    provider: str,
+    endpoint: str,
+    policy: RetryPolicy,
+    stats: RetryStats | None = None,
+    breaker: CircuitBreaker | None = None,
+    rate_limiter=None,
+    idempotent: bool = True,
+    logger=None,
+    api_stats: ApiCallStats | None = None,
+) -> Any:
+    """`call_with_retry` for coroutines: backoff and rate-limit waits yield to the event loop."""
+    key = f"{provider}.{endpoint}"
+    if api_stats is not None:
+        api_stats.record_call(key)
+    attempt = 0
+    while True:
+        attempt += 1
+        _start_attempt(stats, breaker)
+        if rate_limiter is not None:
+            waited = await rate_limiter.acquire_async()
+            if waited and stats is not None:
+                stats._add(throttle_seconds=waited)
+        if stats is not None:
+            stats._add(calls=1)
+        try:
+            with track_attempt(api_stats, key, retry=attempt > 1):
+                result = await fn()
+        except Exception as exc:
+            delay = _retry_delay(
+                exc,
+                attempt,
+                provider=provider,
+                endpoint=endpoint,
+                policy=policy,
+                stats=stats,
+                breaker=breaker,
+                idempotent=idempotent,
+                logger=logger,
+            )
+            if delay is None:
+                raise
+            await policy.async_sleep(delay)
+            continue
+        if breaker is not None:
+            breaker.record_success()
+        return result
+
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "RetryDeadlineError",
+    "RetryPolicy",
+    "RetryStats",
+    "bind_retry_deadline",
+    "call_with_retry",
+    "call_with_retry_async",
+    "classify_error",
+    "get_circuit_breaker",
+    "reset_circuit_breakers",
+    "retry_after_seconds",
+]
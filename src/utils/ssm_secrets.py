@@ -1,6 +1,8 @@
 import os
 from typing import Any
 
+from utils.api_metrics import track_api_call
+
 
 _SSM_CLIENT: Any | None = None
 _PARAMETER_CACHE: dict[str, str] = {}
@@ -38,7 +40,8 @@ def get_ssm_parameter(name: str) -> str:
         return _PARAMETER_CACHE[parameter_name]
 
     try:
-        response = _get_ssm_client().get_parameter(Name=parameter_name, WithDecryption=True)
+        with track_api_call("ssm.get_parameter"):
+            response = _get_ssm_client().get_parameter(Name=parameter_name, WithDecryption=True)
         value = response["Parameter"]["Value"]
     except SSMSecretError:
         raise
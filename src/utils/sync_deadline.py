@@ -0,0 +1,56 @@
+import os
+import time
+from typing import Any, Callable
+
+SYNC_DEADLINE_SAFETY_MARGIN_MS_VAR = "SYNC_DEADLINE_SAFETY_MARGIN_MS"
+# Time kept in reserve for in-flight writes, sync log persistence, and the handler response.
+DEFAULT_SYNC_DEADLINE_SAFETY_MARGIN_MS = 20_000
+
+
+def _safety_margin_from_env() -> int:
+    raw = os.environ.get(SYNC_DEADLINE_SAFETY_MARGIN_MS_VAR, "").strip()
+    if not raw:
+        return DEFAULT_SYNC_DEADLINE_SAFETY_MARGIN_MS
+    try:
+        return max(int(raw), 0)
+    except ValueError:
+        return DEFAULT_SYNC_DEADLINE_SAFETY_MARGIN_MS
+
+
+class SyncDeadline:
+    """Remaining-time budget for a sync run.
+
+    The sync engine stops taking new actions once `expired()` is true, so the
+    invocation can still report partial results before the runtime kills it.
+    """
+
+    def __init__(self, remaining_time_ms: Callable[[], int], safety_margin_ms: int | None = None):
+        self._remaining_time_ms = remaining_time_ms
+        self.safety_margin_ms = _safety_margin_from_env() if safety_margin_ms is None else safety_margin_ms
+
+    @classmethod
+    def from_lambda_context(cls, context: Any, safety_margin_ms: int | None = None) -> "SyncDeadline | None":
+        """Build a deadline from a Lambda context, or return None when the context has no timer."""
+        remaining_time_ms = getattr(context, "get_remaining_time_in_millis", None)
+        if not callable(remaining_time_ms):
+            return None
+        return cls(remaining_time_ms, safety_margin_ms)
+
+    @classmethod
+    def after(cls, seconds: float, safety_margin_ms: int = 0) -> "SyncDeadline":
+        """Build a deadline that expires `seconds` from now (local runs and tests)."""
+        deadline_at = time.monotonic() + seconds
+        return cls(lambda: int((deadline_at - time.monotonic()) * 1000), safety_margin_ms)
+
+    def remaining_ms(self) -> int:
+        return int(self._remaining_time_ms())
+
+    def expired(self) -> bool:
+        return self.remaining_ms() <= self.safety_margin_ms
+
+
+__all__ = [
+    "SyncDeadline",
+    "SYNC_DEADLINE_SAFETY_MARGIN_MS_VAR",
+    "DEFAULT_SYNC_DEADLINE_SAFETY_MARGIN_MS",
+]
@@ -0,0 +1,147 @@
+"""
+Compact DynamoDB encoding of persisted sync logs (contract v3).
+
+A sync log is stored as a small header map: the scalar top-level contract fields, so the app can list runs without
+decoding, plus the full sanitized payload as zlib-compressed JSON in the binary `log_blob` attribute. The compressed
+blob is kept under SYNC_LOG_MAX_BYTES (default 16 KiB) by dropping the bulkiest parts of the payload in a fixed
+order; the dropped parts are listed in `log_truncated`.
+
+`decode_sync_log` turns a stored item back into the payload. Items written before v3 are plain maps and are
+returned unchanged.
+"""
+
+import json
+import os
+import zlib
+
+SYNC_LOG_ENCODING = "zlib+json"
+SYNC_LOG_MAX_BYTES_VAR = "SYNC_LOG_MAX_BYTES"
+DEFAULT_SYNC_LOG_MAX_BYTES = 16 * 1024
+HEADER_KEYS = (
+    "contract_version",
+    "trigger_by",
+    "uuid",
+    "statusCode",
+    "status",
+    "lambda_name",
+    "aws_request_id",
+    "log_level",
+    "duration_ms",
+    "job_id",
+)
+
+
+class SyncLogDecodeError(ValueError):
+    """Raised when a stored sync log has an unknown encoding or a corrupt blob."""
+
+
+def sync_log_max_bytes() -> int:
+    raw = os.environ.get(SYNC_LOG_MAX_BYTES_VAR, "").strip()
+    try:
+        value = int(raw) if raw else DEFAULT_SYNC_LOG_MAX_BYTES
+    except ValueError:
+        return DEFAULT_SYNC_LOG_MAX_BYTES
+    return value if value > 0 else DEFAULT_SYNC_LOG_MAX_BYTES
+
+
+def _compress(payload: dict) -> bytes:
+    encoded = json.dumps(payload, separators=(",", ":"), sort_keys=True, default=str)
+    return zlib.compress(encoded.encode("utf-8"), 9)
+
+
+def _message(payload: dict) -> dict | None:
+    message = payload.get("message")
+    return message if isinstance(message, dict) else None
+
+
+def _drop_record_summaries(payload: dict) -> bool:
+    if "record_summaries" not in payload:
+        return False
+    payload["omitted_record_summary_count"] = len(payload.pop("record_summaries") or [])
+    return True
+
+
+def _drop_nested_summary(payload: dict) -> bool:
+    message = _message(payload)
+    summary = message.get("summary") if message else None
+    if not isinstance(summary, dict) or not any(isinstance(value, (dict, list)) for value in summary.values()):
+        return False
+    message["summary"] = {key: value for key, value in summary.items() if not isinstance(value, (dict, list))}
+    return True
+
+
+def _drop_errors(payload: dict) -> bool:
+    message = _message(payload)
+    if not message or not message.get("errors"):
+        return False
+    message.setdefault("error_count", len(message["errors"]))
+    message["errors"] = []
+    return True
+
+
+def _drop_message(payload: dict) -> bool:
+    payload["message"] = {"error_code": "sync_log_too_large"}
+    return True
+
+
+# Cheapest to lose first: batch record copies, then per-phase detail, then error details, then everything else.
+_TRUNCATION_STEPS = (
+    ("record_summaries", _drop_record_summaries),
+    ("summary_detail", _drop_nested_summary),
+    ("errors", _drop_errors),
+    ("message", _drop_message),
+)
+
+
+def encode_sync_log(payload: dict, max_bytes: int | None = None) -> dict:
+    """Return the DynamoDB item for `payload`: header fields plus the compressed payload."""
+    max_bytes = max_bytes or sync_log_max_bytes()
+    payload = json.loads(json.dumps(payload, default=str))
+    truncated = []
+    blob = _compress(payload)
+    for name, step in _TRUNCATION_STEPS:
+        if len(blob) <= max_bytes:
+            break
+        if step(payload):
+            truncated.append(name)
+            blob = _compress(payload)
+
+    item = {key: payload[key] for key in HEADER_KEYS if key in payload}
+    item["log_encoding"] = SYNC_LOG_ENCODING
+    item["log_blob"] = blob
+    if truncated:
+        item["log_truncated"] = truncated
+    return item
+
+
+def decode_sync_log(item: dict | None) -> dict | None:
+    """Return the payload of a stored sync log; pre-v3 plain maps are returned as they are."""
+    if not isinstance(item, dict):
+        return item
+    encoding = item.get("log_encoding")
+    if encoding is None:
+        return dict(item)
+    if encoding != SYNC_LOG_ENCODING:
+        raise SyncLogDecodeError(f"Unknown sync log encoding: {encoding}")
+    blob = item.get("log_blob")
+    # boto3 returns binary attributes wrapped in boto3.dynamodb.types.Binary.
+    blob = getattr(blob, "value", blob)
+    try:
+        payload = json.loads(zlib.decompress(bytes(blob)).decode("utf-8"))
+    except (TypeError, ValueError, zlib.error) as exc:
+        raise SyncLogDecodeError("Corrupt sync log blob") from exc
+    if item.get("log_truncated"):
+        payload["log_truncated"] = list(item["log_truncated"])
+    return payload
+
+
+__all__ = [
+    "DEFAULT_SYNC_LOG_MAX_BYTES",
+    "HEADER_KEYS",
+    "SYNC_LOG_ENCODING",
+    "SYNC_LOG_MAX_BYTES_VAR",
+    "SyncLogDecodeError",
+    "decode_sync_log",
+    "encode_sync_log",
+    "sync_log_max_bytes",
+]
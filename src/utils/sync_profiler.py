@@ -0,0 +1,187 @@
+"""
+Opt-in profiling of a sync run.
+
+Set SYNC_PROFILE=cprofile (deterministic, writes a `.pstats` file) or SYNC_PROFILE=pyinstrument (sampling, writes
+a `.collapsed` folded-stack file for flamegraph tools; needs the optional `pyinstrument` package and falls back
+to cProfile without it). SYNC_PROFILE_UUIDS limits profiling to a comma-separated list of user uuids, so one
+user's slow run can be captured on demand; without it the whole Lambda invocation is profiled.
+
+Artifacts go to SYNC_PROFILE_DIR (default /tmp/sync-profiles), or to s3://SYNC_PROFILE_S3_BUCKET/<prefix> when a
+bucket is set. Callers may pass any `sink(name, data) -> location` instead. Only the thread that starts the run
+is profiled; the concurrent input fetch threads are not.
+"""
+
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable
+
+from .logging_utils import get_logger
+
+SYNC_PROFILE_VAR = "SYNC_PROFILE"
+SYNC_PROFILE_UUIDS_VAR = "SYNC_PROFILE_UUIDS"
+SYNC_PROFILE_DIR_VAR = "SYNC_PROFILE_DIR"
+SYNC_PROFILE_S3_BUCKET_VAR = "SYNC_PROFILE_S3_BUCKET"
+SYNC_PROFILE_S3_PREFIX_VAR = "SYNC_PROFILE_S3_PREFIX"
+DEFAULT_SYNC_PROFILE_DIR = "/tmp/sync-profiles"
+DEFAULT_SYNC_PROFILE_S3_PREFIX = "sync-profiles/"
+PROFILE_MODES = frozenset({"cprofile", "pyinstrument"})
+# Sampling interval for pyinstrument, in seconds.
+PYINSTRUMENT_INTERVAL_SECONDS = 0.001
+
+logger = get_logger(__name__)
+
+ProfileSink = Callable[[str, bytes], str]
+
+
+def profile_mode() -> str | None:
+    mode = os.environ.get(SYNC_PROFILE_VAR, "").strip().lower()
+    return mode if mode in PROFILE_MODES else None
+
+
+def _profiled_uuids() -> set[str]:
+    raw = os.environ.get(SYNC_PROFILE_UUIDS_VAR, "")
+    return {value.strip() for value in raw.split(",") if value.strip()}
+
+
+def should_profile(uuid: str | None = None) -> bool:
+    """True when profiling is on and, if SYNC_PROFILE_UUIDS is set, `uuid` is one of the listed users."""
+    if profile_mode() is None:
+        return False
+    uuids = _profiled_uuids()
+    return not uuids or uuid in uuids
+
+
+class LocalProfileSink:
+    """Write profile artifacts into a local directory (Lambda: under /tmp)."""
+
+    def __init__(self, directory: str | Path | None = None):
+        self.directory = Path(directory or os.environ.get(SYNC_PROFILE_DIR_VAR, "") or DEFAULT_SYNC_PROFILE_DIR)
+
+    def __call__(self, name: str, data: bytes) -> str:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / name
+        path.write_bytes(data)
+        return str(path)
+
+
+class S3ProfileSink:
+    """Upload profile artifacts to S3 under `prefix`."""
+
+    def __init__(self, bucket: str, prefix: str = DEFAULT_SYNC_PROFILE_S3_PREFIX, client=None):
+        self.bucket = bucket
+        self.prefix = prefix
+        self._client = client
+
+    def __call__(self, name: str, data: bytes) -> str:
+        if self._client is None:
+            # Lazy import to avoid loading boto3 unless an S3 upload is requested.
+            import boto3
+
+            self._client = boto3.client("s3", region_name=os.getenv("APP_REGION"))
+        key = f"{self.prefix}{name}"
+        self._client.put_object(Bucket=self.bucket, Key=key, Body=data)
+        return f"s3://{self.bucket}/{key}"
+
+
+def default_profile_sink() -> ProfileSink:
+    bucket = os.environ.get(SYNC_PROFILE_S3_BUCKET_VAR, "").strip()
+    if bucket:
+        prefix = os.environ.get(SYNC_PROFILE_S3_PREFIX_VAR, "").strip() or DEFAULT_SYNC_PROFILE_S3_PREFIX
+        return S3ProfileSink(bucket, prefix)
+    return LocalProfileSink()
+
+
+def _pstats_bytes(profiler: cProfile.Profile) -> bytes:
+    # Same bytes `Stats.dump_stats` writes to a file; load with pstats.Stats(path) or snakeviz.
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    return marshal.dumps(stats.stats)
+
+
+def _frame_label(frame) -> str:
+    return f"{frame.function} ({frame.file_path_short}:{frame.line_no})".replace(";", ":")
+
+
+def _collapsed_stacks(root_frame) -> bytes:
+    """Fold a pyinstrument frame tree into `a;b;c <microseconds>` lines (Brendan Gregg's collapsed format)."""
+    lines = []
+    stack = [(root_frame, [])] if root_frame is not None else []
+    while stack:
+        frame, parents = stack.pop()
+        path = parents + [_frame_label(frame)]
+        self_time = frame.time - sum(child.time for child in frame.children)
+        if self_time > 0:
+            lines.append(f"{';'.join(path)} {round(self_time * 1_000_000)}")
+        stack.extend((child, path) for child in frame.children)
+    return ("\n".join(sorted(lines)) + "\n").encode("utf-8")
+
+
+def _start_profiler(mode: str):
+    if mode == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            logger.warning("SYNC_PROFILE=pyinstrument but pyinstrument is not installed; using cProfile")
+        else:
+            profiler = Profiler(interval=PYINSTRUMENT_INTERVAL_SECONDS)
+            profiler.start()
+            return "pyinstrument", profiler
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return "cprofile", profiler
+
+
+def _stop_profiler(kind: str, profiler) -> tuple[str, bytes]:
+    if kind == "pyinstrument":
+        session = profiler.stop()
+        return "collapsed", _collapsed_stacks(session.root_frame())
+    profiler.disable()
+    return "pstats", _pstats_bytes(profiler)
+
+
+@contextmanager
+def profile_sync_run(label: str, uuid: str | None = None, sink: ProfileSink | None = None):
+    """
+    Profile the enclosed run when `should_profile(uuid)`; yields the artifact name (None when not profiling).
+
+    A run nested in one that is already being profiled (main() inside lambda_handler) is left to the outer one.
+    The artifact is written even when the run raises; a failed write is logged and never fails the sync.
+    """
+    mode = profile_mode()
+    if mode is None or not should_profile(uuid) or sys.getprofile() is not None:
+        yield None
+        return
+
+    kind, profiler = _start_profiler(mode)
+    stamp = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+    base_name = f"{label}-{uuid or 'all'}-{stamp}-{os.getpid()}"
+    try:
+        yield base_name
+    finally:
+        try:
+            extension, data = _stop_profiler(kind, profiler)
+            location = (sink or default_profile_sink())(f"{base_name}.{extension}", data)
+            logger.info(f"Sync profile written to {location}")
+        except Exception:
+            logger.exception("Failed to write sync profile")
+
+
+__all__ = [
+    "LocalProfileSink",
+    "S3ProfileSink",
+    "SYNC_PROFILE_DIR_VAR",
+    "SYNC_PROFILE_S3_BUCKET_VAR",
+    "SYNC_PROFILE_S3_PREFIX_VAR",
+    "SYNC_PROFILE_UUIDS_VAR",
+    "SYNC_PROFILE_VAR",
+    "default_profile_sink",
+    "profile_mode",
+    "profile_sync_run",
+    "should_profile",
+]
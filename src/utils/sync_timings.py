@@ -0,0 +1,70 @@
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class SyncTimings:
+    """Per-sync phase spans (count, total and max milliseconds) reported in the sync summary's `timings`.
+
+    One instance is shared by main(), the token loaders, both services and the sync engine of a run, so a
+    slow phase for a given user can be read off the stored sync log. Span names are flat dotted keys such
+    as `config_load`, `gcal_fetch_calendar.Work` or `write.create_gcal`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans: dict[str, dict] = {}
+
+    def add(self, name: str, elapsed_ms: float) -> None:
+        with self._lock:
+            span = self._spans.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            span["count"] += 1
+            span["total_ms"] += elapsed_ms
+            span["max_ms"] = max(span["max_ms"], elapsed_ms)
+
+    @contextmanager
+    def span(self, name: str):
+        """Time the enclosed block; the span is recorded even when the block raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - started) * 1000)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                name: {
+                    "count": span["count"],
+                    "total_ms": round(span["total_ms"], 1),
+                    "max_ms": round(span["max_ms"], 1),
+                }
+                for name, span in sorted(self._spans.items())
+            }
+
+
+def timing_span(timings: SyncTimings | None, name: str):
+    """`timings.span(name)`, or a no-op context when the caller was not given a timings recorder."""
+    return timings.span(name) if timings is not None else nullcontext()
+
+
+def merge_timings(*recorders) -> dict:
+    """Combine the spans of several recorders; the same recorder passed twice is only counted once."""
+    merged: dict[str, dict] = {}
+    seen = set()
+    for recorder in recorders:
+        if not isinstance(recorder, SyncTimings) or id(recorder) in seen:
+            continue
+        seen.add(id(recorder))
+        for name, span in recorder.to_dict().items():
+            if name not in merged:
+                merged[name] = dict(span)
+                continue
+            total = merged[name]
+            total["count"] += span["count"]
+            total["total_ms"] = round(total["total_ms"] + span["total_ms"], 1)
+            total["max_ms"] = max(total["max_ms"], span["max_ms"])
+    return dict(sorted(merged.items()))
+
+
+__all__ = ["SyncTimings", "merge_timings", "timing_span"]
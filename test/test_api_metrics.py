@@ -0,0 +1,109 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = REPO_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+sys.path.insert(0, str(REPO_ROOT))
+
+from utils import dynamodb_utils  # noqa: E402
+from utils.api_metrics import (  # noqa: E402
+    ApiCallStats,
+    merge_api_stats,
+    record_response_bytes,
+    track_api_call,
+)
+from utils.retry_utils import RetryPolicy, call_with_retry  # noqa: E402
+
+
+class _RateLimited(Exception):
+    status = 429
+
+
+class ApiCallStatsTests(unittest.TestCase):
+    def test_retried_call_counts_one_call_and_every_attempt(self):
+        stats = ApiCallStats()
+        outcomes = [_RateLimited("slow down"), {"id": "evt-1"}]
+
+        def fn():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            record_response_bytes(42)
+            return outcome
+
+        result = call_with_retry(
+            fn,
+            provider="google",
+            endpoint="events.insert",
+            policy=RetryPolicy(sleep=lambda _: None, jitter=lambda: 0.0),
+            idempotent=False,
+            api_stats=stats,
+        )
+
+        self.assertEqual(result, {"id": "evt-1"})
+        entry = stats.to_dict()["google.events.insert"]
+        self.assertEqual(
+            {name: entry[name] for name in ("calls", "attempts", "retries", "errors", "response_bytes")},
+            {"calls": 1, "attempts": 2, "retries": 1, "errors": 1, "response_bytes": 42},
+        )
+        self.assertEqual(sum(entry["latency_histogram"].values()), 2)
+
+    def test_track_api_call_records_only_into_the_active_stats(self):
+        with track_api_call("ssm.get_parameter"):
+            record_response_bytes(10)
+
+        stats = ApiCallStats()
+        with stats.activate():
+            with track_api_call("ssm.get_parameter"):
+                record_response_bytes(10)
+        with track_api_call("ssm.get_parameter"):
+            pass
+
+        entry = stats.to_dict()["ssm.get_parameter"]
+        self.assertEqual((entry["calls"], entry["attempts"], entry["response_bytes"]), (1, 1, 10))
+
+    def test_merge_counts_a_shared_recorder_once(self):
+        shared = ApiCallStats()
+        shared.record_call("notion.pages.update")
+        shared.record_attempt("notion.pages.update", 30.0)
+        other = ApiCallStats()
+        other.record_call("notion.pages.update")
+        other.record_attempt("notion.pages.update", 7000.0, error=True)
+
+        merged = merge_api_stats(shared, shared, other, MagicMock(), None)["notion.pages.update"]
+
+        self.assertEqual((merged["calls"], merged["attempts"], merged["errors"]), (2, 2, 1))
+        self.assertEqual(merged["latency_histogram"], {"le_50": 1, "gt_5000": 1})
+
+    def test_dynamodb_reads_are_counted_with_response_size(self):
+        table = MagicMock()
+        table.get_item.return_value = {
+            "Item": {"uuid": "user-1", "accessToken": "token"},
+            "ResponseMetadata": {"HTTPHeaders": {"content-length": "128"}},
+        }
+        stats = ApiCallStats()
+        with patch.object(dynamodb_utils, "_get_notion_tables", return_value=table), stats.activate():
+            dynamodb_utils.get_notion_token_by_uuid("user-1")
+
+        entry = stats.to_dict()["dynamodb.notion_tokens.get_item"]
+        self.assertEqual((entry["calls"], entry["response_bytes"]), (1, 128))
+
+    def test_real_service_attempts_match_server_side_counts(self):
+        from benchmarks.run_benchmark import run_benchmark
+
+        report = run_benchmark(tasks=6, events=6, iterations=1, warmup=0, notion_page_size=2)
+
+        api_calls = report["last_run_api_calls"]
+        self.assertEqual(
+            {key: entry["attempts"] for key, entry in api_calls.items()},
+            report["api_calls_per_run"],
+        )
+        self.assertGreater(api_calls["notion.databases.query"]["response_bytes"], 0)
+        self.assertGreater(api_calls["google.events.list"]["response_bytes"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import csv
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+import scripts.batch_sync_runner as batch_runner  # noqa: E402
+
+import main as main_module  # noqa: E402
+
+
+def _success(action_counts=None):
+    return {
+        "statusCode": 200,
+        "body": {
+            "status": "sync_success",
+            "message": {"summary": {"action_counts": action_counts or {}, "deferred_count": 0}, "errors": []},
+        },
+    }
+
+
+class BatchSyncRunnerTargetTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_cloud_targets_merge_flags_and_file_without_duplicates(self):
+        uuids_file = self.tmp / "uuids.txt"
+        uuids_file.write_text("u2\n# comment\nu1  # dup\n\nu3\n", encoding="utf-8")
+        args = batch_runner._parse_args(
+            ["--mode", "cloud", "--uuid", "u1", "--uuids-file", str(uuids_file), "--output", "x"]
+        )
+
+        targets = batch_runner.build_targets(args)
+
+        self.assertEqual([target["uuid"] for target in targets], ["u1", "u2", "u3"])
+
+    def test_local_targets_get_their_own_setting_checkpoint_and_watermark_paths(self):
+        args = batch_runner._parse_args(["--mode", "local", "--config", str(self.tmp / "a.json"), "--output", "x"])
+
+        (target,) = batch_runner.build_targets(args)
+
+        self.assertEqual(target["config"]["notion_setting_path"], self.tmp / "a.json")
+        self.assertEqual(target["config"]["sync_checkpoint_path"], self.tmp / "a.sync-checkpoint.json")
+        self.assertEqual(target["config"]["sync_watermark_path"], self.tmp / "a.sync-watermark.json")
+
+    def test_local_targets_never_share_a_state_file(self):
+        args = batch_runner._parse_args(
+            ["--mode", "local", "--config", str(self.tmp / "a.json"), "--config", str(self.tmp / "b.json")]
+            + ["--output", "x"]
+        )
+
+        first, second = batch_runner.build_targets(args)
+
+        for key in ("sync_checkpoint_path", "sync_watermark_path", "sync_retry_ledger_path"):
+            self.assertEqual(first["config"][key].parent, self.tmp)
+            self.assertNotEqual(first["config"][key], second["config"][key])
+        self.assertEqual(first["config"]["sync_retry_ledger_path"], self.tmp / "a.sync-retry-ledger.json")
+
+    def test_mode_and_target_kind_must_match(self):
+        with self.assertRaises(ValueError):
+            batch_runner.build_targets(batch_runner._parse_args(["--mode", "local", "--uuid", "u1", "--output", "x"]))
+        with self.assertRaises(ValueError):
+            batch_runner.build_targets(batch_runner._parse_args(["--mode", "cloud", "--output", "x"]))
+
+
+class BatchSyncRunnerRunTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp = Path(self.tmp_dir.name)
+        self.targets = [
+            {"target": uuid, "kind": "uuid", "uuid": uuid, "config": None} for uuid in ("ok", "boom", "init")
+        ]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @staticmethod
+    def _fake_main(uuid=None, deadline=None, config=None):
+        if uuid == "boom":
+            raise RuntimeError("exploded")
+        if uuid == "init":
+            return {"error": "service_initialization_error", "message": "missing token"}
+        return _success({"create_gcal": 2})
+
+    def test_threaded_batch_isolates_failures_and_writes_jsonl(self):
+        output = self.tmp / "rows.jsonl"
+        writer = batch_runner.RowWriter(output)
+        with patch.object(main_module, "main", side_effect=self._fake_main):
+            summary = batch_runner.run_batch(self.targets, 2, "threads", writer)
+        writer.close()
+
+        rows = {row["target"]: row for row in map(json.loads, output.read_text().splitlines())}
+        self.assertEqual(summary["targets"], 3)
+        self.assertEqual(summary["outcomes"], {"ok": 1, "error": 2})
+        self.assertEqual(rows["ok"]["action_counts"], {"create_gcal": 2})
+        self.assertEqual(rows["boom"]["error"], "RuntimeError: exploded")
+        self.assertEqual(rows["init"]["error"], "service_initialization_error")
+
+    def test_async_batch_writes_csv(self):
+        output = self.tmp / "rows.csv"
+        writer = batch_runner.RowWriter(output)
+
+        async def fake_main_async(uuid=None, deadline=None, notion_transport=None, config=None):
+            return self._fake_main(uuid)
+
+        with patch.object(main_module, "main_async", side_effect=fake_main_async):
+            summary = batch_runner.run_batch(self.targets, 2, "async", writer)
+        writer.close()
+
+        with output.open(newline="") as f:
+            rows = {row["target"]: row for row in csv.DictReader(f)}
+        self.assertEqual(summary["outcomes"], {"ok": 1, "error": 2})
+        self.assertEqual(rows["ok"]["outcome"], "ok")
+        self.assertEqual(json.loads(rows["ok"]["action_counts"]), {"create_gcal": 2})
+
+    def test_partial_results_are_reported_as_partial(self):
+        result = _success()
+        result["body"]["status"] = "sync_partial"
+
+        row = batch_runner.build_row(self.targets[0], 0.0, 1.5, result=result)
+
+        self.assertEqual(row["outcome"], "partial")
+        self.assertEqual(row["duration_ms"], 1500)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import sys
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from benchmarks.dataset import describe_dataset, generate_dataset  # noqa: E402
+from benchmarks.run_benchmark import run_benchmark  # noqa: E402
+from notion.notion_properties import get_rich_text, get_select, get_title  # noqa: E402
+
+
+class SyntheticDatasetTests(unittest.TestCase):
+    def test_same_seed_yields_the_same_payloads(self):
+        self.assertEqual(generate_dataset(300, seed=5), generate_dataset(300, seed=5))
+        self.assertNotEqual(generate_dataset(300, seed=5)[0], generate_dataset(300, seed=6)[0])
+
+    def test_dataset_covers_every_feature(self):
+        pages, events_by_calendar, _ = generate_dataset(400, seed=1)
+        profile = describe_dataset(pages, events_by_calendar)
+
+        for feature in (
+            "all_day",
+            "timed",
+            "recurring_instances",
+            "cancelled",
+            "emoji_titles",
+            "long_descriptions",
+            "foreign_events",
+            "mismatched_calendars",
+            "duplicate_links",
+        ):
+            with self.subTest(feature=feature):
+                self.assertGreater(profile[feature], 0)
+        self.assertEqual(profile["foreign_events"], 20)
+        self.assertEqual(profile["duplicate_links"], 20)
+
+    def test_pages_read_through_the_property_accessors(self):
+        pages, events_by_calendar, user_setting = generate_dataset(50, seed=2)
+        page_property = user_setting["page_property"]
+        event_ids = {event["id"] for events in events_by_calendar.values() for event in events}
+
+        for page in pages:
+            properties = page["properties"]
+            self.assertTrue(get_title(properties, page_property["Task_Notion_Name"]))
+            self.assertIn(
+                get_select(properties, page_property["GCal_Name_Notion_Name"]), user_setting["gcal_name_dict"]
+            )
+            event_id = get_rich_text(properties, page_property["GCal_EventId_Notion_Name"])
+            if event_id is not None:
+                self.assertIn(event_id, event_ids)
+
+    def test_small_sizes_keep_the_requested_unit_count(self):
+        pages, events_by_calendar, _ = generate_dataset(10, seed=0)
+        self.assertTrue(pages)
+        self.assertTrue(any(events_by_calendar.values()))
+        self.assertEqual(generate_dataset(0, seed=0)[:2], ([], {"home@benchmark.test": [], "work@benchmark.test": []}))
+
+    def test_synthetic_dataset_syncs_against_fake_servers(self):
+        report = run_benchmark(dataset="synthetic", size=60, iterations=1, warmup=0, seed=4)
+
+        self.assertEqual(report["statuses"], {"sync_success": 1})
+        self.assertEqual(set(report["action_counts"]), {"create_gcal", "update_gcal", "update_notion", "create_notion"})
+        self.assertEqual(report["profile"], describe_dataset(*generate_dataset(60, seed=4)[:2]))
+
+
+if __name__ == "__main__":
+    unittest.main()
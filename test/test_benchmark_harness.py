@@ -0,0 +1,57 @@
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.run_benchmark import check_regression, run_benchmark  # noqa: E402
+
+FAST_RETRIES = {"PROVIDER_RETRY_BASE_DELAY_SECONDS": "0", "PROVIDER_RETRY_MAX_DELAY_SECONDS": "0"}
+
+
+class BenchmarkHarnessTests(unittest.TestCase):
+    def test_blocking_engine_syncs_against_fake_servers(self):
+        report = run_benchmark(tasks=8, events=8, iterations=2, warmup=0, calendar_page_size=3, notion_page_size=5)
+
+        self.assertEqual(report["statuses"], {"sync_success": 2})
+        self.assertEqual(
+            report["action_counts"], {"create_gcal": 4, "update_gcal": 2, "update_notion": 2, "create_notion": 4}
+        )
+        # 8 tasks over pages of 5 rows; events split over two calendars in pages of 3.
+        self.assertEqual(report["api_calls_per_run"]["notion.databases.query"], 2)
+        self.assertGreaterEqual(report["api_calls_per_run"]["google.events.list"], 3)
+        self.assertEqual(report["api_calls_per_run"]["google.events.insert"], 4)
+        self.assertGreater(report["response_bytes_per_run"], 0)
+        self.assertGreater(report["peak_rss_mb"], 0)
+
+    def test_async_engine_takes_the_same_actions(self):
+        blocking = run_benchmark(tasks=6, events=6, iterations=1, warmup=0)
+        asynchronous = run_benchmark(tasks=6, events=6, iterations=1, warmup=0, engine="async")
+
+        self.assertEqual(asynchronous["statuses"], {"sync_success": 1})
+        self.assertEqual(asynchronous["action_counts"], blocking["action_counts"])
+        self.assertEqual(asynchronous["api_calls_per_run"], blocking["api_calls_per_run"])
+
+    def test_injected_rate_limits_are_retried(self):
+        with patch.dict(os.environ, FAST_RETRIES):
+            report = run_benchmark(tasks=6, events=6, iterations=1, warmup=0, error_rate=0.2, error_status=429, seed=3)
+        clean = run_benchmark(tasks=6, events=6, iterations=1, warmup=0)
+
+        self.assertEqual(report["statuses"], {"sync_success": 1})
+        self.assertEqual(report["action_counts"], clean["action_counts"])
+        self.assertGreater(report["injected_errors_per_run"], 0)
+        self.assertEqual(
+            sum(report["api_calls_per_run"].values()),
+            sum(clean["api_calls_per_run"].values()) + report["injected_errors_per_run"],
+        )
+
+    def test_regression_check_compares_p95(self):
+        self.assertIsNone(check_regression({"p95_ms": 110}, {"p95_ms": 100}, 0.25))
+        self.assertIn("exceeds baseline", check_regression({"p95_ms": 130}, {"p95_ms": 100}, 0.25))
+
+
+if __name__ == "__main__":
+    unittest.main()
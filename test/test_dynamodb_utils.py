@@ -13,7 +13,15 @@ sys.modules.setdefault("boto3", boto3_module)
 
 from utils.dynamodb_utils import (  # noqa: E402
     GoogleTokenWriteConflictError,
+    delete_sync_state_by_uuid,
     get_google_token_by_uuid,
+    get_last_sync_log_by_uuid,
+    get_notion_config_by_uuid,
+    get_notion_token_by_uuid,
+    get_sync_state_by_uuid,
+    record_noop_sync_by_uuid,
+    save_sync_state_by_uuid,
+    save_sync_logs,
     update_google_token_by_uuid,
 )
 from utils.token_crypto import TokenCryptoError  # noqa: E402
@@ -33,7 +41,11 @@ class DynamoDbGoogleTokenTests(unittest.TestCase):
             item = get_google_token_by_uuid("u-1")
         self.assertEqual(item["accessToken"], "enc:v1:encrypted-access")
         self.assertEqual(item["refreshToken"], "enc:v1:encrypted-refresh")
-        table.get_item.assert_called_once_with(Key={"uuid": "u-1"}, ConsistentRead=False)
+        table.get_item.assert_called_once_with(
+            Key={"uuid": "u-1"},
+            ConsistentRead=False,
+            ProjectionExpression="accessToken, refreshToken, expiryDate, updatedAt",
+        )
 
     def test_get_google_token_returns_plaintext_fields_unchanged(self):
         table = MagicMock()
@@ -62,7 +74,11 @@ class DynamoDbGoogleTokenTests(unittest.TestCase):
             item = get_google_token_by_uuid("u-1", consistent_read=True)
         self.assertEqual(item["accessToken"], "plain-access")
         self.assertEqual(item["refreshToken"], "plain-refresh")
-        table.get_item.assert_called_once_with(Key={"uuid": "u-1"}, ConsistentRead=True)
+        table.get_item.assert_called_once_with(
+            Key={"uuid": "u-1"},
+            ConsistentRead=True,
+            ProjectionExpression="accessToken, refreshToken, expiryDate, updatedAt",
+        )
 
     def test_update_google_token_encrypts_plaintext_fields(self):
         table = MagicMock()
@@ -71,9 +87,7 @@ class DynamoDbGoogleTokenTests(unittest.TestCase):
                 "utils.dynamodb_utils.encrypt_token_if_plaintext",
                 side_effect=["enc:v1:access", "enc:v1:refresh"],
             ) as mock_encrypt:
-                update_google_token_by_uuid(
-                    "u-1", "plain-access", "plain-refresh", "111", "222", "123"
-                )
+                update_google_token_by_uuid("u-1", "plain-access", "plain-refresh", "111", "222", "123")
 
         self.assertEqual(mock_encrypt.call_args_list[0].args[0], "plain-access")
         self.assertEqual(mock_encrypt.call_args_list[1].args[0], "plain-refresh")
@@ -113,9 +127,7 @@ class DynamoDbGoogleTokenTests(unittest.TestCase):
                 side_effect=TokenCryptoError("Malformed encrypted token payload."),
             ):
                 with self.assertRaises(TokenCryptoError):
-                    update_google_token_by_uuid(
-                        "u-1", "enc:v1:broken", "plain-refresh", "111", "222", "123"
-                    )
+                    update_google_token_by_uuid("u-1", "enc:v1:broken", "plain-refresh", "111", "222", "123")
         table.update_item.assert_not_called()
 
     def test_update_google_token_uses_attribute_not_exists_guard_when_row_has_no_updated_at(self):
@@ -149,5 +161,105 @@ class DynamoDbGoogleTokenTests(unittest.TestCase):
                     update_google_token_by_uuid("u-1", "plain-access", "plain-refresh", "111", "222", "123")
 
 
+class DynamoDbProjectionTests(unittest.TestCase):
+    def test_notion_token_read_projects_only_the_access_token(self):
+        table = MagicMock()
+        table.get_item.return_value = {"Item": {"accessToken": "enc:v1:notion"}}
+        with patch("utils.dynamodb_utils._get_notion_tables", return_value=table):
+            item = get_notion_token_by_uuid("u-1")
+        self.assertEqual(item, {"accessToken": "enc:v1:notion"})
+        table.get_item.assert_called_once_with(Key={"uuid": "u-1"}, ProjectionExpression="accessToken")
+
+    def test_notion_config_read_skips_the_rest_of_the_users_item(self):
+        table = MagicMock()
+        table.get_item.return_value = {"Item": {"notionConfig": {"database_id": "db-1"}}}
+        with patch("utils.dynamodb_utils._get_users_table", return_value=table):
+            notion_config = get_notion_config_by_uuid("u-1")
+        self.assertEqual(notion_config, {"database_id": "db-1"})
+        table.get_item.assert_called_once_with(Key={"uuid": "u-1"}, ProjectionExpression="notionConfig")
+
+    def test_missing_notion_config_still_raises(self):
+        table = MagicMock()
+        table.get_item.return_value = {"Item": {}}
+        with patch("utils.dynamodb_utils._get_users_table", return_value=table):
+            with self.assertRaises(ValueError):
+                get_notion_config_by_uuid("u-1")
+
+
+class DynamoDbSyncLogTests(unittest.TestCase):
+    def test_save_sync_logs_writes_the_same_encoded_item_to_both_tables(self):
+        users, logs = MagicMock(), MagicMock()
+        payload = {"trigger_by": "sqs", "status": "sync_success", "message": {"summary": {}, "errors": []}}
+        with patch("utils.dynamodb_utils._get_logs_tables", return_value=(users, logs)):
+            save_sync_logs("u-1", payload)
+        last_sync_log = users.update_item.call_args.kwargs["ExpressionAttributeValues"][":ls"]
+        self.assertEqual(logs.put_item.call_args.kwargs["Item"]["log"], last_sync_log)
+        self.assertEqual(last_sync_log["status"], "sync_success")
+        self.assertIsInstance(last_sync_log["log_blob"], bytes)
+
+    def test_get_last_sync_log_decodes_the_stored_item(self):
+        users, logs = MagicMock(), MagicMock()
+        payload = {"trigger_by": "sqs", "status": "sync_success", "message": {"summary": {}, "errors": []}}
+        with patch("utils.dynamodb_utils._get_logs_tables", return_value=(users, logs)):
+            save_sync_logs("u-1", payload)
+        stored = users.update_item.call_args.kwargs["ExpressionAttributeValues"][":ls"]
+        users.get_item.return_value = {"Item": {"lastSyncLog": stored}}
+        with patch("utils.dynamodb_utils._get_users_table", return_value=users):
+            self.assertEqual(get_last_sync_log_by_uuid("u-1"), payload)
+        users.get_item.assert_called_once_with(Key={"uuid": "u-1"}, ProjectionExpression="lastSyncLog")
+
+
+class DynamoDbNoopSyncTests(unittest.TestCase):
+    def test_noop_sync_bumps_counter_only_while_status_is_unchanged(self):
+        table = MagicMock()
+        with patch("utils.dynamodb_utils._get_users_table", return_value=table):
+            self.assertTrue(record_noop_sync_by_uuid("u-1", "sync_success"))
+        kwargs = table.update_item.call_args.kwargs
+        self.assertEqual(kwargs["ConditionExpression"], "lastSyncLog.#status = :status")
+        self.assertEqual(kwargs["ExpressionAttributeValues"][":status"], "sync_success")
+        self.assertIn("noopSyncCount = if_not_exists(noopSyncCount, :zero) + :one", kwargs["UpdateExpression"])
+
+    def test_noop_sync_reports_a_status_change(self):
+        table = MagicMock()
+
+        class _ConditionalFailure(Exception):
+            def __init__(self):
+                self.response = {"Error": {"Code": "ConditionalCheckFailedException"}}
+
+        table.update_item.side_effect = _ConditionalFailure()
+        with patch("utils.dynamodb_utils._get_users_table", return_value=table):
+            self.assertFalse(record_noop_sync_by_uuid("u-1", "sync_success"))
+
+
+class DynamoDbSyncStateTests(unittest.TestCase):
+    def test_get_sync_state_projects_only_the_requested_attribute(self):
+        table = MagicMock()
+        table.get_item.return_value = {"Item": {"syncCheckpoint": {"version": 1, "entries": {}}}}
+        with patch("utils.dynamodb_utils._get_users_table", return_value=table):
+            checkpoint = get_sync_state_by_uuid("u-1", "syncCheckpoint")
+        self.assertEqual(checkpoint, {"version": 1, "entries": {}})
+        table.get_item.assert_called_once_with(
+            Key={"uuid": "u-1"}, ProjectionExpression="#state", ExpressionAttributeNames={"#state": "syncCheckpoint"}
+        )
+
+    def test_get_sync_state_returns_none_when_absent(self):
+        table = MagicMock()
+        table.get_item.return_value = {}
+        with patch("utils.dynamodb_utils._get_users_table", return_value=table):
+            self.assertIsNone(get_sync_state_by_uuid("u-1", "syncRetryLedger"))
+
+    def test_save_and_delete_sync_state(self):
+        table = MagicMock()
+        with patch("utils.dynamodb_utils._get_users_table", return_value=table):
+            save_sync_state_by_uuid("u-1", "syncRetryLedger", {"version": 1})
+            delete_sync_state_by_uuid("u-1", "syncRetryLedger")
+        save_kwargs, delete_kwargs = [c.kwargs for c in table.update_item.call_args_list]
+        self.assertEqual(save_kwargs["UpdateExpression"], "SET #state = :state")
+        self.assertEqual(save_kwargs["ExpressionAttributeNames"], {"#state": "syncRetryLedger"})
+        self.assertEqual(save_kwargs["ExpressionAttributeValues"], {":state": {"version": 1}})
+        self.assertEqual(delete_kwargs["UpdateExpression"], "REMOVE #state")
+        self.assertEqual(delete_kwargs["ExpressionAttributeNames"], {"#state": "syncRetryLedger"})
+
+
 if __name__ == "__main__":
     unittest.main()
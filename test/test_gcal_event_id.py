@@ -0,0 +1,265 @@
+import copy
+import os
+import re
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = REPO_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+sys.path.insert(0, str(REPO_ROOT))
+
+from gcal.gcal_event_id import (  # noqa: E402
+    deterministic_gcal_event_id,
+    event_content_hash,
+    is_unchanged_since_last_sync,
+    linked_content_hash,
+    linked_notion_page_id,
+    stamp_notion_link,
+)
+from sync.sync import synchronize_notion_and_google_calendar  # noqa: E402
+from sync.sync_checkpoint import SyncCheckpoint  # noqa: E402
+
+USER_SETTING = {
+    "page_property": {
+        "Task_Notion_Name": "Task Name",
+        "Date_Notion_Name": "Date",
+        "GCal_Name_Notion_Name": "Calendar",
+        "GCal_EventId_Notion_Name": "GCal Event Id",
+        "GCal_Sync_Time_Notion_Name": "GCal Sync Time",
+        "Delete_Notion_Name": "Delete",
+    },
+    "gcal_name_dict": {"Primary": "primary@example.com"},
+    "gcal_id_dict": {"primary@example.com": "Primary"},
+    "gcal_default_name": "Primary",
+    "gcal_default_id": "primary@example.com",
+}
+
+PAGE_ID = "1c0f5a2e-0b7d-4a9e-8f21-3d4c5b6a7e8f"
+
+NOTION_TASK = {
+    "id": PAGE_ID,
+    "last_edited_time": "2026-05-01T00:00:00.000Z",
+    "properties": {
+        "Calendar": {"select": {"name": "Primary"}},
+        "GCal Event Id": {"rich_text": []},
+        "Delete": {"checkbox": False},
+        "GCal Sync Time": {"rich_text": []},
+    },
+}
+
+DETERMINISTIC_IDS_ON = {"GCAL_DETERMINISTIC_EVENT_IDS": "true"}
+
+
+class DeterministicEventIdTests(unittest.TestCase):
+    def test_id_is_base32hex_and_stable_across_page_id_forms(self):
+        event_id = deterministic_gcal_event_id(PAGE_ID)
+
+        self.assertRegex(event_id, re.compile(r"^[0-9a-v]{32}$"))
+        self.assertEqual(event_id, deterministic_gcal_event_id(PAGE_ID.replace("-", "").upper()))
+        self.assertNotEqual(event_id, deterministic_gcal_event_id("2c0f5a2e0b7d4a9e8f213d4c5b6a7e8f"))
+
+    def _sync(self, gcal_events, created_event_id="evt-server"):
+        notion_service = MagicMock()
+        google_service = MagicMock()
+        notion_service.get_notion_task.return_value = ({"action": "get_notion_task"}, [NOTION_TASK])
+        google_service.get_gcal_event.return_value = gcal_events
+        google_service.create_gcal_event.return_value = created_event_id
+        result = synchronize_notion_and_google_calendar(
+            USER_SETTING, notion_service, google_service, checkpoint=SyncCheckpoint()
+        )
+        return result, notion_service, google_service
+
+    def test_create_passes_the_client_id_and_writes_it_back_to_notion(self):
+        event_id = deterministic_gcal_event_id(PAGE_ID)
+        with patch.dict(os.environ, DETERMINISTIC_IDS_ON):
+            result, notion_service, google_service = self._sync([], created_event_id=event_id)
+
+        self.assertEqual(result["body"]["message"]["summary"]["action_counts"], {"create_gcal": 1})
+        google_service.create_gcal_event.assert_called_once_with(NOTION_TASK, "primary@example.com", event_id=event_id)
+        notion_service.update_notion_task_for_new_gcal_event_id.assert_called_once_with(PAGE_ID, event_id)
+
+    def test_unlinked_task_is_matched_to_its_recomputed_event_id(self):
+        gcal_event = {
+            "id": deterministic_gcal_event_id(PAGE_ID),
+            "summary": "Task",
+            "updated": "2026-05-02T00:00:00.000Z",
+            "organizer": {"email": "primary@example.com"},
+            "start": {"date": "2026-05-23"},
+            "end": {"date": "2026-05-24"},
+        }
+        with patch.dict(os.environ, DETERMINISTIC_IDS_ON):
+            result, notion_service, google_service = self._sync([gcal_event])
+
+        # The newer event is written to Notion (id included) instead of being created a second time.
+        self.assertEqual(result["body"]["message"]["summary"]["action_counts"], {"update_notion": 1})
+        google_service.create_gcal_event.assert_not_called()
+        notion_service.create_notion_task.assert_not_called()
+
+    def test_unlinked_task_is_matched_to_the_event_stamped_with_its_page(self):
+        gcal_event = stamp_notion_link(
+            {
+                "id": "evt-server",
+                "summary": "Task",
+                "updated": "2026-05-02T00:00:00.000Z",
+                "organizer": {"email": "primary@example.com"},
+                "start": {"date": "2026-05-23"},
+                "end": {"date": "2026-05-24"},
+            },
+            PAGE_ID,
+        )
+        with patch.dict(os.environ, {"GCAL_DETERMINISTIC_EVENT_IDS": ""}):
+            result, notion_service, google_service = self._sync([gcal_event])
+
+        self.assertEqual(result["body"]["message"]["summary"]["action_counts"], {"update_notion": 1})
+        google_service.create_gcal_event.assert_not_called()
+        notion_service.create_notion_task.assert_not_called()
+
+    def test_unlinked_deleted_task_deletes_the_event_stamped_with_its_page(self):
+        deleted_task = copy.deepcopy(NOTION_TASK)
+        deleted_task["properties"]["Delete"] = {"checkbox": True}
+        gcal_event = stamp_notion_link(
+            {"id": "evt-server", "summary": "Task", "organizer": {"email": "primary@example.com"}}, PAGE_ID
+        )
+        notion_service = MagicMock()
+        google_service = MagicMock()
+        notion_service.get_notion_task.return_value = ({"action": "get_notion_task"}, [deleted_task])
+        google_service.get_gcal_event.return_value = [gcal_event]
+
+        result = synchronize_notion_and_google_calendar(
+            USER_SETTING, notion_service, google_service, checkpoint=SyncCheckpoint()
+        )
+
+        self.assertEqual(result["body"]["message"]["summary"]["action_counts"], {"delete_gcal": 1})
+        google_service.delete_gcal_event.assert_called_once_with("primary@example.com", "evt-server")
+        notion_service.create_notion_task.assert_not_called()
+
+    def test_disabled_by_default(self):
+        with patch.dict(os.environ, {"GCAL_DETERMINISTIC_EVENT_IDS": ""}):
+            _, notion_service, google_service = self._sync([])
+
+        google_service.create_gcal_event.assert_called_once_with(NOTION_TASK, "primary@example.com")
+        notion_service.update_notion_task_for_new_gcal_event_id.assert_called_once_with(PAGE_ID, "evt-server")
+
+
+class NotionLinkPropertyTests(unittest.TestCase):
+    def test_stamp_records_page_id_and_a_hash_of_the_synced_fields(self):
+        body = stamp_notion_link({"summary": "Task", "start": {"date": "2026-05-23"}}, PAGE_ID)
+
+        self.assertEqual(linked_notion_page_id(body), PAGE_ID)
+        self.assertEqual(
+            linked_content_hash(body), event_content_hash({"start": {"date": "2026-05-23"}, "summary": "Task"})
+        )
+        self.assertNotEqual(linked_content_hash(body), event_content_hash({"summary": "Task 2"}))
+        self.assertIsNone(linked_notion_page_id({"summary": "Manual event"}))
+
+    def test_unchanged_requires_the_stored_hash_and_untouched_text_fields(self):
+        body = stamp_notion_link({"summary": "Task", "start": {"date": "2026-05-23"}}, PAGE_ID)
+
+        self.assertTrue(is_unchanged_since_last_sync(dict(body), body))
+        self.assertFalse(is_unchanged_since_last_sync({**body, "summary": "Renamed in Calendar"}, body))
+        self.assertFalse(is_unchanged_since_last_sync({"summary": "Task", "start": {"date": "2026-05-23"}}, body))
+        self.assertFalse(is_unchanged_since_last_sync(body, stamp_notion_link({"summary": "Task 2"}, PAGE_ID)))
+
+    def test_unchanged_compares_the_live_start_and_end(self):
+        body = stamp_notion_link(
+            {
+                "summary": "Task",
+                "start": {"dateTime": "2026-05-23T10:00:00+0800", "timeZone": "Asia/Taipei"},
+                "end": {"dateTime": "2026-05-23T11:00:00+0800", "timeZone": "Asia/Taipei"},
+            },
+            PAGE_ID,
+        )
+        # Google echoes the same instants with its own offset format
+        live = {
+            **body,
+            "start": {"dateTime": "2026-05-23T02:00:00Z", "timeZone": "Asia/Taipei"},
+            "end": {"dateTime": "2026-05-23T11:00:00+08:00", "timeZone": "Asia/Taipei"},
+        }
+        self.assertTrue(is_unchanged_since_last_sync(live, body))
+
+        moved = {
+            **live,
+            "start": {"dateTime": "2026-05-24T10:00:00+08:00"},
+            "end": {"dateTime": "2026-05-24T11:00:00+08:00"},
+        }
+        self.assertFalse(is_unchanged_since_last_sync(moved, body))
+        all_day = {**live, "start": {"date": "2026-05-23"}, "end": {"date": "2026-05-24"}}
+        self.assertFalse(is_unchanged_since_last_sync(all_day, body))
+
+
+class DeterministicEventIdServiceTests(unittest.TestCase):
+    def _services(self, pages, events_by_calendar, user_setting):
+        from benchmarks.fake_servers import FakeCalendarServer, FakeNotionServer
+        from benchmarks.run_benchmark import _build_blocking_services
+
+        notion_server = FakeNotionServer(pages)
+        calendar_server = FakeCalendarServer(events_by_calendar)
+        self.enterContext(notion_server)
+        self.enterContext(calendar_server)
+        _, google_service = _build_blocking_services(
+            user_setting, notion_server.url, calendar_server.url, keep_rate_limits=False
+        )
+        self.addCleanup(google_service.close)
+        return calendar_server, google_service
+
+    def test_created_events_are_found_by_page_id_and_unchanged_updates_are_skipped(self):
+        from benchmarks.dataset import build_dataset
+
+        pages, events_by_calendar, user_setting = build_dataset(task_count=2, event_count=0)
+        calendar_server, google_service = self._services(pages, events_by_calendar, user_setting)
+        event_id = google_service.create_gcal_event(pages[0], None)
+        google_service.create_gcal_event(pages[1], None)
+
+        (found,) = google_service.find_gcal_events_by_notion_page_id(pages[0]["id"])
+        google_service.update_gcal_event(pages[0], found["calendar_id"], event_id, existing_event=found)
+        google_service.update_gcal_event(
+            pages[0], found["calendar_id"], event_id, existing_event={**found, "summary": "Renamed in Calendar"}
+        )
+
+        self.assertEqual(found["id"], event_id)
+        self.assertEqual(found["calendar_id"], user_setting["gcal_default_id"])
+        self.assertEqual(linked_notion_page_id(found), pages[0]["id"])
+        self.assertEqual(calendar_server.call_counts["events.patch"], 1)
+
+    def test_repeated_insert_gets_a_conflict_and_updates_the_existing_event(self):
+        from benchmarks.dataset import build_dataset
+        from benchmarks.fake_servers import FakeCalendarServer, FakeNotionServer
+        from benchmarks.run_benchmark import _build_blocking_services
+
+        pages, events_by_calendar, user_setting = build_dataset(task_count=1, event_count=0)
+        with FakeNotionServer(pages) as notion_server, FakeCalendarServer(events_by_calendar) as calendar_server:
+            _, google_service = _build_blocking_services(
+                user_setting, notion_server.url, calendar_server.url, keep_rate_limits=False
+            )
+            try:
+                event_id = deterministic_gcal_event_id(pages[0]["id"])
+                first = google_service.create_gcal_event(pages[0], None, event_id=event_id)
+                second = google_service.create_gcal_event(pages[0], None, event_id=event_id)
+            finally:
+                google_service.close()
+
+            calendar_events = calendar_server.calendars[user_setting["gcal_default_id"]]
+            call_counts = dict(calendar_server.call_counts)
+
+        self.assertEqual((first, second), (event_id, event_id))
+        self.assertEqual(list(calendar_events), [event_id])
+        self.assertEqual(call_counts, {"events.insert": 2, "events.patch": 1})
+
+    def test_conflict_with_an_event_deleted_in_google_keeps_it_deleted(self):
+        from benchmarks.dataset import build_dataset
+
+        pages, events_by_calendar, user_setting = build_dataset(task_count=1, event_count=0)
+        event_id = deterministic_gcal_event_id(pages[0]["id"])
+        calendar_id = user_setting["gcal_default_id"]
+        events_by_calendar = {calendar_id: [{"id": event_id, "summary": "Task", "status": "cancelled"}]}
+        calendar_server, google_service = self._services(pages, events_by_calendar, user_setting)
+
+        self.assertEqual(google_service.create_gcal_event(pages[0], None, event_id=event_id), event_id)
+        self.assertEqual(calendar_server.calendars[calendar_id][event_id]["status"], "cancelled")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import gzip
+import io
+import json
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import requests
+import urllib3
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+SRC_ROOT = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+from gcal.gcal_http import PooledHttp  # noqa: E402
+from utils.api_metrics import ApiCallStats, track_api_call  # noqa: E402
+
+
+def _response(status_code, payload, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(payload).encode()
+    response.headers.update({"Content-Type": "application/json", **(headers or {})})
+    response.reason = "OK" if status_code == 200 else "Error"
+    return response
+
+
+class PooledHttpTests(unittest.TestCase):
+    def setUp(self):
+        self.http = PooledHttp(MagicMock(universe_domain="googleapis.com"), pool_maxsize=4, timeout=5)
+
+    def tearDown(self):
+        self.http.close()
+
+    def test_session_is_mounted_with_a_sized_pool_and_no_transport_retries(self):
+        adapter = self.http.session.get_adapter("https://www.googleapis.com/")
+
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertEqual(adapter.max_retries.total, 0)
+        self.assertEqual(self.http.session.headers["Accept-Encoding"], "gzip")
+
+    def test_request_returns_httplib2_style_response_without_encoding_headers(self):
+        with patch.object(
+            self.http.session,
+            "request",
+            return_value=_response(200, {"ok": True}, {"Content-Encoding": "gzip", "Content-Length": "10"}),
+        ) as mock_request:
+            resp, content = self.http.request("https://example.com/x", method="POST", body="{}", headers={"a": "b"})
+
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(resp["content-type"], "application/json")
+        self.assertNotIn("content-encoding", resp)
+        self.assertNotIn("content-length", resp)
+        self.assertEqual(json.loads(content), {"ok": True})
+        self.assertEqual(mock_request.call_args.kwargs["timeout"], 5)
+
+    def test_response_bytes_count_the_compressed_body(self):
+        body = json.dumps({"items": ["x" * 100] * 50}).encode()
+        wire = gzip.compress(body)
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = urllib3.HTTPResponse(
+            io.BytesIO(wire), headers={"Content-Encoding": "gzip"}, status=200, preload_content=False
+        )
+        stats = ApiCallStats()
+        with patch.object(self.http.session, "request", return_value=response), stats.activate():
+            with track_api_call("google.events.list"):
+                _, content = self.http.request("https://example.com/x")
+
+        self.assertEqual(content, body)
+        self.assertEqual(stats.to_dict()["google.events.list"]["response_bytes"], len(wire))
+
+    def test_connection_errors_are_raised_as_builtin_errors(self):
+        with patch.object(self.http.session, "request", side_effect=requests.exceptions.ConnectionError("reset")):
+            with self.assertRaises(ConnectionError):
+                self.http.request("https://example.com/x")
+        with patch.object(self.http.session, "request", side_effect=requests.exceptions.ReadTimeout("slow")):
+            with self.assertRaises(TimeoutError):
+                self.http.request("https://example.com/x")
+
+    def test_calendar_client_executes_requests_through_the_pooled_session(self):
+        service = build("calendar", "v3", http=self.http)
+        responses = [
+            _response(200, {"items": [{"id": "evt-1"}]}),
+            _response(404, {"error": {"code": 404, "message": "Not Found"}}),
+        ]
+        with patch.object(self.http.session, "request", side_effect=responses) as mock_request:
+            result = service.events().list(calendarId="primary").execute()
+            with self.assertRaises(HttpError) as ctx:
+                service.events().get(calendarId="primary", eventId="missing").execute()
+
+        self.assertEqual(result["items"][0]["id"], "evt-1")
+        self.assertEqual(ctx.exception.resp.status, 404)
+        self.assertEqual(mock_request.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -23,6 +23,7 @@ sys.path.insert(0, str(SRC_ROOT))
 
 from gcal.gcal_service import GoogleService  # noqa: E402
 from notion.notion_service import NotionService  # noqa: E402
+from utils.retry_utils import CircuitBreaker, RetryPolicy  # noqa: E402
 
 
 # ---------------------------------------------------------------------------
@@ -144,6 +145,8 @@ def _make_google_service(api_items):
         gs = GoogleService(MINIMAL_USER_SETTING, MagicMock(), logger)
     gs.service = mock_service
     gs.logger = logger
+    # Keep tests independent of the process-wide provider quota.
+    gs.rate_limiter = None
     return gs, mock_service, logger
 
 
@@ -333,6 +336,7 @@ class TestGetGcalEventPagination(unittest.TestCase):
             gs = GoogleService(MINIMAL_USER_SETTING, MagicMock(), logger)
         gs.service = mock_service
         gs.logger = logger
+        gs.rate_limiter = None
         return gs, mock_service
 
     def test_single_page_no_token(self):
@@ -547,6 +551,7 @@ class TestGetGcalEventLimit(unittest.TestCase):
             gs = GoogleService(MINIMAL_USER_SETTING, MagicMock(), logger)
         gs.service = mock_service
         gs.logger = logger
+        gs.rate_limiter = None
         return gs
 
     def test_exactly_max_events_is_accepted(self):
@@ -627,6 +632,9 @@ class TestDeleteGcalEventApiErrors(unittest.TestCase):
             gs = GoogleService(MINIMAL_USER_SETTING, MagicMock(), logger)
         gs.service = mock_service
         gs.logger = logger
+        gs.retry_policy = RetryPolicy(sleep=lambda _seconds: None)
+        gs.circuit_breaker = CircuitBreaker("google")
+        gs.rate_limiter = None
         return gs, mock_service, logger
 
     def test_404_is_treated_as_delete_converged(self):
@@ -677,6 +685,7 @@ class TestDeleteGcalEventApiErrors(unittest.TestCase):
             gs.delete_gcal_event("cal@group.calendar.google.com", "evt-500")
 
         logger.error.assert_called_once()
+        self.assertEqual(mock_service.events.return_value.delete.return_value.execute.call_count, 4)
 
 
 if __name__ == "__main__":
@@ -1,5 +1,7 @@
 import json
+import os
 import sys
+import tempfile
 import types
 import unittest
 from pathlib import Path
@@ -178,6 +180,35 @@ class LambdaHandlerTests(unittest.TestCase):
 
         self.assertEqual(result, expected)
 
+    def test_sqs_run_sync_is_bound_to_the_invocation_deadline(self):
+        event = _make_sqs_event("uuid-1")
+        context = _make_context(aws_request_id="req-1")
+        context.get_remaining_time_in_millis = lambda: 5_000
+
+        with self._stub_src_main():
+            with patch.object(lambda_function, "detect_event_source", return_value="sqs"):
+                with patch.object(lambda_function, "process_sqs_records", return_value={}) as mock_process:
+                    lambda_function.lambda_handler(event, context)
+
+        run_sync = mock_process.call_args[0][3]
+        deadline = run_sync.keywords["deadline"]
+        self.assertEqual(deadline.remaining_ms(), 5_000)
+
+    def test_profiling_mode_writes_one_artifact_per_invocation(self):
+        event = {"requestContext": {"http": {"method": "POST"}}}
+        context = _make_context(aws_request_id="req-profile")
+
+        with tempfile.TemporaryDirectory() as profile_dir:
+            env = {"SYNC_PROFILE": "cprofile", "SYNC_PROFILE_UUIDS": "", "SYNC_PROFILE_DIR": profile_dir}
+            with patch.dict(os.environ, env):
+                with patch.object(lambda_function, "detect_event_source", return_value="api"):
+                    result = lambda_function.lambda_handler(event, context)
+            artifacts = os.listdir(profile_dir)
+
+        self.assertEqual(result["statusCode"], 501)
+        self.assertEqual(len(artifacts), 1)
+        self.assertTrue(artifacts[0].startswith("lambda-req-profile-all-"))
+
 
 if __name__ == "__main__":
     unittest.main()
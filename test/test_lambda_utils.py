@@ -1,6 +1,9 @@
+import io
 import json
+import os
 import sys
 import unittest
+from contextlib import redirect_stdout
 from datetime import datetime, timezone
 from pathlib import Path
 from unittest.mock import MagicMock, patch
@@ -163,6 +166,46 @@ class TestProcessAndLogSyncResult(unittest.TestCase):
         )
 
 
+class TestSyncLogWritePolicy(unittest.TestCase):
+    def _payload(self, **message):
+        return {
+            "statusCode": 200,
+            "status": "sync_success",
+            "message": {"summary": {"action_counts": {}}, "errors": [], **message},
+        }
+
+    def test_noop_detection(self):
+        self.assertTrue(lambda_utils.is_noop_sync_log(self._payload()))
+        self.assertTrue(lambda_utils.is_noop_sync_log(self._payload(summary={"change_probe": {}})))
+        self.assertFalse(lambda_utils.is_noop_sync_log(self._payload(summary={"action_counts": {"update_gcal": 1}})))
+        self.assertFalse(lambda_utils.is_noop_sync_log(self._payload(errors=[{"error_code": "x"}])))
+        self.assertFalse(lambda_utils.is_noop_sync_log(self._payload(deferred_actions=[{"action": "create_gcal"}])))
+        self.assertFalse(lambda_utils.is_noop_sync_log({**self._payload(), "status": "sync_partial"}))
+
+    def test_noop_run_only_bumps_the_counter(self):
+        with patch("utils.dynamodb_utils.record_noop_sync_by_uuid", return_value=True) as mock_noop:
+            with patch("utils.dynamodb_utils.save_sync_logs") as mock_save:
+                lambda_utils._save_sync_logs("u-1", self._payload())
+        mock_noop.assert_called_once_with("u-1", "sync_success")
+        mock_save.assert_not_called()
+
+    def test_status_change_falls_back_to_a_full_log(self):
+        with patch("utils.dynamodb_utils.record_noop_sync_by_uuid", return_value=False):
+            with patch("utils.dynamodb_utils.save_sync_logs") as mock_save:
+                lambda_utils._save_sync_logs("u-1", self._payload())
+        mock_save.assert_called_once()
+
+    def test_always_policy_and_active_runs_write_full_logs(self):
+        active = self._payload(summary={"action_counts": {"create_notion": 2}})
+        with patch("utils.dynamodb_utils.record_noop_sync_by_uuid") as mock_noop:
+            with patch("utils.dynamodb_utils.save_sync_logs") as mock_save:
+                with patch.dict(os.environ, {"SYNC_LOG_WRITE_POLICY": "always"}):
+                    lambda_utils._save_sync_logs("u-1", self._payload())
+                lambda_utils._save_sync_logs("u-1", active)
+        mock_noop.assert_not_called()
+        self.assertEqual(mock_save.call_count, 2)
+
+
 class TestProcessSqsRecords(unittest.TestCase):
     def setUp(self):
         self.ctx = _make_context()
@@ -325,6 +368,134 @@ class TestProcessSqsRecords(unittest.TestCase):
         self.assertEqual(result["failure_count"], 1)
         self.assertEqual(result["batchItemFailures"], [{"itemIdentifier": "msg-1"}])
 
+    def test_repeated_uuids_are_synced_once_per_batch(self):
+        event = _make_sqs_event(["uuid-a", "uuid-b", "uuid-a", "uuid-a"])
+        calls = []
+
+        def run_sync(uuid):
+            calls.append(uuid)
+            if uuid == "uuid-a":
+                return {"statusCode": 500, "body": {"status": "sync_error", "message": {"error_code": "boom"}}}
+            return _ok_sync_result()
+
+        with patch.object(lambda_utils, "_save_sync_logs") as mock_save:
+            result = lambda_utils.process_sqs_records(
+                logger_obj=self.logger,
+                event=event,
+                context=self.ctx,
+                run_sync=run_sync,
+                lambda_start_time=self.start,
+            )
+
+        self.assertEqual(calls, ["uuid-a", "uuid-b"])
+        self.assertEqual((result["record_count"], result["sync_count"], result["deduplicated_count"]), (4, 2, 2))
+        self.assertEqual((result["success_count"], result["failure_count"]), (1, 3))
+        self.assertEqual(
+            result["batchItemFailures"],
+            [{"itemIdentifier": "msg-0"}, {"itemIdentifier": "msg-2"}, {"itemIdentifier": "msg-3"}],
+        )
+        self.assertEqual([s["job_id"] for s in result["record_summaries"]], ["msg-0", "msg-1", "msg-2", "msg-3"])
+        saved = {c[0][0]: c[0][1] for c in mock_save.call_args_list}
+        self.assertEqual(mock_save.call_count, 2)
+        self.assertEqual(saved["uuid-a"]["job_ids"], ["msg-0", "msg-2", "msg-3"])
+        self.assertNotIn("job_ids", saved["uuid-b"])
+
+    def test_grouped_records_replay_the_ledger_only_when_all_ask_for_it(self):
+        records = [
+            {"messageId": "msg-0", "body": json.dumps({"uuid": "uuid-a", "retry_failed": True})},
+            {"messageId": "msg-1", "body": json.dumps({"uuid": "uuid-a"})},
+            {"messageId": "msg-2", "body": json.dumps({"uuid": "uuid-b", "retry_failed": True})},
+            {"messageId": "msg-3", "body": json.dumps({"uuid": "uuid-b", "retry_failed": True})},
+        ]
+        run_sync = MagicMock(return_value=_ok_sync_result())
+
+        with patch.object(lambda_utils, "_save_sync_logs"):
+            lambda_utils.process_sqs_records(
+                logger_obj=self.logger,
+                event={"Records": records},
+                context=self.ctx,
+                run_sync=run_sync,
+                lambda_start_time=self.start,
+            )
+
+        self.assertEqual(
+            [(c.args, c.kwargs) for c in run_sync.call_args_list],
+            [(("uuid-a",), {}), (("uuid-b",), {"retry_failed": True})],
+        )
+
+    def test_unreadable_record_fails_alone(self):
+        records = [
+            {"messageId": "msg-0", "body": "not json"},
+            {"messageId": "msg-1", "body": json.dumps({"uuid": "uuid-a"})},
+        ]
+
+        with patch.object(lambda_utils, "_save_sync_logs"):
+            result = lambda_utils.process_sqs_records(
+                logger_obj=self.logger,
+                event={"Records": records},
+                context=self.ctx,
+                run_sync=self._run_sync,
+                lambda_start_time=self.start,
+            )
+
+        self.assertEqual(result["batchItemFailures"], [{"itemIdentifier": "msg-0"}])
+        self.assertEqual(result["success_uuids"], ["uuid-a"])
+
+    def test_record_without_a_string_uuid_fails_alone(self):
+        records = [
+            {"messageId": "msg-0", "body": json.dumps({"uuid": ["uuid-a"]})},
+            {"messageId": "msg-1", "body": json.dumps({"uuid": {"id": "uuid-a"}})},
+            {"messageId": "msg-2", "body": json.dumps({"trigger_by": "manual"})},
+            {"messageId": "msg-3", "body": json.dumps({"uuid": "uuid-a"})},
+        ]
+        run_sync = MagicMock(return_value=_ok_sync_result())
+
+        with patch.object(lambda_utils, "_save_sync_logs"):
+            result = lambda_utils.process_sqs_records(
+                logger_obj=self.logger,
+                event={"Records": records},
+                context=self.ctx,
+                run_sync=run_sync,
+                lambda_start_time=self.start,
+            )
+
+        run_sync.assert_called_once_with("uuid-a")
+        self.assertEqual(
+            result["batchItemFailures"],
+            [{"itemIdentifier": "msg-0"}, {"itemIdentifier": "msg-1"}, {"itemIdentifier": "msg-2"}],
+        )
+        self.assertEqual(result["success_uuids"], ["uuid-a"])
+
+    def test_partial_sync_result_returns_partial_batch_failure(self):
+        event = _make_sqs_event(["uuid-partial"])
+
+        def run_sync(uuid):  # noqa: ARG001
+            return {
+                "statusCode": 200,
+                "body": {
+                    "status": lambda_utils.SYNC_PARTIAL_STATUS,
+                    "message": {
+                        "summary": {"deferred_count": 1},
+                        "errors": [],
+                        "deferred_actions": [
+                            {"action": "create_gcal", "notion_task_id": "page-1", "gcal_event_id": None}
+                        ],
+                    },
+                },
+            }
+
+        with patch.object(lambda_utils, "_save_sync_logs"):
+            result = lambda_utils.process_sqs_records(
+                logger_obj=self.logger,
+                event=event,
+                context=self.ctx,
+                run_sync=run_sync,
+                lambda_start_time=self.start,
+            )
+
+        self.assertEqual(result["failure_uuids"], ["uuid-partial"])
+        self.assertEqual(result["batchItemFailures"], [{"itemIdentifier": "msg-0"}])
+
 
 class TestProcessEventBridgeEvent(unittest.TestCase):
     def setUp(self):
@@ -385,5 +556,92 @@ class TestProcessEventBridgeEvent(unittest.TestCase):
         self.assertEqual(result["statusCode"], 200)
 
 
+class TestEmfMetrics(unittest.TestCase):
+    def setUp(self):
+        self.ctx = _make_context()
+        self.logger = _make_logger()
+        self.start = datetime.now(timezone.utc)
+
+    def _emf_lines(self, fn):
+        stdout = io.StringIO()
+        with patch.object(lambda_utils, "_save_sync_logs"), redirect_stdout(stdout):
+            fn()
+        return [json.loads(line) for line in stdout.getvalue().splitlines() if '"_aws"' in line]
+
+    def test_sync_result_emits_throughput_metrics_with_trigger_and_status_dimensions(self):
+        sync_result = {
+            "statusCode": 200,
+            "body": {
+                "status": "sync_success",
+                "message": {
+                    "summary": {
+                        "notion_task_count": 5,
+                        "google_event_count": 7,
+                        "action_counts": {"create_gcal": 2, "update_notion": 1},
+                        "retries": {"notion": {"retries": 1}, "google": {"retries": 2}},
+                        "deferred_count": 0,
+                    },
+                    "errors": [{"error_code": "x"}],
+                },
+            },
+        }
+
+        lines = self._emf_lines(
+            lambda: lambda_utils.process_and_log_sync_result(
+                logger_obj=self.logger,
+                sync_result=sync_result,
+                context=self.ctx,
+                uuid="uuid-1",
+                lambda_start_time=self.start,
+                trigger_name="eventbridge",
+            )
+        )
+
+        self.assertEqual(len(lines), 1)
+        record = lines[0]
+        directive = record["_aws"]["CloudWatchMetrics"][0]
+        self.assertEqual(directive["Dimensions"], [["trigger", "status"]])
+        self.assertEqual((record["trigger"], record["status"]), ("eventbridge", "sync_success"))
+        metric_names = {metric["Name"] for metric in directive["Metrics"]}
+        self.assertTrue(metric_names <= set(record))
+        self.assertEqual(record["TasksSeen"], 5)
+        self.assertEqual(record["EventsSeen"], 7)
+        self.assertEqual(record["Writes"], 3)
+        self.assertEqual(record["Writes.create_gcal"], 2)
+        self.assertEqual(record["Errors"], 1)
+        self.assertEqual(record["Retries"], 3)
+        self.assertIn("DurationMs", record)
+
+    def test_sqs_batch_emits_one_line_per_record_and_a_batch_line(self):
+        lines = self._emf_lines(
+            lambda: lambda_utils.process_sqs_records(
+                logger_obj=self.logger,
+                event=_make_sqs_event(["uuid-a", "uuid-b"]),
+                context=self.ctx,
+                run_sync=lambda uuid: _ok_sync_result(),  # noqa: ARG005
+                lambda_start_time=self.start,
+            )
+        )
+
+        self.assertEqual([line["trigger"] for line in lines], ["sqs", "sqs", "sqs_batch"])
+        batch = lines[-1]
+        self.assertEqual((batch["Records"], batch["RecordSuccesses"], batch["RecordFailures"]), (2, 2, 0))
+
+    def test_emf_output_can_be_disabled(self):
+        with patch.dict(os.environ, {"SYNC_EMF_ENABLED": "false"}):
+            lines = self._emf_lines(
+                lambda: lambda_utils.process_and_log_sync_result(
+                    logger_obj=self.logger,
+                    sync_result=_ok_sync_result(),
+                    context=self.ctx,
+                    uuid="uuid-1",
+                    lambda_start_time=self.start,
+                    trigger_name="sqs",
+                )
+            )
+
+        self.assertEqual(lines, [])
+
+
 if __name__ == "__main__":
     unittest.main()
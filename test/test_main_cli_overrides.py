@@ -1,8 +1,9 @@
+import asyncio
 import copy
 import sys
 import unittest
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 SRC_ROOT = Path(__file__).resolve().parents[1] / "src"
 sys.path.insert(0, str(SRC_ROOT))
@@ -45,7 +46,7 @@ class FakeNotionConfig:
 
 
 class MainCliOverrideTests(unittest.TestCase):
-    def _run_main_with_args(self, args, sync_patch_name):
+    def _run_main_with_args(self, args, sync_patch_name, **main_kwargs):
         setting = copy.deepcopy(BASE_SETTING)
         FakeNotionConfig.setting = setting
 
@@ -74,7 +75,7 @@ class MainCliOverrideTests(unittest.TestCase):
                 return_value={"statusCode": 200},
             ) as mock_sync,
         ):
-            result = main_module.main("")
+            result = main_module.main("", **main_kwargs)
 
         mock_sync.assert_called_once()
         return result, setting, mock_sync
@@ -125,6 +126,33 @@ class MainCliOverrideTests(unittest.TestCase):
         self.assertEqual(setting["goforward_days"], 12)
         self.assertIs(mock_sync.call_args.kwargs["user_setting"], setting)
 
+    def test_retry_failed_replays_the_retry_ledger(self):
+        result, setting, mock_sync = self._run_main_with_args([], "sync.sync.replay_retry_ledger", retry_failed=True)
+
+        self.assertEqual(result, {"statusCode": 200})
+        self.assertIs(mock_sync.call_args.kwargs["user_setting"], setting)
+
+    def test_main_async_retry_failed_replays_the_retry_ledger(self):
+        setting = copy.deepcopy(BASE_SETTING)
+        retry_ledger = MagicMock(name="retry_ledger")
+        inputs = (setting, MagicMock(), MagicMock(), MagicMock(), MagicMock(), retry_ledger)
+        async_service = MagicMock(return_value=MagicMock(aclose=AsyncMock()))
+
+        with (
+            patch.object(sys, "argv", ["src/main.py"]),
+            patch.object(main_module, "_load_user_inputs", return_value=inputs),
+            patch("notion.notion_service_async.AsyncNotionService", async_service),
+            patch("gcal.gcal_service_async.AsyncGoogleService", async_service),
+            patch("sync.sync_async.replay_retry_ledger_async", AsyncMock(return_value={"statusCode": 200})) as replay,
+            patch("sync.sync_async.synchronize_notion_and_google_calendar_async", AsyncMock()) as full_sync,
+        ):
+            result = asyncio.run(main_module.main_async("", config={"mode": "local"}, retry_failed=True))
+
+        self.assertEqual(result, {"statusCode": 200})
+        full_sync.assert_not_called()
+        self.assertIs(replay.call_args.kwargs["user_setting"], setting)
+        self.assertIs(replay.call_args.kwargs["retry_ledger"], retry_ledger)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,83 @@
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import httpx
+
+SRC_ROOT = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+import notion.notion_http as notion_http  # noqa: E402
+from notion.notion_service import NotionService  # noqa: E402
+
+USER_SETTING = {"page_property": {}}
+
+
+class NotionHttpTests(unittest.TestCase):
+    def setUp(self):
+        notion_http.reset_shared_transport()
+        self.seen = []
+
+        def handler(request):
+            self.seen.append(request)
+            return httpx.Response(200, json={"object": "user", "id": "bot"})
+
+        self.transport = httpx.MockTransport(handler)
+
+    def tearDown(self):
+        notion_http.reset_shared_transport()
+
+    def test_services_share_one_transport_but_keep_their_own_auth_header(self):
+        with patch.object(notion_http, "get_shared_transport", return_value=self.transport):
+            first = NotionService("token-a", USER_SETTING, MagicMock())
+            second = NotionService("token-b", USER_SETTING, MagicMock())
+
+        first.client.users.me()
+        second.client.users.me()
+
+        self.assertIsNot(first.http_client, second.http_client)
+        self.assertIs(first.http_client._transport, second.http_client._transport)
+        self.assertEqual(
+            [request.headers["Authorization"] for request in self.seen], ["Bearer token-a", "Bearer token-b"]
+        )
+
+    def test_closing_a_user_client_keeps_the_shared_transport_open(self):
+        transport = notion_http.get_shared_transport()
+        client = notion_http.create_notion_http_client()
+
+        with patch.object(transport, "close") as mock_close:
+            with client:
+                pass
+            client.close()
+
+        mock_close.assert_not_called()
+        self.assertIs(notion_http.get_shared_transport(), transport)
+
+    def test_injected_http_client_is_used(self):
+        http_client = httpx.Client(transport=self.transport)
+
+        service = NotionService("token", USER_SETTING, MagicMock(), http_client=http_client)
+        service.client.users.me()
+
+        self.assertIs(service.client.client, http_client)
+        self.assertEqual(len(self.seen), 1)
+
+    def test_http2_is_on_unless_disabled(self):
+        with patch.dict(os.environ, {notion_http.NOTION_HTTP2_VAR: "false"}):
+            self.assertFalse(notion_http.http2_enabled())
+        with patch.dict(os.environ, {notion_http.NOTION_HTTP2_VAR: ""}):
+            self.assertTrue(notion_http.http2_enabled())
+            self.assertTrue(notion_http.create_notion_async_transport()._pool._http2)
+
+    def test_pool_limits_are_read_from_env(self):
+        with patch.dict(os.environ, {notion_http.NOTION_HTTP_MAX_CONNECTIONS_VAR: "5"}):
+            limits = notion_http.notion_http_limits()
+
+        self.assertEqual(limits.max_connections, 5)
+        self.assertEqual(limits.max_keepalive_connections, notion_http.DEFAULT_NOTION_HTTP_MAX_KEEPALIVE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import asyncio
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = REPO_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.dataset import PAGE_PROPERTY, build_dataset  # noqa: E402
+from benchmarks.fake_servers import FakeCalendarServer, FakeNotionServer  # noqa: E402
+from benchmarks.run_benchmark import _build_blocking_services  # noqa: E402
+from notion.notion_service_async import AsyncNotionService  # noqa: E402
+
+DELETE = PAGE_PROPERTY["Delete_Notion_Name"]
+EVENT_ID = PAGE_PROPERTY["GCal_EventId_Notion_Name"]
+
+
+def _tombstone(page, event_id=""):
+    page["properties"][DELETE]["checkbox"] = True
+    page["properties"][EVENT_ID]["rich_text"] = (
+        [{"type": "text", "text": {"content": event_id}, "plain_text": event_id}] if event_id else []
+    )
+    return page
+
+
+class NotionTombstoneTests(unittest.TestCase):
+    def setUp(self):
+        pages, events_by_calendar, self.user_setting = build_dataset(task_count=5, event_count=0)
+        _tombstone(pages[0])
+        _tombstone(pages[1])
+        # Marked deleted by the user but still linked: the sync has yet to delete its event.
+        _tombstone(pages[2], event_id="evt-pending-delete")
+        self.pages = pages
+        self.notion_server = self.enterContext(FakeNotionServer(pages))
+        calendar_server = self.enterContext(FakeCalendarServer(events_by_calendar))
+        self.notion_service, google_service = _build_blocking_services(
+            self.user_setting, self.notion_server.url, calendar_server.url, keep_rate_limits=False
+        )
+        self.addCleanup(google_service.close)
+
+    def _fetched_ids(self):
+        _, tasks = self.notion_service.get_notion_task()
+        return {task["id"] for task in tasks}
+
+    def test_task_query_excludes_tombstones_but_keeps_pending_deletes(self):
+        with patch.dict(os.environ, {"GCAL_DETERMINISTIC_EVENT_IDS": ""}):
+            fetched = self._fetched_ids()
+
+        self.assertEqual(fetched, {page["id"] for page in self.pages[2:]})
+
+    def test_tombstones_are_still_fetched_with_deterministic_event_ids(self):
+        with patch.dict(os.environ, {"GCAL_DETERMINISTIC_EVENT_IDS": "true"}):
+            fetched = self._fetched_ids()
+
+        self.assertEqual(fetched, {page["id"] for page in self.pages})
+
+    def test_archive_deleted_tasks_archives_only_tombstones(self):
+        summary = self.notion_service.archive_deleted_notion_tasks(concurrency=2)
+
+        self.assertEqual(
+            (summary["tombstones_found"], summary["archived"], summary["failed_page_ids"]),
+            (2, 2, []),
+        )
+        archived = {page_id for page_id, page in self.notion_server.pages.items() if page["archived"]}
+        self.assertEqual(archived, {self.pages[0]["id"], self.pages[1]["id"]})
+        with patch.dict(os.environ, {"GCAL_DETERMINISTIC_EVENT_IDS": "true"}):
+            self.assertEqual(self._fetched_ids(), {page["id"] for page in self.pages[2:]})
+
+
+class AsyncNotionArchiveTests(unittest.TestCase):
+    def test_failed_archive_is_reported_and_concurrency_is_bounded(self):
+        _, _, user_setting = build_dataset(task_count=1, event_count=0)
+        service = AsyncNotionService("token", user_setting, MagicMock(), http_client=MagicMock())
+        service._query_database_with_pagination = AsyncMock(return_value=[{"id": f"page-{i}"} for i in range(6)])
+        in_flight = 0
+        peak = 0
+
+        async def archive(page_id):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            if page_id == "page-3":
+                raise RuntimeError("boom")
+
+        service.archive_notion_task = archive
+
+        summary = asyncio.run(service.archive_deleted_notion_tasks(concurrency=2))
+
+        self.assertEqual((summary["archived"], summary["failed_page_ids"]), (5, ["page-3"]))
+        self.assertEqual(peak, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
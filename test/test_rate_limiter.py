@@ -0,0 +1,127 @@
+import os
+import sys
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+SRC_ROOT = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+from utils.rate_limiter import (  # noqa: E402
+    GOOGLE_RATE_LIMIT_PER_SECOND_VAR,
+    TokenBucket,
+    get_rate_limiter,
+    google_rate_limit_scope,
+    notion_rate_limit_scope,
+    reset_rate_limiters,
+)
+from utils.retry_utils import RetryPolicy, RetryStats, call_with_retry  # noqa: E402
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TokenBucketTests(unittest.TestCase):
+    def test_burst_is_free_then_calls_are_paced(self):
+        clock = _FakeClock()
+        bucket = TokenBucket(rate_per_second=2, capacity=2, clock=clock, sleep=clock.sleep)
+
+        waits = [bucket.acquire() for _ in range(4)]
+
+        self.assertEqual(waits, [0.0, 0.0, 0.5, 0.5])
+        self.assertEqual(clock.now, 1.0)
+
+    def test_tokens_refill_over_time_up_to_capacity(self):
+        clock = _FakeClock()
+        bucket = TokenBucket(rate_per_second=1, capacity=2, clock=clock, sleep=clock.sleep)
+        bucket.acquire()
+        bucket.acquire()
+
+        clock.now += 10
+        self.assertEqual([bucket.acquire(), bucket.acquire(), bucket.acquire()], [0.0, 0.0, 1.0])
+
+    def test_zero_rate_disables_limiting(self):
+        bucket = TokenBucket(rate_per_second=0, capacity=1, sleep=MagicMock(side_effect=AssertionError))
+
+        self.assertEqual([bucket.acquire() for _ in range(5)], [0.0] * 5)
+
+    def test_concurrent_callers_share_the_budget(self):
+        clock = _FakeClock()
+        lock = threading.Lock()
+
+        def sleep(seconds):
+            with lock:
+                clock.sleeps.append(seconds)
+
+        bucket = TokenBucket(rate_per_second=10, capacity=1, clock=clock, sleep=sleep)
+        threads = [threading.Thread(target=bucket.acquire) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Reservations queue up, so the last caller waits for four refills.
+        self.assertAlmostEqual(max(clock.sleeps), 0.4)
+        self.assertEqual(len(clock.sleeps), 4)
+
+
+class RateLimiterRegistryTests(unittest.TestCase):
+    def setUp(self):
+        reset_rate_limiters()
+
+    def tearDown(self):
+        reset_rate_limiters()
+
+    def test_same_provider_and_scope_share_one_bucket(self):
+        self.assertIs(get_rate_limiter("notion", "client-a"), get_rate_limiter("notion", "client-a"))
+        self.assertIsNot(get_rate_limiter("notion", "client-a"), get_rate_limiter("notion", "client-b"))
+        self.assertIsNot(get_rate_limiter("notion", "client-a"), get_rate_limiter("google", "client-a"))
+
+    def test_rate_is_read_from_env(self):
+        with patch.dict(os.environ, {GOOGLE_RATE_LIMIT_PER_SECOND_VAR: "4.5"}):
+            self.assertEqual(get_rate_limiter("google", "client").rate_per_second, 4.5)
+
+    def test_scopes(self):
+        with patch.dict(os.environ, {"NOTION_OAUTH_CLIENT_ID": "notion-client"}):
+            self.assertEqual(notion_rate_limit_scope(), "notion-client")
+        self.assertEqual(google_rate_limit_scope(MagicMock(client_id="gcal-client")), "gcal-client")
+        self.assertEqual(google_rate_limit_scope(object()), "default")
+
+    def test_call_with_retry_acquires_before_every_attempt(self):
+        limiter = MagicMock()
+        limiter.acquire.return_value = 0.25
+        stats = RetryStats()
+        calls = {"count": 0}
+
+        def fn():
+            calls["count"] += 1
+            if calls["count"] == 1:
+                raise ConnectionResetError()
+            return "ok"
+
+        call_with_retry(
+            fn,
+            provider="notion",
+            endpoint="pages.update",
+            policy=RetryPolicy(sleep=lambda _seconds: None),
+            stats=stats,
+            rate_limiter=limiter,
+        )
+
+        self.assertEqual(limiter.acquire.call_count, 2)
+        self.assertEqual(stats.to_dict()["throttle_ms"], 500)
+
+
+if __name__ == "__main__":
+    unittest.main()
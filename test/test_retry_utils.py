@@ -0,0 +1,240 @@
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from googleapiclient.errors import HttpError
+
+SRC_ROOT = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+from notion.notion_service import NotionService  # noqa: E402
+from sync.sync import synchronize_notion_and_google_calendar  # noqa: E402
+from utils.retry_utils import (  # noqa: E402
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryDeadlineError,
+    RetryPolicy,
+    RetryStats,
+    call_with_retry,
+    classify_error,
+    retry_after_seconds,
+)
+from utils.sync_deadline import SyncDeadline  # noqa: E402
+
+
+class _Resp(dict):
+    def __init__(self, status, headers=None):
+        super().__init__(headers or {})
+        self.status = status
+        self.reason = "error"
+
+
+def _http_error(status, reason=None, headers=None):
+    content = b'{"error":{"message":"error"}}'
+    if reason:
+        content = ('{"error":{"errors":[{"reason":"%s"}],"message":"error"}}' % reason).encode()
+    return HttpError(_Resp(status, headers), content)
+
+
+class _NotionHttpError(Exception):
+    def __init__(self, status, headers=None):
+        super().__init__(f"notion {status}")
+        self.status = status
+        self.headers = headers or {}
+
+
+def _policy(max_attempts=4):
+    sleeps = []
+    return RetryPolicy(max_attempts=max_attempts, sleep=sleeps.append, jitter=lambda: 1.0), sleeps
+
+
+def _flaky(exc, failures, result="ok"):
+    calls = {"count": 0}
+
+    def fn():
+        calls["count"] += 1
+        if calls["count"] <= failures:
+            raise exc
+        return result
+
+    return fn, calls
+
+
+class ClassifyErrorTests(unittest.TestCase):
+    def test_google_rate_limit_and_server_errors_are_retryable(self):
+        self.assertEqual(classify_error(_http_error(429)), (True, True))
+        self.assertEqual(classify_error(_http_error(403, "rateLimitExceeded")), (True, True))
+        self.assertEqual(classify_error(_http_error(503)), (True, False))
+
+    def test_client_errors_are_not_retryable(self):
+        self.assertEqual(classify_error(_http_error(403, "forbidden")), (False, False))
+        self.assertEqual(classify_error(_http_error(404)), (False, False))
+        self.assertEqual(classify_error(_NotionHttpError(400)), (False, False))
+
+    def test_connection_errors_are_retryable(self):
+        self.assertEqual(classify_error(ConnectionResetError()), (True, False))
+
+    def test_retry_after_is_read_from_notion_headers_and_google_response(self):
+        self.assertEqual(retry_after_seconds(_NotionHttpError(429, {"retry-after": "3"})), 3.0)
+        self.assertEqual(retry_after_seconds(_http_error(429, headers={"retry-after": "2"})), 2.0)
+        self.assertIsNone(retry_after_seconds(_http_error(503)))
+
+
+class CallWithRetryTests(unittest.TestCase):
+    def test_transient_failures_are_retried_with_capped_backoff(self):
+        policy, sleeps = _policy()
+        stats = RetryStats()
+        fn, calls = _flaky(_http_error(503), failures=2)
+
+        result = call_with_retry(fn, provider="google", endpoint="events.list", policy=policy, stats=stats)
+
+        self.assertEqual(result, "ok")
+        self.assertEqual(calls["count"], 3)
+        self.assertEqual(sleeps, [0.5, 1.0])
+        self.assertEqual(stats.to_dict()["retries"], 2)
+        self.assertEqual(stats.to_dict()["sleep_ms"], 1500)
+
+    def test_retry_after_overrides_shorter_backoff(self):
+        policy, sleeps = _policy()
+        fn, _ = _flaky(_NotionHttpError(429, {"Retry-After": "5"}), failures=1)
+
+        call_with_retry(fn, provider="notion", endpoint="pages.update", policy=policy)
+
+        self.assertEqual(sleeps, [5.0])
+
+    def test_gives_up_after_max_attempts(self):
+        policy, sleeps = _policy(max_attempts=3)
+        stats = RetryStats()
+        fn, calls = _flaky(_http_error(500), failures=10)
+
+        with self.assertRaises(HttpError):
+            call_with_retry(fn, provider="google", endpoint="events.patch", policy=policy, stats=stats)
+
+        self.assertEqual(calls["count"], 3)
+        self.assertEqual(stats.to_dict()["gave_up"], 1)
+
+    def test_non_idempotent_call_is_not_retried_on_server_error(self):
+        policy, _ = _policy()
+        fn, calls = _flaky(_http_error(500), failures=1)
+
+        with self.assertRaises(HttpError):
+            call_with_retry(fn, provider="google", endpoint="events.insert", policy=policy, idempotent=False)
+
+        self.assertEqual(calls["count"], 1)
+
+    def test_non_idempotent_call_is_retried_when_rate_limited(self):
+        policy, _ = _policy()
+        fn, calls = _flaky(_http_error(429), failures=1)
+
+        call_with_retry(fn, provider="google", endpoint="events.insert", policy=policy, idempotent=False)
+
+        self.assertEqual(calls["count"], 2)
+
+    def test_wait_past_the_deadline_raises_instead_of_sleeping(self):
+        policy, sleeps = _policy()
+        policy.deadline = SyncDeadline(lambda: 6_000, safety_margin_ms=2_000)
+        stats = RetryStats()
+        fn, calls = _flaky(_NotionHttpError(429, {"Retry-After": "5"}), failures=1)
+
+        with self.assertRaises(RetryDeadlineError):
+            call_with_retry(fn, provider="notion", endpoint="pages.update", policy=policy, stats=stats)
+
+        self.assertEqual(calls["count"], 1)
+        self.assertEqual(sleeps, [])
+        self.assertEqual(stats.to_dict()["gave_up"], 1)
+
+    def test_wait_inside_the_deadline_is_taken(self):
+        policy, sleeps = _policy()
+        policy.deadline = SyncDeadline(lambda: 10_000, safety_margin_ms=2_000)
+        fn, _ = _flaky(_NotionHttpError(429, {"Retry-After": "5"}), failures=1)
+
+        self.assertEqual(call_with_retry(fn, provider="notion", endpoint="pages.update", policy=policy), "ok")
+        self.assertEqual(sleeps, [5.0])
+
+
+class CircuitBreakerTests(unittest.TestCase):
+    def test_breaker_opens_after_threshold_and_fails_fast(self):
+        now = {"t": 0.0}
+        breaker = CircuitBreaker("google", failure_threshold=2, reset_seconds=10, clock=lambda: now["t"])
+        policy, _ = _policy(max_attempts=2)
+        stats = RetryStats()
+        fn, calls = _flaky(_http_error(503), failures=10)
+
+        with self.assertRaises(HttpError):
+            call_with_retry(fn, provider="google", endpoint="events.list", policy=policy, breaker=breaker)
+        with self.assertRaises(CircuitOpenError):
+            call_with_retry(fn, provider="google", endpoint="events.list", policy=policy, stats=stats, breaker=breaker)
+
+        self.assertEqual(calls["count"], 2)
+        self.assertEqual(stats.to_dict()["circuit_rejections"], 1)
+
+    def test_one_users_rate_limits_do_not_open_the_shared_breaker(self):
+        breaker = CircuitBreaker("google", failure_threshold=2, reset_seconds=10)
+        policy, _ = _policy(max_attempts=3)
+
+        for exc in (_http_error(403, "userRateLimitExceeded"), _http_error(429), _NotionHttpError(429)):
+            fn, _ = _flaky(exc, failures=10)
+            with self.assertRaises(type(exc)):
+                call_with_retry(fn, provider="google", endpoint="events.list", policy=policy, breaker=breaker)
+
+        self.assertFalse(breaker.is_open)
+
+    def test_breaker_closes_after_successful_trial_call(self):
+        now = {"t": 0.0}
+        breaker = CircuitBreaker("notion", failure_threshold=1, reset_seconds=10, clock=lambda: now["t"])
+        breaker.record_failure()
+        self.assertTrue(breaker.is_open)
+
+        now["t"] = 11.0
+        result = call_with_retry(
+            lambda: "ok", provider="notion", endpoint="pages.update", policy=_policy()[0], breaker=breaker
+        )
+
+        self.assertEqual(result, "ok")
+        self.assertFalse(breaker.is_open)
+
+
+class ServiceRetryTests(unittest.TestCase):
+    def test_notion_page_update_is_retried(self):
+        mock_client = MagicMock()
+        setting = {"page_property": {"GCal_Sync_Time_Notion_Name": "GCal Sync Time"}}
+        with patch("notion.notion_service.Client", return_value=mock_client):
+            notion_service = NotionService("token", setting, MagicMock())
+        notion_service.retry_policy = _policy()[0]
+        notion_service.circuit_breaker = CircuitBreaker("notion")
+        fn, calls = _flaky(_NotionHttpError(502), failures=1)
+        mock_client.pages.update.side_effect = lambda **kwargs: fn()
+
+        notion_service.update_notion_task_for_new_gcal_sync_time("page-1", "2026-05-01T00:00:00+00:00")
+
+        self.assertEqual(calls["count"], 2)
+        self.assertEqual(notion_service.retry_stats.to_dict()["retries"], 1)
+
+    def test_retry_stats_are_reported_in_sync_summary(self):
+        notion_service = MagicMock()
+        google_service = MagicMock()
+        notion_service.retry_stats = RetryStats()
+        notion_service.retry_stats._add(calls=3, retries=2, sleep_seconds=1.5)
+        notion_service.get_notion_task.return_value = ({}, [])
+        google_service.get_gcal_event.return_value = [{"id": "evt-1", "summary": "Event"}]
+        setting = {
+            "page_property": {},
+            "gcal_name_dict": {},
+            "gcal_id_dict": {},
+            "gcal_default_name": "Primary",
+            "gcal_default_id": "primary@example.com",
+        }
+
+        result = synchronize_notion_and_google_calendar(
+            setting, notion_service, google_service, should_update_notion_tasks=False
+        )
+
+        retries = result["body"]["message"]["summary"]["retries"]
+        self.assertEqual(retries["notion"]["retries"], 2)
+        self.assertEqual(retries["notion"]["sleep_ms"], 1500)
+        self.assertNotIn("google", retries)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,299 @@
+import asyncio
+import copy
+import json
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+
+SRC_ROOT = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+import main as main_module  # noqa: E402
+from gcal.gcal_http import AsyncCalendarHttp  # noqa: E402
+from gcal.gcal_service_async import AsyncGoogleService  # noqa: E402
+from notion.notion_service_async import AsyncNotionService  # noqa: E402
+from sync.sync import synchronize_notion_and_google_calendar  # noqa: E402
+from sync.sync_async import synchronize_notion_and_google_calendar_async  # noqa: E402
+from sync.sync_checkpoint import SyncCheckpoint  # noqa: E402
+from utils.retry_utils import (  # noqa: E402
+    CircuitBreaker,
+    RetryDeadlineError,
+    RetryPolicy,
+    RetryStats,
+    call_with_retry_async,
+)
+
+USER_SETTING = {
+    "database_id": "db-1",
+    "before_date": "2026-06-01",
+    "after_date": "2026-05-01",
+    "timecode": "+00:00",
+    "timezone": "UTC",
+    "default_event_length": 60,
+    "google_timemin": "2026-05-01T00:00:00Z",
+    "google_timemax": "2026-06-01T00:00:00Z",
+    "page_property": {
+        "Task_Notion_Name": "Task Name",
+        "Date_Notion_Name": "Date",
+        "GCal_Name_Notion_Name": "Calendar",
+        "GCal_EventId_Notion_Name": "GCal Event Id",
+        "GCal_Sync_Time_Notion_Name": "GCal Sync Time",
+        "Delete_Notion_Name": "Delete",
+        "GCal_End_Date_Notion_Name": "End Date",
+        "ExtraInfo_Notion_Name": "Extra Info",
+        "Location_Notion_Name": "Location",
+        "CompleteIcon_Notion_Name": "Icon",
+    },
+    "gcal_name_dict": {"Primary": "primary@example.com"},
+    "gcal_id_dict": {"primary@example.com": "Primary"},
+    "gcal_default_name": "Primary",
+    "gcal_default_id": "primary@example.com",
+}
+
+
+def _make_notion_task(page_id, event_id="", last_edited_time="2026-05-02T00:00:00.000Z"):
+    return {
+        "id": page_id,
+        "last_edited_time": last_edited_time,
+        "properties": {
+            "Calendar": {"select": {"name": "Primary"}},
+            "GCal Event Id": {"rich_text": [{"plain_text": event_id}] if event_id else []},
+            "GCal Sync Time": {"rich_text": []},
+            "Delete": {"checkbox": False},
+            "Task Name": {"title": [{"plain_text": "Task"}]},
+            "Date": {"date": {"start": "2026-05-23"}},
+        },
+    }
+
+
+def _make_gcal_event(event_id, updated="2026-05-01T00:00:00.000Z"):
+    return {
+        "id": event_id,
+        "summary": event_id,
+        "updated": updated,
+        "organizer": {"email": "primary@example.com"},
+        "start": {"date": "2026-05-23"},
+        "end": {"date": "2026-05-24"},
+    }
+
+
+def _inputs():
+    tasks = [
+        _make_notion_task("page-new"),
+        _make_notion_task("page-newer", event_id="evt-1", last_edited_time="2026-05-03T00:00:00.000Z"),
+    ]
+    events = [_make_gcal_event("evt-1"), _make_gcal_event("evt-unmatched")]
+    return tasks, events
+
+
+def _no_sleep_policy():
+    return RetryPolicy(max_attempts=3, sleep=lambda _: None, jitter=lambda: 0.0, async_sleep=AsyncMock())
+
+
+class AsyncSyncEngineTests(unittest.IsolatedAsyncioTestCase):
+    def _async_services(self, tasks, events):
+        notion_service = MagicMock()
+        notion_service.get_notion_task = AsyncMock(return_value=({"action": "get_notion_task"}, tasks))
+        for name in (
+            "update_notion_task_for_new_gcal_event_id",
+            "update_notion_task_for_new_gcal_sync_time",
+            "update_notion_task_for_default_calendar",
+            "update_notion_task",
+            "create_notion_task",
+            "delete_notion_task",
+        ):
+            setattr(notion_service, name, AsyncMock())
+        google_service = MagicMock()
+        google_service.get_gcal_event = AsyncMock(return_value=events)
+        google_service.create_gcal_event = AsyncMock(return_value="evt-created")
+        google_service.update_gcal_event = AsyncMock()
+        return notion_service, google_service
+
+    async def test_async_engine_takes_the_same_actions_as_the_blocking_engine(self):
+        tasks, events = _inputs()
+        notion_service, google_service = self._async_services(copy.deepcopy(tasks), copy.deepcopy(events))
+        async_result = await synchronize_notion_and_google_calendar_async(
+            USER_SETTING, notion_service, google_service, checkpoint=SyncCheckpoint()
+        )
+
+        blocking_notion, blocking_google = MagicMock(), MagicMock()
+        blocking_notion.get_notion_task.return_value = ({"action": "get_notion_task"}, copy.deepcopy(tasks))
+        blocking_google.get_gcal_event.return_value = copy.deepcopy(events)
+        blocking_google.create_gcal_event.return_value = "evt-created"
+        blocking_result = synchronize_notion_and_google_calendar(
+            USER_SETTING, blocking_notion, blocking_google, checkpoint=SyncCheckpoint()
+        )
+
+        self.assertEqual(async_result["body"]["status"], "sync_success")
+        self.assertEqual(
+            async_result["body"]["message"]["summary"]["action_counts"],
+            blocking_result["body"]["message"]["summary"]["action_counts"],
+        )
+        google_service.create_gcal_event.assert_awaited_once()
+        google_service.update_gcal_event.assert_awaited_once()
+        notion_service.update_notion_task_for_new_gcal_event_id.assert_awaited_once_with("page-new", "evt-created")
+        notion_service.create_notion_task.assert_awaited_once()
+        self.assertEqual(notion_service.create_notion_task.await_args.args[0]["id"], "evt-unmatched")
+
+    async def test_writes_run_concurrently_up_to_the_concurrency_limit(self):
+        tasks = [_make_notion_task(f"page-{i}") for i in range(6)]
+        notion_service, google_service = self._async_services(tasks, [])
+        in_flight = 0
+        peak = 0
+
+        async def create_gcal_event(notion_task, calendar_id):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return f"evt-{notion_task['id']}"
+
+        google_service.create_gcal_event = create_gcal_event
+        result = await synchronize_notion_and_google_calendar_async(
+            USER_SETTING, notion_service, google_service, checkpoint=SyncCheckpoint(), concurrency=3
+        )
+
+        self.assertEqual(result["body"]["message"]["summary"]["action_counts"], {"create_gcal": 6})
+        self.assertEqual(peak, 3)
+
+    async def test_failed_write_is_reported_per_task(self):
+        tasks, events = _inputs()
+        notion_service, google_service = self._async_services(tasks, events)
+        google_service.create_gcal_event = AsyncMock(side_effect=RuntimeError("boom"))
+
+        result = await synchronize_notion_and_google_calendar_async(
+            USER_SETTING, notion_service, google_service, checkpoint=SyncCheckpoint()
+        )
+
+        errors = result["body"]["message"]["errors"]
+        self.assertEqual([(e["action"], e["notion_task_id"]) for e in errors], [("create_gcal", "page-new")])
+        google_service.update_gcal_event.assert_awaited_once()
+
+    async def test_retry_that_would_pass_the_deadline_defers_the_write(self):
+        tasks, events = _inputs()
+        notion_service, google_service = self._async_services(tasks, events)
+        google_service.create_gcal_event = AsyncMock(side_effect=RetryDeadlineError("google", "events.insert", 5.0))
+
+        result = await synchronize_notion_and_google_calendar_async(
+            USER_SETTING, notion_service, google_service, checkpoint=SyncCheckpoint()
+        )
+
+        self.assertEqual(result["body"]["status"], "sync_partial")
+        self.assertEqual(result["body"]["message"]["errors"], [])
+        self.assertEqual(
+            result["body"]["message"]["deferred_actions"],
+            [{"action": "create_gcal", "notion_task_id": "page-new", "gcal_event_id": None}],
+        )
+
+    async def test_input_load_failure_maps_to_sync_input_load_failed(self):
+        notion_service, google_service = self._async_services([], [])
+        google_service.get_gcal_event = AsyncMock(side_effect=RuntimeError("down"))
+
+        result = await synchronize_notion_and_google_calendar_async(USER_SETTING, notion_service, google_service)
+
+        self.assertEqual(result["statusCode"], 500)
+        self.assertEqual(result["body"]["message"]["error_code"], "sync_input_load_failed")
+
+
+class AsyncServiceTransportTests(unittest.IsolatedAsyncioTestCase):
+    async def test_notion_service_paginates_over_async_client(self):
+        seen = []
+        pages = [
+            {"results": [{"id": "p1"}], "has_more": True, "next_cursor": "c1"},
+            {"results": [{"id": "p2"}], "has_more": False},
+        ]
+
+        def handler(request):
+            seen.append(json.loads(request.content))
+            return httpx.Response(200, json=pages[len(seen) - 1])
+
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        service = AsyncNotionService("token", USER_SETTING, MagicMock(), http_client=http_client)
+        service.rate_limiter = None
+
+        summary, results = await service.get_notion_task()
+
+        self.assertEqual([page["id"] for page in results], ["p1", "p2"])
+        self.assertEqual(seen[1]["start_cursor"], "c1")
+        self.assertEqual(summary["database_id"], "db-1")
+        self.assertEqual(service.retry_stats.calls, 2)
+
+    async def test_google_service_lists_retries_and_converges_deletes(self):
+        requests_seen = []
+        responses = [
+            httpx.Response(503, json={"error": {"code": 503}}),
+            httpx.Response(200, json={"items": [_make_gcal_event("evt-1")]}),
+            httpx.Response(404, json={"error": {"code": 404}}),
+        ]
+
+        def handler(request):
+            requests_seen.append(request)
+            return responses[len(requests_seen) - 1]
+
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        token = MagicMock(credentials=MagicMock(valid=True, client_id="client"))
+        service = AsyncGoogleService(USER_SETTING, token, MagicMock(), http_client=http_client)
+        service.rate_limiter = None
+        service.retry_policy = _no_sleep_policy()
+        service.circuit_breaker = CircuitBreaker("google")
+
+        events = await service.get_gcal_event()
+        deleted = await service.delete_gcal_event("primary@example.com", "evt-1")
+
+        self.assertEqual([event["id"] for event in events], ["evt-1"])
+        self.assertTrue(deleted)
+        self.assertIn("/calendar/v3/calendars/primary%40example.com/events?", str(requests_seen[0].url))
+        self.assertEqual(requests_seen[0].url.params["singleEvents"], "true")
+        self.assertEqual(requests_seen[2].method, "DELETE")
+        self.assertEqual(service.retry_stats.retries, 1)
+
+    async def test_calendar_http_refreshes_invalid_credentials_off_the_loop(self):
+        credentials = MagicMock(valid=False)
+        credentials.refresh.side_effect = lambda request: setattr(credentials, "valid", True)
+        http = AsyncCalendarHttp(
+            credentials, client=httpx.AsyncClient(transport=httpx.MockTransport(lambda r: httpx.Response(204)))
+        )
+
+        self.assertIsNone(await http.request("DELETE", http.path("calendars", "a", "events", "b")))
+        credentials.refresh.assert_called_once()
+        credentials.apply.assert_called_once()
+
+
+class CallWithRetryAsyncTests(unittest.IsolatedAsyncioTestCase):
+    async def test_transient_errors_are_retried_with_async_sleep(self):
+        policy = _no_sleep_policy()
+        stats = RetryStats()
+        fn = AsyncMock(side_effect=[ConnectionError("reset"), "ok"])
+
+        result = await call_with_retry_async(fn, provider="notion", endpoint="x", policy=policy, stats=stats)
+
+        self.assertEqual(result, "ok")
+        self.assertEqual(stats.retries, 1)
+        policy.async_sleep.assert_awaited_once()
+
+
+class MainManyAsyncTests(unittest.IsolatedAsyncioTestCase):
+    async def test_users_run_concurrently_and_share_one_notion_transport(self):
+        transports = set()
+
+        async def fake_main_async(uuid, deadline=None, notion_transport=None):
+            transports.add(id(notion_transport))
+            if uuid == "bad":
+                raise RuntimeError("boom")
+            await asyncio.sleep(0)
+            return {"statusCode": 200, "uuid": uuid}
+
+        with patch.object(main_module, "main_async", side_effect=fake_main_async):
+            results = await main_module.main_many_async(["u1", "u2", "bad"], concurrency=2)
+
+        self.assertEqual(results["u1"]["uuid"], "u1")
+        self.assertEqual(results["bad"]["error"], "sync_failed")
+        self.assertEqual(len(transports), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
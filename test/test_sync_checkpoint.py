@@ -0,0 +1,210 @@
+import copy
+import json
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+SRC_ROOT = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+from sync.sync import synchronize_notion_and_google_calendar  # noqa: E402
+from sync.sync_checkpoint import CHECKPOINT_VERSION, SyncCheckpoint  # noqa: E402
+
+USER_SETTING = {
+    "page_property": {
+        "Task_Notion_Name": "Task Name",
+        "Date_Notion_Name": "Date",
+        "GCal_Name_Notion_Name": "Calendar",
+        "GCal_EventId_Notion_Name": "GCal Event Id",
+        "GCal_Sync_Time_Notion_Name": "GCal Sync Time",
+        "Delete_Notion_Name": "Delete",
+        "GCal_End_Date_Notion_Name": "End Date",
+    },
+    "gcal_name_dict": {"Primary": "primary@example.com"},
+    "gcal_id_dict": {"primary@example.com": "Primary"},
+    "gcal_default_name": "Primary",
+    "gcal_default_id": "primary@example.com",
+}
+
+
+def _make_notion_task(page_id, event_id="", last_edited_time="2026-05-02T00:00:00.000Z"):
+    return {
+        "id": page_id,
+        "last_edited_time": last_edited_time,
+        "properties": {
+            "Calendar": {"select": {"name": "Primary"}},
+            "GCal Event Id": {"rich_text": [{"plain_text": event_id}] if event_id else []},
+            "GCal Sync Time": {"rich_text": []},
+            "Delete": {"checkbox": False},
+            "Task Name": {"title": [{"plain_text": "Task"}]},
+            "Date": {"date": {"start": "2026-05-23"}},
+        },
+    }
+
+
+def _local_config(path):
+    return {"mode": "local", "sync_checkpoint_path": path}
+
+
+class SyncCheckpointStorageTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name) / "checkpoint.json"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_create_entry_is_flushed_immediately_and_reloaded(self):
+        checkpoint = SyncCheckpoint(_local_config(self.path), MagicMock())
+        checkpoint.record("create_gcal", "page-1", gcal_event_id="evt-1")
+
+        reloaded = SyncCheckpoint(_local_config(self.path), MagicMock())
+        self.assertEqual(reloaded.get("create_gcal", "page-1")["gcal_event_id"], "evt-1")
+        self.assertEqual(reloaded.summary(), {"resumed_count": 1, "pending_count": 1})
+
+    def test_other_entries_are_buffered_until_flush_interval(self):
+        checkpoint = SyncCheckpoint(_local_config(self.path), MagicMock(), flush_interval=2)
+        checkpoint.record("update_gcal", "page-1", gcal_event_id="evt-1")
+        self.assertFalse(self.path.exists())
+
+        checkpoint.record("update_gcal", "page-2", gcal_event_id="evt-2")
+        self.assertTrue(self.path.exists())
+
+    def test_completing_all_entries_removes_the_stored_checkpoint(self):
+        checkpoint = SyncCheckpoint(_local_config(self.path), MagicMock())
+        checkpoint.record("create_gcal", "page-1", gcal_event_id="evt-1")
+        checkpoint.complete("create_gcal", "page-1")
+        checkpoint.flush()
+
+        self.assertFalse(self.path.exists())
+
+    def test_stale_entries_are_dropped_on_load(self):
+        old = (datetime.now(timezone.utc) - timedelta(days=30)).isoformat()
+        self.path.write_text(
+            json.dumps(
+                {
+                    "version": CHECKPOINT_VERSION,
+                    "entries": {
+                        "create_gcal:page-1": {
+                            "action": "create_gcal",
+                            "item_id": "page-1",
+                            "recorded_at": old,
+                            "gcal_event_id": "evt-1",
+                        }
+                    },
+                }
+            )
+        )
+
+        checkpoint = SyncCheckpoint(_local_config(self.path), MagicMock())
+
+        self.assertIsNone(checkpoint.get("create_gcal", "page-1"))
+
+    def test_load_failure_starts_with_empty_checkpoint(self):
+        self.path.write_text("{not json")
+        logger = MagicMock()
+
+        checkpoint = SyncCheckpoint(_local_config(self.path), logger)
+
+        self.assertEqual(checkpoint.entries, {})
+        logger.exception.assert_called_once()
+
+    def test_cloud_mode_uses_dynamodb_helpers(self):
+        with (
+            patch("utils.dynamodb_utils.get_sync_state_by_uuid", return_value=None) as mock_get,
+            patch("utils.dynamodb_utils.save_sync_state_by_uuid") as mock_save,
+        ):
+            checkpoint = SyncCheckpoint({"mode": "cloud", "uuid": "u-1"}, MagicMock())
+            checkpoint.record("create_gcal", "page-1", gcal_event_id="evt-1")
+
+        mock_get.assert_called_once_with("u-1", "syncCheckpoint")
+        saved_uuid, attribute, saved = mock_save.call_args[0]
+        self.assertEqual((saved_uuid, attribute), ("u-1", "syncCheckpoint"))
+        self.assertIn("create_gcal:page-1", saved["entries"])
+
+
+class SyncCheckpointResumeTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name) / "checkpoint.json"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _sync(self, notion_service, google_service):
+        return synchronize_notion_and_google_calendar(
+            user_setting=copy.deepcopy(USER_SETTING),
+            notion_service=notion_service,
+            google_service=google_service,
+            checkpoint=SyncCheckpoint(_local_config(self.path), MagicMock()),
+        )
+
+    def test_interrupted_create_is_resumed_without_duplicate_event(self):
+        notion_service = MagicMock()
+        google_service = MagicMock()
+        notion_service.get_notion_task.return_value = ({}, [_make_notion_task("page-1")])
+        google_service.get_gcal_event.return_value = []
+        google_service.create_gcal_event.return_value = "evt-new"
+        notion_service.update_notion_task_for_new_gcal_event_id.side_effect = RuntimeError("write-back lost")
+
+        first = self._sync(notion_service, google_service)
+        self.assertEqual(first["body"]["message"]["errors"][0]["action"], "create_gcal")
+
+        notion_service.update_notion_task_for_new_gcal_event_id.side_effect = None
+        google_service.create_gcal_event.reset_mock()
+        second = self._sync(notion_service, google_service)
+
+        google_service.create_gcal_event.assert_not_called()
+        notion_service.update_notion_task_for_new_gcal_event_id.assert_called_with("page-1", "evt-new")
+        self.assertEqual(second["body"]["message"]["summary"]["checkpoint"], {"resumed_count": 1, "pending_count": 0})
+        self.assertFalse(self.path.exists())
+
+    def test_interrupted_update_gcal_only_writes_sync_time(self):
+        notion_service = MagicMock()
+        google_service = MagicMock()
+        task = _make_notion_task("page-1", event_id="evt-1", last_edited_time="2026-05-02T00:00:00.000Z")
+        event = {
+            "id": "evt-1",
+            "summary": "Task",
+            "updated": "2026-05-01T00:00:00.000Z",
+            "start": {"date": "2026-05-23"},
+            "organizer": {"email": "primary@example.com"},
+        }
+        notion_service.get_notion_task.return_value = ({}, [task])
+        google_service.get_gcal_event.return_value = [dict(event)]
+        notion_service.update_notion_task_for_new_gcal_sync_time.side_effect = RuntimeError("timeout")
+
+        self._sync(notion_service, google_service)
+        google_service.update_gcal_event.assert_called_once()
+
+        # The patch made Google newer; without the checkpoint this would flip to update_notion.
+        google_service.get_gcal_event.return_value = [{**event, "updated": "2026-05-03T00:00:00.000Z"}]
+        notion_service.update_notion_task_for_new_gcal_sync_time.side_effect = None
+        google_service.update_gcal_event.reset_mock()
+        self._sync(notion_service, google_service)
+
+        google_service.update_gcal_event.assert_not_called()
+        notion_service.update_notion_task.assert_not_called()
+        notion_service.update_notion_task_for_new_gcal_sync_time.assert_called()
+
+    def test_entries_for_tasks_that_no_longer_need_resuming_are_pruned(self):
+        checkpoint = SyncCheckpoint(_local_config(self.path), MagicMock())
+        checkpoint.record("create_gcal", "page-1", gcal_event_id="evt-1")
+
+        notion_service = MagicMock()
+        google_service = MagicMock()
+        # The write-back did land before the interruption, so the task is already linked.
+        notion_service.get_notion_task.return_value = ({}, [_make_notion_task("page-1", event_id="evt-1")])
+        google_service.get_gcal_event.return_value = []
+
+        result = self._sync(notion_service, google_service)
+
+        self.assertEqual(result["body"]["message"]["summary"]["checkpoint"]["pending_count"], 0)
+        self.assertFalse(self.path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
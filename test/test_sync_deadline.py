@@ -0,0 +1,187 @@
+import copy
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+SRC_ROOT = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+from sync.sync import synchronize_notion_and_google_calendar  # noqa: E402
+from sync.sync_result import SYNC_PARTIAL_STATUS  # noqa: E402
+from utils.retry_utils import RetryDeadlineError, RetryPolicy  # noqa: E402
+from utils.sync_deadline import (  # noqa: E402
+    DEFAULT_SYNC_DEADLINE_SAFETY_MARGIN_MS,
+    SYNC_DEADLINE_SAFETY_MARGIN_MS_VAR,
+    SyncDeadline,
+)
+
+USER_SETTING = {
+    "page_property": {
+        "Task_Notion_Name": "Task Name",
+        "Date_Notion_Name": "Date",
+        "GCal_Name_Notion_Name": "Calendar",
+        "GCal_EventId_Notion_Name": "GCal Event Id",
+        "GCal_Sync_Time_Notion_Name": "GCal Sync Time",
+        "Delete_Notion_Name": "Delete",
+        "GCal_End_Date_Notion_Name": "End Date",
+    },
+    "gcal_name_dict": {"Primary": "primary@example.com"},
+    "gcal_id_dict": {"primary@example.com": "Primary"},
+    "gcal_default_name": "Primary",
+    "gcal_default_id": "primary@example.com",
+}
+
+
+def _make_notion_task(page_id, event_id="", deleted=False):
+    return {
+        "id": page_id,
+        "last_edited_time": "2026-05-02T00:00:00.000Z",
+        "properties": {
+            "Calendar": {"select": {"name": "Primary"}},
+            "GCal Event Id": {"rich_text": [{"plain_text": event_id}] if event_id else []},
+            "GCal Sync Time": {"rich_text": []},
+            "Delete": {"checkbox": deleted},
+            "Task Name": {"title": [{"plain_text": "Task"}]},
+            "Date": {"date": {"start": "2026-05-23"}},
+        },
+    }
+
+
+class _CountdownDeadline:
+    """Expires after a fixed number of `expired()` checks."""
+
+    def __init__(self, checks_left):
+        self.checks_left = checks_left
+
+    def expired(self):
+        self.checks_left -= 1
+        return self.checks_left < 0
+
+
+class SyncDeadlineTests(unittest.TestCase):
+    def test_from_lambda_context_uses_remaining_time(self):
+        context = MagicMock()
+        context.get_remaining_time_in_millis.return_value = 30_000
+
+        deadline = SyncDeadline.from_lambda_context(context, safety_margin_ms=20_000)
+
+        self.assertEqual(deadline.remaining_ms(), 30_000)
+        self.assertFalse(deadline.expired())
+        context.get_remaining_time_in_millis.return_value = 20_000
+        self.assertTrue(deadline.expired())
+
+    def test_from_lambda_context_without_timer_returns_none(self):
+        self.assertIsNone(SyncDeadline.from_lambda_context(object()))
+
+    def test_safety_margin_is_read_from_env(self):
+        with patch.dict(os.environ, {SYNC_DEADLINE_SAFETY_MARGIN_MS_VAR: "1500"}):
+            self.assertEqual(SyncDeadline(lambda: 0).safety_margin_ms, 1500)
+        with patch.dict(os.environ, {SYNC_DEADLINE_SAFETY_MARGIN_MS_VAR: "not-a-number"}):
+            self.assertEqual(SyncDeadline(lambda: 0).safety_margin_ms, DEFAULT_SYNC_DEADLINE_SAFETY_MARGIN_MS)
+
+    def test_after_expires_once_the_budget_is_spent(self):
+        self.assertFalse(SyncDeadline.after(60).expired())
+        self.assertTrue(SyncDeadline.after(0).expired())
+
+
+class SyncDeadlineDeferralTests(unittest.TestCase):
+    def _sync(self, notion_service, google_service, deadline):
+        return synchronize_notion_and_google_calendar(
+            user_setting=copy.deepcopy(USER_SETTING),
+            notion_service=notion_service,
+            google_service=google_service,
+            deadline=deadline,
+        )
+
+    def test_actions_after_the_deadline_are_deferred(self):
+        notion_service = MagicMock()
+        google_service = MagicMock()
+        notion_service.get_notion_task.return_value = ({}, [_make_notion_task("page-1"), _make_notion_task("page-2")])
+        google_service.get_gcal_event.return_value = []
+        google_service.create_gcal_event.return_value = "evt-1"
+
+        # One check before input load and one for the first task; the second task is out of time.
+        result = self._sync(notion_service, google_service, _CountdownDeadline(2))
+
+        body = result["body"]
+        self.assertEqual(body["status"], SYNC_PARTIAL_STATUS)
+        google_service.create_gcal_event.assert_called_once()
+        self.assertEqual(
+            body["message"]["deferred_actions"],
+            [{"action": "create_gcal", "notion_task_id": "page-2", "gcal_event_id": None}],
+        )
+        self.assertEqual(body["message"]["summary"]["action_counts"], {"create_gcal": 1})
+        self.assertEqual(body["message"]["summary"]["deferred_count"], 1)
+
+    def test_retry_that_would_pass_the_deadline_defers_the_action(self):
+        notion_service = MagicMock()
+        google_service = MagicMock()
+        google_service.retry_policy = RetryPolicy()
+        notion_service.get_notion_task.return_value = ({}, [_make_notion_task("page-1"), _make_notion_task("page-2")])
+        google_service.get_gcal_event.return_value = []
+        google_service.create_gcal_event.side_effect = [RetryDeadlineError("google", "events.insert", 5.0), "evt-2"]
+        deadline = SyncDeadline.after(60)
+
+        result = self._sync(notion_service, google_service, deadline)
+
+        body = result["body"]
+        self.assertIs(google_service.retry_policy.deadline, deadline)
+        self.assertEqual(body["status"], SYNC_PARTIAL_STATUS)
+        self.assertEqual(body["message"]["errors"], [])
+        self.assertEqual(
+            body["message"]["deferred_actions"],
+            [{"action": "create_gcal", "notion_task_id": "page-1", "gcal_event_id": None}],
+        )
+        self.assertEqual(body["message"]["summary"]["action_counts"], {"create_gcal": 1})
+
+    def test_retry_deadline_while_loading_inputs_defers_the_whole_sync(self):
+        notion_service = MagicMock()
+        google_service = MagicMock()
+        google_service.get_gcal_event.side_effect = RetryDeadlineError("google", "events.list", 5.0)
+
+        result = self._sync(notion_service, google_service, SyncDeadline.after(60))
+
+        self.assertEqual(result["body"]["status"], SYNC_PARTIAL_STATUS)
+
+    def test_deferred_delete_does_not_recreate_the_event_in_notion(self):
+        notion_service = MagicMock()
+        google_service = MagicMock()
+        notion_service.get_notion_task.return_value = ({}, [_make_notion_task("page-1", "evt-1", deleted=True)])
+        google_service.get_gcal_event.return_value = [
+            {"id": "evt-1", "summary": "Task", "organizer": {"email": "primary@example.com"}}
+        ]
+
+        result = self._sync(notion_service, google_service, _CountdownDeadline(1))
+
+        google_service.delete_gcal_event.assert_not_called()
+        notion_service.create_notion_task.assert_not_called()
+        self.assertEqual(result["body"]["message"]["deferred_actions"][0]["action"], "delete_gcal")
+
+    def test_expired_before_input_load_skips_the_whole_sync(self):
+        notion_service = MagicMock()
+        google_service = MagicMock()
+
+        result = self._sync(notion_service, google_service, SyncDeadline.after(0))
+
+        self.assertEqual(result["body"]["status"], SYNC_PARTIAL_STATUS)
+        google_service.get_gcal_event.assert_not_called()
+        notion_service.get_notion_task.assert_not_called()
+
+    def test_sync_without_deferrals_reports_success(self):
+        notion_service = MagicMock()
+        google_service = MagicMock()
+        notion_service.get_notion_task.return_value = ({}, [_make_notion_task("page-1")])
+        google_service.get_gcal_event.return_value = []
+        google_service.create_gcal_event.return_value = "evt-1"
+
+        result = self._sync(notion_service, google_service, SyncDeadline.after(60))
+
+        self.assertEqual(result["body"]["status"], "sync_success")
+        self.assertNotIn("deferred_actions", result["body"]["message"])
+        self.assertEqual(result["body"]["message"]["summary"]["deferred_count"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
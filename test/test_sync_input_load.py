@@ -0,0 +1,86 @@
+import sys
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+SRC_ROOT = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+from sync.sync import synchronize_notion_and_google_calendar  # noqa: E402
+from sync.sync_checkpoint import SyncCheckpoint  # noqa: E402
+
+USER_SETTING = {
+    "page_property": {
+        "Task_Notion_Name": "Task Name",
+        "Date_Notion_Name": "Date",
+        "GCal_Name_Notion_Name": "Calendar",
+        "GCal_EventId_Notion_Name": "GCal Event Id",
+        "GCal_Sync_Time_Notion_Name": "GCal Sync Time",
+        "Delete_Notion_Name": "Delete",
+    },
+    "gcal_name_dict": {"Primary": "primary@example.com"},
+    "gcal_id_dict": {"primary@example.com": "Primary"},
+    "gcal_default_name": "Primary",
+    "gcal_default_id": "primary@example.com",
+}
+
+GCAL_EVENT = {
+    "id": "evt-1",
+    "summary": "Event",
+    "updated": "2026-05-01T00:00:00.000Z",
+    "organizer": {"email": "primary@example.com"},
+    "start": {"date": "2026-05-23"},
+    "end": {"date": "2026-05-24"},
+}
+
+
+class SyncInputLoadTests(unittest.TestCase):
+    def test_gcal_and_notion_fetches_overlap(self):
+        # Each fetch waits for the other to start, so sequential fetches would time out here.
+        barrier = threading.Barrier(2, timeout=5)
+        notion_service = MagicMock()
+        google_service = MagicMock()
+
+        def get_gcal_event():
+            barrier.wait()
+            return [dict(GCAL_EVENT)]
+
+        def get_notion_task():
+            barrier.wait()
+            return {"action": "get_notion_task"}, []
+
+        google_service.get_gcal_event.side_effect = get_gcal_event
+        notion_service.get_notion_task.side_effect = get_notion_task
+
+        result = synchronize_notion_and_google_calendar(
+            USER_SETTING, notion_service, google_service, checkpoint=SyncCheckpoint()
+        )
+
+        self.assertEqual(result["body"]["status"], "sync_success")
+        timings = result["body"]["message"]["summary"]["timings"]
+        self.assertEqual(set(timings), {"gcal_fetch_ms", "notion_fetch_ms", "input_load_ms", "spans"})
+        notion_service.create_notion_task.assert_called_once()
+
+    def test_either_fetch_failing_maps_to_sync_input_load_failed(self):
+        for failing in ("google", "notion"):
+            with self.subTest(failing=failing):
+                notion_service = MagicMock()
+                google_service = MagicMock()
+                google_service.get_gcal_event.return_value = [dict(GCAL_EVENT)]
+                notion_service.get_notion_task.return_value = ({"action": "get_notion_task"}, [])
+                if failing == "google":
+                    google_service.get_gcal_event.side_effect = RuntimeError("google down")
+                else:
+                    notion_service.get_notion_task.side_effect = RuntimeError("notion down")
+
+                result = synchronize_notion_and_google_calendar(USER_SETTING, notion_service, google_service)
+
+                self.assertEqual(result["statusCode"], 500)
+                self.assertEqual(result["body"]["message"]["error_code"], "sync_input_load_failed")
+                google_service.get_gcal_event.assert_called_once()
+                notion_service.get_notion_task.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,271 @@
+import asyncio
+import os
+import sys
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+SRC_ROOT = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+import main as main_module  # noqa: E402
+import sync.sync_lease as sync_lease  # noqa: E402
+import utils.lambda_utils as lambda_utils  # noqa: E402
+from sync.sync_lease import SYNC_COALESCED_STATUS, InMemoryLeaseStore, SyncLease  # noqa: E402
+import utils.dynamodb_utils as dynamodb_utils  # noqa: E402
+
+SUCCESS = {"statusCode": 200, "body": {"status": "sync_success", "message": {"summary": {}, "errors": []}}}
+FAILED = {"statusCode": 500, "body": {"status": "sync_error", "message": "boom"}}
+
+
+class _ConditionalFailure(Exception):
+    def __init__(self):
+        self.response = {"Error": {"Code": "ConditionalCheckFailedException"}}
+
+
+class SyncLeaseTests(unittest.TestCase):
+    def setUp(self):
+        self.store = InMemoryLeaseStore()
+        self.enterContext(patch.dict(os.environ, {"SYNC_DEBOUNCE_SECONDS": "60"}))
+
+    def _lease(self):
+        return SyncLease("u-1", {"mode": "local"}, MagicMock(), store=self.store)
+
+    def test_second_trigger_is_coalesced_while_a_sync_runs(self):
+        running = self._lease()
+        self.assertTrue(running.acquire())
+
+        second = self._lease()
+        self.assertFalse(second.acquire())
+        self.assertEqual(second.coalesced_result()["body"]["status"], SYNC_COALESCED_STATUS)
+        self.assertEqual(second.coalesced_result()["body"]["message"]["summary"]["lease"]["state"], "running")
+
+    def test_successful_sync_debounces_later_triggers(self):
+        lease = self._lease()
+        lease.acquire()
+        lease.release(SUCCESS)
+
+        debounced = self._lease()
+        self.assertFalse(debounced.acquire())
+        self.assertEqual(debounced.blocking_lease["state"], "finished")
+
+    def test_failed_sync_releases_at_once_so_retries_run(self):
+        lease = self._lease()
+        lease.acquire()
+        lease.release(FAILED)
+
+        self.assertTrue(self._lease().acquire())
+
+    def test_explicit_run_takes_a_finished_lease_but_not_a_running_one(self):
+        lease = self._lease()
+        lease.acquire()
+        explicit = SyncLease("u-1", {"mode": "local"}, MagicMock(), store=self.store, debounce=False)
+        self.assertFalse(explicit.acquire())
+
+        lease.release(SUCCESS)
+        self.assertTrue(explicit.acquire())
+
+    def test_debounce_can_be_turned_off(self):
+        lease = self._lease()
+        lease.acquire()
+        with patch.dict(os.environ, {"SYNC_DEBOUNCE_SECONDS": "0"}):
+            lease.release(SUCCESS)
+
+        self.assertTrue(self._lease().acquire())
+
+    def test_expired_lease_is_taken_over_and_not_released_by_its_old_owner(self):
+        crashed = self._lease()
+        with patch.object(sync_lease, "_now_ms", return_value=0):
+            crashed.acquire()
+        successor = self._lease()
+        self.assertTrue(successor.acquire())
+
+        crashed.release(SUCCESS)
+
+        crashed.logger.warning.assert_called_once()
+        self.assertEqual(self.store._leases["u-1"]["owner"], successor.owner)
+
+    def test_lease_follows_the_invocation_deadline(self):
+        deadline = MagicMock()
+        deadline.remaining_ms.return_value = 5_000
+        lease = self._lease()
+        with patch.object(sync_lease, "_now_ms", return_value=1_000):
+            lease.acquire(deadline)
+
+        self.assertEqual(self.store._leases["u-1"]["expires_at_ms"], 6_000)
+
+    def test_storage_errors_never_block_the_sync(self):
+        store = MagicMock()
+        store.acquire.side_effect = RuntimeError("throttled")
+        lease = SyncLease("u-1", {"mode": "cloud", "uuid": "u-1"}, MagicMock(), store=store)
+
+        self.assertTrue(lease.acquire())
+        lease.release(SUCCESS)
+        store.release.assert_not_called()
+
+    def test_missing_user_syncs_without_a_lease_instead_of_coalescing(self):
+        store = MagicMock()
+        store.acquire.side_effect = LookupError("No Users item for uuid typo")
+        lease = SyncLease("typo", {"mode": "cloud", "uuid": "typo"}, MagicMock(), store=store)
+
+        self.assertTrue(lease.acquire())
+        self.assertFalse(lease.held)
+        lease.release(SUCCESS)
+        store.release.assert_not_called()
+
+    def test_cloud_run_without_uuid_never_leases_a_users_item(self):
+        with patch("utils.dynamodb_utils.acquire_sync_lease_by_uuid") as acquire:
+            lease = SyncLease(None, {"mode": "cloud"}, MagicMock())
+            self.assertTrue(lease.acquire())
+        acquire.assert_not_called()
+        self.assertIsNone(lease.key)
+
+    def test_local_run_without_uuid_uses_the_local_key(self):
+        lease = SyncLease(None, {"mode": "local"}, MagicMock(), store=self.store)
+        self.assertTrue(lease.acquire())
+        self.assertIn("local", self.store._leases)
+
+    def test_local_runs_without_uuid_are_keyed_by_their_settings_file(self):
+        first = SyncLease(None, {"mode": "local", "notion_setting_path": "/cfg/a.json"}, MagicMock(), store=self.store)
+        second = SyncLease(None, {"mode": "local", "notion_setting_path": "/cfg/b.json"}, MagicMock(), store=self.store)
+
+        self.assertTrue(first.acquire())
+        self.assertTrue(second.acquire())
+        self.assertEqual(sorted(self.store._leases), ["/cfg/a.json", "/cfg/b.json"])
+
+
+class MainSyncLeaseTests(unittest.TestCase):
+    def setUp(self):
+        sync_lease._local_lease_store.clear()
+        self.addCleanup(sync_lease._local_lease_store.clear)
+        self.enterContext(patch.dict(os.environ, {"SYNC_DEBOUNCE_SECONDS": "60"}))
+        self.enterContext(patch.object(sys, "argv", ["src/main.py"]))
+
+    def test_main_coalesces_a_trigger_right_after_a_successful_sync(self):
+        with patch.object(main_module, "_run_main", return_value=SUCCESS) as run_main:
+            first = main_module.main("u-1", config={"mode": "local"})
+            second = main_module.main("u-1", config={"mode": "local"})
+            other_user = main_module.main("u-2", config={"mode": "local"})
+
+        self.assertEqual(first, SUCCESS)
+        self.assertEqual(second["body"]["status"], SYNC_COALESCED_STATUS)
+        self.assertEqual(other_user, SUCCESS)
+        self.assertEqual(run_main.call_count, 2)
+
+    def test_explicit_runs_are_not_debounced(self):
+        with patch.object(main_module, "_run_main", return_value=SUCCESS) as run_main:
+            main_module.main("u-1", config={"mode": "local"})
+            retried = main_module.main("u-1", config={"mode": "local"}, retry_failed=True)
+            with patch.object(sys, "argv", ["src/main.py", "-g", "1", "2"]):
+                forced = main_module.main("u-1", config={"mode": "local"})
+
+        self.assertEqual((retried, forced), (SUCCESS, SUCCESS))
+        self.assertEqual(run_main.call_count, 3)
+
+    def test_main_syncs_distinct_local_configs_back_to_back(self):
+        configs = [{"mode": "local", "notion_setting_path": f"/cfg/{name}.json"} for name in ("a", "b")]
+        with patch.object(main_module, "_run_main", return_value=SUCCESS) as run_main:
+            results = [main_module.main(None, config=config) for config in configs]
+
+        self.assertEqual(results, [SUCCESS, SUCCESS])
+        self.assertEqual(run_main.call_count, 2)
+
+    def test_main_async_runs_one_sync_per_user_at_a_time(self):
+        started = []
+
+        async def slow_sync(uuid, *args):
+            started.append(uuid)
+            await asyncio.sleep(0.05)
+            return SUCCESS
+
+        async def run_both():
+            return await asyncio.gather(
+                main_module.main_async("u-1", config={"mode": "local"}),
+                main_module.main_async("u-1", config={"mode": "local"}),
+            )
+
+        with patch.object(main_module, "_run_main_async", side_effect=slow_sync):
+            results = asyncio.run(run_both())
+
+        self.assertEqual(started, ["u-1"])
+        self.assertEqual(
+            sorted(result["body"]["status"] for result in results), [SYNC_COALESCED_STATUS, "sync_success"]
+        )
+
+
+class CoalescedResultLoggingTests(unittest.TestCase):
+    def test_coalesced_result_is_acked_and_not_persisted(self):
+        logger = MagicMock()
+        logger.level = 20
+        coalesced = SyncLease("u-1", {"mode": "local"}, store=InMemoryLeaseStore()).coalesced_result()
+        with (
+            patch.object(lambda_utils, "_save_sync_logs") as mock_save,
+            patch.object(lambda_utils, "emit_sync_metrics"),
+        ):
+            payload = lambda_utils.process_and_log_sync_result(
+                logger_obj=logger,
+                sync_result=coalesced,
+                context=MagicMock(),
+                uuid="u-1",
+                lambda_start_time=datetime.now(timezone.utc),
+                trigger_name="sqs",
+            )
+
+        mock_save.assert_not_called()
+        self.assertFalse(lambda_utils.sync_result_requires_retry(payload))
+
+
+class DynamoDbSyncLeaseTests(unittest.TestCase):
+    def test_acquire_only_takes_a_missing_or_expired_lease_of_an_existing_user(self):
+        table = MagicMock()
+        with patch.object(dynamodb_utils, "_get_users_table", return_value=table):
+            self.assertIsNone(dynamodb_utils.acquire_sync_lease_by_uuid("u-1", {"owner": "a", "expires_at_ms": 20}, 10))
+        kwargs = table.update_item.call_args.kwargs
+        self.assertEqual(
+            kwargs["ConditionExpression"],
+            "attribute_exists(#uuid) AND (attribute_not_exists(syncLease) OR syncLease.expires_at_ms <= :now)",
+        )
+        self.assertEqual(kwargs["ExpressionAttributeNames"], {"#uuid": "uuid"})
+        self.assertEqual(kwargs["ExpressionAttributeValues"][":now"], 10)
+        table.get_item.assert_not_called()
+
+    def test_acquire_can_take_over_a_finished_lease(self):
+        table = MagicMock()
+        with patch.object(dynamodb_utils, "_get_users_table", return_value=table):
+            dynamodb_utils.acquire_sync_lease_by_uuid("u-1", {"owner": "a"}, 10, take_finished=True)
+        kwargs = table.update_item.call_args.kwargs
+        self.assertIn("OR syncLease.#state = :finished)", kwargs["ConditionExpression"])
+        self.assertEqual(kwargs["ExpressionAttributeNames"], {"#uuid": "uuid", "#state": "state"})
+        self.assertEqual(kwargs["ExpressionAttributeValues"][":finished"], "finished")
+
+    def test_acquire_reports_a_held_lease(self):
+        table = MagicMock()
+        table.update_item.side_effect = _ConditionalFailure()
+        table.get_item.return_value = {"Item": {"uuid": "u-1", "syncLease": {"owner": "b", "state": "running"}}}
+        with patch.object(dynamodb_utils, "_get_users_table", return_value=table):
+            blocking = dynamodb_utils.acquire_sync_lease_by_uuid("u-1", {"owner": "a", "expires_at_ms": 20}, 10)
+        self.assertEqual(blocking, {"owner": "b", "state": "running"})
+
+    def test_acquire_for_an_unknown_uuid_reports_a_missing_user(self):
+        table = MagicMock()
+        table.update_item.side_effect = _ConditionalFailure()
+        table.get_item.return_value = {}
+        with patch.object(dynamodb_utils, "_get_users_table", return_value=table):
+            with self.assertRaises(dynamodb_utils.SyncUserNotFoundError):
+                dynamodb_utils.acquire_sync_lease_by_uuid("typo", {"owner": "a", "expires_at_ms": 20}, 10)
+
+    def test_release_is_conditional_on_the_owner(self):
+        table = MagicMock()
+        with patch.object(dynamodb_utils, "_get_users_table", return_value=table):
+            self.assertTrue(dynamodb_utils.release_sync_lease_by_uuid("u-1", "a", None))
+            table.update_item.side_effect = _ConditionalFailure()
+            self.assertFalse(dynamodb_utils.release_sync_lease_by_uuid("u-1", "a", {"owner": "a", "state": "finished"}))
+        first, second = table.update_item.call_args_list
+        self.assertEqual(first.kwargs["UpdateExpression"], "REMOVE syncLease")
+        self.assertEqual(first.kwargs["ConditionExpression"], "syncLease.#owner = :owner")
+        self.assertEqual(second.kwargs["UpdateExpression"], "SET syncLease = :lease")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 import copy
+import hashlib
 import sys
 import unittest
 from datetime import datetime, timezone
@@ -10,6 +11,12 @@ sys.path.insert(0, str(SRC_ROOT))
 
 from sync.sync import synchronize_notion_and_google_calendar  # noqa: E402
 import utils.lambda_utils as lambda_utils  # noqa: E402
+from utils.sync_log_codec import (  # noqa: E402
+    SYNC_LOG_ENCODING,
+    SyncLogDecodeError,
+    decode_sync_log,
+    encode_sync_log,
+)
 
 USER_SETTING = {
     "page_property": {
@@ -137,5 +144,65 @@ class SyncContractTests(unittest.TestCase):
         self.assertIsNone(persisted_errors[0]["error"])
 
 
+def _stored_payload(**extra):
+    return {
+        "contract_version": lambda_utils.SYNC_LOG_CONTRACT_VERSION,
+        "trigger_by": "sqs",
+        "uuid": "real-uuid",
+        "statusCode": 200,
+        "status": "sync_success",
+        "message": {
+            "summary": {"google_event_count": 1, "timings": {"spans": {"planning": {"count": 1}}}},
+            "trigger_time": "2026-05-23T00:00:00.000Z",
+            "errors": [{"action": "update_notion", "error_code": "runtime_error"}],
+        },
+        "lambda_name": "lambda-fn",
+        "aws_request_id": "request-id",
+        "log_level": 20,
+        "duration_ms": 12,
+        **extra,
+    }
+
+
+class SyncLogEncodingContractTests(unittest.TestCase):
+    def test_encoded_log_keeps_header_fields_and_round_trips(self):
+        payload = _stored_payload(job_id="msg-1")
+
+        item = encode_sync_log(payload)
+
+        self.assertEqual(item["log_encoding"], SYNC_LOG_ENCODING)
+        self.assertIsInstance(item["log_blob"], bytes)
+        self.assertEqual((item["status"], item["job_id"]), ("sync_success", "msg-1"))
+        self.assertNotIn("message", item)
+        self.assertNotIn("log_truncated", item)
+        self.assertEqual(decode_sync_log(item), payload)
+
+    def test_oversized_log_is_truncated_in_order_until_it_fits(self):
+        # Random-looking summaries so zlib cannot shrink them below the budget.
+        records = [{"uuid": hashlib.sha256(str(i).encode()).hexdigest(), "job_id": f"msg-{i}"} for i in range(400)]
+        payload = _stored_payload(record_summaries=records)
+
+        item = encode_sync_log(payload, max_bytes=2048)
+        decoded = decode_sync_log(item)
+
+        self.assertLessEqual(len(item["log_blob"]), 2048)
+        self.assertEqual(item["log_truncated"], ["record_summaries"])
+        self.assertEqual(decoded["omitted_record_summary_count"], 400)
+        self.assertEqual(decoded["message"]["errors"], payload["message"]["errors"])
+
+        tiny = decode_sync_log(encode_sync_log(payload, max_bytes=64))
+        self.assertEqual(tiny["log_truncated"], ["record_summaries", "summary_detail", "errors", "message"])
+        self.assertEqual(tiny["message"], {"error_code": "sync_log_too_large"})
+
+    def test_pre_v3_maps_decode_unchanged_and_unknown_encodings_are_rejected(self):
+        legacy = _stored_payload(contract_version="2026-05-31.sync-log.v2")
+
+        self.assertEqual(decode_sync_log(legacy), legacy)
+        with self.assertRaises(SyncLogDecodeError):
+            decode_sync_log({"log_encoding": "brotli+json", "log_blob": b""})
+        with self.assertRaises(SyncLogDecodeError):
+            decode_sync_log({"log_encoding": SYNC_LOG_ENCODING, "log_blob": b"not zlib"})
+
+
 if __name__ == "__main__":
     unittest.main()
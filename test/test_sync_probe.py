@@ -0,0 +1,229 @@
+import asyncio
+import copy
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = REPO_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+sys.path.insert(0, str(REPO_ROOT))
+
+from sync.sync import synchronize_notion_and_google_calendar  # noqa: E402
+from sync.sync_async import synchronize_notion_and_google_calendar_async  # noqa: E402
+from sync.sync_checkpoint import SyncCheckpoint  # noqa: E402
+from sync.sync_probe import SyncWatermark, sync_scope  # noqa: E402
+
+USER_SETTING = {
+    "database_id": "db-1",
+    "before_date": "2026-06-01",
+    "after_date": "2026-05-01",
+    "google_timemin": "2026-05-01T00:00:00Z",
+    "google_timemax": "2026-06-01T00:00:00Z",
+    "page_property": {
+        "Task_Notion_Name": "Task Name",
+        "Date_Notion_Name": "Date",
+        "GCal_Name_Notion_Name": "Calendar",
+        "GCal_EventId_Notion_Name": "GCal Event Id",
+        "GCal_Sync_Time_Notion_Name": "GCal Sync Time",
+        "Delete_Notion_Name": "Delete",
+    },
+    "gcal_name_dict": {"Primary": "primary@example.com"},
+    "gcal_id_dict": {"primary@example.com": "Primary"},
+    "gcal_default_name": "Primary",
+    "gcal_default_id": "primary@example.com",
+}
+
+LINKED_TASK = {
+    "id": "page-1",
+    "last_edited_time": "2026-05-01T00:00:00.000Z",
+    "properties": {
+        "Calendar": {"select": {"name": "Primary"}},
+        "GCal Event Id": {"rich_text": [{"plain_text": "evt-1"}]},
+        "GCal Sync Time": {"rich_text": []},
+        "Delete": {"checkbox": False},
+    },
+}
+LINKED_EVENT = {
+    "id": "evt-1",
+    "summary": "Task",
+    "updated": "2026-05-01T00:00:00.000Z",
+    "organizer": {"email": "primary@example.com"},
+    "start": {"date": "2026-05-23"},
+}
+PROBE_ON = {"SYNC_CHANGE_PROBE": ""}
+
+
+def _services():
+    notion_service = MagicMock()
+    google_service = MagicMock()
+    notion_service.get_notion_task.return_value = ({}, [copy.deepcopy(LINKED_TASK)])
+    notion_service.get_latest_notion_edit_time.return_value = LINKED_TASK["last_edited_time"]
+    google_service.get_gcal_event.return_value = [copy.deepcopy(LINKED_EVENT)]
+    google_service.probe_gcal_changes.return_value = (False, 1)
+    return notion_service, google_service
+
+
+class ChangeProbeTests(unittest.TestCase):
+    def _sync(self, notion_service, google_service, watermark, checkpoint=None, user_setting=USER_SETTING, **kwargs):
+        with patch.dict(os.environ, PROBE_ON):
+            return synchronize_notion_and_google_calendar(
+                copy.deepcopy(user_setting),
+                notion_service,
+                google_service,
+                checkpoint=checkpoint or SyncCheckpoint(),
+                watermark=watermark,
+                **kwargs,
+            )
+
+    def test_first_run_syncs_fully_and_the_next_unchanged_run_returns_early(self):
+        watermark = SyncWatermark()
+        notion_service, google_service = _services()
+
+        first = self._sync(notion_service, google_service, watermark)
+        second = self._sync(notion_service, google_service, watermark)
+
+        self.assertEqual(
+            first["body"]["message"]["summary"]["change_probe"], {"result": "not_run", "reason": "no_watermark"}
+        )
+        self.assertEqual(watermark.synced_at(sync_scope(USER_SETTING)), first["body"]["message"]["trigger_time"])
+        self.assertEqual(second["body"]["status"], "sync_success")
+        probe = second["body"]["message"]["summary"]["change_probe"]
+        self.assertEqual((probe["result"], probe["calls"]), ("unchanged", 2))
+        self.assertEqual(second["body"]["message"]["summary"]["action_counts"], {})
+        notion_service.get_notion_task.assert_called_once()
+        google_service.get_gcal_event.assert_called_once()
+
+    def test_a_change_on_either_side_runs_the_full_sync(self):
+        watermark = SyncWatermark()
+        notion_service, google_service = _services()
+        self._sync(notion_service, google_service, watermark)
+
+        google_service.probe_gcal_changes.return_value = (True, 1)
+        gcal_changed = self._sync(notion_service, google_service, watermark)
+        notion_service.get_latest_notion_edit_time.return_value = "2099-01-01T00:00:00.000Z"
+        notion_changed = self._sync(notion_service, google_service, watermark)
+
+        self.assertEqual(gcal_changed["body"]["message"]["summary"]["change_probe"]["result"], "changed")
+        self.assertEqual(notion_changed["body"]["message"]["summary"]["change_probe"]["calls"], 1)
+        self.assertEqual(notion_service.get_notion_task.call_count, 3)
+
+    def test_probe_is_skipped_for_pending_checkpoints_other_windows_and_force_modes(self):
+        watermark = SyncWatermark()
+        notion_service, google_service = _services()
+        self._sync(notion_service, google_service, watermark)
+        checkpoint = SyncCheckpoint()
+        checkpoint.entries["update_gcal:page-2"] = {"action": "update_gcal", "item_id": "page-2"}
+
+        pending = self._sync(notion_service, google_service, watermark, checkpoint=checkpoint)
+        moved_window = self._sync(
+            notion_service, google_service, watermark, user_setting={**USER_SETTING, "after_date": "2026-05-02"}
+        )
+        forced = self._sync(notion_service, google_service, watermark, compare_time=False)
+
+        self.assertEqual(pending["body"]["message"]["summary"]["change_probe"]["reason"], "pending_checkpoint")
+        self.assertEqual(moved_window["body"]["message"]["summary"]["change_probe"]["reason"], "no_watermark")
+        self.assertNotIn("change_probe", forced["body"]["message"]["summary"])
+        self.assertEqual(notion_service.get_notion_task.call_count, 4)
+
+    def test_runs_with_errors_do_not_advance_the_watermark(self):
+        watermark = SyncWatermark()
+        notion_service, google_service = _services()
+        notion_service.get_notion_task.return_value = (
+            {},
+            [{**copy.deepcopy(LINKED_TASK), "last_edited_time": "2026-05-09T00:00:00.000Z"}],
+        )
+        google_service.update_gcal_event.side_effect = RuntimeError("boom")
+
+        result = self._sync(notion_service, google_service, watermark)
+
+        self.assertEqual(len(result["body"]["message"]["errors"]), 1)
+        self.assertIsNone(watermark.synced_at(sync_scope(USER_SETTING)))
+
+    def test_failed_probe_falls_back_to_the_full_sync(self):
+        watermark = SyncWatermark()
+        notion_service, google_service = _services()
+        self._sync(notion_service, google_service, watermark)
+        google_service.probe_gcal_changes.side_effect = RuntimeError("probe down")
+
+        result = self._sync(notion_service, google_service, watermark)
+
+        self.assertEqual(result["body"]["message"]["summary"]["change_probe"]["result"], "failed")
+        self.assertEqual(notion_service.get_notion_task.call_count, 2)
+
+    def test_local_watermark_is_persisted_per_scope(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            config = {"mode": "local", "sync_watermark_path": Path(tmp_dir) / "watermark.json"}
+            SyncWatermark(config).advance("2026-05-10T00:00:00.000Z", sync_scope(USER_SETTING))
+
+            reloaded = SyncWatermark(config)
+
+        self.assertEqual(reloaded.synced_at(sync_scope(USER_SETTING)), "2026-05-10T00:00:00.000Z")
+        self.assertIsNone(reloaded.synced_at(sync_scope({**USER_SETTING, "database_id": "db-2"})))
+
+    def test_cloud_watermark_is_stored_on_the_users_item(self):
+        with (
+            patch("utils.dynamodb_utils.get_sync_state_by_uuid", return_value=None) as mock_get,
+            patch("utils.dynamodb_utils.save_sync_state_by_uuid") as mock_save,
+        ):
+            SyncWatermark({"mode": "cloud", "uuid": "u-1"}).advance("2026-05-10T00:00:00.000Z", "scope-1")
+
+        mock_get.assert_called_once_with("u-1", "syncWatermark")
+        mock_save.assert_called_once_with(
+            "u-1", "syncWatermark", {"synced_at": "2026-05-10T00:00:00.000Z", "scope": "scope-1"}
+        )
+
+    def test_async_engine_returns_early_when_unchanged(self):
+        watermark = SyncWatermark()
+        watermark.advance("2026-05-10T00:00:00.000Z", sync_scope(USER_SETTING))
+        notion_service = MagicMock()
+        google_service = MagicMock()
+        notion_service.get_latest_notion_edit_time = AsyncMock(return_value=LINKED_TASK["last_edited_time"])
+        notion_service.get_notion_task = AsyncMock()
+        google_service.probe_gcal_changes = AsyncMock(return_value=(False, 1))
+        google_service.get_gcal_event = AsyncMock()
+
+        with patch.dict(os.environ, PROBE_ON):
+            result = asyncio.run(
+                synchronize_notion_and_google_calendar_async(
+                    copy.deepcopy(USER_SETTING),
+                    notion_service,
+                    google_service,
+                    checkpoint=SyncCheckpoint(),
+                    watermark=watermark,
+                )
+            )
+
+        self.assertEqual(result["body"]["message"]["summary"]["change_probe"]["result"], "unchanged")
+        google_service.probe_gcal_changes.assert_awaited_once_with("2026-05-09T23:59:00.000Z")
+        notion_service.get_notion_task.assert_not_awaited()
+
+
+class ChangeProbeServiceTests(unittest.TestCase):
+    def test_probe_against_fake_servers_sees_only_changes_after_the_watermark(self):
+        from benchmarks.dataset import build_dataset
+        from benchmarks.fake_servers import FakeCalendarServer, FakeNotionServer
+        from benchmarks.run_benchmark import _build_blocking_services
+
+        pages, events_by_calendar, user_setting = build_dataset(task_count=3, event_count=3)
+        notion_server = self.enterContext(FakeNotionServer(pages))
+        calendar_server = self.enterContext(FakeCalendarServer(events_by_calendar))
+        notion_service, google_service = _build_blocking_services(
+            user_setting, notion_server.url, calendar_server.url, keep_rate_limits=False
+        )
+        self.addCleanup(google_service.close)
+        latest_edit = max(page["last_edited_time"] for page in pages)
+        latest_update = max(event["updated"] for events in events_by_calendar.values() for event in events)
+
+        self.assertEqual(notion_service.get_latest_notion_edit_time(), latest_edit)
+        self.assertEqual(
+            google_service.probe_gcal_changes("2099-01-01T00:00:00.000Z"), (False, len(events_by_calendar))
+        )
+        self.assertTrue(google_service.probe_gcal_changes(latest_update)[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
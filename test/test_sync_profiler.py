@@ -0,0 +1,116 @@
+import os
+import pstats
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+SRC_ROOT = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+from utils.sync_profiler import (  # noqa: E402
+    LocalProfileSink,
+    S3ProfileSink,
+    _collapsed_stacks,
+    profile_sync_run,
+)
+
+
+def _busy():
+    return sum(index * index for index in range(20_000))
+
+
+class SyncProfilerTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.sink = LocalProfileSink(self.tmp.name)
+
+    def _artifacts(self):
+        return sorted(os.listdir(self.tmp.name))
+
+    def test_disabled_by_default(self):
+        with patch.dict(os.environ, {"SYNC_PROFILE": ""}):
+            with profile_sync_run("main", "uuid-1", sink=self.sink) as name:
+                _busy()
+
+        self.assertIsNone(name)
+        self.assertEqual(self._artifacts(), [])
+
+    def test_cprofile_writes_a_loadable_pstats_file(self):
+        with patch.dict(os.environ, {"SYNC_PROFILE": "cprofile", "SYNC_PROFILE_UUIDS": ""}):
+            with profile_sync_run("main", "uuid-1", sink=self.sink):
+                _busy()
+
+        (artifact,) = self._artifacts()
+        self.assertTrue(artifact.startswith("main-uuid-1-"))
+        self.assertTrue(artifact.endswith(".pstats"))
+        stats = pstats.Stats(os.path.join(self.tmp.name, artifact))
+        self.assertTrue(any(func[2] == "_busy" for func in stats.stats))
+
+    def test_uuid_filter_and_nested_runs_produce_one_artifact(self):
+        env = {"SYNC_PROFILE": "cprofile", "SYNC_PROFILE_UUIDS": "uuid-slow"}
+        with patch.dict(os.environ, env):
+            with profile_sync_run("lambda", sink=self.sink) as outer:
+                with profile_sync_run("main", "uuid-fast", sink=self.sink):
+                    _busy()
+                with profile_sync_run("main", "uuid-slow", sink=self.sink) as profiled:
+                    with profile_sync_run("main", "uuid-slow", sink=self.sink) as nested:
+                        _busy()
+
+        self.assertIsNone(outer)
+        self.assertIsNotNone(profiled)
+        self.assertIsNone(nested)
+        self.assertEqual(len(self._artifacts()), 1)
+
+    def test_missing_pyinstrument_falls_back_to_cprofile(self):
+        with patch.dict(os.environ, {"SYNC_PROFILE": "pyinstrument", "SYNC_PROFILE_UUIDS": ""}):
+            with patch.dict(sys.modules, {"pyinstrument": None}):
+                with profile_sync_run("main", "uuid-1", sink=self.sink):
+                    _busy()
+
+        (artifact,) = self._artifacts()
+        self.assertTrue(artifact.endswith(".pstats"))
+
+    def test_artifact_is_written_when_the_run_raises_and_sink_errors_are_swallowed(self):
+        with patch.dict(os.environ, {"SYNC_PROFILE": "cprofile", "SYNC_PROFILE_UUIDS": ""}):
+            with self.assertRaises(RuntimeError):
+                with profile_sync_run("main", "uuid-1", sink=self.sink):
+                    raise RuntimeError("sync failed")
+            with profile_sync_run("main", "uuid-2", sink=MagicMock(side_effect=OSError("disk full"))):
+                _busy()
+
+        self.assertEqual(len(self._artifacts()), 1)
+
+    def test_collapsed_stacks_fold_self_time_per_call_path(self):
+        def frame(function, time, children=()):
+            return SimpleNamespace(
+                function=function, file_path_short="sync.py", line_no=1, time=time, children=list(children)
+            )
+
+        root = frame("main", 1.0, [frame("fetch", 0.6), frame("write", 0.3)])
+
+        lines = _collapsed_stacks(root).decode().splitlines()
+
+        self.assertEqual(
+            lines,
+            [
+                "main (sync.py:1) 100000",
+                "main (sync.py:1);fetch (sync.py:1) 600000",
+                "main (sync.py:1);write (sync.py:1) 300000",
+            ],
+        )
+
+    def test_s3_sink_uploads_under_prefix(self):
+        client = MagicMock()
+
+        location = S3ProfileSink("profiles-bucket", "sync/", client=client)("main-uuid.pstats", b"data")
+
+        self.assertEqual(location, "s3://profiles-bucket/sync/main-uuid.pstats")
+        client.put_object.assert_called_once_with(Bucket="profiles-bucket", Key="sync/main-uuid.pstats", Body=b"data")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,271 @@
+import asyncio
+import copy
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = REPO_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+sys.path.insert(0, str(REPO_ROOT))
+
+from sync.sync import replay_retry_ledger, synchronize_notion_and_google_calendar  # noqa: E402
+from sync.sync_async import replay_retry_ledger_async, synchronize_notion_and_google_calendar_async  # noqa: E402
+from sync.sync_checkpoint import SyncCheckpoint  # noqa: E402
+from sync.sync_probe import SyncWatermark, sync_scope  # noqa: E402
+from sync.sync_retry_ledger import SyncRetryLedger  # noqa: E402
+from utils.lambda_utils import sync_result_requires_retry  # noqa: E402
+
+USER_SETTING = {
+    "database_id": "db-1",
+    "before_date": "2026-06-01",
+    "after_date": "2026-05-01",
+    "google_timemin": "2026-05-01T00:00:00Z",
+    "google_timemax": "2026-06-01T00:00:00Z",
+    "page_property": {
+        "Task_Notion_Name": "Task Name",
+        "Date_Notion_Name": "Date",
+        "GCal_Name_Notion_Name": "Calendar",
+        "GCal_EventId_Notion_Name": "GCal Event Id",
+        "GCal_Sync_Time_Notion_Name": "GCal Sync Time",
+        "Delete_Notion_Name": "Delete",
+    },
+    "gcal_name_dict": {"Primary": "primary@example.com"},
+    "gcal_id_dict": {"primary@example.com": "Primary"},
+    "gcal_default_name": "Primary",
+    "gcal_default_id": "primary@example.com",
+}
+
+# Edited in Notion after the event was updated, so the sync plans update_gcal.
+EDITED_TASK = {
+    "id": "page-1",
+    "last_edited_time": "2026-05-09T00:00:00.000Z",
+    "properties": {
+        "Calendar": {"select": {"name": "Primary"}},
+        "GCal Event Id": {"rich_text": [{"plain_text": "evt-1"}]},
+        "GCal Sync Time": {"rich_text": []},
+        "Delete": {"checkbox": False},
+    },
+}
+LINKED_EVENT = {
+    "id": "evt-1",
+    "summary": "Task",
+    "updated": "2026-05-01T00:00:00.000Z",
+    "organizer": {"email": "primary@example.com"},
+    "start": {"date": "2026-05-23"},
+}
+PROBE_ON = {"SYNC_CHANGE_PROBE": ""}
+
+
+def _services():
+    notion_service = MagicMock()
+    google_service = MagicMock()
+    notion_service.get_notion_task.return_value = ({}, [copy.deepcopy(EDITED_TASK)])
+    notion_service.get_notion_task_by_id.return_value = copy.deepcopy(EDITED_TASK)
+    notion_service.get_latest_notion_edit_time.return_value = "2026-05-01T00:00:00.000Z"
+    google_service.get_gcal_event.return_value = [copy.deepcopy(LINKED_EVENT)]
+    google_service.get_gcal_event_by_id.return_value = copy.deepcopy(LINKED_EVENT)
+    google_service.probe_gcal_changes.return_value = (False, 1)
+    return notion_service, google_service
+
+
+def _persisted_payload(result):
+    return {"statusCode": result["statusCode"], "status": result["body"]["status"], **result["body"]}
+
+
+class SyncRetryLedgerTests(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = self.enterContext(tempfile.TemporaryDirectory())
+        self.config = {"mode": "local", "sync_retry_ledger_path": Path(tmp_dir) / "ledger.json"}
+
+    def _sync(self, notion_service, google_service, retry_ledger, watermark=None):
+        with patch.dict(os.environ, PROBE_ON):
+            return synchronize_notion_and_google_calendar(
+                copy.deepcopy(USER_SETTING),
+                notion_service,
+                google_service,
+                checkpoint=SyncCheckpoint(),
+                watermark=watermark,
+                retry_ledger=retry_ledger,
+            )
+
+    def test_failed_item_is_ledgered_and_the_record_is_acked(self):
+        notion_service, google_service = _services()
+        google_service.update_gcal_event.side_effect = RuntimeError("boom")
+
+        result = self._sync(notion_service, google_service, SyncRetryLedger(self.config))
+
+        errors = result["body"]["message"]["errors"]
+        self.assertTrue(errors[0]["retriable"])
+        self.assertTrue(errors[0]["retry_scheduled"])
+        self.assertFalse(sync_result_requires_retry(_persisted_payload(result)))
+        entry = SyncRetryLedger(self.config).entries["notion:page-1"]
+        self.assertEqual(
+            (entry["action"], entry["gcal_event_id"], entry["calendar_id"], entry["attempts"]),
+            ("update_gcal", "evt-1", "primary@example.com", 1),
+        )
+
+    def test_without_a_durable_ledger_the_record_is_still_retried(self):
+        notion_service, google_service = _services()
+        google_service.update_gcal_event.side_effect = RuntimeError("boom")
+
+        result = self._sync(notion_service, google_service, SyncRetryLedger())
+
+        self.assertNotIn("retry_scheduled", result["body"]["message"]["errors"][0])
+        self.assertFalse(result["body"]["message"]["summary"]["retry_ledger"]["durable"])
+        self.assertTrue(sync_result_requires_retry(_persisted_payload(result)))
+
+    def test_unchanged_probe_replays_only_the_ledger_items(self):
+        watermark = SyncWatermark()
+        notion_service, google_service = _services()
+        google_service.update_gcal_event.side_effect = RuntimeError("boom")
+        self._sync(notion_service, google_service, SyncRetryLedger(self.config), watermark)
+        # Only the ledgered error was left, so the watermark advanced and the next probe finds nothing new.
+        self.assertIsNotNone(watermark.synced_at(sync_scope(USER_SETTING)))
+        google_service.update_gcal_event.side_effect = None
+
+        result = self._sync(notion_service, google_service, SyncRetryLedger(self.config), watermark)
+
+        summary = result["body"]["message"]["summary"]
+        self.assertEqual(summary["change_probe"]["result"], "unchanged")
+        self.assertEqual(summary["retry_replay"], {"replayed": 1, "failed": 0})
+        self.assertEqual(summary["action_counts"], {"update_gcal": 1})
+        notion_service.get_notion_task.assert_called_once()
+        google_service.get_gcal_event_by_id.assert_called_once_with("primary@example.com", "evt-1")
+        self.assertEqual(SyncRetryLedger(self.config).entries, {})
+
+    def test_attempts_accumulate_until_the_item_is_given_up(self):
+        notion_service, google_service = _services()
+        google_service.update_gcal_event.side_effect = RuntimeError("boom")
+        self._sync(notion_service, google_service, SyncRetryLedger(self.config))
+
+        with patch.dict(os.environ, {"SYNC_RETRY_MAX_ATTEMPTS": "2"}):
+            retried = replay_retry_ledger(
+                copy.deepcopy(USER_SETTING), notion_service, google_service, SyncRetryLedger(self.config)
+            )
+
+        summary = retried["body"]["message"]["summary"]
+        self.assertEqual(summary["retry_ledger"], {"pending_count": 0, "exhausted_count": 1, "durable": True})
+        self.assertTrue(sync_result_requires_retry(_persisted_payload(retried)))
+        notion_service.get_notion_task.assert_called_once()
+
+    def test_replay_drops_items_that_are_gone_or_already_created(self):
+        ledger = SyncRetryLedger(self.config)
+        ledger.entries = {
+            "notion:page-gone": {"action": "update_gcal", "notion_task_id": "page-gone", "gcal_event_id": "evt-9"},
+            "gcal:evt-2": {"action": "create_notion", "gcal_event_id": "evt-2", "calendar_id": "primary@example.com"},
+        }
+        notion_service, google_service = _services()
+        notion_service.get_notion_task_by_id.return_value = None
+        notion_service.get_notion_task_by_gcal_event_id.return_value = [{"id": "page-2"}]
+
+        result = replay_retry_ledger(copy.deepcopy(USER_SETTING), notion_service, google_service, ledger)
+
+        self.assertEqual(result["body"]["status"], "sync_success")
+        self.assertEqual(result["body"]["message"]["summary"]["action_counts"], {})
+        notion_service.create_notion_task.assert_not_called()
+        self.assertEqual(SyncRetryLedger(self.config).entries, {})
+
+    def test_replay_of_an_unlinked_task_finds_its_event_by_page_id(self):
+        ledger = SyncRetryLedger(self.config)
+        ledger.entries = {"notion:page-1": {"action": "create_gcal", "notion_task_id": "page-1"}}
+        notion_service, google_service = _services()
+        unlinked_task = copy.deepcopy(EDITED_TASK)
+        unlinked_task["properties"]["GCal Event Id"] = {"rich_text": []}
+        notion_service.get_notion_task_by_id.return_value = unlinked_task
+        google_service.find_gcal_events_by_notion_page_id.return_value = [
+            {**LINKED_EVENT, "extendedProperties": {"private": {"notionPageId": "page-1"}}}
+        ]
+
+        result = replay_retry_ledger(copy.deepcopy(USER_SETTING), notion_service, google_service, ledger)
+
+        self.assertEqual(result["body"]["message"]["summary"]["action_counts"], {"update_gcal": 1})
+        google_service.find_gcal_events_by_notion_page_id.assert_called_once_with("page-1", ["primary@example.com"])
+        google_service.create_gcal_event.assert_not_called()
+
+    def test_async_replay_retries_only_the_ledger_items(self):
+        ledger = SyncRetryLedger(self.config)
+        ledger.entries = {
+            "notion:page-1": {"action": "update_gcal", "notion_task_id": "page-1", "gcal_event_id": "evt-1"},
+        }
+        notion_service = MagicMock()
+        google_service = MagicMock()
+        notion_service.get_notion_task = AsyncMock()
+        notion_service.get_notion_task_by_id = AsyncMock(return_value=copy.deepcopy(EDITED_TASK))
+        notion_service.update_notion_task_for_new_gcal_sync_time = AsyncMock()
+        google_service.get_gcal_event_by_id = AsyncMock(return_value=copy.deepcopy(LINKED_EVENT))
+        google_service.update_gcal_event = AsyncMock()
+
+        result = asyncio.run(
+            replay_retry_ledger_async(copy.deepcopy(USER_SETTING), notion_service, google_service, ledger)
+        )
+
+        summary = result["body"]["message"]["summary"]
+        self.assertEqual(summary["retry_replay"], {"replayed": 1, "failed": 0})
+        self.assertEqual(summary["action_counts"], {"update_gcal": 1})
+        notion_service.get_notion_task.assert_not_called()
+        self.assertEqual(SyncRetryLedger(self.config).entries, {})
+
+    def test_async_engine_replays_the_ledger_when_unchanged(self):
+        ledger = SyncRetryLedger(self.config)
+        ledger.record_failure(
+            {"action": "update_gcal", "notion_task_id": "page-1", "gcal_event_id": "evt-1", "retriable": True},
+            calendar_id="primary@example.com",
+        )
+        ledger.finish_run()
+        watermark = SyncWatermark()
+        watermark.advance("2026-05-10T00:00:00.000Z", sync_scope(USER_SETTING))
+        notion_service = MagicMock()
+        google_service = MagicMock()
+        notion_service.get_latest_notion_edit_time = AsyncMock(return_value="2026-05-01T00:00:00.000Z")
+        notion_service.get_notion_task = AsyncMock()
+        notion_service.get_notion_task_by_id = AsyncMock(return_value=copy.deepcopy(EDITED_TASK))
+        notion_service.update_notion_task_for_new_gcal_sync_time = AsyncMock()
+        google_service.probe_gcal_changes = AsyncMock(return_value=(False, 1))
+        google_service.get_gcal_event_by_id = AsyncMock(return_value=copy.deepcopy(LINKED_EVENT))
+        google_service.update_gcal_event = AsyncMock()
+
+        with patch.dict(os.environ, PROBE_ON):
+            result = asyncio.run(
+                synchronize_notion_and_google_calendar_async(
+                    copy.deepcopy(USER_SETTING),
+                    notion_service,
+                    google_service,
+                    checkpoint=SyncCheckpoint(),
+                    watermark=watermark,
+                    retry_ledger=SyncRetryLedger(self.config),
+                )
+            )
+
+        self.assertEqual(result["body"]["message"]["summary"]["action_counts"], {"update_gcal": 1})
+        notion_service.get_notion_task.assert_not_awaited()
+        google_service.update_gcal_event.assert_awaited_once()
+        self.assertEqual(SyncRetryLedger(self.config).entries, {})
+
+
+class RetryLookupServiceTests(unittest.TestCase):
+    def test_get_by_id_against_fake_servers(self):
+        from benchmarks.dataset import build_dataset
+        from benchmarks.fake_servers import FakeCalendarServer, FakeNotionServer
+        from benchmarks.run_benchmark import _build_blocking_services
+
+        pages, events_by_calendar, user_setting = build_dataset(task_count=2, event_count=2)
+        notion_server = self.enterContext(FakeNotionServer(pages))
+        calendar_server = self.enterContext(FakeCalendarServer(events_by_calendar))
+        notion_service, google_service = _build_blocking_services(
+            user_setting, notion_server.url, calendar_server.url, keep_rate_limits=False
+        )
+        self.addCleanup(google_service.close)
+        calendar_id, events = next(iter(events_by_calendar.items()))
+
+        self.assertEqual(notion_service.get_notion_task_by_id(pages[0]["id"])["id"], pages[0]["id"])
+        self.assertIsNone(notion_service.get_notion_task_by_id("missing-page"))
+        self.assertEqual(google_service.get_gcal_event_by_id(calendar_id, events[0]["id"])["id"], events[0]["id"])
+        self.assertIsNone(google_service.get_gcal_event_by_id(calendar_id, "missing-event"))
+
+
+if __name__ == "__main__":
+    unittest.main()
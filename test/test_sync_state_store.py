@@ -0,0 +1,59 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+SRC_ROOT = Path(__file__).resolve().parents[1] / "src"
+sys.path.insert(0, str(SRC_ROOT))
+
+from sync.sync_state_store import SyncStateStore  # noqa: E402
+
+
+class SyncStateStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name) / "nested" / "state.json"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_local_store_round_trips_and_deletes_a_json_file(self):
+        store = SyncStateStore({"mode": "local", "state_path": str(self.path)}, "syncState", "state_path")
+
+        self.assertTrue(store.durable)
+        self.assertIsNone(store.read())
+        store.save({"version": 1})
+        self.assertEqual(store.read(), {"version": 1})
+        self.assertFalse(self.path.with_suffix(".json.tmp").exists())
+        store.delete()
+        self.assertFalse(self.path.exists())
+
+    def test_store_without_a_backing_location_is_not_durable(self):
+        store = SyncStateStore({"mode": "local"}, "syncState", "state_path")
+
+        self.assertFalse(store.durable)
+        self.assertIsNone(store.read())
+        store.save({"version": 1})
+        store.delete()
+
+    def test_cloud_store_reads_and_writes_the_named_attribute(self):
+        store = SyncStateStore({"mode": "cloud", "uuid": "u-1"}, "syncState", "state_path")
+
+        with (
+            patch("utils.dynamodb_utils.get_sync_state_by_uuid", return_value={"version": 1}) as mock_get,
+            patch("utils.dynamodb_utils.save_sync_state_by_uuid") as mock_save,
+            patch("utils.dynamodb_utils.delete_sync_state_by_uuid") as mock_delete,
+        ):
+            self.assertEqual(store.read(), {"version": 1})
+            store.save({"version": 2})
+            store.delete()
+
+        self.assertTrue(store.durable)
+        mock_get.assert_called_once_with("u-1", "syncState")
+        mock_save.assert_called_once_with("u-1", "syncState", {"version": 2})
+        mock_delete.assert_called_once_with("u-1", "syncState")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = REPO_ROOT / "src"
+sys.path.insert(0, str(SRC_ROOT))
+sys.path.insert(0, str(REPO_ROOT))
+
+from notion.notion_token import NotionToken  # noqa: E402
+from sync.sync import synchronize_notion_and_google_calendar  # noqa: E402
+from sync.sync_checkpoint import SyncCheckpoint  # noqa: E402
+from utils.sync_timings import SyncTimings, merge_timings, timing_span  # noqa: E402
+
+USER_SETTING = {
+    "page_property": {
+        "Task_Notion_Name": "Task Name",
+        "Date_Notion_Name": "Date",
+        "GCal_Name_Notion_Name": "Calendar",
+        "GCal_EventId_Notion_Name": "GCal Event Id",
+        "GCal_Sync_Time_Notion_Name": "GCal Sync Time",
+        "Delete_Notion_Name": "Delete",
+    },
+    "gcal_name_dict": {"Primary": "primary@example.com"},
+    "gcal_id_dict": {"primary@example.com": "Primary"},
+    "gcal_default_name": "Primary",
+    "gcal_default_id": "primary@example.com",
+}
+
+NOTION_TASK = {
+    "id": "page-1",
+    "last_edited_time": "2026-05-02T00:00:00.000Z",
+    "properties": {
+        "Calendar": {"select": {"name": "Primary"}},
+        "GCal Event Id": {"rich_text": []},
+        "Delete": {"checkbox": False},
+        "GCal Sync Time": {"rich_text": []},
+    },
+}
+
+GCAL_EVENT = {
+    "id": "evt-1",
+    "summary": "Event",
+    "updated": "2026-05-01T00:00:00.000Z",
+    "organizer": {"email": "primary@example.com"},
+    "start": {"date": "2026-05-23"},
+    "end": {"date": "2026-05-24"},
+}
+
+
+class SyncTimingsTests(unittest.TestCase):
+    def test_spans_aggregate_count_total_and_max(self):
+        timings = SyncTimings()
+        timings.add("write.create_gcal", 4.0)
+        timings.add("write.create_gcal", 10.0)
+        with self.assertRaises(RuntimeError):
+            with timings.span("config_load"):
+                raise RuntimeError("boom")
+
+        spans = timings.to_dict()
+        self.assertEqual(spans["write.create_gcal"], {"count": 2, "total_ms": 14.0, "max_ms": 10.0})
+        self.assertEqual(spans["config_load"]["count"], 1)
+
+    def test_merge_counts_a_shared_recorder_once(self):
+        shared = SyncTimings()
+        shared.add("planning", 1.0)
+        other = SyncTimings()
+        other.add("planning", 3.0)
+
+        merged = merge_timings(shared, shared, other, MagicMock(), None)
+
+        self.assertEqual(merged["planning"], {"count": 2, "total_ms": 4.0, "max_ms": 3.0})
+
+    def test_timing_span_without_a_recorder_is_a_no_op(self):
+        with timing_span(None, "anything"):
+            pass
+
+    def test_sync_summary_reports_planning_and_write_spans(self):
+        timings = SyncTimings()
+        timings.add("config_load", 2.0)
+        notion_service = MagicMock()
+        google_service = MagicMock()
+        notion_service.get_notion_task.return_value = ({"action": "get_notion_task"}, [NOTION_TASK])
+        google_service.get_gcal_event.return_value = [dict(GCAL_EVENT)]
+        google_service.create_gcal_event.return_value = "evt-new"
+
+        result = synchronize_notion_and_google_calendar(
+            USER_SETTING, notion_service, google_service, checkpoint=SyncCheckpoint(), timings=timings
+        )
+
+        spans = result["body"]["message"]["summary"]["timings"]["spans"]
+        self.assertEqual(spans["config_load"]["count"], 1)
+        self.assertEqual(spans["planning"]["count"], 2)
+        self.assertEqual(spans["write.create_gcal"]["count"], 1)
+        self.assertEqual(spans["write.create_notion"]["count"], 1)
+
+    def test_notion_token_records_decrypt_span(self):
+        timings = SyncTimings()
+        with patch.dict(os.environ, {"NOTION_TOKEN": "secret_plain"}):
+            token = NotionToken({"mode": "local"}, MagicMock(), timings=timings).get()
+
+        self.assertEqual(token, "secret_plain")
+        self.assertEqual(timings.to_dict()["token_decrypt"]["count"], 1)
+
+    def test_real_services_record_fetch_spans_per_calendar_and_page(self):
+        from benchmarks.run_benchmark import run_benchmark
+
+        report = run_benchmark(tasks=6, events=6, iterations=1, warmup=0, notion_page_size=2)
+
+        spans = report["last_run_spans"]
+        self.assertEqual(spans["notion_fetch_page"]["count"], 3)
+        self.assertEqual(spans["gcal_fetch_calendar.Work"]["count"], 1)
+        self.assertEqual(spans["gcal_fetch_calendar.Home"]["count"], 1)
+        self.assertIn("write.update_gcal", spans)
+
+
+if __name__ == "__main__":
+    unittest.main()